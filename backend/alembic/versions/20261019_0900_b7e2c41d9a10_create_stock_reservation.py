@@ -0,0 +1,55 @@
+"""create_stock_reservation
+
+Revision ID: b7e2c41d9a10
+Revises: 94cb9d806db6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c41d9a10'
+down_revision: Union[str, None] = '94cb9d806db6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Período de locação do orçamento
+    op.add_column('quote', sa.Column('rental_start', sa.DateTime(), nullable=True))
+    op.add_column('quote', sa.Column('rental_end', sa.DateTime(), nullable=True))
+
+    op.create_table(
+        'stockreservation',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quote_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.DateTime(), nullable=False),
+        sa.Column('end_date', sa.DateTime(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['product.id']),
+        sa.ForeignKeyConstraint(['quote_id'], ['quote.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_stockreservation_quote_id', 'stockreservation', ['quote_id'])
+    op.create_index(
+        'ix_stockreservation_product_period',
+        'stockreservation',
+        ['product_id', 'start_date', 'end_date'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stockreservation_product_period', table_name='stockreservation')
+    op.drop_index('ix_stockreservation_quote_id', table_name='stockreservation')
+    op.drop_table('stockreservation')
+    op.drop_column('quote', 'rental_end')
+    op.drop_column('quote', 'rental_start')
@@ -0,0 +1,128 @@
+"""partition_auditlog
+
+Revision ID: c3f9a2e18b54
+Revises: b7e2c41d9a10
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a2e18b54'
+down_revision: Union[str, None] = 'b7e2c41d9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Meses à frente criados já na migração (depois: audit_retention.py ensure)
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, created_at, updated_at, table_name, record_id, action, user_id, changes"
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_auditlog_record_timeline', 'auditlog', ['table_name', 'record_id', 'created_at'])
+    op.create_index('ix_auditlog_created_at', 'auditlog', ['created_at'])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    has_table = inspector.has_table('auditlog')
+
+    if bind.dialect.name != 'postgresql':
+        # Sem particionamento: apenas os índices
+        if has_table:
+            existing = {ix['name'] for ix in inspector.get_indexes('auditlog')}
+            if 'ix_auditlog_record_timeline' not in existing:
+                _create_indexes()
+        return
+
+    if has_table:
+        # A tabela atual vira legado; a sequência do id é reaproveitada
+        op.execute("DROP INDEX IF EXISTS ix_auditlog_record_timeline")
+        op.execute("DROP INDEX IF EXISTS ix_auditlog_created_at")
+        op.execute("ALTER TABLE auditlog RENAME TO auditlog_legacy")
+        op.execute("ALTER INDEX IF EXISTS auditlog_pkey RENAME TO auditlog_legacy_pkey")
+        op.execute("ALTER SEQUENCE IF EXISTS auditlog_id_seq OWNED BY NONE")
+    op.execute("CREATE SEQUENCE IF NOT EXISTS auditlog_id_seq")
+
+    # A chave primária precisa incluir a coluna de particionamento
+    op.execute("""
+        CREATE TABLE auditlog (
+            id INTEGER NOT NULL DEFAULT nextval('auditlog_id_seq'),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            table_name VARCHAR NOT NULL,
+            record_id INTEGER NOT NULL,
+            action VARCHAR NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES "user" (id),
+            changes JSON,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY auditlog.id")
+    op.execute("CREATE TABLE auditlog_default PARTITION OF auditlog DEFAULT")
+
+    # Uma partição por mês, do registro mais antigo até MONTHS_AHEAD à frente
+    first = date.today().replace(day=1)
+    if has_table:
+        oldest = bind.execute(sa.text("SELECT min(created_at) FROM auditlog_legacy")).scalar()
+        if oldest:
+            first = min(first, oldest.date().replace(day=1))
+    last = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+
+    month = first
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE auditlog_y{month.year}m{month.month:02d} PARTITION OF auditlog "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        month = following
+
+    if has_table:
+        op.execute(f"INSERT INTO auditlog ({COLUMNS}) SELECT {COLUMNS} FROM auditlog_legacy")
+        op.execute("DROP TABLE auditlog_legacy")
+
+    # Índices no pai são propagados para todas as partições
+    _create_indexes()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_auditlog_created_at', table_name='auditlog')
+        op.drop_index('ix_auditlog_record_timeline', table_name='auditlog')
+        return
+
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE auditlog RENAME TO auditlog_partitioned")
+    op.execute("ALTER INDEX auditlog_pkey RENAME TO auditlog_partitioned_pkey")
+    op.execute("""
+        CREATE TABLE auditlog (
+            id INTEGER NOT NULL DEFAULT nextval('auditlog_id_seq'),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            table_name VARCHAR NOT NULL,
+            record_id INTEGER NOT NULL,
+            action VARCHAR NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES "user" (id),
+            changes JSON,
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"INSERT INTO auditlog ({COLUMNS}) SELECT {COLUMNS} FROM auditlog_partitioned")
+    # Remove o pai e todas as partições
+    op.execute("DROP TABLE auditlog_partitioned CASCADE")
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY auditlog.id")
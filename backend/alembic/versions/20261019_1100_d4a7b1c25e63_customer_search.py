@@ -0,0 +1,72 @@
+"""customer_search
+
+Revision ID: d4a7b1c25e63
+Revises: c3f9a2e18b54
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7b1c25e63'
+down_revision: Union[str, None] = 'c3f9a2e18b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Busca de clientes (services/customer_search.py). Só existe no Postgres;
+    # nos demais bancos a busca usa ILIKE sem índice.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() é STABLE; colunas geradas e índices exigem IMMUTABLE.
+    # Fixar o dicionário torna o wrapper seguro para isso.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """)
+
+    # Texto normalizado (minúsculo, sem acento) para trigramas e LIKE
+    op.execute("""
+        ALTER TABLE customer ADD COLUMN search_text TEXT GENERATED ALWAYS AS (
+            f_unaccent(lower(
+                coalesce(name, '') || ' ' ||
+                coalesce(fantasy_name, '') || ' ' ||
+                coalesce(document, '') || ' ' ||
+                coalesce(email, '') || ' ' ||
+                coalesce(city, '') || ' ' ||
+                coalesce(contact_name, '')
+            ))
+        ) STORED
+    """)
+
+    # Documento de busca com peso: nomes > contato/cidade > documento/email
+    op.execute("""
+        ALTER TABLE customer ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', f_unaccent(coalesce(name, '') || ' ' || coalesce(fantasy_name, ''))), 'A') ||
+            setweight(to_tsvector('simple', f_unaccent(coalesce(contact_name, '') || ' ' || coalesce(city, ''))), 'B') ||
+            setweight(to_tsvector('simple', coalesce(document, '') || ' ' || coalesce(email, '')), 'C')
+        ) STORED
+    """)
+
+    op.execute("CREATE INDEX ix_customer_search_vector ON customer USING gin (search_vector)")
+    op.execute("CREATE INDEX ix_customer_search_text_trgm ON customer USING gin (search_text gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_customer_search_text_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_customer_search_vector")
+    op.execute("ALTER TABLE customer DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE customer DROP COLUMN IF EXISTS search_text")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
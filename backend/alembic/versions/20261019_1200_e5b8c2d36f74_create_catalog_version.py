@@ -0,0 +1,36 @@
+"""create_catalog_version
+
+Revision ID: e5b8c2d36f74
+Revises: d4a7b1c25e63
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8c2d36f74'
+down_revision: Union[str, None] = 'd4a7b1c25e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    catalogversion = op.create_table(
+        'catalogversion',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(catalogversion, [
+        {'name': 'product', 'version': 0},
+        {'name': 'service', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('catalogversion')
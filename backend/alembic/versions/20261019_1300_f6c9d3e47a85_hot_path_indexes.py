@@ -0,0 +1,54 @@
+"""hot_path_indexes
+
+Revision ID: f6c9d3e47a85
+Revises: e5b8c2d36f74
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c9d3e47a85'
+down_revision: Union[str, None] = 'e5b8c2d36f74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Índices parciais: mesmo predicado no Postgres e no SQLite
+ACTIVE_CUSTOMER = sa.text("status <> 'excluido'")
+
+# (nome, tabela, colunas, predicado postgres, predicado sqlite)
+INDEXES = [
+    ('ix_customer_status', 'customer', ['status'], None, None),
+    ('ix_customer_active', 'customer', ['id'], ACTIVE_CUSTOMER, ACTIVE_CUSTOMER),
+    ('ix_customer_active_salesperson', 'customer', ['salesperson_id', 'id'], ACTIVE_CUSTOMER, ACTIVE_CUSTOMER),
+    ('ix_customernote_customer_created', 'customernote', ['customer_id', 'created_at'], None, None),
+    ('ix_feeditem_user_id_id', 'feeditem', ['user_id', 'id'], None, None),
+    ('ix_feeditem_created_at', 'feeditem', ['created_at'], None, None),
+    ('ix_notification_unread', 'notification', ['user_id', 'id'],
+     sa.text("is_read = false"), sa.text("is_read = 0")),
+    ('ix_quote_status_created_at', 'quote', ['status', 'created_at'], None, None),
+    ('ix_quote_created_at', 'quote', ['created_at'], None, None),
+    ('ix_quote_customer_created', 'quote', ['customer_id', 'created_at'], None, None),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns, postgresql_where, sqlite_where in INDEXES:
+        # create_all do app pode já ter criado o índice
+        if name in {ix['name'] for ix in inspector.get_indexes(table)}:
+            continue
+        op.create_index(
+            name, table, columns,
+            postgresql_where=postgresql_where,
+            sqlite_where=sqlite_where,
+        )
+
+
+def downgrade() -> None:
+    for name, table, *_ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
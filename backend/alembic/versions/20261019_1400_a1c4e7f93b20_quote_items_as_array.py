@@ -0,0 +1,33 @@
+"""quote_items_as_array
+
+Revision ID: a1c4e7f93b20
+Revises: f6c9d3e47a85
+Create Date: 2026-10-19 14:00:00.000000
+
+Orçamentos criados pela API gravavam os itens com json.dumps dentro da
+coluna JSON (uma string JSON contendo a lista). Converte para a lista, o
+formato que o QuoteService grava agora e que permite contar os itens no
+banco (json_array_length) na listagem.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c4e7f93b20'
+down_revision: Union[str, None] = 'f6c9d3e47a85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("UPDATE quote SET items = (items #>> '{}')::json WHERE json_typeof(items) = 'string'")
+    else:
+        op.execute("UPDATE quote SET items = json_extract(items, '$') WHERE json_type(items) = 'text'")
+
+
+def downgrade() -> None:
+    # A lista é lida pelo código antigo também (json.loads só quando é string)
+    pass
@@ -0,0 +1,57 @@
+"""create_job
+
+Revision ID: b2d5f8a04c31
+Revises: a1c4e7f93b20
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d5f8a04c31'
+down_revision: Union[str, None] = 'a1c4e7f93b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tarefas em segundo plano (job_runner.py)
+    op.create_table(
+        'job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('message', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('artifact_path', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('artifact_name', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('artifact_type', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('worker', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_job_status', 'job', ['status', 'id'])
+    op.create_index('ix_job_user', 'job', ['user_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_user', table_name='job')
+    op.drop_index('ix_job_status', table_name='job')
+    op.drop_table('job')
@@ -0,0 +1,42 @@
+"""stock_reservation_cascade
+
+Revision ID: c8e1f4a7b259
+Revises: b2d5f8a04c31
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f4a7b259'
+down_revision: Union[str, None] = 'b2d5f8a04c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reservas liberadas continuam na tabela: sem CASCADE, apagar um
+    # orçamento que já foi aprovado viola a FK. O SQLite (testes) não
+    # altera constraints; lá a rota de exclusão apaga as reservas antes.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_constraint('stockreservation_quote_id_fkey', 'stockreservation', type_='foreignkey')
+    op.create_foreign_key(
+        'stockreservation_quote_id_fkey', 'stockreservation', 'quote',
+        ['quote_id'], ['id'], ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_constraint('stockreservation_quote_id_fkey', 'stockreservation', type_='foreignkey')
+    op.create_foreign_key(
+        'stockreservation_quote_id_fkey', 'stockreservation', 'quote',
+        ['quote_id'], ['id'],
+    )
@@ -0,0 +1,27 @@
+"""quote_reminder_sent_at
+
+Revision ID: d1f7a3c90e46
+Revises: c8e1f4a7b259
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f7a3c90e46'
+down_revision: Union[str, None] = 'c8e1f4a7b259'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Último lembrete de aprovação enviado (tarefa quote_reminders não reenvia)
+    op.add_column('quote', sa.Column('reminder_sent_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('quote', 'reminder_sent_at')
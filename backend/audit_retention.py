@@ -0,0 +1,202 @@
+"""
+Partições e retenção do AuditLog.
+
+No Postgres a tabela auditlog é particionada por mês (RANGE em created_at),
+com uma partição DEFAULT para datas sem partição própria. Este módulo:
+
+- ensure: cria as partições dos próximos meses (rodar mensalmente, ex.: cron)
+- prune:  remove partições inteiras mais antigas que o período de retenção,
+          com DROP (barato, sem DELETE linha a linha) ou movendo para o
+          schema audit_archive (--archive)
+
+Em bancos sem particionamento (ex.: SQLite em desenvolvimento), prune faz
+DELETE por data.
+
+Uso (dentro do container backend):
+    python audit_retention.py ensure --months-ahead 3
+    python audit_retention.py prune --keep-months 24 --archive
+    python audit_retention.py prune --keep-months 24 --dry-run
+"""
+
+from typing import List, Tuple, Optional
+from datetime import date, datetime
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+import argparse
+import re
+
+PARENT_TABLE = "auditlog"
+DEFAULT_PARTITION = "auditlog_default"
+ARCHIVE_SCHEMA = "audit_archive"
+
+_PARTITION_RE = re.compile(r"^auditlog_y(\d{4})m(\d{2})$")
+
+
+def add_months(day: date, months: int) -> date:
+    """Primeiro dia do mês `months` meses depois de `day`"""
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start: date) -> str:
+    return f"auditlog_y{month_start.year}m{month_start.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """True se auditlog é uma tabela particionada do Postgres"""
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).first())
+
+
+def list_partitions(connection: Connection) -> List[Tuple[str, date]]:
+    """Partições mensais existentes: [(nome, primeiro dia do mês)] em ordem"""
+    rows = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).all()
+    partitions = []
+    for (name,) in rows:
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def ensure_partition(connection: Connection, month_start: date) -> bool:
+    """
+    Cria a partição do mês, se ainda não existir.
+
+    Se a partição DEFAULT já recebeu linhas desse mês, elas são movidas para
+    a nova partição antes do ATTACH (o Postgres recusa criar a partição
+    enquanto a DEFAULT tiver linhas do intervalo).
+
+    Returns:
+        True se a partição foi criada
+    """
+    name = partition_name(month_start)
+    if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return False
+
+    start = month_start.isoformat()
+    end = add_months(month_start, 1).isoformat()
+    bounds = {"start": start, "end": end}
+
+    in_default = connection.execute(text(
+        f"SELECT count(*) FROM {DEFAULT_PARTITION} "
+        f"WHERE created_at >= :start AND created_at < :end"
+    ), bounds).scalar()
+
+    if not in_default:
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        return True
+
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+    connection.execute(text(
+        f"WITH moved AS ("
+        f"  DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end "
+        f"  RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    connection.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    return True
+
+
+def ensure_partitions(connection: Connection, months_ahead: int = 3, today: Optional[date] = None) -> List[str]:
+    """Garante partições do mês atual até `months_ahead` meses à frente"""
+    if not is_partitioned(connection):
+        return []
+    current = (today or date.today()).replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month_start = add_months(current, offset)
+        if ensure_partition(connection, month_start):
+            created.append(partition_name(month_start))
+    return created
+
+
+def prune(
+    connection: Connection,
+    keep_months: int,
+    archive: bool = False,
+    dry_run: bool = False,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Remove a auditoria anterior a `keep_months` meses completos.
+
+    Returns:
+        Descrição das ações executadas (ou planejadas, em dry_run)
+    """
+    cutoff = add_months((today or date.today()).replace(day=1), -keep_months)
+    actions = []
+
+    if not is_partitioned(connection):
+        if archive:
+            raise ValueError("--archive requer a tabela particionada (Postgres)")
+        actions.append(f"DELETE FROM {PARENT_TABLE} WHERE created_at < {cutoff.isoformat()}")
+        if not dry_run:
+            connection.execute(
+                text(f"DELETE FROM {PARENT_TABLE} WHERE created_at < :cutoff"),
+                {"cutoff": datetime.combine(cutoff, datetime.min.time())}
+            )
+        return actions
+
+    if archive and not dry_run:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+
+    for name, month_start in list_partitions(connection):
+        if add_months(month_start, 1) > cutoff:
+            continue
+        if archive:
+            actions.append(f"arquivar {name} em {ARCHIVE_SCHEMA}")
+            if not dry_run:
+                connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        else:
+            actions.append(f"remover {name}")
+            if not dry_run:
+                connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                connection.execute(text(f"DROP TABLE {name}"))
+    return actions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partições e retenção do AuditLog")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ensure_parser = subparsers.add_parser("ensure", help="Cria as partições dos próximos meses")
+    ensure_parser.add_argument("--months-ahead", type=int, default=3)
+
+    prune_parser = subparsers.add_parser("prune", help="Remove partições fora da retenção")
+    prune_parser.add_argument("--keep-months", type=int, required=True)
+    prune_parser.add_argument("--archive", action="store_true",
+                              help=f"Move as partições para o schema {ARCHIVE_SCHEMA} em vez de apagar")
+    prune_parser.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args()
+
+    from database import engine
+
+    with engine.begin() as connection:
+        if args.command == "ensure":
+            created = ensure_partitions(connection, args.months_ahead)
+            print(f"✅ Partições criadas: {', '.join(created) if created else 'nenhuma'}")
+        else:
+            actions = prune(connection, args.keep_months, args.archive, args.dry_run)
+            prefix = "🔎 (dry-run) " if args.dry_run else "🧹 "
+            for action in actions or ["nada a remover"]:
+                print(f"{prefix}{action}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Gravação de auditoria (AuditLog).
+
+Dois modos, escolhidos pela variável AUDIT_MODE:
+
+- transactional (padrão): a linha de auditoria entra na mesma transação da
+  operação de negócio. Um único commit grava as duas coisas.
+
+- buffered: as linhas ficam pendentes na sessão e, somente após o commit da
+  operação, vão para uma fila em memória. Uma thread grava a fila em lotes
+  (INSERT de várias linhas) quando atinge AUDIT_BATCH_SIZE ou a cada
+  AUDIT_FLUSH_INTERVAL segundos. Com a fila cheia, quem grava espera até
+  AUDIT_PUT_TIMEOUT e, se ainda não houver espaço, grava o próprio lote de
+  forma síncrona (backpressure: nada é descartado). Em rollback as linhas
+  pendentes são descartadas.
+
+Falha ao gravar um lote: novas tentativas com espera exponencial
+(AUDIT_RETRY_ATTEMPTS, começando em AUDIT_RETRY_BASE segundos). Esgotadas
+as tentativas, o lote vai para AUDIT_SPILL_PATH (um JSON por linha), que a
+thread de gravação reenvia ao banco quando a fila está ociosa. Só contam
+como descartadas (stats["dropped"]) linhas que nem o arquivo aceitou.
+Erros que não são de conexão (ex.: constraint) não se resolvem tentando de
+novo: o lote vai para o log e conta em stats["rejected"].
+
+O lifespan do app chama audit_sink.shutdown() para esvaziar a fila.
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import event, insert
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session
+import atexit
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from database import engine
+from models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_MODE = os.getenv("AUDIT_MODE", "transactional")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_PUT_TIMEOUT = float(os.getenv("AUDIT_PUT_TIMEOUT", "0.5"))
+AUDIT_RETRY_ATTEMPTS = int(os.getenv("AUDIT_RETRY_ATTEMPTS", "4"))
+AUDIT_RETRY_BASE = float(os.getenv("AUDIT_RETRY_BASE", "0.5"))
+AUDIT_SPILL_PATH = os.getenv("AUDIT_SPILL_PATH", os.path.join(tempfile.gettempdir(), "erp-audit-spill.ndjson"))
+
+# Campos de data das linhas (texto ISO no arquivo de reserva)
+_DATE_FIELDS = ("created_at", "updated_at")
+
+_PENDING_KEY = "audit_pending"
+
+
+class AuditSink:
+    """Destino das linhas de auditoria (transacional ou em buffer)"""
+
+    def __init__(
+        self,
+        mode: str = AUDIT_MODE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        queue_size: int = AUDIT_QUEUE_SIZE,
+        put_timeout: float = AUDIT_PUT_TIMEOUT,
+        retry_attempts: int = AUDIT_RETRY_ATTEMPTS,
+        retry_base: float = AUDIT_RETRY_BASE,
+        spill_path: str = AUDIT_SPILL_PATH
+    ):
+        if mode not in ("transactional", "buffered"):
+            raise ValueError(f"AUDIT_MODE inválido: {mode}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_base = retry_base
+        self.spill_path = spill_path
+        self._spill_lock = threading.Lock()
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.stats = {
+            "written": 0, "batches": 0, "sync_fallbacks": 0, "errors": 0,
+            "retries": 0, "spilled": 0, "replayed": 0, "dropped": 0, "rejected": 0,
+        }
+
+    # --- API usada pelos serviços ---
+
+    def write(
+        self,
+        session: Session,
+        table_name: str,
+        record_id: int,
+        action: str,
+        user_id: int,
+        changes: Dict
+    ) -> None:
+        """Registra uma linha de auditoria. Não faz commit."""
+        self.write_many(session, [{
+            "table_name": table_name,
+            "record_id": record_id,
+            "action": action,
+            "user_id": user_id,
+            "changes": changes,
+        }])
+
+    def write_many(self, session: Session, rows: List[Dict]) -> None:
+        """Registra várias linhas de auditoria. Não faz commit."""
+        if not rows:
+            return
+        now = datetime.utcnow()
+        for row in rows:
+            row.setdefault("created_at", now)
+            row.setdefault("updated_at", now)
+
+        if self.mode == "transactional":
+            if len(rows) == 1:
+                session.add(AuditLog(**rows[0]))
+            else:
+                session.execute(insert(AuditLog), rows)
+        else:
+            session.info.setdefault(_PENDING_KEY, []).extend(rows)
+
+    # --- Modo buffered ---
+
+    def enqueue(self, rows: List[Dict]) -> None:
+        """Coloca linhas já confirmadas na fila de gravação"""
+        self._ensure_worker()
+        for index, row in enumerate(rows):
+            try:
+                self._queue.put(row, timeout=self.put_timeout)
+            except queue.Full:
+                # Fila cheia: grava o restante no próprio thread do chamador
+                self.stats["sync_fallbacks"] += 1
+                self._insert(rows[index:])
+                return
+
+    def flush(self) -> int:
+        """Grava imediatamente tudo o que está na fila"""
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return written
+            self._insert(batch)
+            written += len(batch)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Para a thread de gravação e esvazia a fila (chamado no lifespan)"""
+        self._stopping.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+        self._thread = None
+        self._stopping.clear()
+
+    def _ensure_worker(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            # Iniciada sob demanda: cada processo (ex.: workers após fork) tem a sua
+            self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                try:
+                    self.replay_spill()
+                except Exception as e:
+                    logger.error(f"Falha ao ler o arquivo de reserva da auditoria: {e}")
+                continue
+
+            # Junta linhas até encher o lote ou vencer o intervalo
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stopping.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+                except queue.Empty:
+                    continue
+            self._insert(batch)
+
+    def _drain(self, limit: int) -> List[Dict]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows: List[Dict]) -> None:
+        with engine.begin() as connection:
+            connection.execute(insert(AuditLog), rows)
+
+    def _insert(self, rows: List[Dict]) -> None:
+        """Grava o lote com novas tentativas; esgotadas, manda para o arquivo de reserva"""
+        for attempt in range(self.retry_attempts):
+            try:
+                self._write(rows)
+                self.stats["written"] += len(rows)
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                self.stats["errors"] += 1
+                if not _transient(e):
+                    self._reject(rows, e)
+                    return
+                if attempt + 1 == self.retry_attempts:
+                    logger.error(f"Falha ao gravar {len(rows)} linhas de auditoria "
+                                 f"após {self.retry_attempts} tentativas: {e}")
+                    break
+                self.stats["retries"] += 1
+                delay = self.retry_base * 2 ** attempt
+                logger.warning(f"Falha ao gravar {len(rows)} linhas de auditoria ({e}); "
+                               f"nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+        self._spill(rows)
+
+    def _reject(self, rows: List[Dict], error: Exception) -> None:
+        self.stats["rejected"] += len(rows)
+        logger.error(f"Auditoria recusada pelo banco ({len(rows)} linhas): {error}. Linhas: {rows}")
+
+    # --- Arquivo de reserva ---
+
+    def _spill(self, rows: List[Dict]) -> None:
+        try:
+            with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    data = {
+                        key: value.isoformat() if key in _DATE_FIELDS and value else value
+                        for key, value in row.items()
+                    }
+                    f.write(json.dumps(data, default=str) + "\n")
+            self.stats["spilled"] += len(rows)
+            logger.warning(f"{len(rows)} linhas de auditoria gravadas em {self.spill_path}")
+        except Exception as e:
+            self.stats["dropped"] += len(rows)
+            logger.error(f"Auditoria descartada ({len(rows)} linhas): sem banco e sem arquivo de reserva: {e}")
+
+    def replay_spill(self) -> int:
+        """
+        Reenvia ao banco as linhas do arquivo de reserva. O arquivo é
+        renomeado antes da leitura, então dois processos não reenviam as
+        mesmas linhas; se o banco falhar de novo, elas voltam ao arquivo.
+        """
+        if not os.path.exists(self.spill_path):
+            return 0
+        replaying = f"{self.spill_path}.{os.getpid()}.replay"
+        try:
+            with self._spill_lock:
+                os.replace(self.spill_path, replaying)
+        except FileNotFoundError:
+            return 0  # Outro processo pegou o arquivo
+
+        with open(replaying, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            for key in _DATE_FIELDS:
+                if row.get(key):
+                    row[key] = datetime.fromisoformat(row[key])
+
+        replayed = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self._write(batch)
+                replayed += len(batch)
+            except Exception as e:
+                if not _transient(e):
+                    self._reject(batch, e)
+                    continue
+                logger.error(f"Falha ao reenviar auditoria do arquivo de reserva: {e}")
+                self._spill(rows[start:])
+                self.stats["spilled"] -= len(rows) - start  # Já contadas na primeira vez
+                break
+        os.remove(replaying)
+        self.stats["replayed"] += replayed
+        self.stats["written"] += replayed
+        return replayed
+
+
+def _transient(error: Exception) -> bool:
+    """Falha de conexão/banco indisponível (vale tentar de novo)"""
+    if isinstance(error, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+audit_sink = AuditSink()
+atexit.register(audit_sink.shutdown)
+
+
+@event.listens_for(SASession, "after_commit")
+def _enqueue_after_commit(session):
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        audit_sink.enqueue(rows)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
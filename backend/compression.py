@@ -0,0 +1,291 @@
+"""
+Compressão das respostas HTTP (gzip e brotli).
+
+CompressionMiddleware (ASGI puro, como o InstrumentationMiddleware) comprime
+a resposta quando:
+
+- o cliente aceita a codificação (Accept-Encoding, respeitando q=; entre as
+  aceitas vale a ordem de COMPRESSION_ENCODINGS)
+- o Content-Type está em COMPRESSION_TYPES (JSON, NDJSON, CSV, texto...).
+  PDF, XLSX e imagens já são comprimidos e passam direto
+- o corpo tem pelo menos COMPRESSION_MIN_SIZE bytes
+
+Respostas em streaming (StreamingResponse, ex.: NDJSON da auditoria) são
+comprimidas parte a parte, com flush a cada parte: o cliente continua
+recebendo linha a linha. As primeiras partes ficam em buffer até o tamanho
+mínimo; se o stream terminar antes disso, vai sem compressão.
+
+Os ETags do app são fracos (etags.py), então continuam válidos em qualquer
+codificação. Vary: Accept-Encoding vai em toda resposta de tipo compressível.
+
+Bytes do corpo, bytes enviados e CPU gasta na compressão, por rota e
+codificação, vão para /metrics (instrumentation.metrics).
+
+Variáveis de ambiente:
+    COMPRESSION_ENABLED          1/0 (padrão 1)
+    COMPRESSION_MIN_SIZE         corpo mínimo em bytes para comprimir (padrão 1024)
+    COMPRESSION_ENCODINGS        preferência do servidor (padrão br,gzip)
+    COMPRESSION_GZIP_LEVEL       1-9 (padrão 6)
+    COMPRESSION_BROTLI_QUALITY   0-11 (padrão 4; acima disso o custo de CPU
+                                 só compensa para arquivos estáticos)
+    COMPRESSION_TYPES            tipos separados por vírgula; terminado em
+                                 "/" vale como prefixo (ex.: text/)
+
+O pacote brotli é opcional: sem ele só gzip é oferecido.
+"""
+
+from typing import List, Optional, Tuple
+import importlib.util
+import os
+import time
+import zlib
+
+from instrumentation import metrics
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = [
+    e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if e.strip()
+]
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_TYPES = [
+    t.strip().lower() for t in os.getenv(
+        "COMPRESSION_TYPES",
+        "application/json,application/x-ndjson,application/javascript,application/xml,"
+        "image/svg+xml,text/"
+    ).split(",") if t.strip()
+]
+
+# Só verifica se está instalado; o módulo é importado na primeira resposta em br
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+# Sem corpo ou corpo parcial: nunca comprimir
+_SKIP_STATUS = {204, 206, 304}
+
+
+# --- Codificadores ---
+
+class GzipEncoder:
+    def __init__(self, level: int = COMPRESSION_GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        # Z_SYNC_FLUSH: o cliente consegue descomprimir tudo o que já chegou
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int = COMPRESSION_BROTLI_QUALITY):
+        import brotli
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if BROTLI_AVAILABLE:
+    ENCODERS["br"] = BrotliEncoder
+
+
+def negotiate(accept_encoding: str, preferred: List[str]) -> Optional[str]:
+    """
+    Codificação a usar para o Accept-Encoding do cliente, ou None (identity).
+    Maior q do cliente vence; empate fica com a ordem de `preferred`.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[token.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in preferred:
+        if encoding not in ENCODERS:
+            continue
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: str, types: List[str]) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if not media_type:
+        return False
+    return any(media_type.startswith(t) if t.endswith("/") else media_type == t for t in types)
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+# --- Middleware ---
+
+class CompressionMiddleware:
+    """Comprime respostas elegíveis (ver docstring do módulo)"""
+
+    def __init__(
+        self,
+        app,
+        enabled: bool = COMPRESSION_ENABLED,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        encodings: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+    ):
+        self.app = app
+        self.enabled = enabled
+        self.minimum_size = minimum_size
+        self.encodings = encodings or COMPRESSION_ENCODINGS
+        self.types = types or COMPRESSION_TYPES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = _header(scope.get("headers", []), b"accept-encoding") or b""
+        encoding = None
+        if scope["method"] != "HEAD":
+            encoding = negotiate(accept_encoding.decode("latin-1"), self.encodings)
+
+        responder = _CompressionResponder(self, send, encoding)
+        try:
+            await self.app(scope, receive, responder.send)
+        finally:
+            # Template da rota (ex.: /reports/summary), como no InstrumentationMiddleware
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            responder.record(route)
+
+
+class _CompressionResponder:
+    """Estado de uma resposta: decide no http.response.start e comprime o corpo"""
+
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: Optional[str]):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.start_message: Optional[dict] = None
+        self.passthrough = False
+        self.encoder = None
+        self.buffer = b""
+        self.body_bytes = 0
+        self.wire_bytes = 0
+        self.cpu_seconds = 0.0
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            await self._start(message)
+        elif message["type"] == "http.response.body":
+            await self._body(message)
+        else:
+            await self._send(message)
+
+    async def _start(self, message):
+        headers = list(message.get("headers", []))
+        content_type = (_header(headers, b"content-type") or b"").decode("latin-1")
+        compressible = (
+            message["status"] >= 200
+            and message["status"] not in _SKIP_STATUS
+            and _header(headers, b"content-encoding") is None
+            and is_compressible(content_type, self.middleware.types)
+        )
+        if compressible:
+            headers = _add_vary(headers)
+            message = {**message, "headers": headers}
+
+        content_length = _header(headers, b"content-length")
+        too_small = content_length is not None and int(content_length) < self.middleware.minimum_size
+        if not compressible or self.encoding is None or too_small:
+            self.passthrough = True
+            self.encoding = None
+            await self._send(message)
+            return
+        # Espera o corpo: o tamanho decide se comprime
+        self.start_message = message
+
+    async def _body(self, message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        self.body_bytes += len(body)
+
+        if self.passthrough:
+            self.wire_bytes += len(body)
+            await self._send(message)
+            return
+
+        if self.encoder is None:
+            self.buffer += body
+            if len(self.buffer) < self.middleware.minimum_size:
+                if more_body:
+                    return  # Stream ainda abaixo do mínimo: continua acumulando
+                # Terminou pequeno: envia como veio
+                self.encoding = None
+                self.wire_bytes += len(self.buffer)
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": self.buffer, "more_body": False})
+                return
+
+            self.encoder = ENCODERS[self.encoding]()
+            body, self.buffer = self.buffer, b""
+            headers = [
+                (k, v) for k, v in self.start_message["headers"] if k.lower() != b"content-length"
+            ]
+            headers.append((b"content-encoding", self.encoding.encode()))
+            if not more_body:
+                # Corpo completo (JSONResponse/ORJSONResponse): tamanho conhecido
+                data = self._compress(body, final=True)
+                headers.append((b"content-length", str(len(data)).encode()))
+                await self._send({**self.start_message, "headers": headers})
+                await self._send({"type": "http.response.body", "body": data, "more_body": False})
+                return
+            await self._send({**self.start_message, "headers": headers})
+
+        data = self._compress(body, final=not more_body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _compress(self, data: bytes, final: bool) -> bytes:
+        started = time.thread_time()
+        chunk = self.encoder.compress(data) + (self.encoder.finish() if final else self.encoder.flush())
+        self.cpu_seconds += time.thread_time() - started
+        self.wire_bytes += len(chunk)
+        return chunk
+
+    def record(self, route: str) -> None:
+        metrics.observe_body(route, self.encoding or "identity", self.body_bytes, self.wire_bytes, self.cpu_seconds)
+
+
+def _add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    for index, (key, value) in enumerate(headers):
+        if key.lower() == b"vary":
+            if b"accept-encoding" in value.lower() or value.strip() == b"*":
+                return headers
+            headers = list(headers)
+            headers[index] = (key, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
@@ -1,17 +1,49 @@
-from typing import List, Dict
+"""
+Conexões WebSocket (notificações e feed em tempo real).
+
+Cada worker guarda as conexões que recebeu e, por padrão, entrega direto a
+elas. Com vários workers (gunicorn) ou o worker.py, uma mensagem precisa
+chegar a conexões de outros processos: com WS_BUS=postgres ela é publicada
+com NOTIFY e cada worker, com uma thread em LISTEN, entrega às suas
+conexões (tests/test_ws_bus.py, com TEST_DATABASE_URL de um Postgres).
+Mensagens maiores que o limite do NOTIFY são entregues só no processo atual.
+
+Variáveis de ambiente:
+    WS_BUS   local (padrão), postgres ou auto (postgres se o banco for Postgres)
+"""
+
+from typing import List, Dict, Optional
 from fastapi import WebSocket
+from sqlalchemy import text
+import asyncio
+import json
+import os
+import select
+import threading
+
+WS_BUS = os.getenv("WS_BUS", "local")
+WS_CHANNEL = "erp_ws"
+# Limite do payload do NOTIFY é 8000 bytes; acima disso entrega só no worker atual
+NOTIFY_MAX_BYTES = 7900
+
 
 class ConnectionManager:
     def __init__(self):
         # Mapeia ID do Usuário -> Lista de Conexões Ativas
         self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.use_bus = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        # Setado enquanto a thread do barramento está em LISTEN
+        self.listening = threading.Event()
 
     async def connect(self, websocket: WebSocket, user_id: int):
         await websocket.accept()
         if user_id not in self.active_connections:
             self.active_connections[user_id] = []
         self.active_connections[user_id].append(websocket)
-        
+
         count = sum(len(v) for v in self.active_connections.values())
         print(f"🟢 WS: Usuário {user_id} CONECTADO. (Total Online: {count}) Users: {list(self.active_connections.keys())}")
 
@@ -24,6 +56,17 @@ class ConnectionManager:
         print(f"🔴 WS: Usuário {user_id} DESCONECTADO.")
 
     async def send_personal_message(self, message: dict, user_id: int):
+        if self.use_bus and await self._publish({"user_id": user_id, "message": message}):
+            return
+        await self._send_local(message, user_id)
+
+    async def broadcast(self, message: dict):
+        """Envia mensagem para todos os usuários conectados"""
+        if self.use_bus and await self._publish({"user_id": None, "message": message}):
+            return
+        await self._broadcast_local(message)
+
+    async def _send_local(self, message: dict, user_id: int):
         # Log de diagnóstico crucial
         is_online = user_id in self.active_connections
         print(f"🔔 WS Tentativa: Enviar para Usuário {user_id} | Online? {is_online}")
@@ -38,15 +81,14 @@ class ConnectionManager:
                 except Exception as e:
                     print(f"❌ WS: Falha ao enviar para socket específico: {e}")
                     # Opcional: Remover conexão morta
-                    # self.disconnect(connection, user_id) 
+                    # self.disconnect(connection, user_id)
         else:
-            print(f"⚠️ WS: Usuário {user_id} offline. Mensagem não entregue via socket. (Usuários online: {list(self.active_connections.keys())})")
+            print(f"⚠️ WS: Usuário {user_id} offline neste worker. (Usuários online: {list(self.active_connections.keys())})")
 
-    async def broadcast(self, message: dict):
-        """Envia mensagem para todos os usuários conectados"""
+    async def _broadcast_local(self, message: dict):
         print(f"📢 WS Broadcast: Enviando para {len(self.active_connections)} usuários online")
-        
-        for user_id, connections in self.active_connections.items():
+
+        for user_id, connections in list(self.active_connections.items()):
             # Iterar sobre uma cópia da lista para evitar erros
             connections_copy = connections[:]
             for connection in connections_copy:
@@ -56,4 +98,123 @@ class ConnectionManager:
                 except Exception as e:
                     print(f"❌ WS Broadcast: Falha ao enviar para User {user_id}: {e}")
 
-manager = ConnectionManager()
\ No newline at end of file
+    # --- Ciclo de vida (lifespan) ---
+
+    @staticmethod
+    def bus_enabled() -> bool:
+        from database import engine
+        return WS_BUS == "postgres" or (WS_BUS == "auto" and engine.dialect.name == "postgresql")
+
+    async def start(self):
+        """Ativa a entrega entre workers (LISTEN) quando WS_BUS pede o Postgres"""
+        # Loop do worker: notify_user() agenda nele os envios feitos por threads
+        self._loop = asyncio.get_running_loop()
+        self.use_bus = self.bus_enabled()
+        if not self.use_bus:
+            return
+        self._stopping.clear()
+        self._listener = threading.Thread(target=self._listen, name="ws-bus", daemon=True)
+        self._listener.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._listener and self._listener.is_alive():
+            await asyncio.to_thread(self._listener.join, 3)
+        self._listener = None
+        self._loop = None
+        self.use_bus = False
+
+    def notify_user(self, message: dict, user_id: int) -> None:
+        """
+        Envio a partir de threads (ex.: job_runner). Na API agenda no loop do
+        worker; fora dela (worker.py, sem conexões próprias) publica direto no
+        NOTIFY para os processos da API entregarem.
+        """
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.send_personal_message(message, user_id), loop)
+            return
+        if not self.use_bus:
+            return
+        payload = json.dumps({"user_id": user_id, "message": message}, default=str)
+        if len(payload.encode()) > NOTIFY_MAX_BYTES:
+            print("⚠️ WS: Mensagem grande demais para NOTIFY; descartada")
+            return
+        try:
+            self._notify(payload)
+        except Exception as e:
+            print(f"❌ WS: Falha ao publicar no canal {WS_CHANNEL}: {e}")
+
+    async def close_all(self, code: int = 1001, reason: str = "Servidor reiniciando") -> int:
+        """
+        Fecha todas as conexões deste worker (desligamento gracioso). O
+        frontend reconecta sozinho, já em outro worker.
+        """
+        connections = [(user_id, ws) for user_id, lst in self.active_connections.items() for ws in lst]
+        for user_id, websocket in connections:
+            try:
+                await websocket.close(code=code, reason=reason)
+            except Exception:
+                pass  # Já fechada pelo servidor
+            self.disconnect(websocket, user_id)
+        return len(connections)
+
+    # --- Entrega entre workers (Postgres LISTEN/NOTIFY) ---
+
+    async def _publish(self, envelope: dict) -> bool:
+        payload = json.dumps(envelope, default=str)
+        if len(payload.encode()) > NOTIFY_MAX_BYTES:
+            print("⚠️ WS: Mensagem grande demais para NOTIFY; entregue só neste worker")
+            return False
+        try:
+            await asyncio.to_thread(self._notify, payload)
+            return True
+        except Exception as e:
+            print(f"❌ WS: Falha ao publicar no canal {WS_CHANNEL}: {e}")
+            return False
+
+    def _notify(self, payload: str):
+        from database import engine
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": WS_CHANNEL, "payload": payload})
+
+    def _listen(self):
+        """Thread: recebe os NOTIFY e agenda a entrega no loop do worker"""
+        from database import engine
+
+        delay = 0.5
+        while not self._stopping.is_set():
+            try:
+                raw = engine.raw_connection()
+                raw.detach()  # Conexão dedicada: não volta para o pool em modo LISTEN
+                try:
+                    connection = raw.driver_connection
+                    connection.autocommit = True
+                    connection.cursor().execute(f"LISTEN {WS_CHANNEL}")
+                    self.listening.set()
+                    delay = 0.5
+                    while not self._stopping.is_set():
+                        if select.select([connection], [], [], 1.0) == ([], [], []):
+                            continue
+                        connection.poll()
+                        while connection.notifies:
+                            self._dispatch(connection.notifies.pop(0).payload)
+                finally:
+                    self.listening.clear()
+                    raw.close()
+            except Exception as e:
+                print(f"❌ WS: Conexão LISTEN perdida ({e}); nova tentativa em {delay:.1f}s")
+                self._stopping.wait(delay)
+                delay = min(delay * 2, 10.0)
+
+    def _dispatch(self, payload: str):
+        envelope = json.loads(payload)
+        user_id = envelope.get("user_id")
+        if user_id is None:
+            coroutine = self._broadcast_local(envelope["message"])
+        else:
+            coroutine = self._send_local(envelope["message"], user_id)
+        asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+
+manager = ConnectionManager()
@@ -2,7 +2,6 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
-from jose import JWTError, jwt
 from database import get_session
 from models import User
 import security
@@ -10,6 +9,7 @@ import security
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)):
+    from jose import JWTError, jwt  # Carregado na primeira requisição autenticada
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido",
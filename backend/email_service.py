@@ -3,10 +3,7 @@ Email service for sending notifications via SMTP.
 Supports HTML and plain text emails with customer and internal notifications.
 """
 
-import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from os import getenv
 
@@ -41,6 +38,11 @@ def send_email(
     Returns:
         bool: True if sent successfully, False otherwise
     """
+    # Imported on first send to keep worker boot fast
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     try:
         # If SMTP credentials not configured, log and return gracefully
         if not SMTP_USER or not SMTP_PASSWORD:
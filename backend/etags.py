@@ -0,0 +1,88 @@
+"""
+ETags fracos e GET condicional.
+
+Detalhe de um registro: ETag de (tabela, id, updated_at).
+Listagem: ETag de (count, max(updated_at)) do conjunto filtrado, mais o
+escopo (usuário e parâmetros da consulta), então paginação e visibilidade
+por vendedor não compartilham a mesma tag.
+
+Se o If-None-Match da requisição bate com a tag, a rota devolve 304 sem
+montar nem serializar a resposta. As respostas vão com
+"Cache-Control: private, no-cache": o navegador guarda a resposta e
+revalida a cada uso, enviando o If-None-Match sozinho (o axios/React Query
+recebem o 200 do cache normalmente).
+
+Depende de updated_at mudar em toda alteração (onupdate em models.BaseModel).
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from fastapi import Request, Response
+import hashlib
+
+# Aumente quando o formato das respostas mudar (invalida as tags antigas)
+FORMAT_VERSION = 1
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _stamp(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else "-"
+
+
+def _tag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in (FORMAT_VERSION, *parts)).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def resource_etag(record, table: Optional[str] = None) -> str:
+    """ETag de um registro (modelo, ou linha com id e updated_at informando a tabela)"""
+    return _tag(table or record.__tablename__, record.id, _stamp(record.updated_at))
+
+
+def collection_etag(kind: str, count: int, last_updated: Optional[datetime], *scope) -> str:
+    """ETag de uma listagem: total e max(updated_at) do filtro, mais o escopo"""
+    return _tag(kind, count, _stamp(last_updated), *scope)
+
+
+def summarize(records: Iterable) -> Tuple[int, Optional[datetime]]:
+    """(count, max(updated_at)) de registros já em memória (ex.: catálogo)"""
+    count, last_updated = 0, None
+    for record in records:
+        count += 1
+        if record.updated_at and (last_updated is None or record.updated_at > last_updated):
+            last_updated = record.updated_at
+    return count, last_updated
+
+
+def request_scope(request: Request, user) -> Tuple:
+    """Usuário e query string: o que muda o conteúdo de uma listagem"""
+    return (user.id, str(request.query_params))
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (lista separada por vírgulas ou *)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Devolve um 304 se o cliente já tem esta versão; senão coloca ETag e
+    Cache-Control na resposta da rota e devolve None.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,91 @@
+"""
+Configuração do gunicorn (produção): vários workers uvicorn com o app
+pré-carregado no processo mestre.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Com preload_app, os imports (FastAPI, SQLAlchemy, modelos, rotas) acontecem
+uma vez no mestre e os workers herdam essa memória via fork (copy-on-write).
+As dependências pesadas que o app carrega só no primeiro uso (ReportLab,
+jose, passlib, validate_docbr, smtplib, openpyxl; ver LAZY_MODULES em
+profile_imports.py) não entram no `import main`. Sem preload elas deixam o
+boot do worker mais rápido, mas com preload cada worker carregaria a sua
+cópia no primeiro login ou PDF. Por isso o when_ready as importa no mestre
+(WARM_IMPORTS) antes do primeiro fork. O gc.freeze() antes do fork tira
+tudo isso da coleta de lixo, que senão tocaria nas páginas e forçaria a
+cópia em cada worker. O lifespan
+(startup.py: banco, cargos, typeahead, LISTEN dos WebSockets) roda em cada
+worker, depois do fork, então nenhuma conexão ou thread é compartilhada.
+
+Variáveis de ambiente:
+    PORT                 porta (padrão 8000)
+    WEB_CONCURRENCY      número de workers (padrão: número de CPUs)
+    GUNICORN_PRELOAD     1/0 (padrão 1)
+    GRACEFUL_TIMEOUT     segundos para os workers terminarem ao receber SIGTERM (padrão 30;
+                         inclui o DRAIN_DELAY do startup.py, em que o worker ainda atende)
+    WORKER_TIMEOUT       segundos sem resposta do worker antes de reiniciá-lo (padrão 60)
+    KEEPALIVE            segundos de keep-alive HTTP (padrão 5)
+    MAX_REQUESTS         reinicia o worker após N requisições (padrão 0 = nunca)
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+# Carregados no mestre com preload_app (os workers herdam prontos)
+WARM_IMPORTS = (
+    "pdf_generator",  # reportlab
+    "jose.jwt",
+    "validate_docbr",
+    "smtplib",
+    "openpyxl",
+    "openpyxl.cell",
+    "openpyxl.styles",
+)
+
+
+def warm_imports(server=None) -> None:
+    """Importa WARM_IMPORTS e monta o contexto de senhas (passlib) no processo atual"""
+    import importlib
+    from security import get_pwd_context
+
+    get_pwd_context()
+    for name in WARM_IMPORTS:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            # Dependência opcional ausente: o worker falha (ou avisa) no primeiro uso
+            if server:
+                server.log.warning(f"Pré-carga de {name} falhou: {e}")
+
+
+def when_ready(server):
+    # Antes do primeiro fork (e do gc.freeze() do pre_fork)
+    if server.cfg.preload_app:
+        warm_imports(server)
+
+
+def pre_fork(server, worker):
+    # Objetos do preload ficam fora do GC: as páginas continuam compartilhadas
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Nenhuma conexão do pool do mestre pode ser usada por dois processos
+    from database import engine
+    engine.dispose(close=False)
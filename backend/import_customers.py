@@ -0,0 +1,67 @@
+"""
+Importação de clientes pela linha de comando.
+
+Uso (dentro do container backend):
+    python import_customers.py clientes.xlsx --user pacheco@rhynoproject.com.br
+    python import_customers.py clientes.csv --user gerente@erp.com --errors erros.csv
+"""
+
+import argparse
+import csv
+import sys
+import time
+
+from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
+
+from database import engine
+from models import User
+from services.customer_import import CustomerImportService, DEFAULT_CHUNK_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa clientes de um arquivo CSV/XLSX")
+    parser.add_argument("file", help="Arquivo .csv ou .xlsx")
+    parser.add_argument("--user", required=True, help="Email do usuário responsável pela importação")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Linhas por lote")
+    parser.add_argument("--errors", help="Grava o relatório de erros neste CSV")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user = session.exec(
+            select(User).options(selectinload(User.role)).where(User.email == args.user)
+        ).first()
+        if not user or not user.role:
+            print(f"❌ Usuário {args.user} não encontrado ou sem cargo")
+            sys.exit(1)
+
+        start = time.perf_counter()
+        with open(args.file, "rb") as stream:
+            report = CustomerImportService.import_file(
+                session=session,
+                stream=stream,
+                filename=args.file,
+                current_user=user,
+                chunk_size=args.chunk_size
+            )
+        elapsed = time.perf_counter() - start
+
+    rate = report["total"] / elapsed * 60 if elapsed > 0 else 0
+    print(f"✅ Importados: {report['created']} | ❌ Rejeitados: {report['failed']} | "
+          f"Total: {report['total']} em {elapsed:.1f}s ({rate:,.0f} linhas/min)")
+
+    if args.errors and report["errors"]:
+        with open(args.errors, "w", newline="", encoding="utf-8") as out:
+            writer = csv.DictWriter(out, fieldnames=["row", "document", "error"])
+            writer.writeheader()
+            writer.writerows(report["errors"])
+        print(f"📝 Relatório de erros salvo em {args.errors}")
+    else:
+        for error in report["errors"][:20]:
+            print(f"   Linha {error['row']} ({error['document']}): {error['error']}")
+        if len(report["errors"]) > 20:
+            print(f"   ... e mais {len(report['errors']) - 20} erros (use --errors arquivo.csv)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Instrumentação de requisições: quantidade de consultas SQL e tempo de banco.
+
+- Eventos do SQLAlchemy (before/after_cursor_execute) somam consultas e
+  tempo de banco na requisição atual (ContextVar; também vale para rotas
+  síncronas, executadas no threadpool com cópia do contexto)
+- InstrumentationMiddleware (ASGI puro, funciona com StreamingResponse)
+  adiciona o cabeçalho Server-Timing, registra no log requisições acima
+  dos limites e alimenta os histogramas por rota
+- Bytes do corpo, bytes enviados e CPU de compressão por rota e
+  codificação vêm do CompressionMiddleware (compression.py)
+- metrics.render() gera o texto no formato Prometheus para /metrics
+  (inclui a duração das etapas de inicialização, ver startup.py)
+
+Variáveis de ambiente:
+    INSTRUMENTATION_ENABLED   1/0 (padrão 1)
+    SLOW_REQUEST_MS           log de requisições mais lentas que isso (padrão 500)
+    SLOW_REQUEST_QUERIES      log de requisições com mais consultas que isso (padrão 20)
+
+As métricas são por processo: com vários workers, cada um expõe as suas.
+"""
+
+from typing import Optional, Dict, List, Tuple
+from contextvars import ContextVar
+from sqlalchemy import event
+import bisect
+import logging
+import os
+import threading
+import time
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "1") == "1"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", "20"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class RequestStats:
+    """Consultas e tempo de banco de uma requisição"""
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+# --- Eventos do SQLAlchemy ---
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.db_time += time.perf_counter() - starts.pop()
+    stats.queries += 1
+
+
+# --- Histogramas ---
+
+class Histogram:
+    """Histograma com buckets fixos por conjunto de labels"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [contagens, soma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, label_names: Tuple[str, ...]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in items]
+        for labels, counts, total, count in snapshot:
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Métricas HTTP por rota"""
+
+    LABELS = ("method", "route", "status")
+
+    def __init__(self):
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Duração das requisições HTTP", LATENCY_BUCKETS
+        )
+        self.queries = Histogram(
+            "http_request_db_queries", "Consultas SQL por requisição", QUERY_BUCKETS
+        )
+        self.db_time = Histogram(
+            "http_request_db_duration_seconds", "Tempo de banco por requisição", LATENCY_BUCKETS
+        )
+        # (rota, codificação) -> [respostas, bytes do corpo, bytes enviados, CPU em segundos]
+        self.bodies: Dict[Tuple[str, str], List[float]] = {}
+        self._bodies_lock = threading.Lock()
+        self.startup: Dict[str, float] = {}
+
+    def set_startup(self, phases: Dict[str, float]) -> None:
+        self.startup = dict(phases)
+
+    def observe(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        labels = (method, route, str(status))
+        self.latency.observe(labels, elapsed)
+        self.queries.observe(labels, stats.queries)
+        self.db_time.observe(labels, stats.db_time)
+
+    def observe_body(self, route: str, encoding: str, body_bytes: int, wire_bytes: int, cpu_seconds: float) -> None:
+        with self._bodies_lock:
+            series = self.bodies.setdefault((route, encoding), [0, 0, 0, 0.0])
+            series[0] += 1
+            series[1] += body_bytes
+            series[2] += wire_bytes
+            series[3] += cpu_seconds
+
+    def render(self) -> str:
+        lines = []
+        for histogram in (self.latency, self.queries, self.db_time):
+            lines.extend(histogram.render(self.LABELS))
+        with self._bodies_lock:
+            bodies = sorted((labels, list(series)) for labels, series in self.bodies.items())
+        for index, (name, help_text) in enumerate((
+            ("http_responses_total", "Respostas por rota e codificação"),
+            ("http_response_body_bytes_total", "Bytes do corpo antes da compressão"),
+            ("http_response_wire_bytes_total", "Bytes do corpo enviados (após a compressão)"),
+            ("http_compression_cpu_seconds_total", "CPU gasta comprimindo respostas"),
+        )):
+            if not bodies:
+                break
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (route, encoding), series in bodies:
+                lines.append(f'{name}{{route="{_escape(route)}",encoding="{encoding}"}} {series[index]}')
+        if self.startup:
+            lines.append("# HELP app_startup_seconds Duração das etapas de inicialização do processo")
+            lines.append("# TYPE app_startup_seconds gauge")
+            for phase, seconds in self.startup.items():
+                lines.append(f'app_startup_seconds{{phase="{_escape(phase)}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# --- Middleware ---
+
+class InstrumentationMiddleware:
+    """Mede cada requisição HTTP (tempo total, consultas e tempo de banco)"""
+
+    def __init__(self, app, enabled: bool = INSTRUMENTATION_ENABLED):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    (
+                        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                        f"app;dur={elapsed_ms:.1f}"
+                    ).encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            # Template da rota (ex.: /customers/{customer_id}) para não explodir a cardinalidade
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.observe(scope["method"], route, status_code, elapsed, stats)
+
+            if elapsed * 1000 > SLOW_REQUEST_MS or stats.queries > SLOW_REQUEST_QUERIES:
+                logger.warning(
+                    f"Requisição lenta: {scope['method']} {scope['path']} -> {status_code} "
+                    f"em {elapsed * 1000:.0f}ms, {stats.queries} consultas "
+                    f"({stats.db_time * 1000:.0f}ms no banco)"
+                )
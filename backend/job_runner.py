@@ -0,0 +1,412 @@
+"""
+Tarefas em segundo plano (tabela job).
+
+Operações longas (exportações grandes, alteração de status em massa, lotes
+de PDF, envio de emails) não rodam dentro da requisição: a rota grava um
+Job com status queued e responde 202, e um runner executa a tarefa em uma
+thread.
+
+- Estado no banco: qualquer worker do gunicorn responde o status, e uma
+  tarefa interrompida por desligamento volta para a fila
+- Concorrência: até JOB_CONCURRENCY tarefas por processo e, por tipo, o
+  limite do registro (@job_handler(kind, concurrency=N))
+- Andamento: ctx.progress() grava progresso e heartbeat (no máximo a cada
+  JOB_PROGRESS_INTERVAL) e envia {"type": "job_update"} ao dono pelo
+  WebSocket (ConnectionManager; entre processos via NOTIFY no Postgres)
+- Cancelamento: POST /jobs/{id}/cancel marca cancel_requested; a tarefa
+  para no próximo ctx.progress() ou ctx.check_cancelled()
+- Artefatos: arquivos em JOB_ARTIFACT_DIR (ctx.artifact()), baixados em
+  /jobs/{id}/artifact e apagados com a tarefa após JOB_RETENTION_HOURS
+
+Onde as tarefas rodam (JOB_RUNNER):
+    local   (padrão) em threads de cada processo da API
+    off     a API só enfileira; as tarefas rodam em `python worker.py`
+
+Tarefas em running sem heartbeat há JOB_STALE_SECONDS (processo morto)
+voltam para a fila, até JOB_MAX_ATTEMPTS tentativas.
+
+Variáveis de ambiente:
+    JOB_RUNNER              local ou off (padrão local)
+    JOB_CONCURRENCY         tarefas simultâneas por processo (padrão 2)
+    JOB_POLL_INTERVAL       segundos entre consultas à fila (padrão 2)
+    JOB_PROGRESS_INTERVAL   intervalo mínimo entre gravações de andamento (padrão 0.5)
+    JOB_STALE_SECONDS       heartbeat mais antigo que isso = processo morto (padrão 300)
+    JOB_MAX_ATTEMPTS        tentativas antes de desistir (padrão 3)
+    JOB_SHUTDOWN_TIMEOUT    espera pelas tarefas no desligamento (padrão 30)
+    JOB_ARTIFACT_DIR        diretório dos artefatos (padrão <tmp>/erp-jobs)
+    JOB_RETENTION_HOURS     horas até apagar tarefas finalizadas (padrão 24)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import update
+from sqlmodel import Session, select
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from connection_manager import manager
+from database import engine
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_RUNNER = os.getenv("JOB_RUNNER", "local")
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "0.5"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv("JOB_SHUTDOWN_TIMEOUT", "30"))
+JOB_ARTIFACT_DIR = os.getenv("JOB_ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "erp-jobs"))
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+
+FINISHED = ("done", "error", "cancelled")
+_CLEANUP_INTERVAL = 600
+
+
+class JobCancelled(Exception):
+    """Cancelamento pedido pelo usuário (POST /jobs/{id}/cancel)"""
+
+
+class JobInterrupted(Exception):
+    """Processo desligando: a tarefa volta para a fila"""
+
+
+# --- Registro dos tipos de tarefa ---
+
+HANDLERS: Dict[str, Tuple[Callable[["JobContext"], Any], int]] = {}
+
+
+def job_handler(kind: str, concurrency: int = 1):
+    """
+    Registra a função que executa as tarefas do tipo `kind`.
+    `concurrency`: tarefas desse tipo ao mesmo tempo em cada processo.
+    """
+    def register(function):
+        HANDLERS[kind] = (function, concurrency)
+        return function
+    return register
+
+
+def describe(job: Job) -> Dict:
+    """Estado público da tarefa (rotas e mensagens job_update)"""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "message": job.message,
+        "result": job.result,
+        "error": job.error,
+        "artifact_name": job.artifact_name,
+        "artifact_url": f"/jobs/{job.id}/artifact" if job.status == "done" and job.artifact_path else None,
+        "status_url": f"/jobs/{job.id}",
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class JobContext:
+    """O que a função da tarefa recebe: parâmetros, andamento, cancelamento e artefato"""
+
+    def __init__(self, runner: "JobRunner", job: Job):
+        self.runner = runner
+        self.job = job
+        self.params: Dict = dict(job.params or {})
+        self.user_id: Optional[int] = job.user_id
+        self.result: Optional[Dict] = None
+        self._last_flush = 0.0
+
+    @property
+    def id(self) -> int:
+        return self.job.id
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None,
+                 force: bool = False) -> None:
+        """
+        Atualiza o andamento. Pode ser chamado a cada item: só grava e
+        notifica a cada JOB_PROGRESS_INTERVAL (ou com force=True). Levanta
+        JobCancelled se o cancelamento foi pedido.
+        """
+        self.job.progress = done
+        if total is not None:
+            self.job.total = total
+        if message is not None:
+            self.job.message = message
+        self._flush(force)
+
+    def check_cancelled(self) -> None:
+        self._flush(force=False)
+
+    def artifact(self, filename: str, media_type: str) -> str:
+        """Caminho onde gravar o arquivo de resultado (download em /jobs/{id}/artifact)"""
+        os.makedirs(JOB_ARTIFACT_DIR, exist_ok=True)
+        self.job.artifact_path = os.path.join(JOB_ARTIFACT_DIR, f"{self.job.id}-{filename}")
+        self.job.artifact_name = filename
+        self.job.artifact_type = media_type
+        return self.job.artifact_path
+
+    def _flush(self, force: bool) -> None:
+        if self.runner.stopping.is_set():
+            raise JobInterrupted()
+        now = time.monotonic()
+        if not force and now - self._last_flush < JOB_PROGRESS_INTERVAL:
+            return
+        self._last_flush = now
+        with Session(engine) as session:
+            session.execute(
+                update(Job).where(Job.id == self.job.id).values(
+                    progress=self.job.progress, total=self.job.total, message=self.job.message,
+                    heartbeat_at=datetime.utcnow()
+                )
+            )
+            cancel_requested = session.exec(select(Job.cancel_requested).where(Job.id == self.job.id)).one()
+            session.commit()
+        self.runner.publish(self.job)
+        if cancel_requested:
+            raise JobCancelled()
+
+
+class JobRunner:
+    """Fila e execução das tarefas (ver docstring do módulo)"""
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY, poll_interval: float = JOB_POLL_INTERVAL):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    # --- API usada pelas rotas ---
+
+    def submit(self, session: Session, kind: str, user_id: Optional[int], params: Dict,
+               total: Optional[int] = None) -> Job:
+        """Enfileira uma tarefa (commit na sessão) e acorda o runner local"""
+        if kind not in HANDLERS:
+            raise ValueError(f"Tipo de tarefa desconhecido: {kind}")
+        job = Job(kind=kind, user_id=user_id, params=params, total=total, message="Na fila")
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        self.publish(job)
+        self._wake.set()
+        return job
+
+    def cancel(self, session: Session, job: Job) -> Job:
+        """Na fila: cancela na hora. Em execução: pede o cancelamento à tarefa"""
+        now = datetime.utcnow()
+        cancelled = session.execute(
+            update(Job).where(Job.id == job.id, Job.status == "queued").values(
+                status="cancelled", cancel_requested=True, finished_at=now, message="Cancelada"
+            )
+        ).rowcount
+        if not cancelled:
+            session.execute(update(Job).where(Job.id == job.id).values(cancel_requested=True))
+        session.commit()
+        session.refresh(job)
+        self.publish(job)
+        return job
+
+    def publish(self, job: Job) -> None:
+        if job.user_id is not None:
+            manager.notify_user({"type": "job_update", "job": describe(job)}, job.user_id)
+
+    # --- Ciclo de vida ---
+
+    def start(self) -> None:
+        """Thread que consulta a fila (JOB_RUNNER=local na API, sempre no worker.py)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self._loop, name="job-runner", daemon=True)
+        self._thread.start()
+        print(f"🧵 Tarefas: runner ativo em {self.worker_id} ({self.concurrency} simultâneas)")
+
+    def stop(self, timeout: float = JOB_SHUTDOWN_TIMEOUT) -> None:
+        """
+        Para de pegar tarefas; as em execução recebem JobInterrupted no
+        próximo ctx.progress() e voltam para a fila.
+        """
+        if not self._thread:
+            return
+        self.stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        executor, self._executor = self._executor, None
+        if executor:
+            waiter = threading.Thread(target=executor.shutdown, kwargs={"wait": True}, daemon=True)
+            waiter.start()
+            waiter.join(timeout)
+        self._thread = None
+
+    def run_pending(self) -> int:
+        """Executa na thread atual as tarefas da fila (testes e `worker.py --once`)"""
+        executed = 0
+        while not self.stopping.is_set():
+            claimed = self._claim()
+            if not claimed:
+                return executed
+            self._execute(*claimed)
+            executed += 1
+        return executed
+
+    # --- Fila ---
+
+    def _loop(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                self._recover_stale()
+                self._cleanup()
+                while not self.stopping.is_set():
+                    claimed = self._claim()
+                    if not claimed:
+                        break
+                    self._executor.submit(self._execute, *claimed)
+            except Exception as e:
+                print(f"❌ Tarefas: erro ao consultar a fila: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _available_kinds(self) -> List[str]:
+        with self._lock:
+            if sum(self._running.values()) >= self.concurrency:
+                return []
+            return [kind for kind, (_, limit) in HANDLERS.items() if self._running.get(kind, 0) < limit]
+
+    def _claim(self) -> Optional[Tuple[int, str]]:
+        """Pega a tarefa mais antiga de um tipo com vaga (UPDATE condicional: um processo só)"""
+        kinds = self._available_kinds()
+        if not kinds:
+            return None
+        with Session(engine) as session:
+            candidates = session.exec(
+                select(Job.id, Job.kind).where(Job.status == "queued").order_by(Job.id).limit(20)
+            ).all()
+            for job_id, kind in candidates:
+                if kind not in HANDLERS:
+                    self._finish_unknown(session, job_id, kind)
+                    continue
+                if kind not in kinds:
+                    continue
+                now = datetime.utcnow()
+                claimed = session.execute(
+                    update(Job).where(Job.id == job_id, Job.status == "queued").values(
+                        status="running", worker=self.worker_id, started_at=now, heartbeat_at=now,
+                        attempts=Job.attempts + 1, message="Em execução"
+                    )
+                ).rowcount
+                session.commit()
+                if claimed:
+                    with self._lock:
+                        self._running[kind] = self._running.get(kind, 0) + 1
+                    return job_id, kind
+        return None
+
+    def _execute(self, job_id: int, kind: str) -> None:
+        handler = HANDLERS[kind][0]
+        try:
+            with Session(engine) as session:
+                job = session.get(Job, job_id)
+                session.expunge(job)
+            ctx = JobContext(self, job)
+            self.publish(job)
+            try:
+                ctx.result = handler(ctx)
+                self._finish(ctx, "done")
+            except JobCancelled:
+                self._finish(ctx, "cancelled", message="Cancelada")
+            except JobInterrupted:
+                self._finish(ctx, "queued", message="Interrompida; aguardando nova execução")
+            except Exception as e:
+                logger.exception(f"Tarefa {job_id} ({kind}) falhou")
+                self._finish(ctx, "error", message="Falhou", error=str(e) or e.__class__.__name__)
+        finally:
+            with self._lock:
+                self._running[kind] -= 1
+            self._wake.set()
+
+    def _finish(self, ctx: JobContext, status: str, message: Optional[str] = None,
+                error: Optional[str] = None) -> None:
+        job = ctx.job
+        if status == "done":
+            message = message or "Concluída"
+            if job.total is not None:
+                job.progress = job.total
+        values = {
+            "status": status, "message": message, "error": error, "progress": job.progress,
+            "total": job.total, "heartbeat_at": datetime.utcnow(),
+        }
+        if status == "queued":
+            values.update(worker=None, started_at=None, progress=0)
+        else:
+            values.update(finished_at=datetime.utcnow(), result=ctx.result if status == "done" else None)
+            if status == "done" and job.artifact_path:
+                values.update(artifact_path=job.artifact_path, artifact_name=job.artifact_name,
+                              artifact_type=job.artifact_type)
+        if status != "done" and job.artifact_path and os.path.exists(job.artifact_path):
+            os.remove(job.artifact_path)  # Arquivo pela metade
+
+        with Session(engine) as session:
+            session.execute(update(Job).where(Job.id == job.id).values(**values))
+            session.commit()
+            job = session.get(Job, job.id)
+            self.publish(job)
+
+    def _finish_unknown(self, session: Session, job_id: int, kind: str) -> None:
+        session.execute(
+            update(Job).where(Job.id == job_id, Job.status == "queued").values(
+                status="error", error=f"Tipo de tarefa desconhecido: {kind}", finished_at=datetime.utcnow()
+            )
+        )
+        session.commit()
+
+    def _recover_stale(self) -> None:
+        """Tarefas de processos mortos (sem heartbeat) voltam para a fila ou falham"""
+        cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        stale = (Job.status == "running", Job.heartbeat_at < cutoff)
+        with Session(engine) as session:
+            failed = session.execute(
+                update(Job).where(*stale, Job.attempts >= JOB_MAX_ATTEMPTS).values(
+                    status="error", error="Processo interrompido (tentativas esgotadas)",
+                    finished_at=datetime.utcnow()
+                )
+            ).rowcount
+            requeued = session.execute(
+                update(Job).where(*stale).values(status="queued", worker=None, progress=0,
+                                                 message="Processo interrompido; aguardando nova execução")
+            ).rowcount
+            session.commit()
+        if failed or requeued:
+            print(f"⚠️ Tarefas sem heartbeat: {requeued} de volta à fila, {failed} com erro")
+
+    def _cleanup(self) -> None:
+        """Apaga tarefas finalizadas há mais de JOB_RETENTION_HOURS e seus artefatos"""
+        if time.monotonic() - self._last_cleanup < _CLEANUP_INTERVAL:
+            return
+        self._last_cleanup = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=JOB_RETENTION_HOURS)
+        with Session(engine) as session:
+            jobs = session.exec(
+                select(Job).where(Job.status.in_(FINISHED), Job.finished_at < cutoff)
+            ).all()
+            for job in jobs:
+                if job.artifact_path and os.path.exists(job.artifact_path):
+                    os.remove(job.artifact_path)
+                session.delete(job)
+            session.commit()
+
+
+job_runner = JobRunner()
@@ -1,145 +1,46 @@
+import time
+PROCESS_STARTED = time.perf_counter()  # Início dos imports (tempo de inicialização)
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from sqlmodel import Session, select
-import time
-from sqlalchemy.exc import OperationalError
+import asyncio
 
-from database import create_db_and_tables, engine
-from models import Role
-from routers import auth, users, customers, feed, websockets, audit, products, services, quotes, dashboard, reports 
-
-def create_default_roles():
-    """Cria os cargos padrão se não existirem."""
-    try:
-        with Session(engine) as session:
-            roles = [
-                {
-                    "name": "Super Admin", 
-                    "slug": "admin", 
-                    "description": "Acesso total", 
-                    "permissions": {
-                        "all": True,
-                        # Clientes
-                        "customer_change_status": True, 
-                        "customer_require_approval": False,
-                        "can_edit_own_customers": True,
-                        "can_edit_others_customers": True,
-                        "can_delete_customers": True,
-                        # Produtos
-                        "can_create_products": True,
-                        "can_edit_products": True,
-                        "can_delete_products": True,
-                        "can_change_product_status": True,
-                        # Serviços
-                        "can_create_services": True,
-                        "can_edit_services": True,
-                        "can_delete_services": True,
-                        "can_change_service_status": True,
-                        "can_edit_service_basic": True,
-                        # Orçamentos
-                        "can_create_quotes": True,
-                        "can_edit_quotes": True,
-                        "can_delete_quotes": True,
-                        "can_change_quote_status": True,
-                        "can_view_all_quotes": True,
-                    }
-                },
-                {
-                    "name": "Gerente", 
-                    "slug": "manager", 
-                    "description": "Gestão", 
-                    "permissions": {
-                        # Clientes
-                        "customer_change_status": True, 
-                        "customer_require_approval": False,
-                        "can_edit_own_customers": True,
-                        "can_edit_others_customers": True,
-                        "can_delete_customers": True,
-                        # Produtos
-                        "can_create_products": True,
-                        "can_edit_products": True,
-                        "can_delete_products": True,
-                        "can_change_product_status": True,
-                        # Serviços
-                        "can_create_services": True,
-                        "can_edit_services": True,
-                        "can_delete_services": True,
-                        "can_change_service_status": True,
-                        "can_edit_service_basic": True,
-                        # Orçamentos
-                        "can_create_quotes": True,
-                        "can_edit_quotes": True,
-                        "can_delete_quotes": True,
-                        "can_change_quote_status": True,
-                        "can_view_all_quotes": True,
-                    }
-                },
-                {
-                    "name": "Vendedor", 
-                    "slug": "sales", 
-                    "description": "Vendas", 
-                    "permissions": {
-                        # Clientes
-                        "customer_change_status": False, 
-                        "customer_require_approval": True,
-                        "can_edit_own_customers": True,
-                        "can_edit_others_customers": False,
-                        "can_delete_customers": False,
-                        # Produtos
-                        "can_create_products": False,
-                        "can_edit_products": False,
-                        "can_delete_products": False,
-                        "can_change_product_status": False,
-                        # Serviços
-                        "can_create_services": False,
-                        "can_edit_services": False,
-                        "can_delete_services": False,
-                        "can_change_service_status": False,
-                        "can_edit_service_basic": False,
-                        # Orçamentos
-                        "can_create_quotes": True,
-                        "can_edit_quotes": True,
-                        "can_delete_quotes": False,
-                        "can_change_quote_status": False,
-                        "can_view_all_quotes": False,
-                    }
-                }
-            ]
-            for role_data in roles:
-                role = session.exec(select(Role).where(Role.slug == role_data["slug"])).first()
-                if not role: 
-                    print(f"🛠️ Criando cargo: {role_data['name']}")
-                    session.add(Role(**role_data))
-                else:
-                    # Sempre atualiza permissões para adicionar novas
-                    print(f"📝 Atualizando permissões do cargo: {role_data['name']}")
-                    role.permissions = role_data["permissions"]
-                    session.add(role)
-            session.commit()
-            print("✅ Cargos padrão verificados/criados com sucesso.")
-    except Exception as e:
-        print(f"❌ Erro ao criar cargos: {e}")
+from audit_sink import audit_sink
+from compression import CompressionMiddleware
+from connection_manager import manager
+from database import engine
+from instrumentation import InstrumentationMiddleware
+from job_runner import JOB_RUNNER, job_runner
+from serialization import ORJSONResponse
+from startup import initialize, install_drain_handler, process_state
+from routers import auth, users, customers, feed, websockets, audit, products, services, quotes, dashboard, reports, typeahead, catalog, metrics, health, jobs
+from services import job_handlers  # noqa: F401 (registra os tipos de tarefa)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Tenta conectar ao banco com retries
-    max_retries = 10
-    for i in range(max_retries):
-        try:
-            print(f"⏳ Tentando conectar ao banco ({i+1}/{max_retries})...")
-            create_db_and_tables()
-            create_default_roles()
-            break
-        except OperationalError:
-            print("⚠️ Banco de dados ainda não está pronto. Aguardando 5s...")
-            time.sleep(5)
-        except Exception as e:
-            print(f"❌ Erro crítico ao iniciar banco: {e}")
-            break
+    # Banco (com backoff), schema, cargos, typeahead e leaderboard; só grava o que mudou
+    await initialize(process_started=PROCESS_STARTED)
+    # WebSockets entre workers (LISTEN/NOTIFY no Postgres)
+    await manager.start()
+    # Tarefas em segundo plano neste processo (JOB_RUNNER=off: só no worker.py)
+    if JOB_RUNNER == "local":
+        job_runner.start()
+    process_state.set("ready")
+    # SIGTERM: sai do /health/ready e fecha os WebSockets (1012: o frontend
+    # reconecta em outro worker) enquanto o servidor ainda atende
+    install_drain_handler(lambda: manager.close_all(code=1012))
     yield
+    # Desligamento: o uvicorn já parou de aceitar conexões
+    process_state.set("draining")
+    # Tarefas em execução voltam para a fila (outro processo continua)
+    await asyncio.to_thread(job_runner.stop)
+    await manager.stop()
+    audit_sink.shutdown()
+    engine.dispose()
 
-app = FastAPI(lifespan=lifespan, title="ERP Agent MVP")
+# orjson nas rotas sem response_model (as com response_model já serializam pelo Pydantic)
+app = FastAPI(lifespan=lifespan, title="ERP Agent MVP", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -147,8 +48,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag", "Content-Disposition"],
 )
 
+# Conta consultas SQL e tempo por requisição (Server-Timing e /metrics)
+app.add_middleware(InstrumentationMiddleware)
+
+# gzip/brotli por tamanho e Content-Type (PDF e XLSX passam direto). Por
+# último = mais externo: comprime o corpo já pronto, inclusive em streaming
+app.add_middleware(CompressionMiddleware)
+
 # --- INCLUI ROTEADORES ---
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -160,4 +69,9 @@ app.include_router(products.router)
 app.include_router(services.router)
 app.include_router(quotes.router)
 app.include_router(dashboard.router)
-app.include_router(reports.router)
\ No newline at end of file
+app.include_router(reports.router)
+app.include_router(typeahead.router)
+app.include_router(catalog.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+app.include_router(jobs.router)
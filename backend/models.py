@@ -1,13 +1,14 @@
 from typing import Optional, Dict, List
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Column, Relationship
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index, text
 
 # --- Base ---
 class BaseModel(SQLModel):
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # onupdate: todo UPDATE (ORM ou update()) que não define updated_at o atualiza (ETags)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
 
 # --- TABELA DE LIGAÇÃO (SUPERVISÃO) ---
 class UserSupervisor(SQLModel, table=True):
@@ -49,6 +50,23 @@ class User(BaseModel, table=True):
     )
 
 class Customer(BaseModel, table=True):
+    __table_args__ = (
+        # Filtros por status (dashboard, lixeira, alteração em massa)
+        Index("ix_customer_status", "status"),
+        # Listagem: WHERE status <> 'excluido' ORDER BY id (parcial: ignora a lixeira)
+        Index(
+            "ix_customer_active", "id",
+            postgresql_where=text("status <> 'excluido'"),
+            sqlite_where=text("status <> 'excluido'"),
+        ),
+        # Listagem do vendedor: ... AND salesperson_id = X ORDER BY id
+        Index(
+            "ix_customer_active_salesperson", "salesperson_id", "id",
+            postgresql_where=text("status <> 'excluido'"),
+            sqlite_where=text("status <> 'excluido'"),
+        ),
+    )
+    
     # Identificação Básica
     name: str = Field(index=True)
     fantasy_name: Optional[str] = None  # [NOVO] Nome Fantasia
@@ -92,6 +110,11 @@ class Customer(BaseModel, table=True):
 
 # --- TIMELINE E FEED ---
 class CustomerNote(BaseModel, table=True):
+    __table_args__ = (
+        # Notas do cliente: WHERE customer_id = X ORDER BY created_at DESC
+        Index("ix_customernote_customer_created", "customer_id", "created_at"),
+    )
+    
     content: str 
     customer_id: int = Field(foreign_key="customer.id")
     created_by_id: int = Field(foreign_key="user.id")
@@ -103,6 +126,13 @@ class CustomerNote(BaseModel, table=True):
     completed_at: Optional[datetime] = None  
 
 class FeedItem(BaseModel, table=True):
+    __table_args__ = (
+        # Feed filtrado por usuário: WHERE user_id = X ORDER BY id DESC
+        Index("ix_feeditem_user_id_id", "user_id", "id"),
+        # Filtro por período
+        Index("ix_feeditem_created_at", "created_at"),
+    )
+    
     content: str
     icon: str = "activity"
     user_id: int = Field(foreign_key="user.id")
@@ -110,6 +140,15 @@ class FeedItem(BaseModel, table=True):
     visibility: str = Field(default="public") 
 
 class Notification(BaseModel, table=True):
+    __table_args__ = (
+        # Não lidas do usuário: WHERE user_id = X AND is_read = false ORDER BY id DESC
+        Index(
+            "ix_notification_unread", "user_id", "id",
+            postgresql_where=text("is_read = false"),
+            sqlite_where=text("is_read = 0"),
+        ),
+    )
+    
     user_id: int = Field(foreign_key="user.id")
     content: str
     is_read: bool = Field(default=False)
@@ -118,6 +157,15 @@ class Notification(BaseModel, table=True):
 
 # --- NOVO: AUDITORIA TÉCNICA ---
 class AuditLog(BaseModel, table=True):
+    # No Postgres a tabela é particionada por mês em created_at (ver migração
+    # c3f9a2e18b54 e audit_retention.py); os índices valem para todas as partições.
+    __table_args__ = (
+        # Linha do tempo de um registro: WHERE table_name/record_id ORDER BY created_at
+        Index("ix_auditlog_record_timeline", "table_name", "record_id", "created_at"),
+        # Atividades recentes do dashboard: WHERE created_at >= X ORDER BY created_at DESC
+        Index("ix_auditlog_created_at", "created_at"),
+    )
+    
     table_name: str # Ex: 'customer'
     record_id: int  # Ex: 15
     action: str     # CREATE, UPDATE, DELETE
@@ -163,6 +211,15 @@ class Service(BaseModel, table=True):
 
 class Quote(BaseModel, table=True):
     """Orçamento/Cotação para clientes"""
+    __table_args__ = (
+        # Contagens por status no período (dashboard, relatórios)
+        Index("ix_quote_status_created_at", "status", "created_at"),
+        # Listagem ORDER BY created_at DESC e relatórios por período
+        Index("ix_quote_created_at", "created_at"),
+        # Orçamentos do cliente: WHERE customer_id = X ORDER BY created_at DESC
+        Index("ix_quote_customer_created", "customer_id", "created_at"),
+    )
+    
     quote_number: str = Field(unique=True, index=True)  # Ex: ORC-2026-0001
     customer_id: int = Field(foreign_key="customer.id")
     
@@ -170,7 +227,7 @@ class Quote(BaseModel, table=True):
     customer: Optional["Customer"] = Relationship()
     
     # Dados do orçamento
-    items: str = Field(sa_column=Column(JSON))  # Lista de {type: 'product'|'service', id, quantity, price, subtotal}
+    items: List[Dict] = Field(sa_column=Column(JSON))  # Lista de {type: 'product'|'service', item_id, name, quantity, unit_price, subtotal}
     subtotal: float = Field(default=0.0)
     discount: float = Field(default=0.0)  # Desconto em valor
     discount_percent: float = Field(default=0.0)  # Desconto em %
@@ -188,4 +245,66 @@ class Quote(BaseModel, table=True):
     # Datas importantes
     sent_at: Optional[datetime] = None  # Data de envio ao cliente
     approved_at: Optional[datetime] = None  # Data de aprovação
-    invoiced_at: Optional[datetime] = None  # Data de faturamento
\ No newline at end of file
+    invoiced_at: Optional[datetime] = None  # Data de faturamento
+    reminder_sent_at: Optional[datetime] = None  # Último lembrete de aprovação (tarefa quote_reminders)
+    
+    # Período de locação (usado nas reservas de estoque)
+    rental_start: Optional[datetime] = None  # Início da locação
+    rental_end: Optional[datetime] = None  # Fim da locação (exclusivo)
+
+
+# --- RESERVAS DE ESTOQUE (LOCAÇÃO) ---
+class StockReservation(BaseModel, table=True):
+    """Unidades de um produto reservadas por um orçamento aprovado em um período"""
+    __table_args__ = (
+        # Índice de intervalos: busca reservas de um produto que cruzam um período
+        Index("ix_stockreservation_product_period", "product_id", "start_date", "end_date"),
+    )
+    
+    product_id: int = Field(foreign_key="product.id")
+    quote_id: int = Field(foreign_key="quote.id", index=True, ondelete="CASCADE")
+    quantity: int = Field(default=1)
+    start_date: datetime  # Início do período reservado
+    end_date: datetime    # Fim do período reservado (exclusivo)
+    status: str = Field(default="ativa")  # ativa, liberada
+
+# --- VERSÃO DO CATÁLOGO (CACHE) ---
+class CatalogVersion(SQLModel, table=True):
+    """Contador incrementado a cada escrita em produtos/serviços (ver services/catalog_cache.py)"""
+    name: str = Field(primary_key=True)  # product, service
+    version: int = Field(default=0)
+
+# --- TAREFAS EM SEGUNDO PLANO ---
+class Job(BaseModel, table=True):
+    """Operação longa executada pelo job_runner (ver job_runner.py)"""
+    __table_args__ = (
+        # Runner: fila (WHERE status = 'queued' ORDER BY id) e tarefas sem heartbeat
+        Index("ix_job_status", "status", "id"),
+        # Tarefas do usuário: WHERE user_id = X ORDER BY id DESC
+        Index("ix_job_user", "user_id", "id"),
+    )
+    
+    kind: str  # Tipo registrado com @job_handler (ex.: report_export)
+    status: str = Field(default="queued")  # queued, running, done, error, cancelled
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id")  # Dono (recebe o andamento)
+    params: Dict = Field(default={}, sa_column=Column(JSON))
+    
+    # Andamento
+    progress: int = Field(default=0)
+    total: Optional[int] = None
+    message: Optional[str] = None
+    cancel_requested: bool = Field(default=False)
+    
+    # Resultado
+    result: Optional[Dict] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    artifact_path: Optional[str] = None  # Arquivo gerado (download em /jobs/{id}/artifact)
+    artifact_name: Optional[str] = None
+    artifact_type: Optional[str] = None
+    
+    # Execução
+    attempts: int = Field(default=0)
+    worker: Optional[str] = None  # host:pid do processo que está executando
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
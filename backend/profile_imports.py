@@ -0,0 +1,145 @@
+"""
+Perfil de imports do app (tempo de boot dos workers).
+
+Roda `python -X importtime -c "import main"` em um processo novo e mostra o
+tempo acumulado por módulo (o mesmo dado do -X importtime, ordenado), ou
+agrupado por pacote. Também verifica que as dependências pesadas continuam
+sendo carregadas só no primeiro uso (LAZY_MODULES).
+
+Uso (dentro do container backend):
+    python profile_imports.py                    # 25 módulos mais caros
+    python profile_imports.py --by-package       # soma por pacote de topo
+    python profile_imports.py --repeat 5 --budget-ms 1500
+    python profile_imports.py --json > imports.json
+
+Sai com código 1 se o tempo (mediana das repetições) passar de --budget-ms
+ou se algum módulo de LAZY_MODULES for importado no boot.
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Carregados sob demanda: PDF, e-mail, JWT/senha, CPF/CNPJ e planilhas
+LAZY_MODULES = ("reportlab", "smtplib", "jose", "passlib", "validate_docbr", "openpyxl")
+
+# Orçamento padrão de `import main` (ms), ajustável por variável de ambiente
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+
+class ImportEntry(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportEntry]:
+    """Converte a saída de -X importtime em entradas (na ordem do Python)"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.rstrip()
+        depth = (len(module) - len(module.lstrip())) // 2
+        entries.append(ImportEntry(module.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def profile(target: str = "main") -> List[ImportEntry]:
+    """Importa `target` em um processo novo e devolve o perfil"""
+    env = dict(os.environ)
+    # O engine é criado no import, mas não conecta: não precisa de banco real
+    env.setdefault("DATABASE_URL", "sqlite://")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {target}:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def total_ms(entries: List[ImportEntry], target: str = "main") -> float:
+    for entry in reversed(entries):
+        if entry.module == target and entry.depth == 0:
+            return entry.cumulative_us / 1000
+    return sum(e.self_us for e in entries) / 1000
+
+
+def lazy_violations(entries: List[ImportEntry], lazy_modules=LAZY_MODULES) -> List[str]:
+    """Módulos que deveriam ser carregados sob demanda mas entraram no boot"""
+    found = set()
+    for entry in entries:
+        root = entry.module.split(".")[0]
+        if entry.module in lazy_modules or root in lazy_modules:
+            found.add(entry.module if entry.module in lazy_modules else root)
+    return sorted(found)
+
+
+def by_package(entries: List[ImportEntry]) -> Dict[str, int]:
+    """Tempo próprio (us) somado por pacote de topo"""
+    totals: Dict[str, int] = {}
+    for entry in entries:
+        root = entry.module.split(".")[0]
+        totals[root] = totals.get(root, 0) + entry.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Perfil de imports do backend")
+    parser.add_argument("--target", default="main", help="Módulo a importar (padrão: main)")
+    parser.add_argument("--top", type=int, default=25, help="Quantidade de linhas")
+    parser.add_argument("--by-package", action="store_true", help="Agrupa o tempo próprio por pacote")
+    parser.add_argument("--repeat", type=int, default=1, help="Execuções (usa a mediana)")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help=f"Falha acima deste tempo (padrão do teste: {IMPORT_BUDGET_MS:.0f})")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args(argv)
+
+    runs = [profile(args.target) for _ in range(max(1, args.repeat))]
+    totals = [total_ms(entries, args.target) for entries in runs]
+    median = statistics.median(totals)
+    entries = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    violations = lazy_violations(entries)
+
+    if args.json:
+        print(json.dumps({
+            "target": args.target,
+            "total_ms": round(median, 1),
+            "runs_ms": [round(t, 1) for t in totals],
+            "lazy_violations": violations,
+            "packages_ms": {k: round(v / 1000, 1) for k, v in by_package(entries).items()},
+            "modules": [e._asdict() for e in entries],
+        }, indent=2))
+    elif args.by_package:
+        print(f"{'pacote':<32}{'ms':>10}")
+        for package, self_us in list(by_package(entries).items())[:args.top]:
+            print(f"{package:<32}{self_us / 1000:>10.1f}")
+    else:
+        print(f"{'acumulado ms':>12}{'próprio ms':>12}  módulo")
+        for entry in sorted(entries, key=lambda e: e.cumulative_us, reverse=True)[:args.top]:
+            print(f"{entry.cumulative_us / 1000:>12.1f}{entry.self_us / 1000:>12.1f}  "
+                  f"{'  ' * entry.depth}{entry.module}")
+
+    if not args.json:
+        print(f"\nimport {args.target}: {median:.0f}ms (mediana de {len(totals)})")
+    failed = False
+    if violations:
+        print(f"❌ Importados no boot (deveriam ser sob demanda): {', '.join(violations)}", file=sys.stderr)
+        failed = True
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"❌ Acima do orçamento de {args.budget_ms:.0f}ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
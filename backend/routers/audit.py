@@ -1,42 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from typing import Optional
 
 from database import get_session
-from models import AuditLog, User
 from dependencies import get_current_user
-from schemas import AuditLogRead
+from schemas import AuditLogPage
+from services.audit_service import AuditService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/audit", tags=["Auditoria"])
 
-@router.get("/customer/{customer_id}", response_model=List[AuditLogRead])
-def get_customer_audit_logs(
-    customer_id: int,
-    session: Session = Depends(get_session),
-    current_user=Depends(get_current_user)
-):
+
+def _require_admin(current_user) -> None:
     # Only admin can view audit logs
     if not current_user.role or current_user.role.slug != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
-    
-    statement = select(AuditLog, User.name).join(User, AuditLog.user_id == User.id).where(
-        AuditLog.table_name == "customer",
-        AuditLog.record_id == customer_id
-    ).order_by(AuditLog.created_at.desc())
-    
-    results = session.exec(statement).all()
-    
-    # Map to AuditLogRead with user_name
-    audit_logs = []
-    for audit, user_name in results:
-        audit_logs.append(AuditLogRead(
-            id=audit.id,
-            table_name=audit.table_name,
-            action=audit.action,
-            user_id=audit.user_id,
-            user_name=user_name,
-            changes=audit.changes,
-            created_at=audit.created_at
-        ))
-    
-    return audit_logs
\ No newline at end of file
+
+
+@router.get("/{table_name}/{record_id}", response_model=AuditLogPage)
+def get_audit_timeline(
+    table_name: str,
+    record_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """
+    Linha do tempo de auditoria de um registro (mais recente primeiro).
+
+    - format=json: página com até `limit` itens e `next_cursor`
+    - format=ndjson: exporta todos os itens (a partir do cursor, se informado)
+      em streaming, um JSON por linha
+    """
+    _require_admin(current_user)
+
+    if format == "ndjson":
+        return StreamingResponse(
+            AuditService.stream_ndjson(table_name, record_id, cursor),
+            media_type="application/x-ndjson",
+            headers={
+                "Content-Disposition": f"attachment; filename=audit_{table_name}_{record_id}.ndjson"
+            }
+        )
+
+    return AuditService.get_page(session, table_name, record_id, limit, cursor)
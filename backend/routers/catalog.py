@@ -0,0 +1,19 @@
+"""
+Rotas HTTP do Catálogo
+Estatísticas do cache de produtos e serviços
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from dependencies import get_current_user
+from services.catalog_cache import catalog_cache
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+@router.get("/stats")
+def get_catalog_cache_stats(current_user=Depends(get_current_user)):
+    """Acertos, recargas e versão do cache do catálogo (somente admin)"""
+    if not current_user.role or current_user.role.slug != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    return catalog_cache.stats()
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, status, Body, UploadFile, File, Query, Request, Response
+from sqlmodel import Session, select, func
 from typing import List
 # Ajuste de importação: removido o prefixo 'backend.' pois o container já inicia nesta pasta
 from database import get_session
-from models import Customer, AuditLog, CustomerNote, User, Notification
+from models import Customer, CustomerNote, User, Notification
 from dependencies import get_current_user
 import schemas
 from schemas import CustomerCreate, CustomerRead
 from connection_manager import manager
+from utils import create_audit_log
+from etags import collection_etag, not_modified, request_scope, resource_etag
+from serialization import json_response
+from job_runner import describe, job_runner
 
 # NOVO: Import do Service Layer
-from services.customer_service import CustomerService
+from services.customer_service import BULK_STATUS_MAX_IDS, CustomerService
+from services.customer_import import CustomerImportService, DEFAULT_CHUNK_SIZE
+from services.customer_search import CustomerSearchService, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
@@ -32,6 +38,25 @@ def create_customer(
     )
     return new_customer
 
+@router.post("/import")
+def import_customers(
+    file: UploadFile = File(...),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """
+    Importa clientes em massa de um arquivo CSV ou XLSX.
+    Retorna o total importado e o erro de cada linha rejeitada.
+    """
+    return CustomerImportService.import_file(
+        session=session,
+        stream=file.file,
+        filename=file.filename,
+        current_user=current_user,
+        chunk_size=chunk_size
+    )
+
 @router.put("/{customer_id}", response_model=CustomerRead)
 def update_customer(
     customer_id: int,
@@ -55,6 +80,40 @@ def update_customer(
     )
     return updated_customer
 
+@router.patch("/status")
+def bulk_update_customer_status(
+    payload: schemas.CustomerBulkStatusUpdate,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """
+    Altera o status de vários clientes em uma única requisição.
+    Espera JSON: { "ids": [1, 2, 3], "status": "ativo" }
+    Retorna o resultado por ID (sucesso ou motivo da recusa).
+
+    Acima de BULK_STATUS_MAX_IDS clientes responde 202 com a tarefa
+    customer_status (andamento em /jobs/{id}; contadores e falhas no result).
+    """
+    if len(payload.ids) > BULK_STATUS_MAX_IDS:
+        job = job_runner.submit(
+            session, "customer_status", current_user.id, {"ids": payload.ids, "status": payload.status},
+            total=len(set(payload.ids))
+        )
+        return json_response(describe(job), status_code=202)
+
+    results = CustomerService.bulk_update_customer_status(
+        session=session,
+        customer_ids=payload.ids,
+        new_status=payload.status,
+        current_user=current_user
+    )
+    return {
+        "status": payload.status,
+        "updated": sum(1 for r in results if r.get("changed")),
+        "failed": sum(1 for r in results if not r["success"]),
+        "results": results
+    }
+
 # [NOVO] Rota específica para alterar apenas o Status (Mais leve e segura para Bulk Actions)
 @router.patch("/{customer_id}/status", response_model=CustomerRead)
 def update_customer_status(
@@ -92,8 +151,22 @@ def verify_document(
         return {"exists": True, "name": existing.name, "id": existing.id}
     return {"exists": False}
 
+@router.get("/search", response_model=List[CustomerRead])
+def search_customers(
+    q: str = Query(..., min_length=2, description="Nome, fantasia, documento, email, cidade ou contato"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """Busca clientes visíveis para o usuário, mais relevantes primeiro."""
+    if not current_user.role:
+        raise HTTPException(status_code=403, detail="Usuário sem cargo definido")
+    return CustomerSearchService.search(session, current_user, q, limit)
+
 @router.get("/")
 def read_customers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 25,
     session: Session = Depends(get_session),
@@ -108,12 +181,19 @@ def read_customers(
     if user_role_slug not in ["admin", "manager"]:
         statement = statement.where(Customer.salesperson_id == current_user.id)
     
-    # Conta total de registros (antes da paginação)
-    count_statement = statement.with_only_columns(Customer.id)
-    total = len(session.exec(count_statement).all())
-    
-    # Aplica paginação
-    statement = statement.offset(skip).limit(limit)
+    # Total (antes da paginação) e última alteração no próprio banco: ETag da listagem
+    filtered = statement.subquery()
+    total, last_updated = session.exec(
+        select(func.count(), func.max(filtered.c.updated_at)).select_from(filtered)
+    ).one()
+    cached = not_modified(request, response, collection_etag(
+        "customer", total, last_updated, *request_scope(request, current_user)
+    ))
+    if cached:
+        return cached
+    
+    # Aplica paginação (ordem estável por id: ix_customer_active*)
+    statement = statement.order_by(Customer.id).offset(skip).limit(limit)
     customers = session.exec(statement).all()
     
     return {
@@ -138,6 +218,8 @@ def read_trash(
 @router.get("/{customer_id}", response_model=CustomerRead)
 def read_customer(
     customer_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user)
 ):
@@ -151,6 +233,9 @@ def read_customer(
         if customer.salesperson_id != current_user.id:
             raise HTTPException(status_code=403, detail="Você não tem permissão para acessar este cliente")
     
+    cached = not_modified(request, response, resource_etag(customer))
+    if cached:
+        return cached
     return customer
 
 @router.delete("/{customer_id}")
@@ -174,7 +259,8 @@ def soft_delete_customer(
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
     # ITEM 1: Registro de Auditoria da ação de exclusão
-    audit = AuditLog(
+    create_audit_log(
+        session=session,
         table_name="customer",
         record_id=customer_id,
         action="SOFT_DELETE",
@@ -184,7 +270,6 @@ def soft_delete_customer(
     
     customer.status = "excluido"
     session.add(customer)
-    session.add(audit)
     session.commit()
     return {"detail": "Cliente enviado para a lixeira"}
 
@@ -206,7 +291,8 @@ def restore_customer(
         raise HTTPException(status_code=400, detail="Cliente não está na lixeira")
     
     # Registro de Auditoria da restauração
-    audit = AuditLog(
+    create_audit_log(
+        session=session,
         table_name="customer",
         record_id=customer_id,
         action="RESTORE",
@@ -216,7 +302,6 @@ def restore_customer(
     
     customer.status = "ativo"
     session.add(customer)
-    session.add(audit)
     session.commit()
     return {"detail": "Cliente restaurado com sucesso"}
 
@@ -238,7 +323,8 @@ def hard_delete_customer(
         raise HTTPException(status_code=400, detail="Cliente deve estar na lixeira para exclusão definitiva")
     
     # Registro de Auditoria da exclusão definitiva
-    audit = AuditLog(
+    create_audit_log(
+        session=session,
         table_name="customer",
         record_id=customer_id,
         action="HARD_DELETE",
@@ -250,7 +336,6 @@ def hard_delete_customer(
         }}
     )
     
-    session.add(audit)
     session.delete(customer)
     session.commit()
     return {"detail": "Cliente excluído definitivamente"}
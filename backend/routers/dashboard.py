@@ -3,14 +3,15 @@ Rotas HTTP do Dashboard
 KPIs e estatísticas do sistema
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select, func
 from datetime import datetime, timedelta
 from typing import Optional
 
 from database import get_session
-from models import Customer, Quote, Product, Service, User, AuditLog
+from models import Customer, Quote, Product, Service, AuditLog
 from dependencies import get_current_user
+from services.leaderboard import leaderboard, METRICS, DEFAULT_LEADERBOARD_LIMIT, MAX_LEADERBOARD_LIMIT
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
@@ -122,23 +123,10 @@ def get_dashboard_stats(
         "pendente": pending_customers
     }
     
-    # 8. TOP VENDEDORES (clientes por vendedor)
-    top_salespeople = session.query(
-        User.name,
-        func.count(Customer.id).label("total_customers")
-    ).outerjoin(
-        Customer, Customer.salesperson_id == User.id
-    ).filter(
-        User.role_id.isnot(None)
-    ).group_by(
-        User.id, User.name
-    ).order_by(
-        func.count(Customer.id).desc()
-    ).limit(5).all()
-    
+    # 8. TOP VENDEDORES (contadores em memória, ver services/leaderboard.py)
     salespeople_data = [
-        {"name": name, "total_customers": count}
-        for name, count in top_salespeople
+        {**row, "total_customers": row["customers"]}
+        for row in leaderboard.ranking("customers", DEFAULT_LEADERBOARD_LIMIT)
     ]
     
     return {
@@ -171,6 +159,30 @@ def get_dashboard_stats(
     }
 
 
+@router.get("/leaderboard")
+def get_leaderboard(
+    metric: str = Query("customers", description=f"Ordenação: {', '.join(METRICS)}"),
+    limit: int = Query(DEFAULT_LEADERBOARD_LIMIT, ge=1, le=MAX_LEADERBOARD_LIMIT),
+    current_user=Depends(get_current_user)
+):
+    """
+    Ranking de vendedores: clientes, orçamentos em aberto, receita aprovada
+    e faturada. Servido da memória; escritas de outros workers aparecem em
+    até LEADERBOARD_RECONCILE_INTERVAL segundos.
+    """
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"Métrica inválida. Use: {', '.join(METRICS)}")
+    return leaderboard.ranking(metric, limit)
+
+
+@router.get("/leaderboard/stats")
+def get_leaderboard_stats(current_user=Depends(get_current_user)):
+    """Atualizações, reconciliações e correções do leaderboard (somente admin)"""
+    if not current_user.role or current_user.role.slug != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    return leaderboard.snapshot_stats()
+
+
 @router.get("/quotes-timeline")
 def get_quotes_timeline(
     days: int = 30,
@@ -196,7 +208,9 @@ def get_quotes_timeline(
                 "rascunho": 0,
                 "enviado": 0,
                 "aprovado": 0,
-                "faturado": 0
+                "recusado": 0,
+                "faturado": 0,
+                "cancelado": 0
             }
         timeline[date_key][quote.status] += 1
     
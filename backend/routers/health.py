@@ -0,0 +1,42 @@
+"""
+Rotas de Saúde (balanceador, orquestrador e healthcheck do Docker)
+
+- /health/live: o processo responde (não consulta o banco). Falha aqui = reiniciar.
+- /health/ready: o worker terminou a inicialização, não está encerrando e o
+  banco responde. Falha aqui = tirar do balanceamento, sem reiniciar.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+import asyncio
+import os
+import time
+
+from startup import check_connection, process_state
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+# Tempo máximo do SELECT 1 da prontidão (segundos)
+READY_DB_TIMEOUT = float(os.getenv("READY_DB_TIMEOUT", "2"))
+
+
+@router.get("/live")
+def live():
+    return {"status": "ok", "pid": os.getpid(), "phase": process_state.phase}
+
+
+@router.get("/ready")
+async def ready():
+    body = {"pid": os.getpid(), "phase": process_state.phase, "database": "não verificado"}
+    if process_state.phase != "ready":
+        return JSONResponse({"status": "indisponível", **body}, status_code=503)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.to_thread(check_connection), READY_DB_TIMEOUT)
+    except Exception as e:
+        body["database"] = f"erro: {type(e).__name__}"
+        return JSONResponse({"status": "indisponível", **body}, status_code=503)
+    body["database"] = "ok"
+    body["database_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return {"status": "ok", **body}
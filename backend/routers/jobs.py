@@ -0,0 +1,75 @@
+"""
+Rotas de Tarefas em Segundo Plano
+Status, cancelamento e artefatos das tarefas (ver job_runner.py). As
+tarefas são criadas pelas rotas de cada domínio (exportações, status em
+massa, lotes de PDF, lembretes), que respondem 202 com o estado inicial.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlmodel import Session, select
+import os
+
+from database import get_session
+from dependencies import get_current_user, get_user_role_slug
+from job_runner import FINISHED, describe, job_runner
+from models import Job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _get_job(job_id: int, session: Session, current_user) -> Job:
+    """Tarefa do usuário (admin vê todas); 404 também para a de outro usuário"""
+    job = session.get(Job, job_id)
+    if not job or (job.user_id != current_user.id and get_user_role_slug(current_user, session) != "admin"):
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    return job
+
+
+@router.get("/")
+def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """Tarefas do usuário, mais recentes primeiro"""
+    jobs = session.exec(
+        select(Job).where(Job.user_id == current_user.id).order_by(Job.id.desc()).limit(limit)
+    ).all()
+    return [describe(job) for job in jobs]
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: int,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    return describe(_get_job(job_id, session, current_user))
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(
+    job_id: int,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """Na fila: cancela na hora. Em execução: a tarefa para no próximo ponto de progresso"""
+    job = _get_job(job_id, session, current_user)
+    if job.status in FINISHED:
+        raise HTTPException(status_code=409, detail=f"Tarefa já finalizada ({job.status})")
+    return describe(job_runner.cancel(session, job))
+
+
+@router.get("/{job_id}/artifact")
+def download_artifact(
+    job_id: int,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    job = _get_job(job_id, session, current_user)
+    if job.status != "done" or not job.artifact_path:
+        raise HTTPException(status_code=409, detail=f"Tarefa sem arquivo disponível ({job.status})")
+    if not os.path.exists(job.artifact_path):
+        raise HTTPException(status_code=410, detail="Arquivo da tarefa expirou")
+    return FileResponse(job.artifact_path, media_type=job.artifact_type, filename=job.artifact_name)
@@ -0,0 +1,23 @@
+"""
+Rota de Métricas
+Histogramas por rota no formato texto do Prometheus (ver instrumentation.py)
+"""
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import os
+
+from instrumentation import metrics
+
+router = APIRouter(tags=["metrics"])
+
+# Se definido, o scraper precisa enviar "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(authorization: Optional[str] = Header(None)):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -3,15 +3,20 @@ Rotas HTTP de Produtos
 Finas e limpas - toda lógica delegada para ProductService
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
 from sqlmodel import Session
 from typing import Optional, List
+from datetime import datetime, date
 
 from database import get_session
 from models import Product
 from dependencies import get_current_user
+from etags import collection_etag, not_modified, request_scope, resource_etag, summarize
+from serialization import json_response
 from schemas import ProductCreate, ProductRead, ProductUpdate
 from services.product_service import ProductService
+from services.reservation_service import ReservationService
+from services.availability_service import AvailabilityService
 
 router = APIRouter(prefix="/products", tags=["products"])
 
@@ -36,6 +41,8 @@ def create_product(
 
 @router.get("/")
 def list_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(25, ge=1, le=100),
     status: Optional[str] = Query(None),
@@ -47,22 +54,21 @@ def list_products(
     Lista produtos com filtros opcionais de status e categoria.
     Retorna paginação com total.
     """
-    products = ProductService.get_products_for_user(
-        session=session,
-        user=current_user,
-        skip=skip,
-        limit=limit,
-        status_filter=status,
-        category_filter=category
-    )
-    
-    # Contar total (sem limite)
+    # Todos os do filtro (cache do catálogo, sem consulta): total e ETag
     all_products = ProductService.get_products_for_user(
         session=session,
         user=current_user,
+        limit=None,
         status_filter=status,
         category_filter=category
     )
+    cached = not_modified(request, response, collection_etag(
+        "product", *summarize(all_products), *request_scope(request, current_user)
+    ))
+    if cached:
+        return cached
+    
+    products = all_products[skip:skip + limit]
     
     # Serializar produtos manualmente
     items_list = []
@@ -84,17 +90,41 @@ def list_products(
             "updated_at": p.updated_at.isoformat() if p.updated_at else None,
         })
     
-    return {
+    # Já são tipos simples: sem jsonable_encoder
+    return json_response({
         "items": items_list,
         "total": len(all_products),
         "skip": skip,
         "limit": limit
-    }
+    }, response)
+
+
+@router.get("/availability/calendar")
+def get_availability_calendar(
+    product_ids: List[int] = Query(...),
+    start: date = Query(...),
+    end: date = Query(...),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """
+    Calendário de disponibilidade: unidades livres por dia para vários produtos.
+    Exemplo: /products/availability/calendar?product_ids=1&product_ids=2&start=2026-01-01&end=2026-01-31
+    """
+    return AvailabilityService.get_calendar(
+        session=session,
+        product_ids=product_ids,
+        start=start,
+        end=end,
+        user=current_user
+    )
 
 
 @router.get("/{product_id}", response_model=ProductRead)
 def get_product(
     product_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user)
 ):
@@ -110,6 +140,9 @@ def get_product(
     if not product:
         raise HTTPException(status_code=404, detail="Produto não encontrado")
     
+    cached = not_modified(request, response, resource_etag(product))
+    if cached:
+        return cached
     return product
 
 
@@ -190,11 +223,15 @@ def delete_product(
 @router.get("/{product_id}/availability")
 def check_product_availability(
     product_id: int,
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user)
 ):
     """
     Verifica disponibilidade de um produto para locação.
+    Com start/end, desconta as unidades reservadas por orçamentos aprovados
+    no período [start, end).
     """
     product = ProductService.get_product_by_id(
         session=session,
@@ -205,12 +242,29 @@ def check_product_availability(
     if not product:
         raise HTTPException(status_code=404, detail="Produto não encontrado")
     
+    if (start is None) != (end is None):
+        raise HTTPException(status_code=400, detail="Informe start e end juntos")
+    
+    if start and end:
+        if end <= start:
+            raise HTTPException(status_code=400, detail="end deve ser posterior a start")
+        quantity_available = ReservationService.get_available_quantity(
+            session=session,
+            product=product,
+            start=start,
+            end=end
+        )
+    else:
+        quantity_available = product.quantity if product.status == "disponivel" else 0
+    
     return {
         "product_id": product.id,
         "name": product.name,
         "status": product.status,
-        "is_available": product.status == "disponivel",
-        "quantity_available": product.quantity if product.status == "disponivel" else 0,
+        "is_available": quantity_available > 0,
+        "quantity_available": quantity_available,
+        "start": start,
+        "end": end,
         "price_daily": product.price_daily,
         "price_weekly": product.price_weekly,
         "price_monthly": product.price_monthly
@@ -2,23 +2,29 @@
 Rotas HTTP de Orçamentos (Quotes)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from typing import Optional, List
-import json
 import logging
 
 from database import get_session
 from models import Quote, Customer
-from dependencies import get_current_user
-from schemas import QuoteCreate, QuoteRead, QuoteUpdate, QuoteItem
+from dependencies import get_current_user, get_user_role_slug
+from job_runner import describe, job_runner
+from schemas import QuoteCreate, QuoteRead, QuoteUpdate
 from services.quote_service import QuoteService
-from pdf_generator import generate_quote_pdf
+from services.reservation_service import ReservationService
+from services.quote_projection import QuoteProjection
 from email_service import send_quote_status_notification
+from etags import collection_etag, not_modified, request_scope, resource_etag, summarize
+from serialization import json_response
 
 logger = logging.getLogger(__name__)
 
+# Orçamentos por lote de PDFs (tarefa quote_pdfs)
+PDF_BATCH_MAX_IDS = 1000
+
 router = APIRouter(prefix="/quotes", tags=["quotes"])
 
 
@@ -38,128 +44,78 @@ def create_quote(
         current_user=current_user
     )
     
-    # Converter items de JSON string para lista
-    items_list = json.loads(new_quote.items) if isinstance(new_quote.items, str) else new_quote.items
-    
-    return QuoteRead(
-        id=new_quote.id,
-        quote_number=new_quote.quote_number,
-        customer_id=new_quote.customer_id,
-        items=[QuoteItem(**item) for item in items_list],
-        subtotal=new_quote.subtotal,
-        discount=new_quote.discount,
-        discount_percent=new_quote.discount_percent,
-        total=new_quote.total,
-        status=new_quote.status,
-        valid_until=new_quote.valid_until,
-        notes=new_quote.notes,
-        payment_terms=new_quote.payment_terms,
-        delivery_terms=new_quote.delivery_terms,
-        sent_at=new_quote.sent_at,
-        approved_at=new_quote.approved_at,
-        invoiced_at=new_quote.invoiced_at,
-        created_at=new_quote.created_at,
-        updated_at=new_quote.updated_at
-    )
+    return QuoteProjection.from_model(new_quote)
 
 
 @router.get("/", response_model=dict)
 def list_quotes(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(25, ge=1, le=100),
     status: Optional[str] = Query(None),
     customer_id: Optional[int] = Query(None),
+    view: str = Query("summary", pattern="^(summary|detail)$"),
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user)
 ):
     """
     Lista orçamentos com filtros opcionais.
+    view=summary (padrão): linhas da tabela, sem itens (items_count no lugar).
+    view=detail: orçamentos completos (formato de QuoteRead).
     """
-    quotes = QuoteService.get_quotes_for_user(
+    count, last_updated = QuoteService.get_quotes_summary(
         session=session,
         user=current_user,
-        skip=skip,
-        limit=limit,
         status_filter=status,
         customer_id=customer_id
     )
+    cached = not_modified(request, response, collection_etag(
+        "quote", count, last_updated, *request_scope(request, current_user)
+    ))
+    if cached:
+        return cached
     
-    # Contar total
-    all_quotes = QuoteService.get_quotes_for_user(
+    # Só as colunas da visão; sem QuoteRead/QuoteItem nem nova validação
+    rows = QuoteService.get_quote_rows(
         session=session,
         user=current_user,
+        skip=skip,
+        limit=limit,
         status_filter=status,
-        customer_id=customer_id
+        customer_id=customer_id,
+        view=view
     )
+    project = QuoteProjection.summary if view == "summary" else QuoteProjection.detail
     
-    # Converter para QuoteRead
-    quotes_read = []
-    for quote in quotes:
-        items_list = json.loads(quote.items) if isinstance(quote.items, str) else quote.items
-        quotes_read.append(QuoteRead(
-            id=quote.id,
-            quote_number=quote.quote_number,
-            customer_id=quote.customer_id,
-            items=[QuoteItem(**item) for item in items_list],
-            subtotal=quote.subtotal,
-            discount=quote.discount,
-            discount_percent=quote.discount_percent,
-            total=quote.total,
-            status=quote.status,
-            valid_until=quote.valid_until,
-            notes=quote.notes,
-            payment_terms=quote.payment_terms,
-            delivery_terms=quote.delivery_terms,
-            sent_at=quote.sent_at,
-            approved_at=quote.approved_at,
-            invoiced_at=quote.invoiced_at,
-            created_at=quote.created_at,
-            updated_at=quote.updated_at
-        ))
-    
-    return {
-        "items": quotes_read,
-        "total": len(all_quotes),
+    return json_response({
+        "items": [project(row) for row in rows],
+        "total": count,
         "skip": skip,
         "limit": limit
-    }
+    }, response)
 
 
 @router.get("/{quote_id}", response_model=QuoteRead)
 def get_quote(
     quote_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user)
 ):
     """
     Busca um orçamento específico por ID.
     """
-    quote = session.get(Quote, quote_id)
-    if not quote:
+    row = QuoteService.get_quote_row(session, quote_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
     
-    items_list = json.loads(quote.items) if isinstance(quote.items, str) else quote.items
+    cached = not_modified(request, response, resource_etag(row, table="quote"))
+    if cached:
+        return cached
     
-    return QuoteRead(
-        id=quote.id,
-        quote_number=quote.quote_number,
-        customer_id=quote.customer_id,
-        items=[QuoteItem(**item) for item in items_list],
-        subtotal=quote.subtotal,
-        discount=quote.discount,
-        discount_percent=quote.discount_percent,
-        total=quote.total,
-        status=quote.status,
-        valid_until=quote.valid_until,
-        notes=quote.notes,
-        payment_terms=quote.payment_terms,
-        delivery_terms=quote.delivery_terms,
-        sent_at=quote.sent_at,
-        approved_at=quote.approved_at,
-        invoiced_at=quote.invoiced_at,
-        created_at=quote.created_at,
-        updated_at=quote.updated_at
-    )
+    return json_response(QuoteProjection.detail(row), response)
 
 
 @router.patch("/{quote_id}/status")
@@ -205,33 +161,14 @@ def update_quote_status(
         # Log error but don't fail the request
         logger.error(f"Failed to send email notification: {str(e)}")
     
-    items_list = json.loads(updated_quote.items) if isinstance(updated_quote.items, str) else updated_quote.items
-    
-    return QuoteRead(
-        id=updated_quote.id,
-        quote_number=updated_quote.quote_number,
-        customer_id=updated_quote.customer_id,
-        items=[QuoteItem(**item) for item in items_list],
-        subtotal=updated_quote.subtotal,
-        discount=updated_quote.discount,
-        discount_percent=updated_quote.discount_percent,
-        total=updated_quote.total,
-        status=updated_quote.status,
-        valid_until=updated_quote.valid_until,
-        notes=updated_quote.notes,
-        payment_terms=updated_quote.payment_terms,
-        delivery_terms=updated_quote.delivery_terms,
-        sent_at=updated_quote.sent_at,
-        approved_at=updated_quote.approved_at,
-        invoiced_at=updated_quote.invoiced_at,
-        created_at=updated_quote.created_at,
-        updated_at=updated_quote.updated_at
-    )
+    return QuoteProjection.from_model(updated_quote)
 
 
 @router.get("/customer/{customer_id}")
 def get_quotes_by_customer(
     customer_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user)
 ):
@@ -242,41 +179,24 @@ def get_quotes_by_customer(
     if not customer:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
-    quotes = QuoteService.get_quotes_for_user(
+    rows = QuoteService.get_quote_rows(
         session=session,
         user=current_user,
         customer_id=customer_id
     )
     
-    quotes_read = []
-    for quote in quotes:
-        items_list = json.loads(quote.items) if isinstance(quote.items, str) else quote.items
-        quotes_read.append(QuoteRead(
-            id=quote.id,
-            quote_number=quote.quote_number,
-            customer_id=quote.customer_id,
-            items=[QuoteItem(**item) for item in items_list],
-            subtotal=quote.subtotal,
-            discount=quote.discount,
-            discount_percent=quote.discount_percent,
-            total=quote.total,
-            status=quote.status,
-            valid_until=quote.valid_until,
-            notes=quote.notes,
-            payment_terms=quote.payment_terms,
-            delivery_terms=quote.delivery_terms,
-            sent_at=quote.sent_at,
-            approved_at=quote.approved_at,
-            invoiced_at=quote.invoiced_at,
-            created_at=quote.created_at,
-            updated_at=quote.updated_at
-        ))
+    # Orçamentos já carregados: o 304 só economiza a serialização
+    cached = not_modified(request, response, collection_etag(
+        "customer-quotes", *summarize(rows), customer.name, *request_scope(request, current_user)
+    ))
+    if cached:
+        return cached
     
-    return {
+    return json_response({
         "customer": customer.name,
-        "quotes": quotes_read,
-        "total": len(quotes_read)
-    }
+        "quotes": [QuoteProjection.detail(row) for row in rows],
+        "total": len(rows)
+    }, response)
 
 @router.delete("/{quote_id}")
 def delete_quote(
@@ -298,6 +218,8 @@ def delete_quote(
             detail="Apenas administradores podem deletar orçamentos"
         )
     
+    # Reservas (inclusive as liberadas) saem junto; a FK também tem CASCADE
+    ReservationService.delete_quote_reservations(session, quote)
     session.delete(quote)
     session.commit()
     
@@ -319,37 +241,10 @@ def get_quote_pdf(
     
     # Buscar dados do cliente
     customer = session.get(Customer, quote.customer_id)
+    quote_data = QuoteService.pdf_data(quote, customer)
     
-    # Preparar dados para o PDF
-    items_list = json.loads(quote.items) if isinstance(quote.items, str) else quote.items
-    
-    quote_data = {
-        "id": quote.id,
-        "quote_number": quote.quote_number,
-        "status": quote.status,
-        "created_at": quote.created_at.isoformat() if quote.created_at else "",
-        "valid_until": quote.valid_until,
-        "subtotal": float(quote.subtotal or 0),
-        "discount": float(quote.discount or 0),
-        "discount_percent": float(quote.discount_percent or 0),
-        "total": float(quote.total or 0),
-        "payment_terms": quote.payment_terms or "",
-        "delivery_terms": quote.delivery_terms or "",
-        "notes": quote.notes or "",
-        "items": items_list or [],
-        "customer": {
-            "name": customer.name if customer else "N/A",
-            "document": customer.document if customer else "N/A",
-            "email": customer.email if customer else "N/A",
-            "phone": customer.phone if customer else "N/A",
-            "address_line": customer.address_line if customer else "N/A",
-            "number": customer.number if customer else "N/A",
-            "city": customer.city if customer else "N/A",
-            "state": customer.state if customer else "N/A",
-        }
-    }
-    
-    # Gerar PDF
+    # Gerar PDF (ReportLab só é carregado no primeiro PDF)
+    from pdf_generator import generate_quote_pdf
     pdf_content = generate_quote_pdf(quote_data)
     
     # Retornar como download
@@ -359,4 +254,40 @@ def get_quote_pdf(
         headers={
             "Content-Disposition": f"attachment; filename={quote.quote_number}.pdf"
         }
-    )
\ No newline at end of file
+    )
+
+
+@router.post("/pdf-batch", status_code=202)
+def create_pdf_batch(
+    ids: List[int] = Body(..., embed=True),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """
+    PDFs de vários orçamentos em um .zip, gerado pela tarefa quote_pdfs.
+    Espera JSON: { "ids": [1, 2, 3] }. Andamento em /jobs/{id}; o .zip em
+    /jobs/{id}/artifact.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="Informe ao menos um orçamento")
+    if len(ids) > PDF_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {PDF_BATCH_MAX_IDS} orçamentos por lote")
+    job = job_runner.submit(session, "quote_pdfs", current_user.id, {"ids": ids}, total=len(ids))
+    return describe(job)
+
+
+@router.post("/approval-reminders", status_code=202)
+def send_approval_reminders(
+    days: int = Body(7, embed=True, ge=0),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """
+    Envia lembrete de aprovação (email) para os orçamentos 'enviado' há pelo
+    menos `days` dias, pela tarefa quote_reminders. Apenas admin e gerente.
+    """
+    if get_user_role_slug(current_user, session) not in ("admin", "manager"):
+        raise HTTPException(status_code=403, detail="Apenas administradores e gerentes podem enviar lembretes")
+    job = job_runner.submit(session, "quote_reminders", current_user.id, {"days": days})
+    return describe(job)
@@ -4,14 +4,21 @@ Análises e exportações de dados
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlmodel import Session, select, func
+from starlette.background import BackgroundTask
 from datetime import datetime, timedelta
 from typing import Optional
-import json
+import os
+import tempfile
 
 from database import get_session
 from models import Quote, Customer, User, Product, Service
 from dependencies import get_current_user
+from job_runner import describe, job_runner
+from serialization import json_response
+from services.quote_projection import QuoteProjection
+from services.report_export import EXPORT_BACKGROUND_ROWS, FORMATS, REPORTS, ReportExport
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -105,8 +112,9 @@ def get_products_most_sold(
         end = datetime.utcnow()
     
     # Buscar quotes no período
+    # Só id e itens (load_only): os relatórios de itens não usam as demais colunas
     quotes = session.exec(
-        select(Quote).filter(
+        select(Quote).options(QuoteProjection.items_only()).filter(
             Quote.created_at >= start,
             Quote.created_at <= end
         )
@@ -115,7 +123,7 @@ def get_products_most_sold(
     # Processar items
     products_sold = {}
     for quote in quotes:
-        items = json.loads(quote.items) if isinstance(quote.items, str) else quote.items
+        items = QuoteProjection.items(quote)
         
         for item in items:
             if item.get("type") == "product":
@@ -178,8 +186,9 @@ def get_services_most_sold(
         end = datetime.utcnow()
     
     # Buscar quotes no período
+    # Só id e itens (load_only): os relatórios de itens não usam as demais colunas
     quotes = session.exec(
-        select(Quote).filter(
+        select(Quote).options(QuoteProjection.items_only()).filter(
             Quote.created_at >= start,
             Quote.created_at <= end
         )
@@ -188,7 +197,7 @@ def get_services_most_sold(
     # Processar items
     services_sold = {}
     for quote in quotes:
-        items = json.loads(quote.items) if isinstance(quote.items, str) else quote.items
+        items = QuoteProjection.items(quote)
         
         for item in items:
             if item.get("type") == "service":
@@ -249,41 +258,36 @@ def get_top_customers(
     else:
         end = datetime.utcnow()
     
-    # Query: Group by customer and sum totals
-    customer_totals = {}
-    
-    quotes = session.exec(
-        select(Quote).filter(
+    # Uma consulta: soma e contagem por cliente, com o nome via JOIN
+    rows = session.exec(
+        select(
+            Quote.customer_id,
+            Customer.name,
+            func.coalesce(func.sum(Quote.total), 0.0),
+            func.count(Quote.id)
+        )
+        .outerjoin(Customer, Customer.id == Quote.customer_id)
+        .where(
             Quote.created_at >= start,
             Quote.created_at <= end
         )
+        .group_by(Quote.customer_id, Customer.name)
+        .order_by(func.coalesce(func.sum(Quote.total), 0.0).desc())
     ).all()
     
-    for quote in quotes:
-        if quote.customer_id not in customer_totals:
-            customer = session.get(Customer, quote.customer_id)
-            customer_totals[quote.customer_id] = {
-                "customer_id": quote.customer_id,
-                "customer_name": customer.name if customer else "Desconhecido",
-                "total_spent": 0.0,
-                "quote_count": 0,
-                "avg_order_value": 0.0
-            }
-        
-        customer_totals[quote.customer_id]["total_spent"] += float(quote.total or 0)
-        customer_totals[quote.customer_id]["quote_count"] += 1
-    
-    # Calcular média
-    for customer in customer_totals.values():
-        if customer["quote_count"] > 0:
-            customer["avg_order_value"] = customer["total_spent"] / customer["quote_count"]
-    
-    # Ordenar por total gasto
-    sorted_customers = sorted(
-        customer_totals.values(),
-        key=lambda x: x["total_spent"],
-        reverse=True
-    )[:limit]
+    customer_totals = [
+        {
+            "customer_id": customer_id,
+            "customer_name": name or "Desconhecido",
+            "total_spent": float(total_spent),
+            "quote_count": quote_count,
+            "avg_order_value": float(total_spent) / quote_count if quote_count else 0.0
+        }
+        for customer_id, name, total_spent, quote_count in rows
+    ]
+    
+    # Ordenado por total gasto no banco
+    sorted_customers = customer_totals[:limit]
     
     return {
         "period": f"{start.date()} a {end.date()}",
@@ -363,3 +367,59 @@ def get_reports_summary(
             )
         ).first() or 0
     }
+
+
+# --- Exportações (CSV/XLSX) ---
+
+@router.get("/export/{report}")
+def export_report(
+    report: str,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    status: Optional[str] = Query(None, description="Só para report=quotes"),
+    salesperson_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """
+    Exporta sales-by-period, top-customers ou quotes (todas as linhas do
+    período, sem limite) em CSV ou XLSX.
+
+    - Até EXPORT_BACKGROUND_ROWS linhas: download direto (CSV em streaming)
+    - Acima disso: 202 com a tarefa report_export; andamento em /jobs/{id}
+      (e pelo WebSocket) e o arquivo em /jobs/{id}/artifact
+    """
+    if report not in REPORTS:
+        raise HTTPException(status_code=404, detail=f"Relatório '{report}' não pode ser exportado")
+
+    start = datetime.fromisoformat(start_date) if start_date else datetime.utcnow() - timedelta(days=30)
+    end = datetime.fromisoformat(end_date) if end_date else datetime.utcnow()
+    statement = ReportExport.statement(report, start, end, status, salesperson_id)
+
+    rows = ReportExport.count(session, statement)
+    if rows > EXPORT_BACKGROUND_ROWS:
+        params = {
+            "report": report, "format": format, "start": start.isoformat(), "end": end.isoformat(),
+            "status": status, "salesperson_id": salesperson_id,
+        }
+        job = job_runner.submit(session, "report_export", current_user.id, params, total=rows)
+        return json_response(describe(job), status_code=202)
+
+    filename = ReportExport.filename(report, format)
+    if format == "csv":
+        return StreamingResponse(
+            ReportExport.iter_csv(report, statement),
+            media_type=FORMATS["csv"],
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
+    # XLSX só existe completo: grava em arquivo temporário e apaga depois do envio
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        ReportExport.write(report, format, statement, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return FileResponse(path, media_type=FORMATS["xlsx"], filename=filename, background=BackgroundTask(os.remove, path))
@@ -3,13 +3,15 @@ Rotas HTTP de Serviços
 Finas e limpas - toda lógica delegada para ServiceService
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
 from sqlmodel import Session
 from typing import Optional, List
 
 from database import get_session
 from models import Service
 from dependencies import get_current_user
+from etags import collection_etag, not_modified, request_scope, resource_etag, summarize
+from serialization import json_response
 from schemas import ServiceCreate, ServiceRead, ServiceUpdate
 from services.service_service import ServiceService
 
@@ -36,6 +38,8 @@ def create_service(
 
 @router.get("/")
 def list_services(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(25, ge=1, le=100),
     status: Optional[str] = Query(None),
@@ -47,22 +51,21 @@ def list_services(
     Lista serviços com filtros opcionais de status e categoria.
     Retorna paginação com total.
     """
-    services = ServiceService.get_services_for_user(
-        session=session,
-        user=current_user,
-        skip=skip,
-        limit=limit,
-        status_filter=status,
-        category_filter=category
-    )
-    
-    # Contar total (sem limite)
+    # Todos os do filtro (cache do catálogo, sem consulta): total e ETag
     all_services = ServiceService.get_services_for_user(
         session=session,
         user=current_user,
+        limit=None,
         status_filter=status,
         category_filter=category
     )
+    cached = not_modified(request, response, collection_etag(
+        "service", *summarize(all_services), *request_scope(request, current_user)
+    ))
+    if cached:
+        return cached
+    
+    services = all_services[skip:skip + limit]
     
     # Serializar serviços manualmente
     items_list = []
@@ -81,17 +84,20 @@ def list_services(
             "updated_at": s.updated_at.isoformat() if s.updated_at else None,
         })
     
-    return {
+    # Já são tipos simples: sem jsonable_encoder
+    return json_response({
         "items": items_list,
         "total": len(all_services),
         "skip": skip,
         "limit": limit
-    }
+    }, response)
 
 
 @router.get("/{service_id}", response_model=ServiceRead)
 def get_service(
     service_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user)
 ):
@@ -107,6 +113,9 @@ def get_service(
     if not service:
         raise HTTPException(status_code=404, detail="Serviço não encontrado")
     
+    cached = not_modified(request, response, resource_etag(service))
+    if cached:
+        return cached
     return service
 
 
@@ -0,0 +1,52 @@
+"""
+Rotas HTTP de Autocompletar
+Sugestões de clientes, produtos e serviços para a montagem de orçamentos
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+
+from database import get_session
+from dependencies import get_current_user
+from services.typeahead_service import (
+    typeahead_index, DEFAULT_TYPEAHEAD_LIMIT, MAX_TYPEAHEAD_LIMIT
+)
+
+router = APIRouter(prefix="/typeahead", tags=["typeahead"])
+
+
+@router.get("/customers")
+def typeahead_customers(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_TYPEAHEAD_LIMIT, ge=1, le=MAX_TYPEAHEAD_LIMIT),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user)
+):
+    """Clientes visíveis para o usuário cujo nome, fantasia ou documento começa com `q`"""
+    if not current_user.role:
+        raise HTTPException(status_code=403, detail="Usuário sem cargo definido")
+    return typeahead_index.search_customers(session, current_user, q, limit)
+
+
+@router.get("/products")
+def typeahead_products(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_TYPEAHEAD_LIMIT, ge=1, le=MAX_TYPEAHEAD_LIMIT),
+    include_inactive: bool = False,
+    current_user=Depends(get_current_user)
+):
+    """Produtos cujo nome começa com `q` (inativos só com include_inactive)"""
+    allow = None if include_inactive else (lambda doc: doc["status"] != "inativo")
+    return typeahead_index.search("product", q, limit, allow)
+
+
+@router.get("/services")
+def typeahead_services(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_TYPEAHEAD_LIMIT, ge=1, le=MAX_TYPEAHEAD_LIMIT),
+    include_inactive: bool = False,
+    current_user=Depends(get_current_user)
+):
+    """Serviços cujo nome começa com `q` (inativos só com include_inactive)"""
+    allow = None if include_inactive else (lambda doc: doc["status"] != "inativo")
+    return typeahead_index.search("service", q, limit, allow)
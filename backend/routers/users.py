@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select, or_
+from sqlalchemy.orm import selectinload
 from typing import List
 
 from database import get_session
@@ -55,7 +56,8 @@ def update_role_permissions(role_id: int, role_data: RoleUpdate, session: Sessio
 @router.get("/users/", response_model=List[UserRead])
 def list_users(session: Session = Depends(get_session)):
     """Lista todos os usuários."""
-    return session.exec(select(User)).all()
+    # Supervisores em uma consulta só (sem lazy load por usuário)
+    return session.exec(select(User).options(selectinload(User.supervisors))).all()
 
 @router.post("/users/", response_model=UserRead)
 def create_user_internal(user_input: UserCreate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
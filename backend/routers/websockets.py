@@ -1,5 +1,4 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from jose import JWTError, jwt
 from sqlmodel import Session, select
 from models import User
 from connection_manager import manager
@@ -11,6 +10,7 @@ router = APIRouter(tags=["Real-time"])
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
+    from jose import JWTError, jwt  # Carregado na primeira conexão
     # 1. Validação do Token (Manual)
     try:
         payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
@@ -1,7 +1,6 @@
 from typing import Optional, Dict, List, Any
 from datetime import datetime
 from pydantic import BaseModel, field_validator
-from validate_docbr import CPF, CNPJ
 
 # --- AUDITORIA (NOVO) ---
 class AuditLogRead(BaseModel):
@@ -13,6 +12,10 @@ class AuditLogRead(BaseModel):
     changes: Dict[str, Any]
     created_at: datetime
 
+class AuditLogPage(BaseModel):
+    items: List[AuditLogRead]
+    next_cursor: Optional[str] = None  # None = última página
+
 # --- FEED E NOTAS ---
 class NoteCreate(BaseModel):
     content: str; type: str = "message"; target_user_id: Optional[int] = None
@@ -84,6 +87,7 @@ class CustomerCreate(BaseModel):
 
     @field_validator('document')
     def validate_document(cls, v):
+        from validate_docbr import CPF, CNPJ  # Carregado na primeira validação
         doc_clean = "".join([d for d in v if d.isdigit()])
         if len(doc_clean) == 11:
             if not CPF().validate(doc_clean): raise ValueError('CPF inválido')
@@ -93,6 +97,10 @@ class CustomerCreate(BaseModel):
             return doc_clean
         else: raise ValueError('Documento inválido')
 
+class CustomerBulkStatusUpdate(BaseModel):
+    ids: List[int]
+    status: str
+
 class CustomerRead(CustomerCreate):
     id: int
     created_by_id: Optional[int]
@@ -179,6 +187,8 @@ class QuoteCreate(BaseModel):
     payment_terms: Optional[str] = None
     delivery_terms: Optional[str] = None
     valid_until: Optional[datetime] = None
+    rental_start: Optional[datetime] = None
+    rental_end: Optional[datetime] = None
 
 
 class QuoteRead(BaseModel):
@@ -198,6 +208,8 @@ class QuoteRead(BaseModel):
     sent_at: Optional[datetime]
     approved_at: Optional[datetime]
     invoiced_at: Optional[datetime]
+    rental_start: Optional[datetime] = None
+    rental_end: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -1,24 +1,29 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
 import os
 
+# jose e passlib são carregados no primeiro uso (boot mais rápido dos workers)
+
 # Configurações de Segurança extraídas do seu ambiente 
 SECRET_KEY = os.getenv("SECRET_KEY", "sua_chave_secreta_super_segura_aqui")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 # Ajuste solicitado: 10 minutos 
 ACCESS_TOKEN_EXPIRE_MINUTES = 10
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -0,0 +1,31 @@
+"""
+Serialização JSON rápida (orjson).
+
+ORJSONResponse é a classe de resposta padrão do app (main.py). Nas rotas de
+listagem mais pesadas a rota monta dicts só com tipos simples e devolve
+json_response(...): como não há response_model, o FastAPI não valida de novo
+nem passa o conteúdo pelo jsonable_encoder.
+
+Os orçamentos usam services/quote_projection.py: os itens entram na
+resposta como orjson.Fragment, sem json.loads nem um QuoteItem por item.
+"""
+
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+import orjson
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse com orjson (datetime, UUID e dataclasses sem jsonable_encoder)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> ORJSONResponse:
+    """Resposta pronta; copia os cabeçalhos que a rota definiu em `response` (ex.: ETag)"""
+    result = ORJSONResponse(content, status_code=status_code)
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
@@ -0,0 +1,141 @@
+"""
+Audit Service
+Consulta da linha do tempo de auditoria de um registro.
+
+- Paginação por cursor (keyset em created_at DESC, id DESC): cada página é
+  uma consulta indexada (ix_auditlog_record_timeline), sem OFFSET.
+- Exportação em NDJSON lida de um cursor do servidor (yield_per), sem
+  carregar a linha do tempo inteira em memória.
+"""
+
+from typing import Optional, Dict, Tuple, Iterator
+from sqlmodel import Session, select
+from sqlalchemy import tuple_
+from fastapi import HTTPException
+from datetime import datetime
+import base64
+import json
+
+from database import engine
+from models import AuditLog, User
+
+
+# Tabelas cuja auditoria é gravada pela camada de serviços
+AUDITED_TABLES = {"customer", "product", "service", "quote"}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+
+
+class AuditService:
+    """Serviço de leitura da auditoria"""
+
+    @staticmethod
+    def validate_table(table_name: str) -> None:
+        if table_name not in AUDITED_TABLES:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Tabela sem auditoria: {table_name}. Use: {', '.join(sorted(AUDITED_TABLES))}"
+            )
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, audit_id: int) -> str:
+        raw = f"{created_at.isoformat()}|{audit_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, audit_id = base64.urlsafe_b64decode(padded).decode().split("|")
+            return datetime.fromisoformat(created_at), int(audit_id)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    @staticmethod
+    def timeline_statement(table_name: str, record_id: int, cursor: Optional[str] = None):
+        """SELECT da linha do tempo (mais recente primeiro), a partir do cursor"""
+        statement = (
+            select(
+                AuditLog.id,
+                AuditLog.table_name,
+                AuditLog.action,
+                AuditLog.user_id,
+                User.name,
+                AuditLog.changes,
+                AuditLog.created_at
+            )
+            .outerjoin(User, AuditLog.user_id == User.id)
+            .where(AuditLog.table_name == table_name, AuditLog.record_id == record_id)
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        )
+        if cursor:
+            created_at, audit_id = AuditService.decode_cursor(cursor)
+            statement = statement.where(
+                tuple_(AuditLog.created_at, AuditLog.id) < tuple_(created_at, audit_id)
+            )
+        return statement
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict:
+        audit_id, table_name, action, user_id, user_name, changes, created_at = row
+        return {
+            "id": audit_id,
+            "table_name": table_name,
+            "action": action,
+            "user_id": user_id,
+            "user_name": user_name or "Sistema",
+            "changes": changes or {},
+            "created_at": created_at,
+        }
+
+    @staticmethod
+    def get_page(
+        session: Session,
+        table_name: str,
+        record_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """
+        Uma página da linha do tempo.
+
+        Returns:
+            {items: [...], next_cursor: str | None}
+        """
+        AuditService.validate_table(table_name)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        # Busca uma linha a mais para saber se existe próxima página
+        statement = AuditService.timeline_statement(table_name, record_id, cursor).limit(limit + 1)
+        rows = session.exec(statement).all()
+
+        items = [AuditService._row_to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = AuditService.encode_cursor(last["created_at"], last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    def stream_ndjson(table_name: str, record_id: int, cursor: Optional[str] = None) -> Iterator[bytes]:
+        """
+        Gera a linha do tempo em NDJSON (um objeto JSON por linha).
+
+        Usa uma sessão própria: a sessão da requisição é fechada antes de o
+        corpo da StreamingResponse terminar de ser enviado.
+        """
+        # Validação (tabela e cursor) antes de a resposta começar a ser enviada
+        AuditService.validate_table(table_name)
+        statement = AuditService.timeline_statement(table_name, record_id, cursor)
+        return AuditService._stream_rows(statement)
+
+    @staticmethod
+    def _stream_rows(statement) -> Iterator[bytes]:
+        with Session(engine) as session:
+            result = session.exec(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+            for row in result:
+                item = AuditService._row_to_dict(row)
+                item["created_at"] = item["created_at"].isoformat()
+                yield (json.dumps(item, ensure_ascii=False, default=str) + "\n").encode()
@@ -0,0 +1,240 @@
+"""
+Availability Service Layer
+Calendário de disponibilidade de produtos para locação.
+
+Para cada produto, as reservas ativas viram uma lista ordenada de eventos
+(início +qtd / fim -qtd). O calendário é calculado com uma varredura
+(sweep line) única sobre esses eventos e os dias do período, em O(E + D).
+
+Os eventos ficam em cache por produto. O ReservationService marca os
+produtos alterados na sessão e o cache é invalidado após o commit; um TTL
+curto cobre alterações feitas por outros workers.
+"""
+
+from typing import Optional, Dict, List, Iterable, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+from fastapi import HTTPException
+from datetime import datetime, date, timedelta
+import os
+import threading
+import time
+
+from models import StockReservation, User
+from services.catalog_cache import catalog_cache
+
+
+# Segundos que os eventos de um produto ficam em cache
+CACHE_TTL = float(os.getenv("AVAILABILITY_CACHE_TTL", "30"))
+
+# Limites do calendário por requisição
+MAX_CALENDAR_DAYS = 366
+MAX_CALENDAR_PRODUCTS = 100
+
+# Evento: (instante, tipo, delta). Tipo 0 = fim, 1 = início, para que fins
+# sejam aplicados antes de inícios no mesmo instante (intervalos semiabertos).
+Event = Tuple[datetime, int, int]
+
+
+class AvailabilityCache:
+    """Cache em memória dos eventos de reserva por produto"""
+
+    def __init__(self, ttl: float = CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[float, List[Event]]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, product_ids: Iterable[int]) -> Tuple[Dict[int, List[Event]], List[int]]:
+        """Retorna (eventos em cache, ids que precisam ser carregados)"""
+        now = time.monotonic()
+        found: Dict[int, List[Event]] = {}
+        missing: List[int] = []
+        with self._lock:
+            for product_id in product_ids:
+                entry = self._entries.get(product_id)
+                if entry and now - entry[0] < self.ttl:
+                    found[product_id] = entry[1]
+                else:
+                    missing.append(product_id)
+        return found, missing
+
+    def set(self, product_id: int, events: List[Event]) -> None:
+        with self._lock:
+            self._entries[product_id] = (time.monotonic(), events)
+
+    def invalidate(self, product_ids: Optional[Iterable[int]] = None) -> None:
+        """Invalida os produtos informados (ou todo o cache)"""
+        with self._lock:
+            if product_ids is None:
+                self._entries.clear()
+            else:
+                for product_id in product_ids:
+                    self._entries.pop(product_id, None)
+
+
+availability_cache = AvailabilityCache()
+
+
+def invalidate_on_commit(session: Session, product_ids: Iterable[int]) -> None:
+    """
+    Agenda a invalidação do cache desses produtos para depois do commit da sessão.
+    Invalidar antes do commit permitiria que outra requisição recarregasse o
+    cache com dados antigos enquanto a transação ainda está aberta.
+    """
+    pending = session.info.setdefault("availability_invalidate", set())
+    pending.update(product_ids)
+
+
+@event.listens_for(SASession, "after_commit")
+def _invalidate_after_commit(session):
+    pending = session.info.pop("availability_invalidate", None)
+    if pending:
+        availability_cache.invalidate(pending)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("availability_invalidate", None)
+
+
+class AvailabilityService:
+    """Serviço de disponibilidade de produtos"""
+
+    @staticmethod
+    def load_events(session: Session, product_ids: List[int]) -> Dict[int, List[Event]]:
+        """
+        Eventos ordenados de reserva por produto, usando o cache.
+        Os produtos fora do cache são carregados em uma única consulta.
+        """
+        events, missing = availability_cache.get_many(product_ids)
+        if not missing:
+            return events
+
+        loaded: Dict[int, List[Event]] = {product_id: [] for product_id in missing}
+        reservations = session.exec(
+            select(
+                StockReservation.product_id,
+                StockReservation.start_date,
+                StockReservation.end_date,
+                StockReservation.quantity
+            ).where(
+                StockReservation.product_id.in_(missing),
+                StockReservation.status == "ativa"
+            )
+        ).all()
+        for product_id, start, end, quantity in reservations:
+            loaded[product_id].append((start, 1, quantity))
+            loaded[product_id].append((end, 0, -quantity))
+
+        for product_id, product_events in loaded.items():
+            product_events.sort()
+            availability_cache.set(product_id, product_events)
+            events[product_id] = product_events
+        return events
+
+    @staticmethod
+    def daily_peaks(events: List[Event], start: date, end: date) -> List[int]:
+        """
+        Pico de unidades reservadas em cada dia de [start, end] (inclusivo).
+
+        Varredura única: antes de cada dia aplica os eventos até a meia-noite
+        (o nível nesse instante é o ponto de partida do dia); depois aplica os
+        eventos dentro do dia registrando o maior nível alcançado.
+        """
+        peaks = []
+        index = 0
+        current = 0
+        total = len(events)
+        day = start
+        while day <= end:
+            day_start = datetime.combine(day, datetime.min.time())
+            day_end = day_start + timedelta(days=1)
+
+            while index < total and events[index][0] <= day_start:
+                current += events[index][2]
+                index += 1
+            peak = current
+
+            while index < total and events[index][0] < day_end:
+                current += events[index][2]
+                peak = max(peak, current)
+                index += 1
+
+            peaks.append(peak)
+            day += timedelta(days=1)
+        return peaks
+
+    @staticmethod
+    def get_calendar(
+        session: Session,
+        product_ids: List[int],
+        start: date,
+        end: date,
+        user: User
+    ) -> Dict:
+        """
+        Unidades livres por dia para cada produto no período [start, end].
+
+        Raises:
+            HTTPException: Se o período/lista for inválido ou sem permissão
+        """
+        if end < start:
+            raise HTTPException(status_code=400, detail="end deve ser igual ou posterior a start")
+        if (end - start).days + 1 > MAX_CALENDAR_DAYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Período máximo do calendário: {MAX_CALENDAR_DAYS} dias"
+            )
+
+        ids = list(dict.fromkeys(product_ids))
+        if not ids:
+            raise HTTPException(status_code=400, detail="Informe ao menos um produto")
+        if len(ids) > MAX_CALENDAR_PRODUCTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Máximo de {MAX_CALENDAR_PRODUCTS} produtos por consulta"
+            )
+
+        # Mesma regra de visualização do ProductService
+        if user.role:
+            can_view = user.role.permissions.get("can_view_products", True)
+            if not can_view and user.role.slug not in ["admin", "manager"]:
+                raise HTTPException(
+                    status_code=403,
+                    detail="Você não tem permissão para visualizar produtos"
+                )
+
+        products = catalog_cache.products.get_many(ids)
+        missing = [product_id for product_id in ids if product_id not in products]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Produtos não encontrados: {', '.join(str(i) for i in missing)}"
+            )
+
+        events = AvailabilityService.load_events(session, ids)
+
+        days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        result = []
+        for product_id in ids:
+            product = products[product_id]
+            if product.status == "disponivel":
+                peaks = AvailabilityService.daily_peaks(events[product_id], start, end)
+                free = [max(0, product.quantity - peak) for peak in peaks]
+            else:
+                free = [0] * len(days)
+
+            result.append({
+                "product_id": product.id,
+                "name": product.name,
+                "status": product.status,
+                "quantity": product.quantity,
+                "days": dict(zip(days, free))
+            })
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "products": result
+        }
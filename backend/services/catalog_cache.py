@@ -0,0 +1,193 @@
+"""
+Catalog Cache
+Cache em memória do catálogo (produtos e serviços).
+
+Cada entidade é carregada inteira sob demanda, com mapas por id, categoria
+e status. A coerência entre workers usa a tabela CatalogVersion:
+
+- ProductService/ServiceService chamam bump_catalog_version() antes do
+  commit: o contador sobe na mesma transação da escrita e o cache local é
+  descartado após o commit
+- Antes de responder, o cache compara sua versão com a do banco (no máximo
+  uma consulta por CATALOG_VERSION_TTL segundos) e recarrega se mudou
+
+Os objetos do cache estão desanexados de sessões: servem para leitura e não
+devem ser alterados nem adicionados a uma sessão.
+
+Estatísticas: uma leitura (id do get_many ou chamada do list) conta como
+hit só quando o cache já estava carregado; se a própria chamada recarregou
+a tabela, ou o id não existe, conta como miss.
+"""
+
+from typing import Optional, Dict, List, Iterable
+from sqlmodel import Session, select
+from sqlalchemy import event, update, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as SASession
+import os
+import threading
+import time
+
+from database import engine
+from models import Product, Service, CatalogVersion
+
+
+# Segundos em que a versão local é considerada atual sem consultar o banco
+VERSION_TTL = float(os.getenv("CATALOG_VERSION_TTL", "1.0"))
+
+_PENDING_KEY = "catalog_pending"
+
+
+class CatalogEntityCache:
+    """Cache de uma entidade do catálogo (product ou service)"""
+
+    def __init__(self, name: str, model, order_by, ttl: float = VERSION_TTL):
+        self.name = name
+        self.model = model
+        self.order_by = order_by
+        self.ttl = ttl
+        self.version: Optional[int] = None
+        self.checked_at = 0.0
+        self.by_id: Dict[int, object] = {}
+        self.ordered_ids: List[int] = []
+        self.by_category: Dict[str, List[int]] = {}
+        self.by_status: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0, "version_checks": 0, "invalidations": 0}
+
+    def _read_version(self) -> int:
+        with engine.begin() as connection:
+            version = connection.execute(
+                select(CatalogVersion.version).where(CatalogVersion.name == self.name)
+            ).scalar()
+            if version is None:
+                try:
+                    with connection.begin_nested():
+                        connection.execute(insert(CatalogVersion).values(name=self.name, version=0))
+                except IntegrityError:
+                    pass  # Outro worker criou a linha
+                version = 0
+        return version
+
+    def _ensure_current(self) -> bool:
+        """Confere a versão (no máximo uma vez por ttl); True se recarregou a tabela"""
+        now = time.monotonic()
+        if self.version is not None and now - self.checked_at < self.ttl:
+            return False
+        with self._lock:
+            if self.version is not None and time.monotonic() - self.checked_at < self.ttl:
+                return False
+            self.stats["version_checks"] += 1
+            version = self._read_version()
+            reloaded = version != self.version
+            if reloaded:
+                self._load(version)
+            self.checked_at = time.monotonic()
+            return reloaded
+
+    def _load(self, version: int) -> None:
+        with Session(engine) as session:
+            rows = list(session.exec(select(self.model).order_by(*self.order_by)).all())
+        by_id, by_category, by_status = {}, {}, {}
+        for row in rows:
+            by_id[row.id] = row
+            by_category.setdefault(row.category, []).append(row.id)
+            by_status.setdefault(row.status, []).append(row.id)
+        self.by_id, self.by_category, self.by_status = by_id, by_category, by_status
+        self.ordered_ids = [row.id for row in rows]
+        self.version = version
+        self.stats["reloads"] += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version = None
+            self.stats["invalidations"] += 1
+
+    # --- Leitura ---
+
+    def get(self, record_id: int):
+        return self.get_many([record_id]).get(record_id)
+
+    def get_many(self, ids: Iterable[int]) -> Dict[int, object]:
+        reloaded = self._ensure_current()
+        found = {}
+        for record_id in ids:
+            row = self.by_id.get(record_id)
+            if row is not None:
+                found[record_id] = row
+            self.stats["misses" if reloaded or row is None else "hits"] += 1
+        return found
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: Optional[int] = None
+    ) -> List[object]:
+        """Lista na ordem do banco, filtrando pelos mapas secundários"""
+        reloaded = self._ensure_current()
+        ids = self.ordered_ids
+        if status is not None:
+            ids = self.by_status.get(status, [])
+        if category is not None:
+            allowed = set(self.by_category.get(category, []))
+            ids = [record_id for record_id in ids if record_id in allowed]
+        end = None if limit is None else skip + limit
+        self.stats["misses" if reloaded else "hits"] += 1
+        return [self.by_id[record_id] for record_id in ids[skip:end]]
+
+    def snapshot_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "version": self.version,
+            "size": len(self.by_id),
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else None,
+        }
+
+
+class CatalogCache:
+    """Caches de produtos e serviços"""
+
+    def __init__(self):
+        self.products = CatalogEntityCache("product", Product, (Product.id,))
+        self.services = CatalogEntityCache("service", Service, (Service.created_at.desc(), Service.id.desc()))
+        self.entities = {"product": self.products, "service": self.services}
+
+    def stats(self) -> Dict:
+        return {name: cache.snapshot_stats() for name, cache in self.entities.items()}
+
+
+catalog_cache = CatalogCache()
+
+
+def bump_catalog_version(session: Session, name: str) -> None:
+    """
+    Incrementa a versão do catálogo na transação da sessão (chamar antes do
+    commit de qualquer escrita em produtos/serviços).
+    """
+    statement = (
+        update(CatalogVersion)
+        .where(CatalogVersion.name == name)
+        .values(version=CatalogVersion.version + 1)
+    )
+    if session.execute(statement).rowcount == 0:
+        # Linha ainda não existe (banco criado sem a migração)
+        try:
+            with session.begin_nested():
+                session.execute(insert(CatalogVersion).values(name=name, version=1))
+        except IntegrityError:
+            session.execute(statement)  # Outro worker criou a linha
+    session.info.setdefault(_PENDING_KEY, set()).add(name)
+
+
+@event.listens_for(SASession, "after_commit")
+def _invalidate_after_commit(session):
+    for name in session.info.pop(_PENDING_KEY, ()):
+        catalog_cache.entities[name].invalidate()
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,316 @@
+"""
+Customer Import Service
+Importação em massa de clientes a partir de planilhas CSV/XLSX.
+
+As linhas são lidas do arquivo em streaming e processadas em lotes:
+- validação de cada linha com o mesmo schema da API (CPF/CNPJ incluso)
+- deduplicação dentro do arquivo e contra o banco (uma consulta por lote)
+- INSERT em lote dos clientes e das linhas de auditoria
+- um commit por lote
+
+Retorna um relatório com o erro de cada linha rejeitada.
+"""
+
+from typing import Optional, Dict, List, Iterable, Iterator, IO
+from sqlmodel import Session, select
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException
+from pydantic import ValidationError
+from datetime import datetime
+import codecs
+import csv
+
+from models import Customer, User
+from audit_sink import audit_sink
+from services.leaderboard import track_leaderboard_change
+from services.typeahead_service import track_on_commit
+from schemas import CustomerCreate
+from services.customer_service import CustomerService
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Cabeçalhos aceitos além dos nomes de campo do CustomerCreate
+HEADER_ALIASES = {
+    "nome": "name",
+    "razao_social": "name",
+    "nome_fantasia": "fantasy_name",
+    "documento": "document",
+    "cpf": "document",
+    "cnpj": "document",
+    "cpf_cnpj": "document",
+    "tipo_pessoa": "person_type",
+    "telefone": "phone",
+    "celular": "cellphone",
+    "contato": "contact_name",
+    "estado": "state",
+    "uf": "state",
+    "cidade": "city",
+    "bairro": "neighborhood",
+    "endereco": "address_line",
+    "numero": "number",
+    "complemento": "complement",
+    "limite_credito": "credit_limit",
+    "observacao": "observation",
+}
+
+IMPORT_FIELDS = set(CustomerCreate.model_fields.keys())
+
+# Campos que continuam numéricos; nos demais, números do XLSX viram texto
+NUMERIC_FIELDS = {"credit_limit", "salesperson_id"}
+
+
+def normalize_header(header) -> Optional[str]:
+    """Converte um cabeçalho da planilha para o nome do campo do cliente"""
+    if header is None:
+        return None
+    key = str(header).strip().lower().replace(" ", "_").replace("-", "_")
+    key = HEADER_ALIASES.get(key, key)
+    return key if key in IMPORT_FIELDS else None
+
+
+def _clean_row(headers: List[Optional[str]], values: Iterable) -> Dict:
+    row = {}
+    for field, value in zip(headers, values):
+        if field is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        if value == "" or value is None:
+            continue
+        if field not in NUMERIC_FIELDS and isinstance(value, (int, float)) and not isinstance(value, bool):
+            # Ex.: CPF digitado como número no Excel
+            value = str(int(value)) if float(value).is_integer() else str(value)
+        row[field] = value
+    return row
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[Optional[Dict]]:
+    """
+    Lê linhas de um CSV (UTF-8, separador ',' ou ';') sem carregar o arquivo
+    inteiro. Linhas vazias viram None (mantém a numeração do relatório).
+    """
+    text = codecs.getreader("utf-8-sig")(stream)
+    first_line = text.readline()
+    delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+    reader = csv.reader(text, delimiter=delimiter)
+    headers = [normalize_header(h) for h in next(csv.reader([first_line], delimiter=delimiter), [])]
+    for values in reader:
+        yield _clean_row(headers, values) if any(v.strip() for v in values) else None
+
+
+def iter_xlsx_rows(stream: IO[bytes]) -> Iterator[Optional[Dict]]:
+    """
+    Lê linhas da primeira aba de um XLSX em modo read-only (memória
+    constante). Linhas vazias viram None, como no CSV.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise HTTPException(
+            status_code=400,
+            detail="Importação de XLSX requer o pacote openpyxl"
+        )
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [normalize_header(h) for h in next(rows, [])]
+        for values in rows:
+            yield _clean_row(headers, values) if any(v not in (None, "") for v in values) else None
+    finally:
+        workbook.close()
+
+
+def iter_rows(stream: IO[bytes], filename: str) -> Iterator[Optional[Dict]]:
+    """Escolhe o leitor pelo nome do arquivo"""
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        return iter_xlsx_rows(stream)
+    if name.endswith(".csv") or name.endswith(".txt"):
+        return iter_csv_rows(stream)
+    raise HTTPException(status_code=400, detail="Formato não suportado. Use .csv ou .xlsx")
+
+
+def chunked(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    messages = []
+    for e in error.errors():
+        field = ".".join(str(loc) for loc in e.get("loc", ()))
+        message = e.get("msg", "inválido").replace("Value error, ", "")
+        messages.append(f"{field}: {message}" if field else message)
+    return "; ".join(messages)
+
+
+class CustomerImportService:
+    """Serviço de importação em massa de clientes"""
+
+    @staticmethod
+    def import_rows(
+        session: Session,
+        rows: Iterable[Optional[Dict]],
+        current_user: User,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Dict:
+        """
+        Importa clientes a partir de um iterável de dicts (uma linha por dict).
+
+        Args:
+            session: Sessão do banco
+            rows: Linhas já mapeadas para os campos do cliente (None =
+                linha vazia: não é importada, só avança a numeração)
+            current_user: Usuário responsável pela importação
+            chunk_size: Linhas por lote (um commit por lote)
+
+        Returns:
+            Relatório {total, created, failed, errors: [{row, document, error}]}
+        """
+        role_permissions = current_user.role.permissions
+        status = CustomerService.determine_customer_status(current_user, role_permissions)
+        require_approval = role_permissions.get("customer_require_approval", False)
+        default_salesperson = current_user.id if current_user.role.slug == "admin" else None
+
+        report = {"total": 0, "created": 0, "failed": 0, "errors": []}
+        seen_documents = set()
+        row_number = 1  # Linha 1 é o cabeçalho
+
+        for chunk in chunked(rows, chunk_size):
+            candidates = []  # (número da linha, dados validados)
+
+            # 1. Validar linhas
+            for raw in chunk:
+                row_number += 1
+                if raw is None:
+                    continue
+                report["total"] += 1
+                try:
+                    data = CustomerCreate(**raw).dict()
+                except ValidationError as e:
+                    CustomerImportService._add_error(
+                        report, row_number, raw.get("document"), _format_validation_error(e)
+                    )
+                    continue
+
+                if data["document"] in seen_documents:
+                    CustomerImportService._add_error(
+                        report, row_number, data["document"], "Documento repetido no arquivo"
+                    )
+                    continue
+                seen_documents.add(data["document"])
+                candidates.append((row_number, data))
+
+            if not candidates:
+                continue
+
+            # 2. Deduplicar contra o banco (uma consulta por lote)
+            documents = [data["document"] for _, data in candidates]
+            existing = set(session.exec(
+                select(Customer.document).where(Customer.document.in_(documents))
+            ).all())
+
+            to_insert = []
+            for line, data in candidates:
+                if data["document"] in existing:
+                    CustomerImportService._add_error(
+                        report, line, data["document"], "Documento já cadastrado no sistema"
+                    )
+                    continue
+                now = datetime.utcnow()
+                data["status"] = status
+                if not data.get("salesperson_id"):
+                    data["salesperson_id"] = default_salesperson
+                data["created_by_id"] = current_user.id
+                data["created_at"] = now
+                data["updated_at"] = now
+                to_insert.append((line, data))
+
+            if not to_insert:
+                continue
+
+            # 3. Inserir lote + auditoria
+            try:
+                created = CustomerImportService._insert_chunk(
+                    session, [data for _, data in to_insert], current_user, status, require_approval
+                )
+                report["created"] += created
+            except IntegrityError:
+                # Corrida com outra inserção: refaz o lote linha a linha
+                session.rollback()
+                for line, data in to_insert:
+                    try:
+                        report["created"] += CustomerImportService._insert_chunk(
+                            session, [data], current_user, status, require_approval
+                        )
+                    except IntegrityError:
+                        session.rollback()
+                        CustomerImportService._add_error(
+                            report, line, data["document"], "Documento já cadastrado no sistema"
+                        )
+
+        report["errors"].sort(key=lambda e: e["row"])
+        return report
+
+    @staticmethod
+    def _insert_chunk(
+        session: Session,
+        customers: List[Dict],
+        current_user: User,
+        status: str,
+        require_approval: bool
+    ) -> int:
+        """INSERT em lote dos clientes e das auditorias de criação, com commit"""
+        result = session.execute(
+            insert(Customer).returning(Customer.id),
+            customers
+        )
+        customer_ids = [row[0] for row in result]
+
+        now = datetime.utcnow()
+        audit_sink.write_many(session, [
+            {
+                "table_name": "customer",
+                "record_id": customer_id,
+                "action": "CREATE",
+                "user_id": current_user.id,
+                "changes": {
+                    "created": True,
+                    "status": status,
+                    "require_approval": require_approval,
+                    "source": "import"
+                },
+                "created_at": now,
+                "updated_at": now,
+            }
+            for customer_id in customer_ids
+        ])
+        track_on_commit(session, "customer", customer_ids)
+        track_leaderboard_change(session, "customer", customer_ids)
+        session.commit()
+        return len(customer_ids)
+
+    @staticmethod
+    def _add_error(report: Dict, row: int, document: Optional[str], error: str) -> None:
+        report["failed"] += 1
+        report["errors"].append({"row": row, "document": document, "error": error})
+
+    @staticmethod
+    def import_file(
+        session: Session,
+        stream: IO[bytes],
+        filename: str,
+        current_user: User,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Dict:
+        """Importa clientes de um arquivo CSV/XLSX"""
+        rows = iter_rows(stream, filename)
+        return CustomerImportService.import_rows(session, rows, current_user, chunk_size)
@@ -0,0 +1,127 @@
+"""
+Customer Search Service
+Busca de clientes por nome, nome fantasia, documento, email, cidade e contato.
+
+No Postgres (migração d4a7b1c25e63):
+- search_vector (tsvector gerado, índice GIN): palavras completas ou prefixos
+- search_text (texto normalizado, índice GIN pg_trgm): trechos e erros de
+  digitação, sem diferenciar acentos
+Nos demais bancos (ex.: SQLite em desenvolvimento) usa ILIKE.
+
+O escopo de permissão do usuário entra no próprio WHERE.
+"""
+
+from typing import List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import or_, func, literal_column, inspect
+import re
+
+from models import Customer, User
+from services.customer_service import CustomerService
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+SEARCH_FIELDS = (
+    Customer.name,
+    Customer.fantasy_name,
+    Customer.document,
+    Customer.email,
+    Customer.city,
+    Customer.contact_name,
+)
+
+# Cache por engine: as colunas de busca existem (migração aplicada)?
+_search_columns_available = {}
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _prefix_tsquery(query: str) -> Optional[str]:
+    """'joao sil' -> 'joao:* & sil:*' (to_tsquery com prefixos)"""
+    tokens = re.findall(r"\w+", query)
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+class CustomerSearchService:
+    """Serviço de busca de clientes"""
+
+    @staticmethod
+    def uses_full_text(session: Session) -> bool:
+        bind = session.get_bind()
+        if bind.dialect.name != "postgresql":
+            return False
+        if bind not in _search_columns_available:
+            columns = {c["name"] for c in inspect(bind).get_columns("customer")}
+            _search_columns_available[bind] = {"search_text", "search_vector"} <= columns
+        return _search_columns_available[bind]
+
+    @staticmethod
+    def search(
+        session: Session,
+        user: User,
+        query: str,
+        limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[Customer]:
+        """
+        Busca clientes visíveis para o usuário, mais relevantes primeiro.
+
+        Args:
+            session: Sessão do banco
+            user: Usuário requisitante (define o escopo)
+            query: Texto digitado
+            limit: Máximo de resultados
+
+        Returns:
+            Lista de clientes
+        """
+        query = query.strip()
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        if not query:
+            return []
+
+        statement = select(Customer).where(Customer.status != "excluido")
+
+        visibility = CustomerService.visibility_filter(user)
+        if visibility is not None:
+            statement = statement.where(visibility)
+
+        like_pattern = f"%{_escape_like(query)}%"
+
+        # CPF/CNPJ digitado com pontuação: compara só os dígitos
+        digits = re.sub(r"\D", "", query)
+        document_match = None
+        if len(digits) >= 3 and len(digits) >= len(re.sub(r"[\s.\-/]", "", query)):
+            document_match = Customer.document.like(f"{digits}%")
+
+        if CustomerSearchService.uses_full_text(session):
+            tsquery_text = _prefix_tsquery(query)
+            search_text = literal_column("customer.search_text")
+            search_vector = literal_column("customer.search_vector")
+            normalized = func.f_unaccent(func.lower(query))
+
+            conditions = [
+                search_text.like(func.f_unaccent(func.lower(like_pattern)), escape="\\"),
+                normalized.op("<%")(search_text),
+            ]
+            rank = func.word_similarity(normalized, search_text)
+            if tsquery_text:
+                tsquery = func.to_tsquery("simple", func.f_unaccent(tsquery_text))
+                conditions.append(search_vector.op("@@")(tsquery))
+                rank = rank + func.ts_rank(search_vector, tsquery)
+            if document_match is not None:
+                conditions.append(document_match)
+
+            statement = statement.where(or_(*conditions)).order_by(rank.desc(), Customer.name)
+        else:
+            conditions = [field.ilike(like_pattern, escape="\\") for field in SEARCH_FIELDS]
+            if document_match is not None:
+                conditions.append(document_match)
+            statement = statement.where(or_(*conditions)).order_by(Customer.name)
+
+        return list(session.exec(statement.limit(limit)).all())
@@ -10,9 +10,18 @@ Separado das rotas HTTP para permitir reutilização em:
 
 from typing import Optional, Dict, List
 from sqlmodel import Session, select
+from sqlalchemy import update, or_
 from fastapi import HTTPException
+from datetime import datetime
 
-from models import Customer, AuditLog, User
+from models import Customer, User, UserSupervisor
+from audit_sink import audit_sink
+from services.leaderboard import track_leaderboard_change
+from services.typeahead_service import track_on_commit
+
+
+# Limite de clientes por requisição de alteração de status em massa
+BULK_STATUS_MAX_IDS = 1000
 
 
 class CustomerService:
@@ -116,8 +125,7 @@ class CustomerService:
         new_customer.created_by_id = current_user.id
         
         session.add(new_customer)
-        session.commit()
-        session.refresh(new_customer)
+        session.flush()  # Gera o ID
         
         # 6. Registrar auditoria
         CustomerService.create_audit_log(
@@ -132,6 +140,9 @@ class CustomerService:
             }
         )
         
+        session.commit()
+        session.refresh(new_customer)
+        
         return new_customer
     
     @staticmethod
@@ -209,8 +220,6 @@ class CustomerService:
         # 3. Salvar mudanças
         if changes:
             session.add(customer)
-            session.commit()
-            session.refresh(customer)
             
             # 4. Registrar auditoria
             CustomerService.create_audit_log(
@@ -220,6 +229,9 @@ class CustomerService:
                 user_id=current_user.id,
                 changes=changes
             )
+            
+            session.commit()
+            session.refresh(customer)
         
         return customer
     
@@ -278,8 +290,6 @@ class CustomerService:
         if old_status != new_status:
             customer.status = new_status
             session.add(customer)
-            session.commit()
-            session.refresh(customer)
             
             # 3. Registrar auditoria
             CustomerService.create_audit_log(
@@ -289,9 +299,99 @@ class CustomerService:
                 user_id=current_user.id,
                 changes={"status": {"old": old_status, "new": new_status}}
             )
+            
+            session.commit()
+            session.refresh(customer)
         
         return customer
     
+    @staticmethod
+    def bulk_update_customer_status(
+        session: Session,
+        customer_ids: List[int],
+        new_status: str,
+        current_user: User
+    ) -> List[Dict]:
+        """
+        Altera o status de vários clientes de uma vez.
+        
+        Carrega apenas id/status/vendedor dos clientes em uma consulta,
+        verifica a permissão de cada um em memória, aplica um único
+        UPDATE ... WHERE id IN (...) e grava a auditoria com um INSERT
+        de várias linhas, tudo em um commit.
+        
+        Returns:
+            Lista com o resultado de cada ID (na ordem recebida)
+        """
+        if len(customer_ids) > BULK_STATUS_MAX_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Máximo de {BULK_STATUS_MAX_IDS} clientes por requisição"
+            )
+        
+        ids = list(dict.fromkeys(customer_ids))
+        role_permissions = current_user.role.permissions
+        
+        # 1. Carregar estado atual (uma consulta)
+        rows = session.exec(
+            select(Customer.id, Customer.status, Customer.salesperson_id).where(
+                Customer.id.in_(ids)
+            )
+        ).all() if ids else []
+        customers = {row.id: row for row in rows}
+        
+        # 2. Verificar permissões em memória
+        results = []
+        changed = []
+        for customer_id in ids:
+            customer = customers.get(customer_id)
+            if not customer:
+                results.append({"id": customer_id, "success": False, "detail": "Cliente não encontrado"})
+                continue
+            if not CustomerService.can_user_change_status(current_user, customer, role_permissions):
+                results.append({
+                    "id": customer_id,
+                    "success": False,
+                    "detail": "Você não tem permissão para alterar status deste cliente"
+                })
+                continue
+            result = {
+                "id": customer_id,
+                "success": True,
+                "old_status": customer.status,
+                "new_status": new_status,
+                "changed": customer.status != new_status
+            }
+            results.append(result)
+            if result["changed"]:
+                changed.append(customer)
+        
+        # 3. Um UPDATE para todos + auditoria em lote
+        if changed:
+            now = datetime.utcnow()
+            session.execute(
+                update(Customer)
+                .where(Customer.id.in_([c.id for c in changed]))
+                .values(status=new_status, updated_at=now)
+            )
+            audit_sink.write_many(session, [
+                {
+                    "table_name": "customer",
+                    "record_id": c.id,
+                    "action": "UPDATE_STATUS",
+                    "user_id": current_user.id,
+                    "changes": {"status": {"old": c.status, "new": new_status}},
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for c in changed
+            ])
+            track_on_commit(session, "customer", [c.id for c in changed])
+            track_leaderboard_change(session, "customer", [c.id for c in changed])
+            session.commit()
+        
+        return results
+    
     @staticmethod
     def create_audit_log(
         session: Session,
@@ -301,7 +401,7 @@ class CustomerService:
         changes: Dict
     ) -> None:
         """
-        Cria um registro de auditoria.
+        Cria um registro de auditoria (sem commit; grava junto com a operação).
         
         Args:
             session: Sessão do banco de dados
@@ -310,15 +410,44 @@ class CustomerService:
             user_id: ID do usuário que executou a ação
             changes: Dicionário com as mudanças realizadas
         """
-        audit = AuditLog(
+        audit_sink.write(
+            session=session,
             table_name="customer",
             record_id=customer_id,
             action=action,
             user_id=user_id,
             changes=changes
         )
-        session.add(audit)
-        session.commit()
+    
+    @staticmethod
+    def visibility_filter(user: User):
+        """
+        Condição SQL com os clientes que o usuário pode visualizar.
+        
+        - Admin vê todos
+        - Manager vê todos ou apenas sua hierarquia (customer_view_all)
+        - Vendedores veem apenas seus clientes
+        
+        Returns:
+            Expressão para .where() ou None quando não há restrição
+        """
+        role_slug = user.role.slug
+        role_permissions = user.role.permissions
+        
+        if role_slug == "admin":
+            return None
+        if role_slug == "manager":
+            if role_permissions.get("customer_view_all", True):
+                return None
+            # Hierarquia resolvida no próprio SQL (subconsulta em UserSupervisor)
+            supervised_ids = select(UserSupervisor.user_id).where(
+                UserSupervisor.supervisor_id == user.id
+            )
+            return or_(
+                Customer.salesperson_id == user.id,
+                Customer.salesperson_id.in_(supervised_ids)
+            )
+        return Customer.salesperson_id == user.id
     
     @staticmethod
     def get_customers_for_user(
@@ -350,25 +479,9 @@ class CustomerService:
             statement = statement.where(Customer.status == status_filter)
         
         # Aplicar filtro de hierarquia
-        role_slug = user.role.slug
-        role_permissions = user.role.permissions
-        
-        if role_slug == "admin":
-            # Admin vê todos
-            pass
-        elif role_slug == "manager":
-            # Manager vê todos ou apenas sua hierarquia (dependendo da config)
-            view_all = role_permissions.get("customer_view_all", True)
-            if not view_all:
-                # Filtrar apenas clientes da hierarquia
-                supervised_ids = [u.id for u in user.monitoring]
-                supervised_ids.append(user.id)
-                statement = statement.where(
-                    Customer.salesperson_id.in_(supervised_ids)
-                )
-        else:
-            # Vendedores veem apenas seus clientes
-            statement = statement.where(Customer.salesperson_id == user.id)
+        visibility = CustomerService.visibility_filter(user)
+        if visibility is not None:
+            statement = statement.where(visibility)
         
         # Aplicar paginação
         statement = statement.offset(skip).limit(limit)
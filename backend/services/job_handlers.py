@@ -0,0 +1,142 @@
+"""
+Job Handlers
+Tipos de tarefa em segundo plano (ver job_runner.py).
+
+Importado pelo main.py e pelo worker.py: os dois precisam do mesmo registro
+(a API para validar o tipo ao enfileirar, o runner para executar).
+
+    report_export     exportação grande de relatório (CSV/XLSX como artefato)
+    customer_status   alteração de status de clientes acima de BULK_STATUS_MAX_IDS
+    quote_pdfs        PDFs de vários orçamentos em um .zip
+    quote_reminders   lembrete de aprovação por email para orçamentos enviados
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+import zipfile
+
+from database import engine
+from job_runner import JobContext, job_handler
+from models import Customer, Quote, User
+from services.customer_service import BULK_STATUS_MAX_IDS, CustomerService
+from services.quote_service import QuoteService
+from services.report_export import FORMATS, ReportExport
+
+# Falhas guardadas no resultado de customer_status (o total vai nos contadores)
+MAX_REPORTED_FAILURES = 100
+
+
+@job_handler("report_export", concurrency=1)
+def export_report(ctx: JobContext) -> Dict:
+    params = ctx.params
+    statement = ReportExport.statement(
+        params["report"],
+        datetime.fromisoformat(params["start"]),
+        datetime.fromisoformat(params["end"]),
+        params.get("status"),
+        params.get("salesperson_id"),
+    )
+    filename = ReportExport.filename(params["report"], params["format"])
+    path = ctx.artifact(filename, FORMATS[params["format"]])
+    ReportExport.write(params["report"], params["format"], statement, path, progress=ctx.progress)
+    return {"rows": ctx.job.progress, "filename": filename}
+
+
+@job_handler("customer_status", concurrency=1)
+def update_customer_status(ctx: JobContext) -> Dict:
+    """Mesmas regras de PATCH /customers/status, em lotes de BULK_STATUS_MAX_IDS (um commit por lote)"""
+    ids: List[int] = list(dict.fromkeys(ctx.params["ids"]))
+    new_status = ctx.params["status"]
+    updated = failed = 0
+    failures = []
+
+    with Session(engine) as session:
+        user = session.get(User, ctx.user_id)
+        for start in range(0, len(ids), BULK_STATUS_MAX_IDS):
+            results = CustomerService.bulk_update_customer_status(
+                session=session,
+                customer_ids=ids[start:start + BULK_STATUS_MAX_IDS],
+                new_status=new_status,
+                current_user=user
+            )
+            updated += sum(1 for r in results if r.get("changed"))
+            for result in results:
+                if not result["success"]:
+                    failed += 1
+                    if len(failures) < MAX_REPORTED_FAILURES:
+                        failures.append(result)
+            ctx.progress(start + len(results), total=len(ids), force=True)
+    return {"status": new_status, "updated": updated, "failed": failed, "failures": failures}
+
+
+@job_handler("quote_pdfs", concurrency=1)
+def quote_pdfs(ctx: JobContext) -> Dict:
+    """PDF de cada orçamento (mesmo da rota /quotes/{id}/pdf) em um .zip"""
+    from pdf_generator import generate_quote_pdf
+
+    ids: List[int] = ctx.params["ids"]
+    filename = f"orcamentos_{datetime.utcnow().strftime('%Y%m%d-%H%M')}.zip"
+    path = ctx.artifact(filename, "application/zip")
+    missing = []
+
+    # PDF já é comprimido: ZIP_STORED evita gastar CPU de novo
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive, Session(engine) as session:
+        for index, quote_id in enumerate(ids, 1):
+            quote = session.get(Quote, quote_id)
+            if not quote:
+                missing.append(quote_id)
+            else:
+                customer = session.get(Customer, quote.customer_id)
+                archive.writestr(f"{quote.quote_number}.pdf", generate_quote_pdf(QuoteService.pdf_data(quote, customer)))
+            session.expunge_all()  # Lotes grandes: não acumula orçamentos na sessão
+            ctx.progress(index, total=len(ids))
+    return {"pdfs": len(ids) - len(missing), "missing": missing}
+
+
+@job_handler("quote_reminders", concurrency=1)
+def quote_reminders(ctx: JobContext) -> Dict:
+    """
+    Lembrete de aprovação para orçamentos 'enviado' há pelo menos `days` dias.
+
+    O runner pode executar a tarefa de novo (desligamento, worker morto):
+    cada envio grava Quote.reminder_sent_at na hora, e orçamentos lembrados
+    dentro de `days` dias ficam de fora, então a nova execução continua de
+    onde a anterior parou em vez de reenviar.
+    """
+    from email_service import send_quote_approval_reminder
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=ctx.params.get("days", 7))
+    with Session(engine) as session:
+        rows = session.exec(
+            select(Quote.id, Quote.quote_number, Quote.sent_at, Customer.name, Customer.email)
+            .join(Customer, Customer.id == Quote.customer_id)
+            .where(
+                Quote.status == "enviado",
+                Quote.sent_at <= cutoff,
+                or_(Quote.reminder_sent_at.is_(None), Quote.reminder_sent_at <= cutoff)
+            )
+            .order_by(Quote.sent_at)
+        ).all()
+
+        sent = failed = skipped = 0
+        for index, (quote_id, quote_number, sent_at, name, email) in enumerate(rows, 1):
+            if not email:
+                skipped += 1
+            elif send_quote_approval_reminder(
+                customer_email=email,
+                customer_name=name,
+                quote_number=quote_number,
+                days_pending=(now - sent_at).days
+            ):
+                session.execute(
+                    update(Quote).where(Quote.id == quote_id).values(reminder_sent_at=datetime.utcnow())
+                )
+                session.commit()
+                sent += 1
+            else:
+                failed += 1
+            ctx.progress(index, total=len(rows))
+    return {"quotes": len(rows), "sent": sent, "failed": failed, "skipped_without_email": skipped}
@@ -0,0 +1,332 @@
+"""
+Leaderboard
+Ranking de vendedores do dashboard servido de contadores em memória.
+
+Por vendedor (usuário com cargo): clientes, orçamentos em aberto, receita
+aprovada e receita faturada. Os orçamentos contam para o vendedor do
+cliente, então trocar o vendedor de um cliente leva junto os orçamentos.
+
+    customers          clientes não excluídos
+    open_quotes        orçamentos em OPEN_STATUSES
+    approved_revenue   total dos orçamentos em APPROVED_STATUSES
+    billed_revenue     total dos orçamentos em BILLED_STATUSES
+
+- Construído no startup (lifespan)
+- Atualizado após cada commit, como o typeahead: um listener de flush marca
+  usuários, clientes e orçamentos alterados e, depois do commit, cada um é
+  recarregado do banco; a diferença para o estado anterior do registro é
+  aplicada nos contadores (caminhos em lote com Core chamam
+  track_leaderboard_change)
+- Reconciliado em segundo plano a cada LEADERBOARD_RECONCILE_INTERVAL
+  segundos: recontagem completa, que também traz escritas de outros
+  workers. Diferenças encontradas entram em stats["corrections"]
+"""
+
+from typing import Optional, Dict, List, Iterable, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+import logging
+import os
+import threading
+import time
+
+from database import engine
+from models import Customer, Quote, User
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_INTERVAL = float(os.getenv("LEADERBOARD_RECONCILE_INTERVAL", "120"))
+
+OPEN_STATUSES = ("rascunho", "enviado")
+APPROVED_STATUSES = ("aprovado", "faturado")
+BILLED_STATUSES = ("faturado",)
+
+METRICS = ("customers", "open_quotes", "approved_revenue", "billed_revenue")
+DEFAULT_LEADERBOARD_LIMIT = 5
+MAX_LEADERBOARD_LIMIT = 100
+
+# Diferença de receita (R$) tolerada na reconciliação (soma de floats)
+REVENUE_TOLERANCE = 0.005
+
+# Ordem de recarga: o vendedor do cliente precisa estar atualizado antes dos orçamentos
+ENTITIES = ("user", "customer", "quote")
+_MODEL_ENTITIES = {User: "user", Customer: "customer", Quote: "quote"}
+
+_PENDING_KEY = "leaderboard_pending"
+
+
+def _quote_values(status: str, total: Optional[float]) -> Tuple[int, float, float]:
+    """(em aberto, receita aprovada, receita faturada) de um orçamento"""
+    total = float(total or 0)
+    return (
+        1 if status in OPEN_STATUSES else 0,
+        total if status in APPROVED_STATUSES else 0.0,
+        total if status in BILLED_STATUSES else 0.0,
+    )
+
+
+class LeaderboardState:
+    """
+    Contadores e a contribuição de cada registro para eles. Guardar a
+    contribuição permite aplicar só a diferença quando o registro muda (e
+    ignorar uma atualização repetida).
+    """
+
+    def __init__(self):
+        self.users: Dict[int, str] = {}
+        # cliente -> (vendedor, conta como cliente)
+        self.customers: Dict[int, Tuple[Optional[int], bool]] = {}
+        # orçamento -> (cliente, em aberto, aprovado, faturado)
+        self.quotes: Dict[int, Tuple[int, int, float, float]] = {}
+        # cliente -> soma dos orçamentos [em aberto, aprovado, faturado]
+        self.customer_quotes: Dict[int, List[float]] = {}
+        # vendedor -> [clientes, em aberto, aprovado, faturado]
+        self.counters: Dict[Optional[int], List[float]] = {}
+
+    def _add(self, salesperson_id: Optional[int], values: Iterable[float], sign: int) -> None:
+        counters = self.counters.setdefault(salesperson_id, [0, 0, 0.0, 0.0])
+        for position, value in enumerate(values):
+            counters[position] += sign * value
+
+    def _salesperson(self, customer_id: int) -> Optional[int]:
+        return self.customers.get(customer_id, (None, False))[0]
+
+    def set_user(self, user_id: int, name: Optional[str]) -> None:
+        """name=None remove o usuário do ranking (sem cargo ou apagado)"""
+        if name is None:
+            self.users.pop(user_id, None)
+        else:
+            self.users[user_id] = name
+
+    def set_customer(self, customer_id: int, salesperson_id: Optional[int], counted: bool) -> None:
+        quotes = self.customer_quotes.get(customer_id, (0, 0.0, 0.0))
+        if customer_id in self.customers:
+            old_salesperson, old_counted = self.customers[customer_id]
+            self._add(old_salesperson, (int(old_counted), *quotes), -1)
+        self.customers[customer_id] = (salesperson_id, counted)
+        self._add(salesperson_id, (int(counted), *quotes), 1)
+
+    def remove_customer(self, customer_id: int) -> None:
+        if customer_id in self.customers:
+            self.set_customer(customer_id, None, False)
+            del self.customers[customer_id]
+
+    def set_quote(self, quote_id: int, customer_id: int, status: str, total: Optional[float]) -> None:
+        self.remove_quote(quote_id)
+        values = _quote_values(status, total)
+        self.quotes[quote_id] = (customer_id, *values)
+        totals = self.customer_quotes.setdefault(customer_id, [0, 0.0, 0.0])
+        for position, value in enumerate(values):
+            totals[position] += value
+        self._add(self._salesperson(customer_id), (0, *values), 1)
+
+    def remove_quote(self, quote_id: int) -> None:
+        old = self.quotes.pop(quote_id, None)
+        if old is None:
+            return
+        customer_id, *values = old
+        totals = self.customer_quotes[customer_id]
+        for position, value in enumerate(values):
+            totals[position] -= value
+        self._add(self._salesperson(customer_id), (0, *values), -1)
+
+    def row(self, user_id: int) -> Dict:
+        customers, open_quotes, approved, billed = self.counters.get(user_id, (0, 0, 0.0, 0.0))
+        return {
+            "salesperson_id": user_id,
+            "name": self.users[user_id],
+            "customers": int(customers),
+            "open_quotes": int(open_quotes),
+            "approved_revenue": round(approved, 2),
+            "billed_revenue": round(billed, 2),
+        }
+
+
+def _differs(old: Iterable[float], new: Iterable[float]) -> bool:
+    old_customers, old_open, *old_revenue = old
+    new_customers, new_open, *new_revenue = new
+    return (
+        old_customers != new_customers
+        or old_open != new_open
+        or any(abs(a - b) > REVENUE_TOLERANCE for a, b in zip(old_revenue, new_revenue))
+    )
+
+
+class Leaderboard:
+    """Ranking de vendedores com atualização incremental e reconciliação periódica"""
+
+    def __init__(self, reconcile_interval: float = RECONCILE_INTERVAL):
+        self.reconcile_interval = reconcile_interval
+        self.state = LeaderboardState()
+        self.built_at: Optional[float] = None
+        self.stats = {"updates": 0, "reconciliations": 0, "corrections": 0}
+        self._lock = threading.RLock()
+        self._rebuilding = threading.Lock()
+        # Registros alterados durante uma reconstrução (reaplicados depois da troca)
+        self._replay: Optional[Dict[str, set]] = None
+
+    def build(self, session: Session) -> Dict[str, int]:
+        """
+        Recontagem completa (startup e reconciliação). Retorna o número de
+        vendedores cujos contadores estavam diferentes.
+        """
+        with self._lock:
+            self._replay = {entity: set() for entity in ENTITIES}
+        try:
+            state = LeaderboardState()
+            for user_id, name in session.exec(select(User.id, User.name).where(User.role_id.isnot(None))):
+                state.set_user(user_id, name)
+            for customer_id, salesperson_id, status in session.exec(
+                select(Customer.id, Customer.salesperson_id, Customer.status).execution_options(yield_per=5000)
+            ):
+                state.set_customer(customer_id, salesperson_id, status != "excluido")
+            for quote_id, customer_id, status, total in session.exec(
+                select(Quote.id, Quote.customer_id, Quote.status, Quote.total).execution_options(yield_per=5000)
+            ):
+                state.set_quote(quote_id, customer_id, status, total)
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+
+        with self._lock:
+            corrections = 0
+            if self.built_at is not None:
+                for salesperson_id in set(self.state.counters) | set(state.counters):
+                    if _differs(self.state.counters.get(salesperson_id, (0, 0, 0.0, 0.0)),
+                                state.counters.get(salesperson_id, (0, 0, 0.0, 0.0))):
+                        corrections += 1
+                self.stats["reconciliations"] += 1
+                self.stats["corrections"] += corrections
+            self.state = state
+            self.built_at = time.monotonic()
+            replay, self._replay = self._replay, None
+
+        if any(replay.values()):
+            self._refresh(session, replay)
+        if corrections:
+            logger.warning(f"Leaderboard: contadores de {corrections} vendedor(es) corrigidos na reconciliação")
+        return {"salespeople": len(state.users), "customers": len(state.customers),
+                "quotes": len(state.quotes), "corrections": corrections}
+
+    def refresh(self, session: Session, pending: Dict[str, Iterable[int]]) -> None:
+        """Recarrega do banco os registros informados ({entidade: ids})"""
+        with self._lock:
+            if self._replay is not None:
+                for entity, ids in pending.items():
+                    self._replay[entity].update(ids)
+        self._refresh(session, pending)
+
+    def _refresh(self, session: Session, pending: Dict[str, Iterable[int]]) -> None:
+        for entity in ENTITIES:
+            ids = list(set(pending.get(entity, ())))
+            if not ids:
+                continue
+            if entity == "user":
+                rows = {row.id: row for row in session.exec(
+                    select(User.id, User.name, User.role_id).where(User.id.in_(ids)))}
+            elif entity == "customer":
+                rows = {row.id: row for row in session.exec(
+                    select(Customer.id, Customer.salesperson_id, Customer.status).where(Customer.id.in_(ids)))}
+            else:
+                rows = {row.id: row for row in session.exec(
+                    select(Quote.id, Quote.customer_id, Quote.status, Quote.total).where(Quote.id.in_(ids)))}
+            with self._lock:
+                state = self.state
+                for record_id in ids:
+                    row = rows.get(record_id)
+                    if entity == "user":
+                        state.set_user(record_id, row.name if row and row.role_id is not None else None)
+                    elif entity == "customer":
+                        if row:
+                            state.set_customer(record_id, row.salesperson_id, row.status != "excluido")
+                        else:
+                            state.remove_customer(record_id)
+                    elif row:
+                        state.set_quote(record_id, row.customer_id, row.status, row.total)
+                    else:
+                        state.remove_quote(record_id)
+                self.stats["updates"] += len(ids)
+
+    def ranking(self, metric: str = "customers", limit: int = DEFAULT_LEADERBOARD_LIMIT) -> List[Dict]:
+        """Vendedores ordenados pela métrica (maior primeiro; empate pelo nome)"""
+        self._ensure_built()
+        position = METRICS.index(metric)
+        with self._lock:
+            state = self.state
+            ordered = sorted(
+                state.users,
+                key=lambda user_id: (-state.counters.get(user_id, (0, 0, 0.0, 0.0))[position], state.users[user_id])
+            )
+            return [state.row(user_id) for user_id in ordered[:limit]]
+
+    def snapshot_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "salespeople": len(self.state.users),
+                "customers": len(self.state.customers),
+                "quotes": len(self.state.quotes),
+                "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            }
+
+    def _ensure_built(self) -> None:
+        if self.built_at is None:
+            # Startup falhou nesta etapa: monta na primeira leitura
+            with self._rebuilding, Session(engine) as session:
+                if self.built_at is None:
+                    self.build(session)
+            return
+        if time.monotonic() - self.built_at < self.reconcile_interval:
+            return
+        if not self._rebuilding.acquire(blocking=False):
+            return
+        self.built_at = time.monotonic()  # Evita disparar outra reconciliação
+        threading.Thread(target=self._reconcile, name="leaderboard-reconcile", daemon=True).start()
+
+    def _reconcile(self) -> None:
+        try:
+            with Session(engine) as session:
+                self.build(session)
+        except Exception as e:
+            logger.error(f"Falha ao reconciliar o leaderboard: {e}")
+        finally:
+            self._rebuilding.release()
+
+
+leaderboard = Leaderboard()
+
+
+def track_leaderboard_change(session: Session, entity: str, ids: Iterable[int]) -> None:
+    """
+    Agenda a atualização do leaderboard desses registros para depois do
+    commit. Usado nos caminhos que gravam com Core (INSERT/UPDATE em lote),
+    que não passam pelo listener de flush.
+    """
+    session.info.setdefault(_PENDING_KEY, {}).setdefault(entity, set()).update(ids)
+
+
+@event.listens_for(SASession, "after_flush")
+def _track_flushed(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        entity = _MODEL_ENTITIES.get(type(obj))
+        if entity and obj.id is not None:
+            track_leaderboard_change(session, entity, [obj.id])
+
+
+@event.listens_for(SASession, "after_commit")
+def _refresh_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or leaderboard.built_at is None:
+        return
+    try:
+        with Session(engine) as refresh_session:
+            leaderboard.refresh(refresh_session, pending)
+    except Exception as e:
+        logger.error(f"Falha ao atualizar o leaderboard: {e}")
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
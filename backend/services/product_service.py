@@ -8,7 +8,9 @@ from typing import Optional, Dict, List
 from sqlmodel import Session, select
 from fastapi import HTTPException
 
-from models import Product, AuditLog, User
+from models import Product, User
+from audit_sink import audit_sink
+from services.catalog_cache import catalog_cache, bump_catalog_version
 
 
 class ProductService:
@@ -113,8 +115,7 @@ class ProductService:
         # 5. Criar produto
         new_product = Product(**product_data)
         session.add(new_product)
-        session.commit()
-        session.refresh(new_product)
+        session.flush()  # Gera o ID
         
         # 6. Registrar auditoria
         ProductService.create_audit_log(
@@ -129,6 +130,10 @@ class ProductService:
             }
         )
         
+        bump_catalog_version(session, "product")
+        session.commit()
+        session.refresh(new_product)
+        
         return new_product
     
     @staticmethod
@@ -220,8 +225,6 @@ class ProductService:
         # 6. Salvar mudanças
         if changes:
             session.add(product)
-            session.commit()
-            session.refresh(product)
             
             # 7. Registrar auditoria
             ProductService.create_audit_log(
@@ -231,6 +234,10 @@ class ProductService:
                 user_id=current_user.id,
                 changes=changes
             )
+            
+            bump_catalog_version(session, "product")
+            session.commit()
+            session.refresh(product)
         
         return product
     
@@ -283,8 +290,6 @@ class ProductService:
         if old_status != new_status:
             product.status = new_status
             session.add(product)
-            session.commit()
-            session.refresh(product)
             
             # 4. Registrar auditoria
             ProductService.create_audit_log(
@@ -294,6 +299,10 @@ class ProductService:
                 user_id=current_user.id,
                 changes={"status": {"old": old_status, "new": new_status}}
             )
+            
+            bump_catalog_version(session, "product")
+            session.commit()
+            session.refresh(product)
         
         return product
     
@@ -332,7 +341,6 @@ class ProductService:
         old_status = product.status
         product.status = "inativo"
         session.add(product)
-        session.commit()
         
         # 3. Registrar auditoria
         ProductService.create_audit_log(
@@ -346,6 +354,9 @@ class ProductService:
                 "deleted": True
             }
         )
+        
+        bump_catalog_version(session, "product")
+        session.commit()
     
     @staticmethod
     def create_audit_log(
@@ -356,7 +367,7 @@ class ProductService:
         changes: Dict
     ) -> None:
         """
-        Cria um registro de auditoria para produtos.
+        Cria um registro de auditoria para produtos (sem commit; grava junto com a operação).
         
         Args:
             session: Sessão do banco
@@ -365,15 +376,14 @@ class ProductService:
             user_id: ID do usuário que executou a ação
             changes: Dicionário com as mudanças realizadas
         """
-        audit = AuditLog(
+        audit_sink.write(
+            session=session,
             table_name="product",
             record_id=product_id,
             action=action,
             user_id=user_id,
             changes=changes
         )
-        session.add(audit)
-        session.commit()
     
     @staticmethod
     def get_products_for_user(
@@ -398,17 +408,6 @@ class ProductService:
         Returns:
             Lista de produtos
         """
-        # Construir query base
-        statement = select(Product)
-        
-        # Aplicar filtro de status se fornecido
-        if status_filter:
-            statement = statement.where(Product.status == status_filter)
-        
-        # Aplicar filtro de categoria se fornecido
-        if category_filter:
-            statement = statement.where(Product.category == category_filter)
-        
         # Verificar se usuário pode ver todos os produtos
         if user.role:
             role_permissions = user.role.permissions
@@ -418,10 +417,13 @@ class ProductService:
                 # Vendedor não pode ver produtos (depende da implementação de negócio)
                 return []
         
-        # Aplicar paginação
-        statement = statement.offset(skip).limit(limit)
-        
-        return list(session.exec(statement).all())
+        # Filtros e paginação sobre o cache do catálogo
+        return catalog_cache.products.list(
+            status=status_filter or None,
+            category=category_filter or None,
+            skip=skip,
+            limit=limit
+        )
     
     @staticmethod
     def get_product_by_id(
@@ -443,7 +445,7 @@ class ProductService:
         Raises:
             HTTPException: Se não tiver permissão
         """
-        product = session.get(Product, product_id)
+        product = catalog_cache.products.get(product_id)
         
         if not product:
             return None
@@ -0,0 +1,136 @@
+"""
+Quote Projection
+Formato de leitura dos orçamentos, montado em um só lugar.
+
+Duas visões, cada uma carregando só as colunas de que precisa:
+
+- summary: tabela de orçamentos. Sem os itens; a quantidade vem do banco
+  (items_count, json_array_length), então nenhum item é decodificado.
+- detail: formato de QuoteRead. Os itens são lidos como texto JSON e vão
+  para a resposta como orjson.Fragment (sem decodificar).
+
+Quem precisa dos itens como lista (reservas, relatórios, PDF) usa
+QuoteProjection.items(), que decodifica uma vez com orjson. Consultas de
+entidade que só precisam dos itens usam QuoteProjection.items_only()
+(load_only).
+
+Os itens ficam na coluna JSON como lista. Orçamentos antigos da API foram
+gravados como string JSON com a lista dentro (json.dumps antes de gravar);
+a migração a1c4e7f93b20 converte, e tudo aqui aceita os dois formatos.
+"""
+
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Integer, Text, cast
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql.functions import FunctionElement
+import orjson
+
+from models import Quote
+
+
+# Ordem dos campos de QuoteRead (mesmo JSON da rota com response_model)
+DETAIL_FIELDS = (
+    "id", "quote_number", "customer_id", "items", "subtotal", "discount", "discount_percent",
+    "total", "status", "valid_until", "notes", "payment_terms", "delivery_terms", "sent_at",
+    "approved_at", "invoiced_at", "rental_start", "rental_end", "created_at", "updated_at",
+)
+
+SUMMARY_FIELDS = (
+    "id", "quote_number", "customer_id", "items_count", "subtotal", "discount", "discount_percent",
+    "total", "status", "valid_until", "created_at", "updated_at",
+)
+
+
+class items_count(FunctionElement):
+    """Quantidade de itens da coluna JSON (lista ou lista dentro de string JSON)"""
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(items_count, "postgresql")
+def _items_count_postgresql(element, compiler, **kw):
+    items = compiler.process(element.clauses, **kw)
+    return (f"CASE WHEN json_typeof({items}) = 'string' "
+            f"THEN json_array_length(({items} #>> '{{}}')::json) ELSE json_array_length({items}) END")
+
+
+@compiles(items_count, "sqlite")
+def _items_count_sqlite(element, compiler, **kw):
+    items = compiler.process(element.clauses, **kw)
+    return (f"CASE WHEN json_type({items}) = 'text' "
+            f"THEN json_array_length(json_extract({items}, '$')) ELSE json_array_length({items}) END")
+
+
+@compiles(items_count)
+def _items_count_default(element, compiler, **kw):
+    return f"json_array_length({compiler.process(element.clauses, **kw)})"
+
+
+_COLUMNS = {
+    "summary": [getattr(Quote, field) for field in SUMMARY_FIELDS if field != "items_count"]
+    + [items_count(Quote.items).label("items_count")],
+    "detail": [getattr(Quote, field) for field in DETAIL_FIELDS if field != "items"]
+    + [cast(Quote.items, Text).label("items_json")],
+}
+
+
+class QuoteProjection:
+    """Leitura de orçamentos (ver docstring do módulo)"""
+
+    @staticmethod
+    def columns(view: str = "detail") -> List:
+        """Colunas do SELECT de cada visão (linhas para summary()/detail())"""
+        return _COLUMNS[view]
+
+    @staticmethod
+    def summary(row) -> Dict[str, Any]:
+        data = row._mapping
+        return {field: data[field] for field in SUMMARY_FIELDS}
+
+    @staticmethod
+    def detail(row) -> Dict[str, Any]:
+        data = row._mapping
+        return {
+            field: QuoteProjection.items_fragment(data["items_json"]) if field == "items" else data[field]
+            for field in DETAIL_FIELDS
+        }
+
+    @staticmethod
+    def from_model(quote: Quote) -> Dict[str, Any]:
+        """Orçamento já carregado (criação, mudança de status) no formato de QuoteRead"""
+        return {
+            field: QuoteProjection.items(quote) if field == "items" else getattr(quote, field)
+            for field in DETAIL_FIELDS
+        }
+
+    # --- Itens ---
+
+    @staticmethod
+    def items(quote: Quote) -> List[Dict]:
+        return QuoteProjection.decode_items(quote.items)
+
+    @staticmethod
+    def decode_items(value: Any) -> List[Dict]:
+        """Itens como lista; decodifica texto JSON uma vez (orjson)"""
+        if not value:
+            return []
+        if isinstance(value, (str, bytes)):
+            value = orjson.loads(value)
+            if isinstance(value, str):  # Formato antigo: lista dentro de string JSON
+                value = orjson.loads(value)
+        return value
+
+    @staticmethod
+    def items_fragment(items_json: Optional[str]) -> orjson.Fragment:
+        """Itens (texto da coluna) como JSON pré-serializado, sem decodificar a lista"""
+        if not items_json:
+            return orjson.Fragment(b"[]")
+        if items_json.lstrip().startswith('"'):
+            items_json = orjson.loads(items_json)  # Formato antigo: só a string externa
+        return orjson.Fragment(items_json)
+
+    @staticmethod
+    def items_only():
+        """load_only para consultas de Quote que só leem os itens (relatórios)"""
+        return load_only(Quote.id, Quote.items)
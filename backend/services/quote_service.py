@@ -3,14 +3,16 @@ Quote Service Layer
 Contém toda a lógica de negócio relacionada a Orçamentos/Cotações.
 """
 
-from typing import Optional, Dict, List
-from sqlmodel import Session, select
+from typing import Optional, Dict, List, Tuple
+from sqlmodel import Session, select, func
 from fastapi import HTTPException
 from datetime import datetime, timedelta
-import json
 
-from models import Quote, Customer, Product, Service, User
+from models import Quote, Customer, User
 from utils import create_audit_log
+from services.reservation_service import ReservationService, RESERVED_STATUSES
+from services.catalog_cache import catalog_cache
+from services.quote_projection import QuoteProjection
 
 
 class QuoteService:
@@ -76,16 +78,29 @@ class QuoteService:
         """
         Valida se os itens existem e estão disponíveis.
         
+        Produtos e serviços vêm do cache do catálogo (sem consulta por item).
+        Linhas repetidas do mesmo produto têm as quantidades somadas antes de
+        comparar com o estoque.
+        
         Raises:
             HTTPException: Se algum item for inválido
         """
+        product_ids = {item.get('item_id') for item in items if item.get('type') == 'product'}
+        service_ids = {item.get('item_id') for item in items if item.get('type') == 'service'}
+        
+        products = catalog_cache.products.get_many(product_ids) if product_ids else {}
+        services = catalog_cache.services.get_many(service_ids) if service_ids else {}
+        
+        # Quantidade total pedida por produto (linhas duplicadas somadas)
+        requested: Dict[int, int] = {}
+        
         for item in items:
             item_type = item.get('type')
             item_id = item.get('item_id')
             quantity = item.get('quantity', 1)
             
             if item_type == 'product':
-                product = session.get(Product, item_id)
+                product = products.get(item_id)
                 if not product:
                     raise HTTPException(
                         status_code=404,
@@ -96,14 +111,10 @@ class QuoteService:
                         status_code=400,
                         detail=f"Produto '{product.name}' não está disponível"
                     )
-                if product.quantity < quantity:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Estoque insuficiente para '{product.name}'. Disponível: {product.quantity}"
-                    )
+                requested[item_id] = requested.get(item_id, 0) + quantity
                     
             elif item_type == 'service':
-                service = session.get(Service, item_id)
+                service = services.get(item_id)
                 if not service:
                     raise HTTPException(
                         status_code=404,
@@ -114,6 +125,14 @@ class QuoteService:
                         status_code=400,
                         detail=f"Serviço '{service.name}' não está ativo"
                     )
+        
+        for product_id, quantity in requested.items():
+            product = products[product_id]
+            if product.quantity < quantity:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Estoque insuficiente para '{product.name}'. Disponível: {product.quantity}"
+                )
     
     @staticmethod
     def create_quote(
@@ -169,6 +188,15 @@ class QuoteService:
         # 5. Gerar número do orçamento
         quote_number = QuoteService.generate_quote_number(session)
         
+        # 5.1 Validar período de locação
+        rental_start = quote_data.get('rental_start')
+        rental_end = quote_data.get('rental_end')
+        if rental_start and rental_end and rental_end <= rental_start:
+            raise HTTPException(
+                status_code=400,
+                detail="Período de locação inválido: o fim deve ser posterior ao início"
+            )
+        
         # 6. Definir validade (30 dias por padrão)
         valid_until = quote_data.get('valid_until')
         if not valid_until:
@@ -178,7 +206,7 @@ class QuoteService:
         db_quote = Quote(
             quote_number=quote_number,
             customer_id=quote_data['customer_id'],
-            items=json.dumps(items_dict),  # Converter para JSON string
+            items=items_dict,  # Lista na coluna JSON (sem json.dumps: evita string dentro do JSON)
             subtotal=subtotal,
             discount=discount,
             discount_percent=discount_percent,
@@ -187,7 +215,9 @@ class QuoteService:
             valid_until=valid_until,
             notes=quote_data.get('notes'),
             payment_terms=quote_data.get('payment_terms'),
-            delivery_terms=quote_data.get('delivery_terms')
+            delivery_terms=quote_data.get('delivery_terms'),
+            rental_start=rental_start,
+            rental_end=rental_end
         )
         
         session.add(db_quote)
@@ -235,11 +265,15 @@ class QuoteService:
         elif new_status == "faturado" and not quote.invoiced_at:
             quote.invoiced_at = datetime.now()
         
+        # Reservar estoque ao entrar em aprovado/faturado, liberar ao sair
+        if new_status in RESERVED_STATUSES and old_status not in RESERVED_STATUSES:
+            ReservationService.reserve_quote(session, quote)
+        elif old_status in RESERVED_STATUSES and new_status not in RESERVED_STATUSES:
+            ReservationService.release_quote(session, quote)
+        
         session.add(quote)
-        session.commit()
-        session.refresh(quote)
         
-        # Auditar
+        # Auditar (mesmo commit da mudança de status)
         create_audit_log(
             session=session,
             table_name='quote',
@@ -249,6 +283,8 @@ class QuoteService:
             changes={'status': {'old': old_status, 'new': new_status}}
         )
         
+        session.commit()
+        session.refresh(quote)
         return quote
     
     @staticmethod
@@ -263,13 +299,84 @@ class QuoteService:
         """
         Recupera orçamentos com filtros.
         """
-        statement = select(Quote).order_by(Quote.created_at.desc())
-        
+        statement = QuoteService._filter(select(Quote), status_filter, customer_id)
+        statement = statement.order_by(Quote.created_at.desc()).offset(skip).limit(limit)
+        return session.exec(statement).all()
+    
+    @staticmethod
+    def get_quote_rows(
+        session: Session,
+        user: User,
+        skip: int = 0,
+        limit: int = 100,
+        status_filter: Optional[str] = None,
+        customer_id: Optional[int] = None,
+        view: str = "detail"
+    ) -> List:
+        """
+        Mesmos filtros de get_quotes_for_user, mas só com as colunas da visão
+        (QuoteProjection.columns): linhas para QuoteProjection.summary/detail.
+        """
+        statement = QuoteService._filter(select(*QuoteProjection.columns(view)), status_filter, customer_id)
+        statement = statement.order_by(Quote.created_at.desc()).offset(skip).limit(limit)
+        return session.exec(statement).all()
+    
+    @staticmethod
+    def get_quote_row(session: Session, quote_id: int):
+        """Um orçamento na visão detail (None se não existir)"""
+        columns = QuoteProjection.columns("detail")
+        return session.exec(select(*columns).where(Quote.id == quote_id)).first()
+    
+    @staticmethod
+    def get_quotes_summary(
+        session: Session,
+        user: User,
+        status_filter: Optional[str] = None,
+        customer_id: Optional[int] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Quantidade e última alteração (max updated_at) dos orçamentos do
+        filtro, em uma consulta. Usado no ETag das listagens.
+        """
+        statement = select(func.count(), func.max(Quote.updated_at))
+        return session.exec(QuoteService._filter(statement, status_filter, customer_id)).one()
+    
+    @staticmethod
+    def _filter(statement, status_filter: Optional[str], customer_id: Optional[int]):
         if status_filter:
             statement = statement.where(Quote.status == status_filter)
         
         if customer_id:
             statement = statement.where(Quote.customer_id == customer_id)
+        return statement
+    
+    @staticmethod
+    def pdf_data(quote: Quote, customer: Optional[Customer]) -> Dict:
+        """Dados do orçamento no formato de generate_quote_pdf (rota do PDF e lotes)"""
+        items_list = QuoteProjection.items(quote)
         
-        statement = statement.offset(skip).limit(limit)
-        return session.exec(statement).all()
+        return {
+            "id": quote.id,
+            "quote_number": quote.quote_number,
+            "status": quote.status,
+            "created_at": quote.created_at.isoformat() if quote.created_at else "",
+            "valid_until": quote.valid_until,
+            "subtotal": float(quote.subtotal or 0),
+            "discount": float(quote.discount or 0),
+            "discount_percent": float(quote.discount_percent or 0),
+            "total": float(quote.total or 0),
+            "payment_terms": quote.payment_terms or "",
+            "delivery_terms": quote.delivery_terms or "",
+            "notes": quote.notes or "",
+            "items": items_list or [],
+            "customer": {
+                "name": customer.name if customer else "N/A",
+                "document": customer.document if customer else "N/A",
+                "email": customer.email if customer else "N/A",
+                "phone": customer.phone if customer else "N/A",
+                "address_line": customer.address_line if customer else "N/A",
+                "number": customer.number if customer else "N/A",
+                "city": customer.city if customer else "N/A",
+                "state": customer.state if customer else "N/A",
+            }
+        }
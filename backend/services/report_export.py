@@ -0,0 +1,201 @@
+"""
+Report Export
+Exportação dos relatórios em CSV ou XLSX sem montar o resultado em memória.
+
+- As linhas vêm do banco em lotes (yield_per; no Postgres, cursor do lado
+  do servidor) e vão direto para o arquivo
+- CSV: gerado lote a lote na própria resposta (StreamingResponse)
+- XLSX: openpyxl em modo write_only (memória constante) gravando em
+  arquivo temporário, enviado quando termina
+- Acima de EXPORT_BACKGROUND_ROWS linhas a exportação vira uma tarefa
+  report_export (job_runner.py, services/job_handlers.py): a rota responde
+  202 e o arquivo sai como artefato da tarefa
+
+Variáveis de ambiente:
+    EXPORT_BACKGROUND_ROWS   linhas a partir das quais roda em segundo plano (padrão 20000)
+    EXPORT_BATCH_SIZE        linhas por lote lido do banco (padrão 2000)
+"""
+
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import Date, Integer, case
+from sqlmodel import Session, select, func
+import csv
+import io
+import os
+
+from database import engine
+from models import Customer, Quote
+from services.quote_projection import items_count
+
+EXPORT_BACKGROUND_ROWS = int(os.getenv("EXPORT_BACKGROUND_ROWS", "20000"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Relatório -> (nome do arquivo, cabeçalho)
+REPORTS = {
+    "sales-by-period": ("vendas_por_periodo", ["Data", "Orçamentos", "Total", "Aprovados", "Faturados"]),
+    "top-customers": ("top_clientes", ["ID Cliente", "Cliente", "Documento", "Total", "Orçamentos", "Ticket Médio"]),
+    "quotes": ("orcamentos", [
+        "Número", "Criado em", "Status", "ID Cliente", "Cliente", "Documento", "Itens",
+        "Subtotal", "Desconto", "Total", "Aprovado em", "Faturado em",
+    ]),
+}
+
+
+class ReportExport:
+    """Consultas e gravação das exportações (ver docstring do módulo)"""
+
+    @staticmethod
+    def statement(
+        report: str,
+        start: datetime,
+        end: datetime,
+        status_filter: Optional[str] = None,
+        salesperson_id: Optional[int] = None
+    ):
+        """SELECT das linhas do relatório, já na ordem das colunas de REPORTS"""
+        period = (Quote.created_at >= start, Quote.created_at <= end)
+
+        if report == "sales-by-period":
+            day = func.date(Quote.created_at, type_=Date)
+            statement = (
+                select(
+                    day,
+                    func.count(Quote.id),
+                    func.coalesce(func.sum(Quote.total), 0.0),
+                    func.sum(case((Quote.status == "aprovado", 1), else_=0), type_=Integer),
+                    func.sum(case((Quote.status == "faturado", 1), else_=0), type_=Integer),
+                )
+                .where(*period, Quote.status.in_(["aprovado", "faturado"]))
+                .group_by(day)
+                .order_by(day)
+            )
+        elif report == "top-customers":
+            total = func.coalesce(func.sum(Quote.total), 0.0)
+            statement = (
+                select(Quote.customer_id, Customer.name, Customer.document, total, func.count(Quote.id))
+                .outerjoin(Customer, Customer.id == Quote.customer_id)
+                .where(*period)
+                .group_by(Quote.customer_id, Customer.name, Customer.document)
+                .order_by(total.desc())
+            )
+        elif report == "quotes":
+            statement = (
+                select(
+                    Quote.quote_number, Quote.created_at, Quote.status, Quote.customer_id,
+                    Customer.name, Customer.document, items_count(Quote.items),
+                    Quote.subtotal, Quote.discount, Quote.total, Quote.approved_at, Quote.invoiced_at,
+                )
+                .outerjoin(Customer, Customer.id == Quote.customer_id)
+                .where(*period)
+                .order_by(Quote.created_at, Quote.id)
+            )
+            if status_filter:
+                statement = statement.where(Quote.status == status_filter)
+        else:
+            raise HTTPException(status_code=404, detail=f"Relatório '{report}' não pode ser exportado")
+
+        if salesperson_id:
+            if report == "sales-by-period":
+                statement = statement.join(Customer, Customer.id == Quote.customer_id)
+            statement = statement.where(Customer.salesperson_id == salesperson_id)
+        return statement
+
+    @staticmethod
+    def count(session: Session, statement) -> int:
+        return session.exec(select(func.count()).select_from(statement.order_by(None).subquery())).one()
+
+    @staticmethod
+    def filename(report: str, fmt: str) -> str:
+        return f"{REPORTS[report][0]}_{datetime.utcnow().strftime('%Y%m%d-%H%M')}.{fmt}"
+
+    # --- Linhas ---
+
+    @staticmethod
+    def rows(report: str, statement, progress: Optional[Callable[[int], None]] = None) -> Iterator[List]:
+        """
+        Linhas formatadas, lidas em lotes (sessão própria: roda fora da
+        requisição). `progress(n)` é chamado a cada linha (tarefas).
+        """
+        format_row = _ROW_FORMATTERS[report]
+        with Session(engine) as session:
+            result = session.exec(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            for index, row in enumerate(result, 1):
+                yield format_row(row)
+                if progress:
+                    progress(index)
+
+    @staticmethod
+    def iter_csv(report: str, statement, progress: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+        """CSV em pedaços de EXPORT_BATCH_SIZE linhas (BOM para o Excel reconhecer UTF-8)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(REPORTS[report][1])
+        pending = 0
+        yield b"\xef\xbb\xbf"
+        for row in ReportExport.rows(report, statement, progress):
+            writer.writerow(["" if v is None else v for v in row])
+            pending += 1
+            if pending >= EXPORT_BATCH_SIZE:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        yield buffer.getvalue().encode()
+
+    @staticmethod
+    def write(report: str, fmt: str, statement, path: str,
+              progress: Optional[Callable[[int], None]] = None) -> None:
+        """Grava a exportação completa em `path`"""
+        if fmt == "csv":
+            with open(path, "wb") as f:
+                for chunk in ReportExport.iter_csv(report, statement, progress):
+                    f.write(chunk)
+            return
+
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(REPORTS[report][0][:31])
+        header = []
+        for title in REPORTS[report][1]:
+            cell = WriteOnlyCell(sheet, value=title)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+        for row in ReportExport.rows(report, statement, progress):
+            sheet.append(row)
+        workbook.save(path)
+
+
+def _money(value) -> float:
+    return round(float(value or 0), 2)
+
+
+def _day(value) -> Optional[date]:
+    # SQLite devolve a data como texto
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _format_top_customer(row) -> List:
+    customer_id, name, document, total, count = row
+    return [customer_id, name or "Desconhecido", document, _money(total), count,
+            _money(float(total or 0) / count if count else 0)]
+
+
+_ROW_FORMATTERS: Dict[str, Callable] = {
+    "sales-by-period": lambda row: [_day(row[0]), row[1], _money(row[2]), row[3] or 0, row[4] or 0],
+    "top-customers": _format_top_customer,
+    "quotes": lambda row: [
+        row[0], row[1], row[2], row[3], row[4] or "Desconhecido", row[5], row[6],
+        _money(row[7]), _money(row[8]), _money(row[9]), row[10], row[11],
+    ],
+}
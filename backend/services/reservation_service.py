@@ -0,0 +1,267 @@
+"""
+Reservation Service Layer
+Reserva de estoque de produtos para locação.
+
+Cada orçamento aprovado reserva as unidades dos seus produtos no período
+de locação. A disponibilidade de um produto em um período é o estoque total
+menos o pico de unidades reservadas simultaneamente dentro do período.
+
+Um orçamento segura reservas enquanto está em RESERVED_STATUSES (aprovado
+ou faturado): entrar nesse conjunto reserva, sair dele libera.
+
+Concorrência: antes de conferir a disponibilidade, as linhas dos produtos
+envolvidos são travadas com SELECT ... FOR UPDATE (sempre em ordem de ID,
+para evitar deadlock). Duas aprovações concorrentes do mesmo produto ficam
+serializadas e a segunda enxerga as reservas da primeira.
+"""
+
+from typing import Optional, Dict, List, Iterable, Tuple
+from sqlmodel import Session, select
+from fastapi import HTTPException
+from datetime import datetime, timedelta
+
+from models import Quote, Product, StockReservation
+from services.availability_service import invalidate_on_commit
+from services.quote_projection import QuoteProjection
+
+
+# Duração padrão da reserva quando o orçamento não informa o fim da locação
+DEFAULT_RENTAL_DAYS = 1
+
+# Status em que o orçamento mantém o estoque reservado
+RESERVED_STATUSES = ("aprovado", "faturado")
+
+
+class ReservationService:
+    """Serviço de reservas de estoque"""
+
+    @staticmethod
+    def get_rental_period(quote: Quote) -> Tuple[datetime, datetime]:
+        """
+        Retorna o período de locação do orçamento.
+
+        Sem datas explícitas, a locação começa na aprovação (ou agora)
+        e dura DEFAULT_RENTAL_DAYS.
+        """
+        start = quote.rental_start or quote.approved_at or datetime.now()
+        end = quote.rental_end or start + timedelta(days=DEFAULT_RENTAL_DAYS)
+        return start, end
+
+    @staticmethod
+    def get_product_quantities(quote: Quote) -> Dict[int, int]:
+        """
+        Soma as quantidades dos itens de produto do orçamento por produto.
+        """
+        items = QuoteProjection.items(quote)
+        quantities: Dict[int, int] = {}
+        for item in items:
+            if item.get('type') == 'product':
+                product_id = item.get('item_id')
+                quantities[product_id] = quantities.get(product_id, 0) + item.get('quantity', 1)
+        return quantities
+
+    @staticmethod
+    def lock_products(session: Session, product_ids: Iterable[int]) -> Dict[int, Product]:
+        """
+        Trava as linhas dos produtos (SELECT ... FOR UPDATE) até o fim da transação.
+
+        Returns:
+            Dict id -> Product
+        """
+        ids = sorted(set(product_ids))
+        if not ids:
+            return {}
+        statement = (
+            select(Product)
+            .where(Product.id.in_(ids))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        return {p.id: p for p in session.exec(statement).all()}
+
+    @staticmethod
+    def get_overlapping_reservations(
+        session: Session,
+        product_ids: Iterable[int],
+        start: datetime,
+        end: datetime
+    ) -> List[StockReservation]:
+        """
+        Reservas ativas dos produtos que cruzam o período [start, end).
+        Usa o índice (product_id, start_date, end_date).
+        """
+        ids = list(set(product_ids))
+        if not ids:
+            return []
+        statement = select(StockReservation).where(
+            StockReservation.product_id.in_(ids),
+            StockReservation.status == "ativa",
+            StockReservation.start_date < end,
+            StockReservation.end_date > start
+        )
+        return list(session.exec(statement).all())
+
+    @staticmethod
+    def peak_reserved(
+        intervals: Iterable[Tuple[datetime, datetime, int]],
+        start: datetime,
+        end: datetime
+    ) -> int:
+        """
+        Maior quantidade reservada simultaneamente dentro de [start, end).
+
+        Varredura (sweep line) sobre os eventos de início/fim das reservas,
+        recortadas ao período consultado. Fins são processados antes de
+        inícios no mesmo instante, pois os intervalos são semiabertos.
+        """
+        events = []
+        for interval_start, interval_end, quantity in intervals:
+            clipped_start = max(interval_start, start)
+            clipped_end = min(interval_end, end)
+            if clipped_start < clipped_end:
+                events.append((clipped_start, 1, quantity))
+                events.append((clipped_end, 0, -quantity))
+
+        events.sort()
+        current = 0
+        peak = 0
+        for _, _, delta in events:
+            current += delta
+            peak = max(peak, current)
+        return peak
+
+    @staticmethod
+    def get_available_quantity(
+        session: Session,
+        product: Product,
+        start: datetime,
+        end: datetime,
+        exclude_quote_id: Optional[int] = None
+    ) -> int:
+        """
+        Quantas unidades do produto estão livres durante todo o período [start, end).
+        """
+        if product.status != "disponivel":
+            return 0
+        reservations = ReservationService.get_overlapping_reservations(
+            session, [product.id], start, end
+        )
+        intervals = [
+            (r.start_date, r.end_date, r.quantity)
+            for r in reservations
+            if r.quote_id != exclude_quote_id
+        ]
+        peak = ReservationService.peak_reserved(intervals, start, end)
+        return max(0, product.quantity - peak)
+
+    @staticmethod
+    def reserve_quote(session: Session, quote: Quote) -> List[StockReservation]:
+        """
+        Cria as reservas de estoque de um orçamento que entrou em RESERVED_STATUSES.
+
+        Não faz commit: as reservas entram na mesma transação da mudança
+        de status, que mantém as linhas dos produtos travadas até o commit.
+        Se o orçamento já tem reservas ativas, nada é feito.
+
+        Raises:
+            HTTPException: Se algum produto não tiver unidades livres no período
+        """
+        existing = session.exec(
+            select(StockReservation).where(
+                StockReservation.quote_id == quote.id,
+                StockReservation.status == "ativa"
+            )
+        ).first()
+        if existing:
+            return []
+
+        quantities = ReservationService.get_product_quantities(quote)
+        if not quantities:
+            return []
+
+        start, end = ReservationService.get_rental_period(quote)
+        if end <= start:
+            raise HTTPException(
+                status_code=400,
+                detail="Período de locação inválido: o fim deve ser posterior ao início"
+            )
+
+        # 1. Travar produtos
+        products = ReservationService.lock_products(session, quantities.keys())
+
+        # 2. Conferir disponibilidade no período com as reservas já existentes
+        reservations = ReservationService.get_overlapping_reservations(
+            session, quantities.keys(), start, end
+        )
+        intervals_by_product: Dict[int, List[Tuple[datetime, datetime, int]]] = {}
+        for r in reservations:
+            intervals_by_product.setdefault(r.product_id, []).append(
+                (r.start_date, r.end_date, r.quantity)
+            )
+
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if not product:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Produto ID {product_id} não encontrado"
+                )
+            peak = ReservationService.peak_reserved(
+                intervals_by_product.get(product_id, []), start, end
+            )
+            available = product.quantity - peak
+            if available < quantity:
+                raise HTTPException(
+                    status_code=409,
+                    detail=(
+                        f"Estoque insuficiente para '{product.name}' no período. "
+                        f"Disponível: {max(0, available)}"
+                    )
+                )
+
+        # 3. Criar reservas
+        created = []
+        for product_id, quantity in quantities.items():
+            reservation = StockReservation(
+                product_id=product_id,
+                quote_id=quote.id,
+                quantity=quantity,
+                start_date=start,
+                end_date=end
+            )
+            session.add(reservation)
+            created.append(reservation)
+        invalidate_on_commit(session, quantities.keys())
+        return created
+
+    @staticmethod
+    def release_quote(session: Session, quote: Quote) -> List[StockReservation]:
+        """
+        Libera as reservas ativas de um orçamento que saiu de RESERVED_STATUSES.
+        Não faz commit.
+        """
+        reservations = session.exec(
+            select(StockReservation).where(
+                StockReservation.quote_id == quote.id,
+                StockReservation.status == "ativa"
+            )
+        ).all()
+        for reservation in reservations:
+            reservation.status = "liberada"
+            reservation.updated_at = datetime.utcnow()
+            session.add(reservation)
+        invalidate_on_commit(session, [r.product_id for r in reservations])
+        return list(reservations)
+
+    @staticmethod
+    def delete_quote_reservations(session: Session, quote: Quote) -> None:
+        """
+        Apaga todas as reservas do orçamento (ativas e liberadas) antes de
+        excluí-lo. Não faz commit.
+        """
+        reservations = session.exec(
+            select(StockReservation).where(StockReservation.quote_id == quote.id)
+        ).all()
+        for reservation in reservations:
+            session.delete(reservation)
+        invalidate_on_commit(session, [r.product_id for r in reservations if r.status == "ativa"])
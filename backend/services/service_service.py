@@ -8,8 +8,9 @@ from typing import Optional, Dict, List
 from sqlmodel import Session, select
 from fastapi import HTTPException
 
-from models import Service, AuditLog, User
+from models import Service, User
 from utils import create_audit_log
+from services.catalog_cache import catalog_cache, bump_catalog_version
 
 
 class ServiceService:
@@ -111,6 +112,7 @@ class ServiceService:
             changes={'name': db_service.name, 'status': status}
         )
         
+        bump_catalog_version(session, "service")
         session.commit()
         return db_service
     
@@ -161,8 +163,6 @@ class ServiceService:
         
         # 4. Salvar
         session.add(service)
-        session.commit()
-        session.refresh(service)
         
         # 5. Auditar
         create_audit_log(
@@ -174,6 +174,10 @@ class ServiceService:
             changes=changes
         )
         
+        bump_catalog_version(session, "service")
+        session.commit()
+        session.refresh(service)
+        
         return service
     
     @staticmethod
@@ -224,8 +228,6 @@ class ServiceService:
         old_status = service.status
         service.status = new_status
         session.add(service)
-        session.commit()
-        session.refresh(service)
         
         # 4. Auditar
         create_audit_log(
@@ -237,6 +239,10 @@ class ServiceService:
             changes={'status': {'old': old_status, 'new': new_status}}
         )
         
+        bump_catalog_version(session, "service")
+        session.commit()
+        session.refresh(service)
+        
         return service
     
     @staticmethod
@@ -269,7 +275,6 @@ class ServiceService:
         old_status = service.status
         service.status = "inativo"
         session.add(service)
-        session.commit()
         
         # 3. Auditar
         create_audit_log(
@@ -280,6 +285,9 @@ class ServiceService:
             user_id=current_user.id,
             changes={'status': {'old': old_status, 'new': 'inativo'}}
         )
+        
+        bump_catalog_version(session, "service")
+        session.commit()
     
     @staticmethod
     def get_services_for_user(
@@ -304,18 +312,13 @@ class ServiceService:
         Returns:
             Lista de serviços
         """
-        statement = select(Service).order_by(Service.created_at.desc())
-        
-        # Filtrar por status se especificado
-        if status_filter:
-            statement = statement.where(Service.status == status_filter)
-        
-        # Filtrar por categoria se especificado
-        if category_filter:
-            statement = statement.where(Service.category == category_filter)
-        
-        statement = statement.offset(skip).limit(limit)
-        return session.exec(statement).all()
+        # Filtros e paginação sobre o cache do catálogo (mais recentes primeiro)
+        return catalog_cache.services.list(
+            status=status_filter or None,
+            category=category_filter or None,
+            skip=skip,
+            limit=limit
+        )
     
     @staticmethod
     def get_service_by_id(
@@ -334,4 +337,4 @@ class ServiceService:
         Returns:
             Serviço ou None se não encontrado
         """
-        return session.get(Service, service_id)
+        return catalog_cache.services.get(service_id)
@@ -0,0 +1,432 @@
+"""
+Typeahead Service
+Autocompletar de clientes, produtos e serviços na montagem de orçamentos.
+
+Cada entidade tem um índice de prefixos em memória: listas ordenadas de
+(chave normalizada, id), consultadas com bisect. A chave é o nome sem
+acentos e em minúsculas a partir de cada palavra ("joao da silva",
+"da silva", "silva"), então "silva" também encontra "João da Silva".
+
+- Construído no startup (lifespan)
+- Atualizado após cada commit: um listener de flush marca os registros
+  alterados na sessão e, depois do commit, eles são recarregados do banco
+  (caminhos em lote com Core chamam track_on_commit)
+- Reconstruído em segundo plano a cada TYPEAHEAD_REBUILD_INTERVAL segundos,
+  para refletir escritas feitas por outros workers
+"""
+
+from typing import Any, Optional, Dict, List, Iterable, Iterator, Tuple, Set, Callable
+from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+import bisect
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from database import engine
+from models import Customer, Product, Service, User, UserSupervisor
+
+logger = logging.getLogger(__name__)
+
+REBUILD_INTERVAL = float(os.getenv("TYPEAHEAD_REBUILD_INTERVAL", "300"))
+
+DEFAULT_TYPEAHEAD_LIMIT = 10
+MAX_TYPEAHEAD_LIMIT = 50
+
+# Palavras do nome que viram início de chave (limita a memória)
+MAX_KEY_WORDS = 6
+# Chaves examinadas por consulta com filtro (o lock do índice fica preso na varredura)
+SCAN_LIMIT = 2000
+
+_PENDING_KEY = "typeahead_pending"
+
+
+def normalize(text: Optional[str]) -> str:
+    """'João  da Silva-ME' -> 'joao da silva me'"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def _customer_doc(row) -> Optional[Dict]:
+    if row.status == "excluido":
+        return None
+    return {
+        "id": row.id,
+        "name": row.name,
+        "fantasy_name": row.fantasy_name,
+        "document": row.document,
+        "status": row.status,
+        "salesperson_id": row.salesperson_id,
+    }
+
+
+def _product_doc(row) -> Optional[Dict]:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "category": row.category,
+        "status": row.status,
+        "price_daily": row.price_daily,
+        "quantity": row.quantity,
+    }
+
+
+def _service_doc(row) -> Optional[Dict]:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "category": row.category,
+        "status": row.status,
+        "price_base": row.price_base,
+    }
+
+
+# entidade -> (modelo, colunas carregadas, campos pesquisáveis, montagem do item)
+ENTITIES: Dict[str, Tuple] = {
+    "customer": (
+        Customer,
+        (Customer.id, Customer.name, Customer.fantasy_name, Customer.document,
+         Customer.status, Customer.salesperson_id),
+        ("name", "fantasy_name", "document"),
+        _customer_doc,
+    ),
+    "product": (
+        Product,
+        (Product.id, Product.name, Product.category, Product.status,
+         Product.price_daily, Product.quantity),
+        ("name",),
+        _product_doc,
+    ),
+    "service": (
+        Service,
+        (Service.id, Service.name, Service.category, Service.status, Service.price_base),
+        ("name",),
+        _service_doc,
+    ),
+}
+
+_MODEL_ENTITIES = {spec[0]: name for name, spec in ENTITIES.items()}
+
+# entidade -> campo de partição (visibilidade resolvida pela escolha das listas)
+PARTITIONS = {"customer": "salesperson_id"}
+
+
+class PrefixIndex:
+    """
+    Duas listas ordenadas de (chave, id):
+    - primária: campos inteiros ("joao da silva")
+    - secundária: a partir da 2ª palavra ("da silva", "silva")
+    A consulta percorre a primária e completa com a secundária, parando ao
+    atingir o limite, então o custo não depende do tamanho do índice.
+
+    Com `partition` (ex.: salesperson_id dos clientes), cada valor do campo
+    também tem as suas duas listas. A consulta restrita a alguns valores
+    percorre só as listas deles (intercaladas em ordem): itens que o usuário
+    não vê nem entram na varredura. Os demais filtros (allow, outras
+    palavras da consulta) examinam no máximo SCAN_LIMIT chaves.
+    """
+
+    def __init__(self, fields: Iterable[str], partition: Optional[str] = None):
+        self.fields = tuple(fields)
+        self.partition = partition
+        self._primary: List[Tuple[str, int]] = []
+        self._secondary: List[Tuple[str, int]] = []
+        self._parts: Dict[Any, Tuple[List, List]] = {}
+        self._docs: Dict[int, Dict] = {}
+        self._doc_keys: Dict[int, Tuple[List, List]] = {}
+        self._doc_words: Dict[int, frozenset] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _keys_for(self, doc: Dict) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]], frozenset]:
+        primary, secondary, all_words = set(), set(), set()
+        for field in self.fields:
+            words = normalize(doc.get(field)).split()
+            if not words:
+                continue
+            all_words.update(words)
+            primary.add((" ".join(words), doc["id"]))
+            for start in range(1, min(len(words), MAX_KEY_WORDS)):
+                secondary.add((" ".join(words[start:]), doc["id"]))
+        return sorted(primary), sorted(secondary - primary), frozenset(all_words)
+
+    def _lists_for(self, doc: Dict) -> List[Tuple[List, List]]:
+        """Listas (primária, secundária) que recebem as chaves do item"""
+        lists = [(self._primary, self._secondary)]
+        if self.partition:
+            lists.append(self._parts.setdefault(doc.get(self.partition), ([], [])))
+        return lists
+
+    def load(self, docs: Iterable[Dict]) -> None:
+        """Carga completa: monta tudo e ordena uma única vez"""
+        primary: List[Tuple[str, int]] = []
+        secondary: List[Tuple[str, int]] = []
+        parts: Dict[Any, Tuple[List, List]] = {}
+        docs_by_id: Dict[int, Dict] = {}
+        doc_keys: Dict[int, Tuple[List, List]] = {}
+        doc_words: Dict[int, frozenset] = {}
+        for doc in docs:
+            doc_primary, doc_secondary, words = self._keys_for(doc)
+            docs_by_id[doc["id"]] = doc
+            doc_keys[doc["id"]] = (doc_primary, doc_secondary)
+            doc_words[doc["id"]] = words
+            primary.extend(doc_primary)
+            secondary.extend(doc_secondary)
+            if self.partition:
+                part_primary, part_secondary = parts.setdefault(doc.get(self.partition), ([], []))
+                part_primary.extend(doc_primary)
+                part_secondary.extend(doc_secondary)
+        for keys in (primary, secondary, *(k for pair in parts.values() for k in pair)):
+            keys.sort()
+        with self._lock:
+            self._primary, self._secondary, self._parts = primary, secondary, parts
+            self._docs, self._doc_keys, self._doc_words = docs_by_id, doc_keys, doc_words
+
+    def upsert(self, doc: Dict) -> None:
+        with self._lock:
+            self.remove(doc["id"])
+            doc_primary, doc_secondary, words = self._keys_for(doc)
+            for primary, secondary in self._lists_for(doc):
+                for key in doc_primary:
+                    bisect.insort(primary, key)
+                for key in doc_secondary:
+                    bisect.insort(secondary, key)
+            self._docs[doc["id"]] = doc
+            self._doc_keys[doc["id"]] = (doc_primary, doc_secondary)
+            self._doc_words[doc["id"]] = words
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            doc_primary, doc_secondary = self._doc_keys.pop(doc_id, ([], []))
+            for lists in self._lists_for(doc) if doc else []:
+                for keys, doc_key_list in zip(lists, (doc_primary, doc_secondary)):
+                    for key in doc_key_list:
+                        position = bisect.bisect_left(keys, key)
+                        if position < len(keys) and keys[position] == key:
+                            del keys[position]
+            self._doc_words.pop(doc_id, None)
+
+    def search(
+        self,
+        query: str,
+        limit: int = DEFAULT_TYPEAHEAD_LIMIT,
+        allow: Optional[Callable[[Dict], bool]] = None,
+        partitions: Optional[Iterable[Any]] = None
+    ) -> List[Dict]:
+        """
+        Itens com uma palavra começando pela consulta: primeiro os que
+        começam pela consulta, depois os que a têm no meio do nome.
+
+        Com várias palavras ("joao sil"), a primeira localiza a faixa no
+        índice e as demais precisam ser prefixo de alguma palavra do item.
+        `partitions` restringe aos itens com esses valores do campo de
+        partição (None = todos).
+        """
+        return self.scan(query, limit, allow, partitions)[0]
+
+    def scan(
+        self,
+        query: str,
+        limit: int = DEFAULT_TYPEAHEAD_LIMIT,
+        allow: Optional[Callable[[Dict], bool]] = None,
+        partitions: Optional[Iterable[Any]] = None
+    ) -> Tuple[List[Dict], bool]:
+        """Como search(); o segundo valor indica que a varredura parou em SCAN_LIMIT"""
+        tokens = normalize(query).split()
+        if not tokens:
+            return [], False
+        first, rest = tokens[0], tokens[1:]
+        full_query = " ".join(tokens)
+
+        results: List[Dict] = []
+        seen: Set[int] = set()
+        scanned = 0
+        with self._lock:
+            if partitions is None:
+                sources = [(self._primary, self._secondary)]
+            else:
+                sources = [self._parts[value] for value in set(partitions) if value in self._parts]
+            passes = [(0, full_query), (1, first)]
+            if rest:
+                passes.append((0, first))  # Com uma palavra, igual à primeira
+            for which, prefix in passes:
+                for key, doc_id in _merged_from([pair[which] for pair in sources], prefix):
+                    if not key.startswith(prefix):
+                        break
+                    if scanned == SCAN_LIMIT:
+                        return results, True
+                    scanned += 1
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    doc = self._docs[doc_id]
+                    if allow and not allow(doc):
+                        continue
+                    if rest and not self._matches_all(doc_id, rest):
+                        continue
+                    results.append(doc)
+                    if len(results) >= limit:
+                        return results, False
+        return results, False
+
+    def _matches_all(self, doc_id: int, tokens: List[str]) -> bool:
+        words = self._doc_words[doc_id]
+        return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+def _merged_from(lists: List[List[Tuple[str, int]]], prefix: str) -> Iterator[Tuple[str, int]]:
+    """Chaves a partir de `prefix`, em ordem, intercalando várias listas ordenadas"""
+    iterators = [
+        map(keys.__getitem__, range(bisect.bisect_left(keys, (prefix,)), len(keys)))
+        for keys in lists
+    ]
+    if len(iterators) == 1:
+        return iterators[0]
+    return heapq.merge(*iterators)
+
+
+class TypeaheadIndex:
+    """Índices de prefixo de todas as entidades"""
+
+    def __init__(self, rebuild_interval: float = REBUILD_INTERVAL):
+        self.rebuild_interval = rebuild_interval
+        self.indexes = {name: PrefixIndex(spec[2], PARTITIONS.get(name)) for name, spec in ENTITIES.items()}
+        self.built_at: Optional[float] = None
+        self._rebuilding = threading.Lock()
+
+    def build(self, session: Session) -> Dict[str, int]:
+        """Carrega todas as entidades do banco (startup)"""
+        counts = {}
+        for name, (_, columns, _, to_doc) in ENTITIES.items():
+            rows = session.exec(select(*columns).execution_options(yield_per=5000))
+            self.indexes[name].load(doc for doc in map(to_doc, rows) if doc)
+            counts[name] = len(self.indexes[name])
+        self.built_at = time.monotonic()
+        return counts
+
+    def refresh(self, session: Session, entity: str, ids: Iterable[int]) -> None:
+        """Recarrega do banco os registros informados"""
+        ids = list(set(ids))
+        if not ids:
+            return
+        model, columns, _, to_doc = ENTITIES[entity]
+        index = self.indexes[entity]
+        rows = {row.id: row for row in session.exec(select(*columns).where(model.id.in_(ids)))}
+        for record_id in ids:
+            doc = to_doc(rows[record_id]) if record_id in rows else None
+            if doc:
+                index.upsert(doc)
+            else:
+                index.remove(record_id)
+
+    def search(
+        self,
+        entity: str,
+        query: str,
+        limit: int = DEFAULT_TYPEAHEAD_LIMIT,
+        allow: Optional[Callable[[Dict], bool]] = None,
+        partitions: Optional[Iterable[Any]] = None
+    ) -> List[Dict]:
+        self._maybe_rebuild()
+        return self.indexes[entity].search(query, limit, allow, partitions)
+
+    def search_customers(self, session: Session, user: User, query: str,
+                         limit: int = DEFAULT_TYPEAHEAD_LIMIT) -> List[Dict]:
+        """
+        Clientes visíveis para o usuário. Se a varredura parar em SCAN_LIMIT
+        sem completar o limite (ex.: muitas chaves com a primeira palavra e
+        poucas com as demais), a busca vai para o banco (CustomerSearchService).
+        """
+        self._maybe_rebuild()
+        results, truncated = self.indexes["customer"].scan(
+            query, limit, partitions=customer_partitions(session, user)
+        )
+        if not truncated:
+            return results
+        from services.customer_search import CustomerSearchService
+        return [_customer_doc(c) for c in CustomerSearchService.search(session, user, query, limit)]
+
+    def _maybe_rebuild(self) -> None:
+        if self.built_at is None or time.monotonic() - self.built_at < self.rebuild_interval:
+            return
+        if not self._rebuilding.acquire(blocking=False):
+            return
+        self.built_at = time.monotonic()  # Evita disparar outra reconstrução
+        threading.Thread(target=self._rebuild, name="typeahead-rebuild", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        try:
+            with Session(engine) as session:
+                self.build(session)
+        except Exception as e:
+            logger.error(f"Falha ao reconstruir o índice de typeahead: {e}")
+        finally:
+            self._rebuilding.release()
+
+
+typeahead_index = TypeaheadIndex()
+
+
+def customer_partitions(session: Session, user: User) -> Optional[Set[int]]:
+    """
+    Mesmo escopo de CustomerService.visibility_filter, como vendedores
+    (partições do índice de clientes) que o usuário vê. None = todos.
+    """
+    role_slug = user.role.slug
+    if role_slug == "admin":
+        return None
+    if role_slug == "manager":
+        if user.role.permissions.get("customer_view_all", True):
+            return None
+        allowed = set(session.exec(
+            select(UserSupervisor.user_id).where(UserSupervisor.supervisor_id == user.id)
+        ).all())
+        allowed.add(user.id)
+        return allowed
+    return {user.id}
+
+
+def track_on_commit(session: Session, entity: str, ids: Iterable[int]) -> None:
+    """
+    Agenda a atualização do índice desses registros para depois do commit.
+    Usado nos caminhos que gravam com Core (INSERT/UPDATE em lote), que não
+    passam pelo listener de flush.
+    """
+    session.info.setdefault(_PENDING_KEY, {}).setdefault(entity, set()).update(ids)
+
+
+@event.listens_for(SASession, "after_flush")
+def _track_flushed(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        entity = _MODEL_ENTITIES.get(type(obj))
+        if entity and obj.id is not None:
+            track_on_commit(session, entity, [obj.id])
+
+
+@event.listens_for(SASession, "after_commit")
+def _refresh_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or typeahead_index.built_at is None:
+        return
+    try:
+        with Session(engine) as refresh_session:
+            for entity, ids in pending.items():
+                typeahead_index.refresh(refresh_session, entity, ids)
+    except Exception as e:
+        logger.error(f"Falha ao atualizar o índice de typeahead: {e}")
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
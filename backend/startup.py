@@ -0,0 +1,394 @@
+"""
+Inicialização do app (lifespan do main.py).
+
+A cada subida de processo:
+- espera o banco com backoff exponencial (asyncio.sleep: não trava o loop)
+- schema: se o banco está na revisão head do Alembic e todas as tabelas dos
+  modelos existem, pula o create_all; senão cria só o que falta (e avisa
+  quando a revisão está atrasada: rode `alembic upgrade head`)
+- cargos padrão: compara um checksum das permissões do código com o do
+  banco e só grava quando difere
+- as escritas (create_all e cargos) rodam com lock consultivo no Postgres,
+  então vários workers subindo juntos não disputam as mesmas linhas
+- mede cada etapa; o resumo vai para o log e para /metrics
+  (app_startup_seconds)
+
+A fase do processo (process_state) alimenta /health/ready: o worker só
+recebe tráfego depois de "ready" e sai do balanceamento ao entrar em
+"draining" (desligamento gracioso). O "draining" começa no SIGTERM
+(install_drain_handler), não no desligamento do lifespan: quando o lifespan
+roda, o uvicorn já parou de aceitar conexões e fechou os WebSockets. O
+worker continua atendendo por DRAIN_DELAY segundos, tempo para o
+balanceador ver o 503, e só então o sinal segue para o uvicorn.
+
+Variáveis de ambiente:
+    STARTUP_MAX_RETRIES    tentativas de conexão (padrão 10)
+    STARTUP_RETRY_BASE     primeira espera em segundos (padrão 0.5, dobra a cada falha)
+    STARTUP_RETRY_MAX      espera máxima entre tentativas (padrão 10)
+    STARTUP_SCHEMA_CHECK   1/0 (padrão 1). 0 = sempre roda create_all
+    DRAIN_DELAY            segundos entre o SIGTERM e o fim do atendimento (padrão 5;
+                           deve ficar abaixo do GRACEFUL_TIMEOUT do gunicorn)
+"""
+
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, select
+import asyncio
+import hashlib
+import json
+import os
+import signal
+import threading
+import time
+
+from database import engine
+from models import Role
+from instrumentation import metrics
+from services.leaderboard import leaderboard
+from services.typeahead_service import typeahead_index
+
+STARTUP_MAX_RETRIES = int(os.getenv("STARTUP_MAX_RETRIES", "10"))
+STARTUP_RETRY_BASE = float(os.getenv("STARTUP_RETRY_BASE", "0.5"))
+STARTUP_RETRY_MAX = float(os.getenv("STARTUP_RETRY_MAX", "10"))
+STARTUP_SCHEMA_CHECK = os.getenv("STARTUP_SCHEMA_CHECK", "1") == "1"
+DRAIN_DELAY = float(os.getenv("DRAIN_DELAY", "5"))
+
+# Chave do pg_advisory_xact_lock usado nas escritas de inicialização
+STARTUP_LOCK_KEY = 41_0001
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+# Cargos padrão (nome, descrição e permissões são gravados quando diferem do banco)
+DEFAULT_ROLES = [
+    {
+        "name": "Super Admin", 
+        "slug": "admin", 
+        "description": "Acesso total", 
+        "permissions": {
+            "all": True,
+            # Clientes
+            "customer_change_status": True, 
+            "customer_require_approval": False,
+            "can_edit_own_customers": True,
+            "can_edit_others_customers": True,
+            "can_delete_customers": True,
+            # Produtos
+            "can_create_products": True,
+            "can_edit_products": True,
+            "can_delete_products": True,
+            "can_change_product_status": True,
+            # Serviços
+            "can_create_services": True,
+            "can_edit_services": True,
+            "can_delete_services": True,
+            "can_change_service_status": True,
+            "can_edit_service_basic": True,
+            # Orçamentos
+            "can_create_quotes": True,
+            "can_edit_quotes": True,
+            "can_delete_quotes": True,
+            "can_change_quote_status": True,
+            "can_view_all_quotes": True,
+        }
+    },
+    {
+        "name": "Gerente", 
+        "slug": "manager", 
+        "description": "Gestão", 
+        "permissions": {
+            # Clientes
+            "customer_change_status": True, 
+            "customer_require_approval": False,
+            "can_edit_own_customers": True,
+            "can_edit_others_customers": True,
+            "can_delete_customers": True,
+            # Produtos
+            "can_create_products": True,
+            "can_edit_products": True,
+            "can_delete_products": True,
+            "can_change_product_status": True,
+            # Serviços
+            "can_create_services": True,
+            "can_edit_services": True,
+            "can_delete_services": True,
+            "can_change_service_status": True,
+            "can_edit_service_basic": True,
+            # Orçamentos
+            "can_create_quotes": True,
+            "can_edit_quotes": True,
+            "can_delete_quotes": True,
+            "can_change_quote_status": True,
+            "can_view_all_quotes": True,
+        }
+    },
+    {
+        "name": "Vendedor", 
+        "slug": "sales", 
+        "description": "Vendas", 
+        "permissions": {
+            # Clientes
+            "customer_change_status": False, 
+            "customer_require_approval": True,
+            "can_edit_own_customers": True,
+            "can_edit_others_customers": False,
+            "can_delete_customers": False,
+            # Produtos
+            "can_create_products": False,
+            "can_edit_products": False,
+            "can_delete_products": False,
+            "can_change_product_status": False,
+            # Serviços
+            "can_create_services": False,
+            "can_edit_services": False,
+            "can_delete_services": False,
+            "can_change_service_status": False,
+            "can_edit_service_basic": False,
+            # Orçamentos
+            "can_create_quotes": True,
+            "can_edit_quotes": True,
+            "can_delete_quotes": False,
+            "can_change_quote_status": False,
+            "can_view_all_quotes": False,
+        }
+    }
+]
+
+
+# --- Fase do processo ---
+
+class ProcessState:
+    """starting -> ready -> draining (um por worker)"""
+
+    def __init__(self):
+        self.phase = "starting"
+        self.changed_at = time.time()
+
+    def set(self, phase: str) -> None:
+        self.phase = phase
+        self.changed_at = time.time()
+
+
+process_state = ProcessState()
+
+
+def install_drain_handler(on_drain: Callable[[], Awaitable], delay: float = DRAIN_DELAY) -> None:
+    """
+    Envolve o tratamento de SIGTERM/SIGINT do uvicorn (chamar no lifespan,
+    que roda depois de o uvicorn instalar os dele). No primeiro sinal: fase
+    "draining", on_drain() no loop e, após `delay` segundos, o sinal segue
+    para o uvicorn. Um segundo sinal segue na hora.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return  # Sinais só no thread principal (ex.: TestClient)
+    loop = asyncio.get_running_loop()
+
+    def wrap(previous):
+        def handler(signum, frame):
+            if process_state.phase == "draining":
+                previous(signum, frame)
+                return
+            process_state.set("draining")
+            print(f"🛑 Sinal {signal.Signals(signum).name}: saindo do balanceamento "
+                  f"(encerra em {delay:g}s)")
+            loop.call_soon_threadsafe(lambda: loop.create_task(on_drain()))
+            loop.call_soon_threadsafe(loop.call_later, delay, previous, signum, frame)
+        return handler
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+        if callable(previous):
+            signal.signal(sig, wrap(previous))
+
+
+# --- Banco ---
+
+def retry_delays(attempts: int = STARTUP_MAX_RETRIES, base: float = STARTUP_RETRY_BASE,
+                 maximum: float = STARTUP_RETRY_MAX) -> List[float]:
+    """Esperas entre tentativas: base, 2×base, 4×base... limitado a `maximum`"""
+    return [min(maximum, base * 2 ** i) for i in range(max(0, attempts - 1))]
+
+
+def check_connection() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def _lock(connection: Connection) -> None:
+    """Serializa as escritas de inicialização entre workers (só Postgres)"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+
+
+# --- Schema ---
+
+def alembic_head() -> Optional[str]:
+    """Revisão head das migrações do código (None se o Alembic não estiver disponível)"""
+    try:
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+    except ImportError:
+        return None
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def missing_tables(connection: Connection) -> List[str]:
+    existing = set(inspect(connection).get_table_names())
+    return [name for name in SQLModel.metadata.tables if name not in existing]
+
+
+def ensure_schema() -> str:
+    """Cria as tabelas que faltam; não escreve nada se o schema já está atual"""
+    if not STARTUP_SCHEMA_CHECK:
+        SQLModel.metadata.create_all(engine)
+        return "create_all"
+
+    head = alembic_head()
+    with engine.connect() as connection:
+        revision = current_revision(connection) if head else None
+        missing = missing_tables(connection)
+
+    if head and revision != head:
+        print(f"⚠️ Banco na revisão {revision or '(nenhuma)'}, código em {head}: rode `alembic upgrade head`")
+    if not missing:
+        return "atual"
+
+    with engine.begin() as connection:
+        _lock(connection)
+        SQLModel.metadata.create_all(connection)
+    return f"criadas {len(missing)} tabelas"
+
+
+# --- Cargos ---
+
+def roles_checksum(roles: Iterable[Tuple[str, Dict]]) -> str:
+    """Checksum de (slug, permissões), independente da ordem"""
+    canonical = json.dumps(sorted(roles, key=lambda role: role[0]), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _expected_roles():
+    return [(r["slug"], r["permissions"]) for r in DEFAULT_ROLES]
+
+
+def _stored_roles(session: Session):
+    slugs = [r["slug"] for r in DEFAULT_ROLES]
+    rows = session.exec(select(Role).where(Role.slug.in_(slugs))).all()
+    return {role.slug: role for role in rows}
+
+
+def sync_default_roles() -> List[str]:
+    """
+    Cria os cargos padrão que faltam e atualiza as permissões dos que
+    diferem do código. Nome e descrição de um cargo existente não são
+    tocados (podem ter sido editados). Retorna os slugs gravados (vazio
+    quando o banco já confere com o checksum).
+    """
+    expected = roles_checksum(_expected_roles())
+    with Session(engine) as session:
+        stored = _stored_roles(session)
+        current = roles_checksum(
+            (role.slug, role.permissions or {}) for role in stored.values()
+        )
+        if current == expected:
+            return []
+
+        _lock(session.connection())
+        stored = _stored_roles(session)  # Relê: outro worker pode ter gravado antes do lock
+        changed = []
+        for role_data in DEFAULT_ROLES:
+            role = stored.get(role_data["slug"])
+            if role is None:
+                print(f"🛠️ Criando cargo: {role_data['name']}")
+                session.add(Role(**role_data))
+            elif role.permissions != role_data["permissions"]:
+                print(f"📝 Atualizando permissões do cargo: {role.name}")
+                role.permissions = role_data["permissions"]
+                session.add(role)
+            else:
+                continue
+            changed.append(role_data["slug"])
+        session.commit()
+        return changed
+
+
+# --- Typeahead ---
+
+def build_typeahead_index() -> Dict[str, int]:
+    """Carrega o índice de autocompletar (clientes, produtos e serviços)."""
+    with Session(engine) as session:
+        return typeahead_index.build(session)
+
+
+# --- Leaderboard ---
+
+def build_leaderboard() -> Dict[str, int]:
+    """Contadores do ranking de vendedores (dashboard)."""
+    with Session(engine) as session:
+        return leaderboard.build(session)
+
+
+# --- Lifespan ---
+
+async def initialize(process_started: Optional[float] = None) -> Dict[str, float]:
+    """
+    Prepara banco, cargos, typeahead e leaderboard. Em caso de erro o app
+    sobe mesmo assim (como antes), com o erro no log. Retorna a duração de
+    cada etapa (s).
+    """
+    started = time.perf_counter()
+    phases: Dict[str, float] = {}
+    if process_started is not None:
+        phases["imports"] = started - process_started
+
+    delays = retry_delays()
+    for attempt in range(len(delays) + 1):
+        try:
+            await asyncio.to_thread(check_connection)
+            break
+        except OperationalError:
+            if attempt == len(delays):
+                print(f"❌ Banco indisponível após {attempt + 1} tentativas")
+                return _report(phases, started)
+            print(f"⚠️ Banco ainda não está pronto ({attempt + 1}/{len(delays) + 1}). "
+                  f"Nova tentativa em {delays[attempt]:.1f}s...")
+            await asyncio.sleep(delays[attempt])
+    phases["connect"] = time.perf_counter() - started
+
+    steps = [
+        ("schema", ensure_schema, "🗄️ Schema: {}"),
+        ("roles", sync_default_roles, "✅ Cargos: {}"),
+        ("typeahead", build_typeahead_index, "🔎 Typeahead: {}"),
+        ("leaderboard", build_leaderboard, "🏆 Leaderboard: {}"),
+    ]
+    for name, step, message in steps:
+        step_started = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(step)
+        except Exception as e:
+            print(f"❌ Erro na inicialização ({name}): {e}")
+            continue
+        finally:
+            phases[name] = time.perf_counter() - step_started
+        if name == "roles":
+            result = f"atualizados {', '.join(result)}" if result else "sem alterações"
+        print(message.format(result))
+
+    return _report(phases, started)
+
+
+def _report(phases: Dict[str, float], started: float) -> Dict[str, float]:
+    phases["total"] = time.perf_counter() - started + phases.get("imports", 0.0)
+    metrics.set_startup(phases)
+    detail = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in phases.items() if name != "total")
+    print(f"🚀 Inicialização em {phases['total'] * 1000:.0f}ms ({detail})")
+    return phases
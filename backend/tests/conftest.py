@@ -0,0 +1,260 @@
+"""
+Configuração dos testes do backend.
+
+Os módulos do backend são importados como no container (`from models
+import ...`), então o diretório backend/ entra no sys.path.
+
+O app roda em processo (TestClient) contra um banco descartável:
+
+- TEST_DATABASE_URL definido: usa esse banco (ex.: Postgres de teste) e
+  apaga as tabelas ao final. Nunca aponte para um banco com dados reais.
+- caso contrário: SQLite em um diretório temporário.
+
+DATABASE_URL é sempre sobrescrito antes de importar o app, para que os
+testes não toquem o banco de desenvolvimento.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+_tmpdir = None
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+else:
+    _tmpdir = tempfile.mkdtemp(prefix="erp-tests-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'erp.db')}"
+
+# Contagens determinísticas: sem consultas de versão do catálogo nem
+# reconstrução do typeahead no meio de uma medição
+os.environ.setdefault("CATALOG_VERSION_TTL", "3600")
+os.environ.setdefault("TYPEAHEAD_REBUILD_INTERVAL", "3600")
+os.environ.setdefault("AUDIT_MODE", "transactional")
+# Tarefas em segundo plano: os testes executam com job_runner.run_pending()
+os.environ.setdefault("JOB_RUNNER", "off")
+
+
+# --- Contagem de consultas ---
+
+class QueryLog:
+    """Consultas SQL executadas dentro de um bloco count_queries()"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, minimum: int = 2) -> Dict[str, int]:
+        """Mesmo SQL executado várias vezes (sintoma típico de N+1)"""
+        return {
+            statement: times
+            for statement, times in Counter(self.statements).most_common()
+            if times >= minimum
+        }
+
+    def describe(self) -> str:
+        lines = [f"{self.count} consultas"]
+        for statement, times in self.repeated().items():
+            lines.append(f"  {times}x {' '.join(statement.split())[:200]}")
+        return "\n".join(lines)
+
+
+@pytest.fixture
+def count_queries(app_client):
+    """
+    Uso:
+        with count_queries() as log:
+            client.get(...)
+        assert log.count <= 3, log.describe()
+    """
+    from sqlalchemy import event
+    from database import engine
+
+    @contextmanager
+    def counter():
+        log = QueryLog()
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            log.statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield log
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+
+# --- App e dados ---
+
+@pytest.fixture(scope="session")
+def app_client():
+    """TestClient com o lifespan do app (tabelas, cargos e typeahead)"""
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    import database
+    database.engine.echo = False
+
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+    if TEST_DATABASE_URL:
+        from sqlmodel import SQLModel
+        SQLModel.metadata.drop_all(database.engine)
+    database.engine.dispose()
+    if _tmpdir:
+        shutil.rmtree(_tmpdir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def users(app_client) -> Dict[str, int]:
+    """Um usuário por cargo (admin, manager, sales); o gerente supervisiona o vendedor"""
+    from sqlmodel import Session, select
+    from database import engine
+    from models import Role, User, UserSupervisor
+
+    ids = {}
+    with Session(engine) as session:
+        for slug in ("admin", "manager", "sales"):
+            role = session.exec(select(Role).where(Role.slug == slug)).one()
+            user = User(name=f"Teste {role.name}", email=f"{slug}@teste.com", password_hash="x", role_id=role.id)
+            session.add(user)
+            session.flush()
+            ids[slug] = user.id
+        session.add(UserSupervisor(user_id=ids["sales"], supervisor_id=ids["manager"]))
+        session.commit()
+    return ids
+
+
+@pytest.fixture(scope="session")
+def auth_headers(users):
+    """auth_headers("sales") -> cabeçalho Authorization com token do cargo"""
+    import security
+
+    def headers(slug: str = "admin") -> Dict[str, str]:
+        token = security.create_access_token({"sub": f"{slug}@teste.com", "role": slug})
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
+
+
+def make_cpf(number: int) -> str:
+    """CPF válido a partir de um número (9 primeiros dígitos)"""
+    digits = [int(d) for d in f"{number % 10 ** 9:09d}"]
+    for weight in (10, 11):
+        remainder = sum(d * w for d, w in zip(digits, range(weight, 1, -1))) % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return "".join(map(str, digits))
+
+
+@pytest.fixture(scope="session")
+def catalog(app_client, auth_headers) -> Dict[str, int]:
+    """Um produto e um serviço para os itens dos orçamentos"""
+    headers = auth_headers("admin")
+    product = app_client.post(
+        "/products/", json={"name": "Caixa de Som", "category": "som", "quantity": 1000}, headers=headers
+    )
+    service = app_client.post(
+        "/services/", json={"name": "Instalação", "category": "instalacao", "price_base": 50}, headers=headers
+    )
+    assert product.status_code == 200, product.text
+    assert service.status_code == 200, service.text
+    return {"product": product.json()["id"], "service": service.json()["id"]}
+
+
+@pytest.fixture(scope="session")
+def seed(users, catalog):
+    """
+    seed(n) insere n clientes, cada um com um orçamento, uma nota e uma
+    atividade no feed (alternando entre vendedor e gerente). Retorna os ids
+    dos clientes criados.
+    """
+    from sqlmodel import Session
+    from database import engine
+    from models import Customer, CustomerNote, FeedItem, Quote
+
+    state = {"next": 0}
+
+    def insert(count: int) -> List[int]:
+        items = [
+            {"type": "product", "item_id": catalog["product"], "name": "Caixa de Som",
+             "quantity": 1, "unit_price": 100.0, "subtotal": 100.0},
+            {"type": "service", "item_id": catalog["service"], "name": "Instalação",
+             "quantity": 1, "unit_price": 50.0, "subtotal": 50.0},
+        ]
+        statuses = ("rascunho", "enviado", "aprovado", "faturado")
+        created = []
+        with Session(engine) as session:
+            for _ in range(count):
+                state["next"] += 1
+                n = state["next"]
+                owner = users["sales"] if n % 2 else users["manager"]
+                customer = Customer(
+                    name=f"Cliente Teste {n}", document=make_cpf(100000000 + n),
+                    person_type="fisica", salesperson_id=owner, created_by_id=owner,
+                    city="Curitiba"
+                )
+                session.add(customer)
+                session.flush()
+                created.append(customer.id)
+                session.add(Quote(
+                    quote_number=f"ORC-TESTE-{n:05d}", customer_id=customer.id, items=items,
+                    subtotal=150.0, total=150.0, status=statuses[n % len(statuses)]
+                ))
+                session.add(CustomerNote(content=f"Nota {n}", customer_id=customer.id, created_by_id=owner))
+                session.add(FeedItem(content=f"Cliente {n} cadastrado", user_id=owner, related_customer_id=customer.id))
+            session.commit()
+        return created
+
+    return insert
+
+
+@pytest.fixture
+def product(app_client, auth_headers, request) -> int:
+    """Produto novo com 2 unidades (sem reservas de outros testes)"""
+    name = f"Gerador {request.node.name}"
+    response = app_client.post("/products/", json={"name": name, "category": "energia", "quantity": 2},
+                               headers=auth_headers("admin"))
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def make_quote(app_client, auth_headers, seed, product):
+    """
+    make_quote(quantity, start, end) cria um orçamento (rascunho) de locação
+    do `product`. Retorna o id.
+    """
+    customer_id = seed(1)[0]
+
+    def create(quantity: int = 2, start: datetime = datetime(2027, 3, 1),
+               end: datetime = datetime(2027, 3, 4)) -> int:
+        response = app_client.post("/quotes/", json={
+            "customer_id": customer_id,
+            "items": [{"type": "product", "item_id": product, "name": "Gerador",
+                       "quantity": quantity, "unit_price": 100.0, "subtotal": 100.0 * quantity}],
+            "rental_start": start.isoformat(),
+            "rental_end": end.isoformat(),
+        }, headers=auth_headers("admin"))
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    return create
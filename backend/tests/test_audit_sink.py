@@ -0,0 +1,141 @@
+"""
+Modo buffered do audit_sink.py: gravação em lote, backpressure com a fila
+cheia, esvaziamento no shutdown e o que acontece quando o banco falha
+(novas tentativas, arquivo de reserva e reenvio).
+"""
+
+import os
+from typing import Optional
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, func, select
+
+from audit_sink import AuditSink
+from database import engine
+from models import AuditLog
+
+
+def _rows(marker: str, count: int, user_id: Optional[int]):
+    return [
+        {"table_name": marker, "record_id": n, "action": "TEST", "user_id": user_id, "changes": {"n": n}}
+        for n in range(count)
+    ]
+
+
+def _down(message: str = "banco fora do ar") -> OperationalError:
+    return OperationalError("INSERT INTO auditlog", {}, Exception(message))
+
+
+def _stored(marker: str) -> int:
+    with Session(engine) as session:
+        return session.exec(select(func.count(AuditLog.id)).where(AuditLog.table_name == marker)).one()
+
+
+@pytest.fixture
+def make_sink(users, tmp_path):
+    sinks = []
+
+    def create(**kwargs):
+        kwargs.setdefault("spill_path", str(tmp_path / "spill.ndjson"))
+        kwargs.setdefault("retry_base", 0.001)
+        sink = AuditSink(mode="buffered", **kwargs)
+        sinks.append(sink)
+        return sink
+
+    yield create
+    for sink in sinks:
+        sink.shutdown(timeout=1)
+
+
+def _with_dates(rows):
+    with Session(engine) as session:
+        AuditSink(mode="buffered").write_many(session, rows)  # Preenche created_at/updated_at
+        session.info.clear()
+    return rows
+
+
+def test_commit_enqueues_and_worker_writes_batch(make_sink, users, monkeypatch):
+    import audit_sink as module
+
+    sink = make_sink(flush_interval=0.05)
+    monkeypatch.setattr(module, "audit_sink", sink)
+    with Session(engine) as session:
+        sink.write_many(session, _rows("sink_commit", 3, users["admin"]))
+        session.commit()
+    with Session(engine) as session:
+        sink.write_many(session, _rows("sink_rollback", 2, users["admin"]))
+        session.rollback()
+
+    sink.shutdown(timeout=2)
+    assert _stored("sink_commit") == 3
+    assert _stored("sink_rollback") == 0
+
+
+def test_full_queue_writes_synchronously_and_shutdown_drains(make_sink, users, monkeypatch):
+    sink = make_sink(queue_size=2, put_timeout=0.01)
+    monkeypatch.setattr(sink, "_ensure_worker", lambda: None)  # Ninguém consome a fila
+
+    sink.enqueue(_with_dates(_rows("sink_backpressure", 5, users["admin"])))
+    assert sink.stats["sync_fallbacks"] == 1
+    assert _stored("sink_backpressure") == 3  # As que não couberam na fila
+
+    sink.shutdown()
+    assert _stored("sink_backpressure") == 5
+
+
+def test_failed_batch_is_retried(make_sink, users, monkeypatch):
+    sink = make_sink(retry_attempts=3)
+    write = sink._write
+    failures = iter([_down("conexão perdida"), _down("conexão perdida")])
+
+    def flaky(rows):
+        error = next(failures, None)
+        if error:
+            raise error
+        write(rows)
+
+    monkeypatch.setattr(sink, "_write", flaky)
+    sink._insert(_with_dates(_rows("sink_retry", 4, users["admin"])))
+    assert _stored("sink_retry") == 4
+    assert sink.stats["retries"] == 2
+    assert sink.stats["spilled"] == sink.stats["dropped"] == 0
+
+
+def test_exhausted_retries_spill_to_file_and_replay(make_sink, users, monkeypatch):
+    sink = make_sink(retry_attempts=2)
+    write = sink._write
+
+    def down(rows):
+        raise _down()
+
+    monkeypatch.setattr(sink, "_write", down)
+    sink._insert(_with_dates(_rows("sink_spill", 3, users["admin"])))
+    assert _stored("sink_spill") == 0
+    assert sink.stats["spilled"] == 3
+    assert sink.stats["dropped"] == 0
+
+    # Banco ainda fora: as linhas voltam para o arquivo
+    assert sink.replay_spill() == 0
+    assert os.path.exists(sink.spill_path)
+
+    monkeypatch.setattr(sink, "_write", write)
+    assert sink.replay_spill() == 3
+    assert _stored("sink_spill") == 3
+    assert not os.path.exists(sink.spill_path)
+    assert sink.stats["replayed"] == 3
+
+
+def test_unwritable_spill_counts_as_dropped(make_sink, users, monkeypatch, tmp_path):
+    sink = make_sink(retry_attempts=1, spill_path=str(tmp_path / "inexistente" / "spill.ndjson"))
+    monkeypatch.setattr(sink, "_write", lambda rows: (_ for _ in ()).throw(_down()))
+    sink._insert(_with_dates(_rows("sink_dropped", 2, users["admin"])))
+    assert sink.stats["dropped"] == 2
+
+
+def test_rejected_rows_are_not_retried_or_spilled(make_sink):
+    sink = make_sink(retry_attempts=3)
+    sink._insert(_with_dates(_rows("sink_rejected", 2, None)))  # user_id é obrigatório
+    assert sink.stats["rejected"] == 2
+    assert sink.stats["retries"] == sink.stats["spilled"] == 0
+    assert not os.path.exists(sink.spill_path)
@@ -0,0 +1,107 @@
+"""
+Calendário de disponibilidade (services/availability_service.py): varredura
+dos eventos de reserva por dia e invalidação do cache após commit/rollback.
+
+Reservas são intervalos semiabertos [início, fim): quem devolve à
+meia-noite não ocupa o dia seguinte.
+"""
+
+from datetime import date, datetime
+
+from sqlmodel import Session
+
+from database import engine
+from services.availability_service import (
+    AvailabilityService, availability_cache, invalidate_on_commit
+)
+
+
+def _events(*reservations):
+    """(início, fim, quantidade) -> eventos ordenados como no load_events"""
+    events = []
+    for start, end, quantity in reservations:
+        events.append((start, 1, quantity))
+        events.append((end, 0, -quantity))
+    return sorted(events)
+
+
+def _peaks(events, start=date(2027, 2, 28), end=date(2027, 3, 4)):
+    return AvailabilityService.daily_peaks(events, start, end)
+
+
+def test_interval_ending_at_midnight_frees_that_day():
+    events = _events((datetime(2027, 3, 1), datetime(2027, 3, 4), 2))
+    # 28/02, 01/03, 02/03, 03/03, 04/03
+    assert _peaks(events) == [0, 2, 2, 2, 0]
+
+
+def test_back_to_back_reservations_do_not_overlap():
+    events = _events((datetime(2027, 3, 1), datetime(2027, 3, 3), 1),
+                     (datetime(2027, 3, 3), datetime(2027, 3, 5), 1))
+    assert _peaks(events) == [0, 1, 1, 1, 1]
+
+    # Troca no meio do dia: o fim entra antes do início no mesmo instante
+    events = _events((datetime(2027, 3, 1), datetime(2027, 3, 2, 12), 2),
+                     (datetime(2027, 3, 2, 12), datetime(2027, 3, 3), 1))
+    assert _peaks(events) == [0, 2, 2, 0, 0]
+
+
+def test_peak_inside_the_day():
+    events = _events((datetime(2027, 3, 1, 8), datetime(2027, 3, 1, 12), 1),
+                     (datetime(2027, 3, 1, 10), datetime(2027, 3, 1, 18), 1),
+                     (datetime(2027, 3, 1, 20), datetime(2027, 3, 2, 6), 1))
+    assert _peaks(events) == [0, 2, 1, 0, 0]
+
+
+def test_events_outside_the_window():
+    events = _events((datetime(2027, 2, 1), datetime(2027, 2, 20), 5),   # Antes do período
+                     (datetime(2027, 2, 10), datetime(2027, 3, 2), 1),   # Começa antes
+                     (datetime(2027, 3, 4, 23), datetime(2027, 3, 9), 3),  # Último dia, à noite
+                     (datetime(2027, 3, 5), datetime(2027, 3, 9), 7))    # Depois do período
+    assert _peaks(events) == [1, 1, 0, 0, 3]
+    assert _peaks([]) == [0] * 5
+    assert _peaks(events, date(2027, 3, 3), date(2027, 3, 3)) == [0]
+
+
+def test_invalidation_waits_for_commit_and_is_discarded_on_rollback():
+    availability_cache.set(-1, [])
+    with Session(engine) as session:
+        invalidate_on_commit(session, [-1])
+        assert availability_cache.get_many([-1]) == ({-1: []}, [])  # Transação aberta
+        session.rollback()
+    assert availability_cache.get_many([-1]) == ({-1: []}, [])
+
+    with Session(engine) as session:
+        invalidate_on_commit(session, [-1])
+        session.commit()
+    assert availability_cache.get_many([-1]) == ({}, [-1])
+
+
+def test_calendar_follows_approve_and_release(app_client, auth_headers, product, make_quote):
+    headers = auth_headers("admin")
+    quote_id = make_quote(quantity=2, start=datetime(2027, 3, 1), end=datetime(2027, 3, 3))
+    blocked = make_quote(quantity=1, start=datetime(2027, 3, 2), end=datetime(2027, 3, 5))
+
+    def calendar():
+        response = app_client.get("/products/availability/calendar", headers=headers, params={
+            "product_ids": [product], "start": "2027-02-28", "end": "2027-03-04"
+        })
+        assert response.status_code == 200, response.text
+        return list(response.json()["products"][0]["days"].values())
+
+    assert calendar() == [2, 2, 2, 2, 2]  # Agora em cache
+
+    def set_status(quote, status):
+        return app_client.patch(f"/quotes/{quote}/status", json={"new_status": status}, headers=headers)
+
+    assert set_status(quote_id, "aprovado").status_code == 200
+    assert calendar() == [2, 0, 0, 2, 2]
+
+    # Aprovação recusada (sem estoque): rollback, cache continua certo
+    assert set_status(blocked, "aprovado").status_code == 409
+    assert calendar() == [2, 0, 0, 2, 2]
+
+    assert set_status(quote_id, "cancelado").status_code == 200
+    assert calendar() == [2, 2, 2, 2, 2]
+    assert set_status(blocked, "aprovado").status_code == 200
+    assert calendar() == [2, 2, 1, 1, 1]
@@ -0,0 +1,21 @@
+"""
+Cache do catálogo (services/catalog_cache.py): estatísticas de hit/miss.
+"""
+
+from models import Product
+from services.catalog_cache import CatalogEntityCache
+
+
+def test_reload_counts_as_miss(app_client, catalog):
+    cache = CatalogEntityCache("product", Product, (Product.id,), ttl=3600)
+
+    cache.list()  # Primeira chamada carrega a tabela
+    assert (cache.stats["hits"], cache.stats["misses"], cache.stats["reloads"]) == (0, 1, 1)
+    cache.list(category="som")
+    cache.get_many([catalog["product"], -1])
+    assert (cache.stats["hits"], cache.stats["misses"]) == (2, 2)
+
+    cache.invalidate()
+    cache.get_many([catalog["product"]])
+    assert (cache.stats["hits"], cache.stats["misses"], cache.stats["reloads"]) == (2, 3, 2)
+    assert cache.snapshot_stats()["hit_ratio"] == 0.4
@@ -0,0 +1,137 @@
+"""
+Compressão das respostas (compression.py): negociação, limite de tamanho,
+tipos compressíveis e streaming parte a parte.
+"""
+
+import asyncio
+import gzip
+import zlib
+
+import orjson
+import pytest
+
+from compression import CompressionMiddleware, negotiate
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("*", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept, ["br", "gzip"]) == expected
+
+
+def test_large_json_is_compressed(app_client, auth_headers, seed):
+    seed(30)
+    headers = {**auth_headers("admin"), "Accept-Encoding": "gzip"}
+    response = app_client.get("/customers/?limit=100", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json()["items"]
+
+
+def test_brotli_preferred_when_accepted(app_client, auth_headers, seed):
+    pytest.importorskip("brotli")
+    seed(30)
+    headers = {**auth_headers("admin"), "Accept-Encoding": "gzip, br"}
+    response = app_client.get("/customers/?limit=100", headers=headers)
+    assert response.headers["content-encoding"] == "br"
+    assert response.json()["items"]
+
+
+def test_small_response_is_not_compressed(app_client):
+    response = app_client.get("/health/live", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "accept-encoding" in response.headers["vary"].lower()
+
+
+def test_pdf_is_not_compressed(app_client, auth_headers, seed):
+    from sqlmodel import Session, select
+    from database import engine
+    from models import Quote
+
+    customer_id = seed(1)[0]
+    with Session(engine) as session:
+        quote_id = session.exec(select(Quote.id).where(Quote.customer_id == customer_id)).one()
+
+    headers = {**auth_headers("admin"), "Accept-Encoding": "gzip, br"}
+    response = app_client.get(f"/quotes/{quote_id}/pdf", headers=headers)
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content.startswith(b"%PDF")
+
+
+def _run(app, headers):
+    """Executa o middleware sobre `app` e devolve as mensagens enviadas"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    return sent
+
+
+def _ndjson_app(lines):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson")]})
+        for line in lines:
+            await send({"type": "http.response.body", "body": line, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+def test_streaming_is_compressed_chunk_by_chunk():
+    lines = [orjson.dumps({"id": i, "action": "UPDATE", "changes": "x" * 50}) + b"\n" for i in range(20)]
+    sent = _run(_ndjson_app(lines), [(b"accept-encoding", b"gzip")])
+
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+
+    # Cada parte enviada já descomprime até a última linha completa (flush)
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    received = b""
+    chunks = [m for m in sent[1:] if m["body"]]
+    assert len(chunks) > 1
+    for message in chunks:
+        received += decompressor.decompress(message["body"])
+        if message["more_body"]:
+            assert received.endswith(b"\n")
+    assert received == b"".join(lines)
+
+
+def test_short_stream_is_sent_uncompressed():
+    lines = [b'{"id": 1}\n', b'{"id": 2}\n']
+    sent = _run(_ndjson_app(lines), [(b"accept-encoding", b"gzip")])
+
+    assert b"content-encoding" not in dict(sent[0]["headers"])
+    assert b"".join(m["body"] for m in sent[1:]) == b"".join(lines)
+
+
+def test_full_body_gets_compressed_length():
+    body = orjson.dumps([{"id": i, "name": "Cliente"} for i in range(50)])
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+    sent = _run(app, [(b"accept-encoding", b"gzip")])
+    headers = dict(sent[0]["headers"])
+    assert int(headers[b"content-length"]) == len(sent[1]["body"])
+    assert gzip.decompress(sent[1]["body"]) == body
@@ -0,0 +1,141 @@
+"""
+Importação de clientes (services/customer_import.py e POST /customers/import):
+mapeamento de cabeçalhos CSV/XLSX, duplicados no arquivo e no banco, o
+fallback linha a linha após IntegrityError e o relatório de erros.
+"""
+
+import io
+
+from sqlmodel import Session, select
+
+import services.customer_import as customer_import
+from conftest import make_cpf
+from database import engine
+from models import AuditLog, Customer
+
+
+def _import(app_client, headers, content: bytes, filename="clientes.csv", **params):
+    response = app_client.post(
+        "/customers/import", headers=headers, params=params,
+        files={"file": (filename, content, "application/octet-stream")}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _customers(documents):
+    with Session(engine) as session:
+        rows = session.exec(select(Customer).where(Customer.document.in_(documents))).all()
+        return {c.document: c for c in rows}
+
+
+def _audited(customer_ids):
+    with Session(engine) as session:
+        return session.exec(select(AuditLog).where(
+            AuditLog.table_name == "customer",
+            AuditLog.action == "CREATE",
+            AuditLog.record_id.in_(customer_ids)
+        )).all()
+
+
+def test_mixed_csv_reports_each_rejected_row(app_client, auth_headers, users, seed):
+    existing = _customers_from_seed(seed)
+    first, second = make_cpf(300000001), make_cpf(300000002)
+    invalid = first[:-1] + str((int(first[-1]) + 1) % 10)
+    # Separador ';', cabeçalhos em português e documento com pontuação
+    csv = "\n".join([
+        "Nome;CPF;Tipo Pessoa;Cidade;Coluna Desconhecida",
+        f"Ana Importada;{first[:3]}.{first[3:6]}.{first[6:9]}-{first[9:]};fisica;Curitiba;x",
+        f"CPF Errado;{invalid};fisica;Curitiba;x",
+        f"Bruno Importado;{second};fisica;Londrina;x",
+        ";;;;",
+        f"Ana de Novo;{first};fisica;Curitiba;x",
+        f"Já Existe;{existing};fisica;Curitiba;x",
+        f";{make_cpf(300000003)};fisica;Curitiba;x",
+    ]).encode()
+
+    report = _import(app_client, auth_headers("admin"), csv, chunk_size=2)
+    assert (report["total"], report["created"], report["failed"]) == (6, 2, 4)
+    # Linha vazia (6) é ignorada, mas conta na numeração do arquivo
+    assert [(e["row"], e["document"]) for e in report["errors"]] == [
+        (3, invalid), (6, first), (7, existing), (8, make_cpf(300000003)),
+    ]
+    errors = [e["error"] for e in report["errors"]]
+    assert errors[0] == "document: CPF inválido"
+    assert errors[1] == "Documento repetido no arquivo"
+    assert errors[2] == "Documento já cadastrado no sistema"
+    assert errors[3].startswith("name:")
+
+    created = _customers([first, second])
+    assert created[first].name == "Ana Importada"
+    assert created[second].city == "Londrina"
+    assert {c.created_by_id for c in created.values()} == {users["admin"]}
+    assert {c.salesperson_id for c in created.values()} == {users["admin"]}
+    assert {c.status for c in created.values()} == {"ativo"}
+
+    audits = _audited([c.id for c in created.values()])
+    assert sorted(a.record_id for a in audits) == sorted(c.id for c in created.values())
+    assert all(a.changes["source"] == "import" and a.user_id == users["admin"] for a in audits)
+
+
+def _customers_from_seed(seed) -> str:
+    customer_id = seed(1)[0]
+    with Session(engine) as session:
+        return session.get(Customer, customer_id).document
+
+
+def test_xlsx_maps_headers_and_numeric_documents(app_client, auth_headers):
+    from openpyxl import Workbook
+
+    document = make_cpf(300000011)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Razao Social", "CPF_CNPJ", "tipo_pessoa", "UF", "Limite Credito"])
+    sheet.append(["Planilha Ltda", int(document), "fisica", "PR", 1500])
+    sheet.append([None, None, None, None, None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    report = _import(app_client, auth_headers("admin"), buffer.getvalue(), filename="clientes.xlsx")
+    assert (report["total"], report["created"], report["failed"]) == (1, 1, 0), report
+
+    customer = _customers([document])[document]
+    assert (customer.name, customer.state, customer.credit_limit) == ("Planilha Ltda", "PR", 1500)
+
+
+def test_unsupported_extension(app_client, auth_headers):
+    response = app_client.post("/customers/import", headers=auth_headers("admin"),
+                               files={"file": ("clientes.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 400
+
+
+def test_integrity_error_retries_chunk_row_by_row(app_client, auth_headers, users, seed, monkeypatch):
+    existing = _customers_from_seed(seed)
+    fresh = [make_cpf(300000021), make_cpf(300000022)]
+
+    # Outra inserção ganhou a corrida: a consulta de duplicados não enxerga o documento
+    real_select = customer_import.select
+    monkeypatch.setattr(customer_import, "select", lambda *c: real_select(*c).where(Customer.id < 0))
+
+    csv = "\n".join(["nome,documento,tipo_pessoa"] + [
+        f"Cliente {doc},{doc},fisica" for doc in (fresh[0], existing, fresh[1])
+    ]).encode()
+    report = _import(app_client, auth_headers("admin"), csv)
+
+    assert (report["created"], report["failed"]) == (2, 1)
+    assert report["errors"] == [
+        {"row": 3, "document": existing, "error": "Documento já cadastrado no sistema"}
+    ]
+    created = _customers(fresh)
+    assert len(created) == 2
+    assert len(_audited([c.id for c in created.values()])) == 2
+
+
+def test_sales_import_assigns_nobody_and_follows_approval_rule(app_client, auth_headers, users):
+    document = make_cpf(300000031)
+    report = _import(app_client, auth_headers("sales"),
+                     f"nome,cpf,tipo_pessoa\nDo Vendedor,{document},fisica".encode())
+    assert report["created"] == 1
+    customer = _customers([document])[document]
+    assert customer.created_by_id == users["sales"]
+    assert customer.salesperson_id is None
@@ -0,0 +1,88 @@
+"""
+GET condicional: ETag fraco nos detalhes e listagens, 304 com If-None-Match
+e updated_at atualizado em toda alteração.
+"""
+
+import pytest
+
+from etags import matches
+
+
+def _revalidate(client, path, headers):
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200, first.text
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    second = client.get(path, headers={**headers, "If-None-Match": etag})
+    return first, second
+
+
+@pytest.mark.parametrize("path", [
+    "/customers/{customer_id}",
+    "/customers/",
+    "/quotes/{quote_id}",
+    "/quotes/",
+    "/quotes/customer/{customer_id}",
+    "/products/{product_id}",
+    "/products/",
+    "/services/{service_id}",
+    "/services/",
+])
+def test_if_none_match_returns_304(app_client, auth_headers, seed, catalog, path):
+    from sqlmodel import Session, select
+    from database import engine
+    from models import Quote
+
+    customer_id = seed(1)[0]
+    with Session(engine) as session:
+        quote_id = session.exec(select(Quote.id).where(Quote.customer_id == customer_id)).one()
+    path = path.format(customer_id=customer_id, quote_id=quote_id,
+                       product_id=catalog["product"], service_id=catalog["service"])
+
+    first, second = _revalidate(app_client, path, auth_headers("admin"))
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+    assert "no-cache" in first.headers["cache-control"]
+
+
+def test_update_bumps_updated_at_and_etag(app_client, auth_headers, catalog):
+    headers = auth_headers("admin")
+    path = f"/products/{catalog['product']}"
+    before = app_client.get(path, headers=headers)
+
+    response = app_client.put(path, json={"notes": "revisado"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    after = app_client.get(path, headers={**headers, "If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["updated_at"] > before.json()["updated_at"]
+    assert after.headers["etag"] != before.headers["etag"]
+
+
+def test_list_etag_changes_with_new_rows_and_page(app_client, auth_headers, seed):
+    headers = auth_headers("manager")
+    page_1 = app_client.get("/customers/?limit=5", headers=headers).headers["etag"]
+    page_2 = app_client.get("/customers/?skip=5&limit=5", headers=headers).headers["etag"]
+    assert page_1 != page_2
+
+    seed(1)
+    response = app_client.get("/customers/?limit=5", headers={**headers, "If-None-Match": page_1})
+    assert response.status_code == 200
+    assert response.headers["etag"] != page_1
+
+
+def test_list_etag_depends_on_user(app_client, auth_headers, seed):
+    seed(2)
+    manager = app_client.get("/quotes/", headers=auth_headers("manager")).headers["etag"]
+    sales = app_client.get("/quotes/", headers=auth_headers("sales")).headers["etag"]
+    assert manager != sales
+
+
+def test_matches_weak_comparison():
+    assert matches('W/"abc"', 'W/"abc"')
+    assert matches('"abc"', 'W/"abc"')
+    assert matches('W/"x", W/"abc"', 'W/"abc"')
+    assert matches("*", 'W/"abc"')
+    assert not matches('W/"abd"', 'W/"abc"')
+    assert not matches(None, 'W/"abc"')
@@ -0,0 +1,62 @@
+"""
+Vivacidade x prontidão (/health/live e /health/ready, usados pelo gunicorn,
+Docker e balanceador).
+"""
+
+import asyncio
+import signal
+
+from startup import install_drain_handler, process_state
+
+
+def test_live_does_not_touch_database(app_client, count_queries):
+    with count_queries() as log:
+        response = app_client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+    assert log.count == 0, log.describe()
+
+
+def test_ready_checks_database(app_client):
+    response = app_client.get("/health/ready")
+    assert response.status_code == 200, response.text
+    assert response.json()["database"] == "ok"
+
+
+def test_not_ready_while_draining(app_client):
+    process_state.set("draining")
+    try:
+        response = app_client.get("/health/ready")
+        assert response.status_code == 503
+        assert app_client.get("/health/live").status_code == 200
+    finally:
+        process_state.set("ready")
+
+
+def test_sigterm_drains_before_server_stops():
+    received, drained = [], []
+    original = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+
+    async def scenario():
+        # Papel do uvicorn: o tratamento de sinal que já estava instalado
+        signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+
+        async def on_drain():
+            drained.append(process_state.phase)
+
+        install_drain_handler(on_drain, delay=0.1)
+        signal.raise_signal(signal.SIGTERM)
+        await asyncio.sleep(0.02)
+        # Ainda atendendo: fora do /health/ready, WebSockets fechados, uvicorn sem o sinal
+        assert process_state.phase == "draining"
+        assert drained == ["draining"]
+        assert received == []
+        await asyncio.sleep(0.2)
+        assert received == [signal.SIGTERM]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        for sig, handler in original.items():
+            signal.signal(sig, handler)
+        process_state.set("ready")
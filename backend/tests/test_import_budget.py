@@ -0,0 +1,65 @@
+"""
+Boot dos workers: `import main` dentro do orçamento e dependências pesadas
+carregadas só no primeiro uso (ver profile_imports.py).
+
+O orçamento de tempo vem de IMPORT_BUDGET_MS (padrão 1500ms); em máquinas
+de CI lentas, aumente a variável em vez de remover o teste.
+"""
+
+import statistics
+
+from profile_imports import IMPORT_BUDGET_MS, lazy_violations, profile, total_ms
+
+
+def test_heavy_modules_are_not_imported_at_boot():
+    violations = lazy_violations(profile("main"))
+    assert not violations, f"importados no boot: {violations} (importe dentro da função que usa)"
+
+
+def test_import_time_within_budget():
+    runs = [total_ms(profile("main")) for _ in range(3)]
+    median = statistics.median(runs)
+    assert median <= IMPORT_BUDGET_MS, (
+        f"import main levou {median:.0f}ms (orçamento {IMPORT_BUDGET_MS:.0f}ms); "
+        f"veja `python profile_imports.py`"
+    )
+
+
+def test_lazy_dependencies_load_on_first_use(app_client, auth_headers, seed):
+    """PDF (ReportLab), JWT e validação de CPF continuam funcionando sob demanda"""
+    from sqlmodel import Session, select
+    from database import engine
+    from models import Quote
+
+    customer_ids = seed(1)
+    with Session(engine) as session:
+        quote = session.exec(select(Quote).where(Quote.customer_id == customer_ids[0])).one()
+
+    headers = auth_headers("admin")
+    response = app_client.get(f"/quotes/{quote.id}/pdf", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.content.startswith(b"%PDF")
+
+    response = app_client.get(f"/customers/{customer_ids[0]}", headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_preloaded_master_warms_lazy_dependencies():
+    """Com preload_app, o mestre do gunicorn carrega as dependências antes do fork"""
+    import subprocess
+    import sys
+    from profile_imports import BACKEND_DIR, LAZY_MODULES
+
+    script = (
+        "import importlib.util, sys, types\n"
+        "import main\n"
+        "spec = importlib.util.spec_from_file_location('gunicorn_conf', 'gunicorn.conf.py')\n"
+        "conf = importlib.util.module_from_spec(spec); spec.loader.exec_module(conf)\n"
+        "conf.when_ready(types.SimpleNamespace(cfg=types.SimpleNamespace(preload_app=True)))\n"
+        f"missing = [m for m in {LAZY_MODULES!r} if m not in sys.modules]\n"
+        "print(','.join(missing))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "", f"não carregados no mestre: {result.stdout.strip()}"
@@ -0,0 +1,289 @@
+"""
+Tarefas em segundo plano (job_runner.py): fila, andamento pelo WebSocket,
+cancelamento, artefatos, recuperação de tarefas presas e os tipos
+registrados em services/job_handlers.py.
+"""
+
+from datetime import datetime, timedelta
+import io
+import zipfile
+
+import pytest
+from sqlmodel import Session
+
+import job_runner as runner_module
+from connection_manager import manager
+from database import engine
+from job_runner import HANDLERS, JobRunner, job_handler, job_runner
+from models import Job
+
+
+@pytest.fixture
+def handler():
+    """handler(kind, função) registra um tipo de tarefa só para o teste"""
+    registered = []
+
+    def register(kind, function, concurrency=1):
+        job_handler(kind, concurrency)(function)
+        registered.append(kind)
+
+    yield register
+    for kind in registered:
+        HANDLERS.pop(kind, None)
+
+
+@pytest.fixture
+def pushed(monkeypatch):
+    """Mensagens job_update enviadas pelo WebSocket: [(user_id, job)]"""
+    messages = []
+    monkeypatch.setattr(manager, "notify_user", lambda message, user_id: messages.append((user_id, message["job"])))
+    return messages
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(runner_module, "JOB_ARTIFACT_DIR", str(tmp_path))
+
+
+def _submit(kind, user_id, params=None, total=None) -> int:
+    with Session(engine) as session:
+        return job_runner.submit(session, kind, user_id, params or {}, total=total).id
+
+
+def _job(job_id) -> Job:
+    with Session(engine) as session:
+        return session.get(Job, job_id)
+
+
+def test_job_runs_with_progress_and_artifact(app_client, auth_headers, users, handler, pushed):
+    def count(ctx):
+        for index in range(1, ctx.params["n"] + 1):
+            ctx.progress(index, total=ctx.params["n"], force=True)
+        with open(ctx.artifact("numeros.txt", "text/plain"), "w") as f:
+            f.write("ok")
+        return {"counted": ctx.params["n"]}
+
+    handler("test_count", count)
+    job_id = _submit("test_count", users["sales"], {"n": 3})
+    assert job_runner.run_pending() == 1
+
+    job = app_client.get(f"/jobs/{job_id}", headers=auth_headers("sales")).json()
+    assert job["status"] == "done"
+    assert job["result"] == {"counted": 3}
+    assert (job["progress"], job["total"]) == (3, 3)
+    artifact = app_client.get(job["artifact_url"], headers=auth_headers("sales"))
+    assert artifact.content == b"ok"
+
+    # Andamento para o dono: na fila, em execução (1, 2, 3) e concluída
+    updates = [(job["status"], job["progress"]) for user_id, job in pushed if job["id"] == job_id]
+    assert all(user_id == users["sales"] for user_id, _ in pushed)
+    assert updates[0] == ("queued", 0)
+    assert ("running", 2) in updates
+    assert updates[-1] == ("done", 3)
+
+    assert job_id in [j["id"] for j in app_client.get("/jobs/", headers=auth_headers("sales")).json()]
+    assert app_client.get(f"/jobs/{job_id}", headers=auth_headers("manager")).status_code == 404
+    assert app_client.get(f"/jobs/{job_id}", headers=auth_headers("admin")).status_code == 200
+    assert app_client.post(f"/jobs/{job_id}/cancel", headers=auth_headers("sales")).status_code == 409
+
+
+def test_cancel_queued_job_never_runs(app_client, auth_headers, users, handler):
+    calls = []
+    handler("test_never", lambda ctx: calls.append(ctx.id))
+    job_id = _submit("test_never", users["sales"])
+
+    response = app_client.post(f"/jobs/{job_id}/cancel", headers=auth_headers("sales"))
+    assert response.json()["status"] == "cancelled"
+    assert job_runner.run_pending() == 0
+    assert calls == []
+
+
+def test_cancel_running_job_stops_at_next_progress(users, handler):
+    def loop(ctx):
+        for index in range(1, 100):
+            if index == 5:
+                # Outra requisição pede o cancelamento no meio da execução
+                with Session(engine) as session:
+                    job_runner.cancel(session, session.get(Job, ctx.id))
+            ctx.progress(index, force=True)
+        return {"finished": True}
+
+    handler("test_loop", loop)
+    job_id = _submit("test_loop", users["sales"])
+    job_runner.run_pending()
+
+    job = _job(job_id)
+    assert job.status == "cancelled"
+    assert job.progress == 5
+    assert job.result is None
+
+
+def test_failed_job_keeps_error_and_drops_partial_artifact(users, handler):
+    paths = []
+
+    def fail(ctx):
+        path = ctx.artifact("parcial.csv", "text/csv")
+        paths.append(path)
+        with open(path, "w") as f:
+            f.write("metade")
+        raise RuntimeError("banco fora do ar")
+
+    handler("test_fail", fail)
+    job_id = _submit("test_fail", users["sales"])
+    job_runner.run_pending()
+
+    job = _job(job_id)
+    assert job.status == "error"
+    assert job.error == "banco fora do ar"
+    assert job.artifact_path is None
+    assert not __import__("os").path.exists(paths[0])
+
+
+def test_shutdown_requeues_running_job(users, handler):
+    runner = JobRunner()
+
+    def interrupted(ctx):
+        runner.stopping.set()  # Desligamento chegou durante a tarefa
+        ctx.progress(1)
+
+    handler("test_interrupted", interrupted)
+    job_id = _submit("test_interrupted", users["sales"])
+    runner.run_pending()
+
+    job = _job(job_id)
+    assert job.status == "queued"
+    assert job.worker is None
+    HANDLERS.pop("test_interrupted")
+    job_runner.run_pending()  # Sem o tipo registrado: vira erro e sai da fila
+    assert _job(job_id).status == "error"
+
+
+def test_stale_running_jobs_are_recovered(users):
+    old = datetime.utcnow() - timedelta(seconds=runner_module.JOB_STALE_SECONDS + 60)
+    with Session(engine) as session:
+        retry = Job(kind="report_export", status="running", user_id=users["sales"], attempts=1, heartbeat_at=old)
+        exhausted = Job(kind="report_export", status="running", user_id=users["sales"],
+                        attempts=runner_module.JOB_MAX_ATTEMPTS, heartbeat_at=old)
+        alive = Job(kind="report_export", status="running", user_id=users["sales"], attempts=1,
+                    heartbeat_at=datetime.utcnow())
+        session.add_all([retry, exhausted, alive])
+        session.commit()
+        ids = retry.id, exhausted.id, alive.id
+
+    JobRunner()._recover_stale()
+    assert [_job(i).status for i in ids] == ["queued", "error", "running"]
+
+    with Session(engine) as session:
+        for job_id in ids:
+            session.delete(session.get(Job, job_id))
+        session.commit()
+
+
+def test_concurrency_limits():
+    runner = JobRunner(concurrency=2)
+    HANDLERS["test_a"] = (lambda ctx: None, 1)
+    HANDLERS["test_b"] = (lambda ctx: None, 2)
+    try:
+        runner._running = {"test_a": 1}
+        assert "test_a" not in runner._available_kinds()
+        assert "test_b" in runner._available_kinds()
+        runner._running = {"test_a": 1, "test_b": 1}
+        assert runner._available_kinds() == []
+    finally:
+        HANDLERS.pop("test_a")
+        HANDLERS.pop("test_b")
+
+
+# --- Tipos registrados ---
+
+def test_bulk_customer_status_above_limit_runs_as_job(app_client, auth_headers, seed, monkeypatch):
+    import routers.customers
+    import services.job_handlers
+
+    monkeypatch.setattr(routers.customers, "BULK_STATUS_MAX_IDS", 2)
+    monkeypatch.setattr(services.job_handlers, "BULK_STATUS_MAX_IDS", 2)
+    ids = seed(5)
+
+    response = app_client.patch(
+        "/customers/status", json={"ids": ids + [999999], "status": "inativo"}, headers=auth_headers("admin")
+    )
+    assert response.status_code == 202, response.text
+    assert job_runner.run_pending() == 1
+
+    job = app_client.get(response.json()["status_url"], headers=auth_headers("admin")).json()
+    assert job["status"] == "done", job
+    assert job["result"]["updated"] == 5
+    assert job["result"]["failed"] == 1
+    assert (job["progress"], job["total"]) == (6, 6)
+
+
+def test_pdf_batch_zips_each_quote(app_client, auth_headers, seed):
+    from sqlmodel import select
+    from models import Quote
+
+    customer_ids = seed(2)
+    with Session(engine) as session:
+        quotes = session.exec(select(Quote.id, Quote.quote_number).where(Quote.customer_id.in_(customer_ids))).all()
+
+    headers = auth_headers("sales")
+    response = app_client.post("/quotes/pdf-batch", json={"ids": [q.id for q in quotes]}, headers=headers)
+    assert response.status_code == 202, response.text
+    job_runner.run_pending()
+
+    job = app_client.get(response.json()["status_url"], headers=headers).json()
+    assert job["status"] == "done", job
+    archive = zipfile.ZipFile(io.BytesIO(app_client.get(job["artifact_url"], headers=headers).content))
+    assert sorted(archive.namelist()) == sorted(f"{q.quote_number}.pdf" for q in quotes)
+    assert archive.read(archive.namelist()[0]).startswith(b"%PDF")
+
+
+def test_approval_reminders_require_manager(app_client, auth_headers):
+    assert app_client.post("/quotes/approval-reminders", json={"days": 7},
+                           headers=auth_headers("sales")).status_code == 403
+
+    response = app_client.post("/quotes/approval-reminders", json={"days": 7}, headers=auth_headers("manager"))
+    assert response.status_code == 202, response.text
+    job_runner.run_pending()
+    job = app_client.get(response.json()["status_url"], headers=auth_headers("manager")).json()
+    assert job["status"] == "done", job
+    assert set(job["result"]) == {"quotes", "sent", "failed", "skipped_without_email"}
+
+
+def test_interrupted_reminders_resume_without_resending(users, seed, monkeypatch):
+    import email_service
+    from sqlmodel import select
+    from models import Customer, Quote
+
+    customer_ids = seed(3)
+    with Session(engine) as session:
+        quotes = session.exec(select(Quote).where(Quote.customer_id.in_(customer_ids))).all()
+        for quote in quotes:
+            quote.status = "enviado"
+            quote.sent_at = datetime.utcnow() - timedelta(days=10)
+            session.add(quote)
+            customer = session.get(Customer, quote.customer_id)
+            customer.email = f"cliente{customer.id}@teste.com"
+            session.add(customer)
+        session.commit()
+        numbers = sorted(q.quote_number for q in quotes)
+
+    runner = JobRunner()
+    sent = []
+
+    def fake_send(quote_number, **kwargs):
+        sent.append(quote_number)
+        runner.stopping.set()  # Desligamento logo depois do primeiro email
+        return True
+
+    monkeypatch.setattr(email_service, "send_quote_approval_reminder", fake_send)
+    job_id = _submit("quote_reminders", users["manager"], {"days": 7})
+    runner.run_pending()
+    assert _job(job_id).status == "queued"
+    assert len(sent) == 1
+
+    # Nova execução (outro processo) continua sem reenviar o primeiro
+    job_runner.run_pending()
+    job = _job(job_id)
+    assert job.status == "done"
+    assert sorted(sent) == numbers
+    assert job.result["sent"] == 2
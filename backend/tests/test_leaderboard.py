@@ -0,0 +1,140 @@
+"""
+Leaderboard de vendedores (services/leaderboard.py): os contadores em
+memória, atualizados após cada commit, precisam bater com uma recontagem
+no banco; a reconciliação corrige escritas que não passaram pelos eventos.
+"""
+
+from sqlalchemy import case, update
+from sqlmodel import Session, func, select
+
+from database import engine
+from models import Customer, Quote, User
+from services.leaderboard import leaderboard
+
+
+def _recount() -> dict:
+    """Mesmas métricas calculadas com GROUP BY"""
+    with Session(engine) as session:
+        customers = dict(session.exec(
+            select(Customer.salesperson_id, func.count(Customer.id))
+            .where(Customer.status != "excluido").group_by(Customer.salesperson_id)
+        ).all())
+        quotes = {
+            row[0]: row[1:] for row in session.exec(
+                select(
+                    Customer.salesperson_id,
+                    func.sum(case((Quote.status.in_(["rascunho", "enviado"]), 1), else_=0)),
+                    func.sum(case((Quote.status.in_(["aprovado", "faturado"]), Quote.total), else_=0.0)),
+                    func.sum(case((Quote.status == "faturado", Quote.total), else_=0.0)),
+                ).join(Customer, Customer.id == Quote.customer_id).group_by(Customer.salesperson_id)
+            ).all()
+        }
+        salespeople = session.exec(select(User.id, User.name).where(User.role_id.isnot(None))).all()
+    return {
+        user_id: {
+            "name": name,
+            "customers": customers.get(user_id, 0),
+            "open_quotes": int(quotes.get(user_id, (0, 0, 0))[0] or 0),
+            "approved_revenue": round(float(quotes.get(user_id, (0, 0, 0))[1] or 0), 2),
+            "billed_revenue": round(float(quotes.get(user_id, (0, 0, 0))[2] or 0), 2),
+        }
+        for user_id, name in salespeople
+    }
+
+
+def _served(app_client, auth_headers, metric="customers") -> dict:
+    response = app_client.get("/dashboard/leaderboard", params={"metric": metric, "limit": 100},
+                              headers=auth_headers("sales"))
+    assert response.status_code == 200, response.text
+    return {row.pop("salesperson_id"): row for row in response.json()}
+
+
+def test_incremental_updates_match_recount(app_client, auth_headers, users, seed):
+    reconciliations = leaderboard.stats["reconciliations"]
+    before = _served(app_client, auth_headers)
+    customer_ids = seed(4)
+
+    served = _served(app_client, auth_headers)
+    assert served == _recount()
+    assert served[users["sales"]]["customers"] == before[users["sales"]]["customers"] + 2
+    assert leaderboard.stats["reconciliations"] == reconciliations
+
+    # Aprovar um orçamento em aberto
+    with Session(engine) as session:
+        quote = session.exec(
+            select(Quote).where(Quote.customer_id.in_(customer_ids), Quote.status.in_(["rascunho", "enviado"]))
+        ).first()
+        owner = session.get(Customer, quote.customer_id).salesperson_id
+        quote.status = "aprovado"
+        session.add(quote)
+        session.commit()
+        total = quote.total
+    after = _served(app_client, auth_headers)
+    assert after[owner]["open_quotes"] == served[owner]["open_quotes"] - 1
+    assert after[owner]["approved_revenue"] == round(served[owner]["approved_revenue"] + total, 2)
+    assert after == _recount()
+
+
+def test_reassigning_customer_moves_its_quotes(app_client, auth_headers, users, seed):
+    customer_id = seed(1)[0]
+    with Session(engine) as session:
+        customer = session.get(Customer, customer_id)
+        old_owner = customer.salesperson_id
+        new_owner = users["admin"]
+        before = _served(app_client, auth_headers)
+        customer.salesperson_id = new_owner
+        session.add(customer)
+        session.commit()
+
+    after = _served(app_client, auth_headers)
+    assert after[old_owner]["customers"] == before[old_owner]["customers"] - 1
+    assert after[new_owner]["customers"] == before[new_owner]["customers"] + 1
+    assert after == _recount()
+
+
+def test_bulk_status_and_delete_update_counters(app_client, auth_headers, users, seed):
+    ids = seed(3)
+    before = _served(app_client, auth_headers)
+
+    # PATCH em lote grava com Core (track_leaderboard_change)
+    response = app_client.patch("/customers/status", json={"ids": ids[:2], "status": "excluido"},
+                                headers=auth_headers("admin"))
+    assert response.status_code == 200, response.text
+    assert app_client.delete(f"/customers/{ids[2]}", headers=auth_headers("admin")).status_code == 200
+
+    after = _served(app_client, auth_headers)
+    removed = sum(before[u]["customers"] - after[u]["customers"] for u in after)
+    assert removed == 3
+    assert after == _recount()
+
+
+def test_reconciliation_corrects_untracked_writes(app_client, auth_headers, seed):
+    ids = seed(2)
+    with Session(engine) as session:
+        # UPDATE com Core sem track_leaderboard_change (como um script ou outro processo)
+        session.execute(update(Quote).where(Quote.customer_id.in_(ids)).values(status="faturado"))
+        session.commit()
+    assert _served(app_client, auth_headers) != _recount()
+
+    corrections = leaderboard.stats["corrections"]
+    with Session(engine) as session:
+        result = leaderboard.build(session)
+    assert result["corrections"] >= 1
+    assert leaderboard.stats["corrections"] == corrections + result["corrections"]
+    assert _served(app_client, auth_headers) == _recount()
+
+
+def test_ranking_order_and_validation(app_client, auth_headers):
+    response = app_client.get("/dashboard/leaderboard", params={"metric": "approved_revenue", "limit": 100},
+                              headers=auth_headers("sales"))
+    revenues = [row["approved_revenue"] for row in response.json()]
+    assert revenues == sorted(revenues, reverse=True)
+
+    assert app_client.get("/dashboard/leaderboard", params={"metric": "nome"},
+                          headers=auth_headers("sales")).status_code == 400
+    assert app_client.get("/dashboard/leaderboard/stats", headers=auth_headers("sales")).status_code == 403
+    assert app_client.get("/dashboard/leaderboard/stats", headers=auth_headers("admin")).json()["updates"] > 0
+
+    top = app_client.get("/dashboard/stats", headers=auth_headers("sales")).json()["top_salespeople"]
+    assert len(top) <= 5
+    assert all(row["total_customers"] == row["customers"] for row in top)
@@ -0,0 +1,142 @@
+"""
+Orçamento de consultas SQL por endpoint e detecção de N+1.
+
+- test_endpoint_query_budget: cada rota tem um número máximo de consultas
+  por requisição (medido com cache aquecido: a primeira chamada carrega
+  catálogo/typeahead e não conta). Se uma mudança legítima precisar de
+  mais consultas, ajuste o orçamento no mesmo commit e explique o porquê.
+- test_query_count_does_not_grow_with_rows: a mesma requisição, antes e
+  depois de inserir mais registros, deve fazer o mesmo número de consultas.
+  Laços com session.get()/lazy load por linha (ex.: um SELECT de cliente
+  por orçamento em /reports/top-customers) fazem o número crescer.
+
+    pytest backend/tests                                    # SQLite temporário
+    TEST_DATABASE_URL=postgresql://... pytest backend/tests  # Postgres descartável
+"""
+
+import pytest
+
+# (cargo, rota, máximo de consultas). {customer_id}/{quote_id} apontam para
+# um cliente do vendedor, visível para os três cargos.
+BUDGETS = [
+    ("admin", "/customers/", 4),
+    ("manager", "/customers/", 4),
+    ("sales", "/customers/", 4),
+    ("sales", "/customers/{customer_id}", 3),
+    ("sales", "/customers/{customer_id}/notes", 4),
+    ("sales", "/customers/search?q=cliente", 3),
+    ("admin", "/customers/trash", 3),
+    ("admin", "/products/", 2),
+    ("admin", "/services/", 2),
+    ("sales", "/quotes/", 4),
+    ("admin", "/quotes/", 4),
+    ("sales", "/quotes/{quote_id}", 3),
+    ("sales", "/quotes/customer/{customer_id}", 4),
+    ("admin", "/dashboard/stats", 22),
+    ("sales", "/dashboard/stats", 22),
+    ("admin", "/dashboard/quotes-timeline", 3),
+    ("admin", "/dashboard/revenue-by-month", 3),
+    ("admin", "/reports/sales-by-period", 3),
+    ("admin", "/reports/products-most-sold", 3),
+    ("admin", "/reports/services-most-sold", 3),
+    ("admin", "/reports/top-customers", 3),
+    ("admin", "/reports/summary", 7),
+    ("admin", "/audit/customer/{customer_id}", 3),
+    ("sales", "/typeahead/customers?q=cli", 2),
+    ("sales", "/typeahead/products?q=cai", 2),
+    ("sales", "/feed/", 3),
+    ("sales", "/notifications/", 3),
+    ("admin", "/users/", 2),
+]
+
+# Rotas de listagem/agregação: o número de consultas não pode depender do volume
+SCALING = [
+    ("admin", "/customers/"),
+    ("manager", "/customers/"),
+    ("sales", "/customers/search?q=cliente"),
+    ("admin", "/quotes/"),
+    ("sales", "/quotes/"),
+    ("admin", "/dashboard/stats"),
+    ("admin", "/reports/sales-by-period"),
+    ("admin", "/reports/products-most-sold"),
+    ("admin", "/reports/services-most-sold"),
+    ("admin", "/reports/top-customers"),
+    ("admin", "/reports/summary"),
+    ("admin", "/feed/"),
+    ("admin", "/products/"),
+    ("admin", "/services/"),
+]
+
+
+@pytest.fixture(scope="module")
+def dataset(seed, users):
+    """Base inicial: alguns clientes com orçamento, nota e atividade"""
+    from sqlmodel import Session, select
+    from database import engine
+    from models import Customer, Quote
+
+    customer_ids = seed(6)
+    with Session(engine) as session:
+        customer = session.exec(
+            select(Customer)
+            .where(Customer.id.in_(customer_ids), Customer.salesperson_id == users["sales"])
+            .order_by(Customer.id)
+        ).first()
+        quote = session.exec(select(Quote).where(Quote.customer_id == customer.id)).first()
+        return {"customer_id": customer.id, "quote_id": quote.id}
+
+
+def _measure(client, count_queries, headers, path):
+    """Número de consultas da requisição, com cache já aquecido"""
+    warmup = client.get(path, headers=headers)
+    assert warmup.status_code == 200, f"{path}: {warmup.status_code} {warmup.text[:200]}"
+    with count_queries() as log:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, f"{path}: {response.status_code} {response.text[:200]}"
+    return log
+
+
+@pytest.mark.parametrize("role, path, budget", BUDGETS)
+def test_endpoint_query_budget(app_client, auth_headers, count_queries, dataset, role, path, budget):
+    log = _measure(app_client, count_queries, auth_headers(role), path.format(**dataset))
+    assert log.count <= budget, f"{role} GET {path}: orçamento {budget}, " + log.describe()
+
+
+@pytest.mark.parametrize("role, path", SCALING)
+def test_query_count_does_not_grow_with_rows(app_client, auth_headers, count_queries, dataset, seed, role, path):
+    headers = auth_headers(role)
+    before = _measure(app_client, count_queries, headers, path)
+    seed(15)
+    after = _measure(app_client, count_queries, headers, path)
+    assert after.count == before.count, (
+        f"{role} GET {path}: {before.count} -> {after.count} consultas com mais registros "
+        f"(provável N+1)\n" + after.describe()
+    )
+
+
+def test_create_quote_query_count_independent_of_items(app_client, auth_headers, count_queries, catalog, dataset):
+    headers = auth_headers("sales")
+
+    def create(item_count):
+        items = [
+            {"type": "product", "item_id": catalog["product"], "name": "Caixa de Som",
+             "quantity": 1, "unit_price": 100.0, "subtotal": 100.0}
+            for _ in range(item_count)
+        ] + [
+            {"type": "service", "item_id": catalog["service"], "name": "Instalação",
+             "quantity": 1, "unit_price": 50.0, "subtotal": 50.0}
+            for _ in range(item_count)
+        ]
+        with count_queries() as log:
+            response = app_client.post(
+                "/quotes/", json={"customer_id": dataset["customer_id"], "items": items}, headers=headers
+            )
+        assert response.status_code == 200, response.text
+        return log
+
+    create(1)  # aquecimento
+    single = create(1)
+    many = create(20)
+    assert many.count == single.count, (
+        f"POST /quotes/: {single.count} consultas com 2 itens, {many.count} com 40\n" + many.describe()
+    )
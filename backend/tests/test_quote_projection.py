@@ -0,0 +1,92 @@
+"""
+Leitura de orçamentos (services/quote_projection.py): visões summary e
+detail, itens repassados como texto e aceitos nos dois formatos gravados.
+
+Substitui o caminho rápido de serialization.py (items_fragment/quote_payload,
+testado em test_serialization.py): as rotas continuam no formato QuoteRead.
+"""
+
+import orjson
+import pytest
+
+from schemas import QuoteRead
+from services.quote_projection import QuoteProjection
+
+ITEMS = [{"type": "product", "item_id": 1, "name": "Caixa", "quantity": 2, "unit_price": 5.0, "subtotal": 10.0}]
+
+
+@pytest.mark.parametrize("stored", [ITEMS, orjson.dumps(ITEMS).decode()], ids=["lista", "string"])
+def test_items_accept_list_and_encoded_string(stored):
+    column_text = orjson.dumps(stored).decode()
+    assert orjson.loads(orjson.dumps(QuoteProjection.items_fragment(column_text))) == ITEMS
+    assert QuoteProjection.decode_items(column_text) == ITEMS
+    assert QuoteProjection.decode_items(stored) == ITEMS
+    assert orjson.loads(orjson.dumps(QuoteProjection.items_fragment(None))) == []
+
+
+@pytest.fixture
+def quote_with_items(app_client, auth_headers, seed, catalog):
+    customer_id = seed(1)[0]
+    created = app_client.post("/quotes/", json={"customer_id": customer_id, "items": [
+        {"type": "product", "item_id": catalog["product"], "name": "Caixa de Som",
+         "quantity": 2, "unit_price": 100.0, "subtotal": 200.0},
+    ]}, headers=auth_headers("admin"))
+    assert created.status_code == 200, created.text
+    return customer_id, created.json()
+
+
+def _is_quote_read(quote) -> bool:
+    return QuoteRead.model_validate(quote).model_dump(mode="json") == quote
+
+
+def test_quote_routes_keep_quote_read_shape(app_client, auth_headers, quote_with_items):
+    customer_id, created = quote_with_items
+    headers = auth_headers("admin")
+    assert _is_quote_read(created)
+
+    detail = app_client.get(f"/quotes/{created['id']}", headers=headers)
+    assert detail.status_code == 200
+    assert detail.json() == created
+
+    listing = app_client.get(f"/quotes/?customer_id={customer_id}&view=detail", headers=headers).json()
+    by_customer = app_client.get(f"/quotes/customer/{customer_id}", headers=headers).json()
+    assert len(listing["items"]) == len(by_customer["quotes"]) == 2
+    for quote in listing["items"] + by_customer["quotes"]:
+        assert _is_quote_read(quote)
+
+    changed = app_client.patch(f"/quotes/{created['id']}/status", json={"new_status": "enviado"}, headers=headers)
+    assert changed.status_code == 200, changed.text
+    assert _is_quote_read(changed.json())
+    assert changed.json()["items"] == created["items"]
+
+    # Visão padrão (summary): colunas da tabela com os nomes do QuoteRead, sem os itens
+    summary = app_client.get(f"/quotes/?customer_id={customer_id}", headers=headers).json()["items"][0]
+    assert "items" not in summary
+    assert set(summary) - {"items_count"} <= set(QuoteRead.model_fields)
+
+
+def test_summary_view_counts_items_without_loading_them(app_client, auth_headers, quote_with_items, count_queries):
+    from sqlmodel import Session
+    from database import engine
+    from models import Quote
+
+    customer_id, created = quote_with_items
+    headers = auth_headers("admin")
+    # Formato antigo da API: lista dentro de string JSON
+    with Session(engine) as session:
+        quote = session.get(Quote, created["id"])
+        quote.items = orjson.dumps(quote.items).decode()
+        session.add(quote)
+        session.commit()
+    assert app_client.get(f"/quotes/{created['id']}", headers=headers).json()["items"] == created["items"]
+
+    with count_queries() as log:
+        listing = app_client.get(f"/quotes/?customer_id={customer_id}", headers=headers).json()
+    summaries = {quote["id"]: quote for quote in listing["items"]}
+    assert "items" not in summaries[created["id"]]
+    assert summaries[created["id"]]["items_count"] == 1
+    # Orçamento do seed (lista) e o do formato antigo contam no banco
+    assert sorted(quote["items_count"] for quote in listing["items"]) == [1, 2]
+    page_query = [statement for statement in log.statements if "LIMIT" in statement.upper()]
+    # A coluna de itens só aparece dentro do items_count (expressão CASE, última coluna)
+    assert page_query and "quote.items" not in page_query[0].split("FROM")[0].split("CASE")[0]
@@ -0,0 +1,93 @@
+"""
+Exportação de relatórios (services/report_export.py): CSV em streaming,
+XLSX e exportações grandes como tarefa (job_runner.py).
+"""
+
+import csv
+import io
+
+import pytest
+
+PERIOD = {"start_date": "2000-01-01T00:00:00", "end_date": "2100-01-01T00:00:00"}
+
+
+def _quote_count():
+    from sqlmodel import Session, func, select
+    from database import engine
+    from models import Quote
+
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(Quote)).one()
+
+
+def _csv_rows(content: bytes):
+    assert content.startswith(b"\xef\xbb\xbf")
+    return list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+
+
+def test_quotes_csv_has_every_quote(app_client, auth_headers, seed):
+    seed(5)
+    response = app_client.get("/reports/export/quotes", params=PERIOD, headers=auth_headers("admin"))
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment; filename=orcamentos_" in response.headers["content-disposition"]
+
+    rows = _csv_rows(response.content)
+    assert rows[0][0] == "Número"
+    assert len(rows) - 1 == _quote_count()
+    # Itens contados no banco (o seed grava 2 por orçamento)
+    assert all(row[6] == "2" for row in rows[1:] if row[0].startswith("ORC-TESTE-"))
+
+
+def test_sales_by_period_csv_matches_json(app_client, auth_headers, seed):
+    seed(8)
+    headers = auth_headers("admin")
+    report = app_client.get("/reports/sales-by-period", params=PERIOD, headers=headers).json()
+    rows = _csv_rows(app_client.get("/reports/export/sales-by-period", params=PERIOD, headers=headers).content)
+
+    assert sum(int(row[1]) for row in rows[1:]) == report["total_quotes"]
+    assert sum(float(row[2]) for row in rows[1:]) == pytest.approx(report["total_sales"])
+
+
+def test_top_customers_xlsx(app_client, auth_headers, seed):
+    from openpyxl import load_workbook
+
+    seed(3)
+    response = app_client.get(
+        "/reports/export/top-customers", params={**PERIOD, "format": "xlsx"}, headers=auth_headers("admin")
+    )
+    assert response.status_code == 200, response.text
+    sheet = load_workbook(io.BytesIO(response.content), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][:2] == ("ID Cliente", "Cliente")
+    assert len(rows) > 1
+    assert all(isinstance(row[3], (int, float)) for row in rows[1:])  # Número, não texto
+
+
+def test_unknown_report_is_404(app_client, auth_headers):
+    assert app_client.get("/reports/export/summary", headers=auth_headers("admin")).status_code == 404
+
+
+def test_large_export_runs_as_job(app_client, auth_headers, seed, monkeypatch, tmp_path):
+    import job_runner as runner_module
+    import routers.reports
+    from job_runner import job_runner
+
+    monkeypatch.setattr(routers.reports, "EXPORT_BACKGROUND_ROWS", 0)
+    monkeypatch.setattr(runner_module, "JOB_ARTIFACT_DIR", str(tmp_path))
+    seed(2)
+
+    response = app_client.get("/reports/export/quotes", params=PERIOD, headers=auth_headers("sales"))
+    assert response.status_code == 202, response.text
+    job = response.json()
+    assert job["kind"] == "report_export"
+    assert job["status"] == "queued"
+
+    assert job_runner.run_pending() == 1
+    status = app_client.get(job["status_url"], headers=auth_headers("sales")).json()
+    assert status["status"] == "done", status
+    assert status["result"]["rows"] == _quote_count()
+
+    download = app_client.get(status["artifact_url"], headers=auth_headers("sales"))
+    assert download.status_code == 200
+    assert len(_csv_rows(download.content)) - 1 == status["result"]["rows"]
@@ -0,0 +1,107 @@
+"""
+Reservas de estoque (services/reservation_service.py): um orçamento segura
+as unidades dos produtos enquanto está aprovado ou faturado.
+
+A aprovação concorrente depende do SELECT ... FOR UPDATE e só roda com
+TEST_DATABASE_URL apontando para um Postgres (o SQLite ignora o lock).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from database import engine
+from models import Quote, StockReservation, User
+from services.quote_service import QuoteService
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+def _set_status(app_client, auth_headers, quote_id, status):
+    return app_client.patch(f"/quotes/{quote_id}/status", json={"new_status": status},
+                            headers=auth_headers("admin"))
+
+
+def _reservations(quote_id):
+    with Session(engine) as session:
+        return [r.status for r in session.exec(
+            select(StockReservation).where(StockReservation.quote_id == quote_id).order_by(StockReservation.id)
+        ).all()]
+
+
+def test_approve_reserves_and_blocks_oversell(app_client, auth_headers, make_quote):
+    first, second = make_quote(), make_quote()
+    assert _set_status(app_client, auth_headers, first, "aprovado").status_code == 200
+    assert _reservations(first) == ["ativa"]
+
+    response = _set_status(app_client, auth_headers, second, "aprovado")
+    assert response.status_code == 409
+    assert _reservations(second) == []
+
+    # Faturar mantém a reserva; cancelar libera e o estoque volta
+    assert _set_status(app_client, auth_headers, first, "faturado").status_code == 200
+    assert _reservations(first) == ["ativa"]
+    assert _set_status(app_client, auth_headers, first, "cancelado").status_code == 200
+    assert _reservations(first) == ["liberada"]
+    assert _set_status(app_client, auth_headers, second, "aprovado").status_code == 200
+
+
+def test_back_to_draft_releases_and_reapproval_checks_stock(app_client, auth_headers, make_quote):
+    first, second = make_quote(), make_quote()
+    _set_status(app_client, auth_headers, first, "aprovado")
+    assert _set_status(app_client, auth_headers, first, "rascunho").status_code == 200
+    assert _reservations(first) == ["liberada"]
+
+    # O estoque liberado foi para outro orçamento: reaprovar confere de novo
+    assert _set_status(app_client, auth_headers, second, "aprovado").status_code == 200
+    assert _set_status(app_client, auth_headers, first, "aprovado").status_code == 409
+    assert _reservations(first) == ["liberada"]
+
+
+def test_billing_without_approval_reserves(app_client, auth_headers, make_quote):
+    first, second = make_quote(), make_quote()
+    _set_status(app_client, auth_headers, first, "enviado")
+    assert _set_status(app_client, auth_headers, first, "faturado").status_code == 200
+    assert _reservations(first) == ["ativa"]
+    assert _set_status(app_client, auth_headers, second, "faturado").status_code == 409
+
+
+def test_delete_quote_with_reservations(app_client, auth_headers, make_quote):
+    released, active = make_quote(), make_quote()
+    _set_status(app_client, auth_headers, released, "aprovado")
+    _set_status(app_client, auth_headers, released, "recusado")
+    _set_status(app_client, auth_headers, active, "aprovado")
+
+    for quote_id in (released, active):
+        assert app_client.delete(f"/quotes/{quote_id}", headers=auth_headers("admin")).status_code == 200
+        assert _reservations(quote_id) == []
+
+    # Unidades do orçamento apagado voltaram para o estoque
+    assert _set_status(app_client, auth_headers, make_quote(), "aprovado").status_code == 200
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL.startswith("postgresql"), reason="FOR UPDATE exige Postgres")
+def test_concurrent_approvals_do_not_oversell(users, make_quote):
+    quote_ids = [make_quote(quantity=1) for _ in range(6)]
+    barrier = threading.Barrier(len(quote_ids))
+
+    def approve(quote_id):
+        with Session(engine) as session:
+            quote = session.get(Quote, quote_id)
+            user = session.get(User, users["admin"])
+            barrier.wait()
+            try:
+                QuoteService.update_quote_status(session, quote, "aprovado", user)
+                return True
+            except HTTPException as e:
+                assert e.status_code == 409
+                return False
+
+    with ThreadPoolExecutor(len(quote_ids)) as executor:
+        approved = list(executor.map(approve, quote_ids))
+
+    assert sum(approved) == 2  # Produto tem 2 unidades
+    assert sum(_reservations(q) == ["ativa"] for q in quote_ids) == 2
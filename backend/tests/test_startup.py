@@ -0,0 +1,46 @@
+"""
+Inicialização (startup.py): cargos padrão sincronizados por checksum.
+"""
+
+from sqlmodel import Session, select
+
+from database import engine
+from models import Role
+from startup import DEFAULT_ROLES, sync_default_roles
+
+
+def _role(session, slug) -> Role:
+    return session.exec(select(Role).where(Role.slug == slug)).one()
+
+
+def test_sync_keeps_edited_name_and_restores_permissions(app_client):
+    expected = next(r for r in DEFAULT_ROLES if r["slug"] == "sales")
+    with Session(engine) as session:
+        role = _role(session, "sales")
+        original = role.name, role.description
+        role.name = "Consultor Comercial"
+        role.description = "Renomeado pelo administrador"
+        session.add(role)
+        session.commit()
+
+    try:
+        # Só nome/descrição diferem: nada a gravar
+        assert sync_default_roles() == []
+
+        with Session(engine) as session:
+            role = _role(session, "sales")
+            role.permissions = {**expected["permissions"], "can_delete_customers": True}
+            session.add(role)
+            session.commit()
+
+        assert sync_default_roles() == ["sales"]
+        with Session(engine) as session:
+            role = _role(session, "sales")
+            assert role.permissions == expected["permissions"]
+            assert (role.name, role.description) == ("Consultor Comercial", "Renomeado pelo administrador")
+    finally:
+        with Session(engine) as session:
+            role = _role(session, "sales")
+            role.name, role.description = original
+            session.add(role)
+            session.commit()
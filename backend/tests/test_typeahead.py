@@ -0,0 +1,102 @@
+"""
+Índice de prefixos do typeahead (services/typeahead_service.py): ordem dos
+resultados, partição dos clientes por vendedor e o limite de varredura.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import services.typeahead_service as typeahead
+from services.typeahead_service import PrefixIndex, TypeaheadIndex
+
+
+def _customer(doc_id, name, salesperson_id, status="ativo"):
+    return {"id": doc_id, "name": name, "fantasy_name": None, "document": None,
+            "status": status, "salesperson_id": salesperson_id}
+
+
+def _sales_user(user_id):
+    return SimpleNamespace(id=user_id, role=SimpleNamespace(slug="sales", permissions={}))
+
+
+@pytest.fixture
+def customers():
+    """Pior caso: milhares de clientes de outro vendedor antes dos visíveis"""
+    index = PrefixIndex(("name", "fantasy_name", "document"), partition="salesperson_id")
+    hidden = [_customer(n, f"Silva Alfa {n:05d}", 1) for n in range(1, 20001)]
+    visible = [_customer(30000 + n, f"Silva Zeta {n}", 2) for n in range(6)]
+    index.load(hidden + visible)
+    return index
+
+
+def test_prefix_matches_come_before_inner_words():
+    index = PrefixIndex(("name",))
+    index.load([{"id": 1, "name": "Maria Silva"}, {"id": 2, "name": "Silvana Costa"},
+                {"id": 3, "name": "Joao da Silva"}])
+    assert [doc["id"] for doc in index.search("silva")] == [2, 1, 3]
+    assert [doc["id"] for doc in index.search("joao sil")] == [3]
+
+
+def test_partition_scan_never_touches_hidden_customers(customers, monkeypatch):
+    # Com a partição, as chaves dos outros vendedores nem entram na varredura
+    monkeypatch.setattr(typeahead, "SCAN_LIMIT", 10)
+    results, truncated = customers.scan("s", limit=10, partitions={2})
+    assert not truncated
+    assert [doc["id"] for doc in results] == [30000 + n for n in range(6)]
+
+    results, _ = customers.scan("s", limit=3, partitions={2, 99})  # Vendedor sem clientes
+    assert [doc["id"] for doc in results] == [30000, 30001, 30002]
+
+
+def test_several_partitions_merge_in_key_order():
+    index = PrefixIndex(("name",), partition="salesperson_id")
+    index.load([_customer(1, "Carla", 1), _customer(2, "Bruno", 2), _customer(3, "Ana", 1),
+                _customer(4, "Beatriz", 3)])
+    assert [doc["id"] for doc in index.search("b", 10, partitions={1, 2, 3})] == [4, 2]
+    assert [doc["id"] for doc in index.search("a", 10, partitions={1, 3})] == [3]
+
+
+def test_upsert_moves_customer_between_partitions():
+    index = PrefixIndex(("name",), partition="salesperson_id")
+    index.load([_customer(1, "Silva Ltda", 1)])
+    index.upsert(_customer(1, "Silva Ltda", 2))
+    assert index.search("silva", partitions={1}) == []
+    assert [doc["id"] for doc in index.search("silva", partitions={2})] == [1]
+
+    index.remove(1)
+    assert index.search("silva", partitions={2}) == []
+    assert index.search("silva") == []
+
+
+def test_filters_stop_at_scan_limit(monkeypatch):
+    monkeypatch.setattr(typeahead, "SCAN_LIMIT", 50)
+    index = PrefixIndex(("name",))
+    index.load([{"id": n, "name": f"Caixa {n}", "status": "inativo"} for n in range(1, 201)])
+    results, truncated = index.scan("caixa", allow=lambda doc: doc["status"] != "inativo")
+    assert (results, truncated) == ([], True)
+
+
+def test_customer_search_falls_back_to_database_when_truncated(customers, monkeypatch):
+    from services.customer_search import CustomerSearchService
+
+    typeahead_index = TypeaheadIndex(rebuild_interval=3600)
+    typeahead_index.indexes["customer"] = customers
+    calls = []
+
+    def database_search(session, user, query, limit):
+        calls.append(query)
+        return [SimpleNamespace(**_customer(30003, "Silva Zeta 3", 2))]
+
+    monkeypatch.setattr(CustomerSearchService, "search", staticmethod(database_search))
+
+    # Só a partição do vendedor: resolvido no índice
+    results = typeahead_index.search_customers(None, _sales_user(2), "silva zeta 3")
+    assert [doc["id"] for doc in results] == [30003]
+    assert calls == []
+
+    # Todos os clientes (admin) e a segunda palavra só bate no fim da faixa
+    admin = SimpleNamespace(id=1, role=SimpleNamespace(slug="admin", permissions={}))
+    results = typeahead_index.search_customers(None, admin, "silva zeta 3")
+    assert calls == ["silva zeta 3"]
+    assert results == [_customer(30003, "Silva Zeta 3", 2)]
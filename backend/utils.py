@@ -1,6 +1,7 @@
 from sqlmodel import Session
-from models import User, FeedItem, AuditLog
+from models import User, FeedItem
 from typing import Any, Dict
+from audit_sink import audit_sink
 
 def log_activity(session: Session, user: User, content: str, icon: str = "activity", customer_id: int = None, visibility: str = "public"):
     feed = FeedItem(
@@ -14,17 +15,18 @@ def log_activity(session: Session, user: User, content: str, icon: str = "activi
 
 def create_audit_log(session: Session, table_name: str, record_id: int, action: str, user_id: int, changes: Dict):
     """
-    Cria um registro de auditoria no banco de dados.
+    Cria um registro de auditoria.
+    Não faz commit: a linha é gravada junto com o commit da operação
+    (ou logo após ele, no modo buffered do audit_sink).
     """
-    audit = AuditLog(
+    audit_sink.write(
+        session=session,
         table_name=table_name,
         record_id=record_id,
         action=action,
         user_id=user_id,
         changes=changes
     )
-    session.add(audit)
-    session.commit()
 
 def register_audit(session: Session, user: User, obj: Any, new_data: Dict, table_name: str, action: str = "UPDATE"):
     """
@@ -55,11 +57,11 @@ def register_audit(session: Session, user: User, obj: Any, new_data: Dict, table
 
     # Só salva se houve mudança ou se é create/delete
     if changes:
-        audit = AuditLog(
+        audit_sink.write(
+            session=session,
             table_name=table_name,
             record_id=obj.id if hasattr(obj, 'id') else 0,
             action=action,
             user_id=user.id,
             changes=changes
-        )
-        session.add(audit)
\ No newline at end of file
+        )
\ No newline at end of file
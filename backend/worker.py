@@ -0,0 +1,76 @@
+"""
+Worker de Tarefas
+Executa as tarefas em segundo plano (job_runner.py) fora dos processos da
+API. Com JOB_RUNNER=off na API só os workers executam; vários podem rodar
+ao mesmo tempo (cada tarefa é pega por um só, com UPDATE condicional).
+
+Uso (dentro do container backend):
+    python worker.py                    # até SIGTERM/SIGINT
+    python worker.py --concurrency 4
+    python worker.py --once             # executa o que estiver na fila e sai
+
+O andamento chega aos usuários pelo WebSocket da API via NOTIFY, com
+WS_BUS=postgres na API e no worker. Sem o barramento (WS_BUS=local, padrão)
+não há entrega entre processos: o estado fica em /jobs/{id}, que a tela de
+relatórios consulta enquanto a tarefa roda.
+
+No SIGTERM o worker para de pegar tarefas e espera as em execução até
+JOB_SHUTDOWN_TIMEOUT; as que não terminarem voltam para a fila.
+"""
+
+import argparse
+import signal
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from connection_manager import manager
+from job_runner import HANDLERS, job_runner
+from services import job_handlers  # noqa: F401 (registra os tipos de tarefa)
+from startup import check_connection, retry_delays
+
+
+def wait_for_database() -> None:
+    delays = retry_delays()
+    for attempt in range(len(delays) + 1):
+        try:
+            check_connection()
+            return
+        except OperationalError:
+            if attempt == len(delays):
+                raise
+            print(f"⚠️ Banco ainda não está pronto ({attempt + 1}/{len(delays) + 1}). "
+                  f"Nova tentativa em {delays[attempt]:.1f}s...")
+            time.sleep(delays[attempt])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa as tarefas em segundo plano")
+    parser.add_argument("--concurrency", type=int, help="Tarefas simultâneas (padrão JOB_CONCURRENCY)")
+    parser.add_argument("--once", action="store_true", help="Executa a fila atual e sai")
+    args = parser.parse_args()
+
+    wait_for_database()
+    # Sem loop nem conexões próprias: o andamento vai direto para o NOTIFY
+    manager.use_bus = manager.bus_enabled()
+    if args.concurrency:
+        job_runner.concurrency = args.concurrency
+    print(f"📋 Tipos de tarefa: {', '.join(sorted(HANDLERS))}")
+
+    if args.once:
+        print(f"✅ {job_runner.run_pending()} tarefa(s) executada(s)")
+        return
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    job_runner.start()
+    stop.wait()
+    print("🛑 Desligando: aguardando as tarefas em execução...")
+    job_runner.stop()
+
+
+if __name__ == "__main__":
+    main()
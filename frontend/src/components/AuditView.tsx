@@ -18,6 +18,8 @@ export default function AuditView() {
   const navigate = useNavigate();
   const [auditLogs, setAuditLogs] = useState<AuditLog[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [customerName, setCustomerName] = useState('');
 
   useEffect(() => {
@@ -25,17 +27,27 @@ export default function AuditView() {
     fetchCustomerName();
   }, [id]);
 
-  const fetchAuditLogs = async () => {
+  const fetchAuditLogs = async (cursor?: string) => {
     try {
-      const response = await api.get(`/audit/customer/${id}`);
-      setAuditLogs(response.data);
+      const response = await api.get(`/audit/customer/${id}`, {
+        params: cursor ? { cursor } : {}
+      });
+      setAuditLogs(prev => cursor ? [...prev, ...response.data.items] : response.data.items);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Erro ao carregar logs de auditoria', error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
+  const loadMore = () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    fetchAuditLogs(nextCursor);
+  };
+
   const fetchCustomerName = async () => {
     try {
       const response = await api.get(`/customers/${id}`);
@@ -150,6 +162,17 @@ export default function AuditView() {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="p-4 text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-4 py-2 text-sm font-medium text-indigo-600 hover:bg-indigo-50 rounded-lg transition disabled:opacity-50"
+                >
+                  {loadingMore ? 'Carregando...' : 'Carregar mais'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -190,7 +190,12 @@ export default function Dashboard() {
             <div className="space-y-3">
               {stats.top_salespeople.map((person: any, idx: number) => (
                 <div key={idx} className="flex items-center justify-between p-3 bg-slate-50 rounded-lg">
-                  <span className="text-slate-700 font-medium">{person.name}</span>
+                  <div>
+                    <span className="text-slate-700 font-medium">{person.name}</span>
+                    <p className="text-xs text-slate-500">
+                      {person.open_quotes} em aberto · Aprovado: R$ {person.approved_revenue.toLocaleString('pt-BR', { maximumFractionDigits: 0 })}
+                    </p>
+                  </div>
                   <span className="bg-blue-100 text-blue-700 px-3 py-1 rounded-full text-sm font-semibold">
                     {person.total_customers} clientes
                   </span>
@@ -104,8 +104,8 @@ export default function Layout({ onLogout }: LayoutProps) {
                         } else {
                             console.log('❌ audioRef.current é null');
                         }
-                    } else if (data.type === 'feed_update') {
-                        console.log('📢 WS: Feed update recebido, disparando evento:', data);
+                    } else if (data.type === 'feed_update' || data.type === 'job_update') {
+                        console.log('📢 WS: Atualização recebida, disparando evento:', data);
                         const customEvent = new CustomEvent('erp-notification', { detail: data });
                         window.dispatchEvent(customEvent);
                     }
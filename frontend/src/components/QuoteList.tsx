@@ -2,33 +2,19 @@ import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../api';
 
-interface QuoteItem {
-  type: string;
-  item_id: number;
-  name: string;
-  quantity: number;
-  unit_price: number;
-  subtotal: number;
-}
-
+// Visão summary de GET /quotes/ (sem itens; ver QuoteDetail para o orçamento completo)
 interface Quote {
   id: number;
   quote_number: string;
   customer_id: number;
   customer_name?: string;
-  items: QuoteItem[];
+  items_count: number;
   subtotal: number;
   discount: number;
   discount_percent: number;
   total: number;
   status: string;
-  notes?: string;
-  payment_terms?: string;
-  delivery_terms?: string;
   valid_until?: string;
-  sent_at?: string;
-  approved_at?: string;
-  invoiced_at?: string;
   created_at: string;
   updated_at: string;
 }
@@ -247,7 +233,7 @@ export default function QuoteList() {
                   <tr key={quote.id} className="border-b hover:bg-gray-50">
                     <td className="px-3 sm:px-4 py-3 font-mono text-[11px] sm:text-sm">{quote.quote_number}</td>
                     <td className="px-3 sm:px-4 py-3">{quote.customer_name}</td>
-                    <td className="px-3 sm:px-4 py-3 text-center">{quote.items.length}</td>
+                    <td className="px-3 sm:px-4 py-3 text-center">{quote.items_count}</td>
                     <td className="px-3 sm:px-4 py-3 text-right font-semibold text-green-600">
                       R$ {quote.total.toFixed(2)}
                     </td>
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { BarChart, Bar, LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
-import { Filter } from 'lucide-react';
+import { Filter, Download } from 'lucide-react';
 import api from '../api';
 
 export default function Reports() {
@@ -15,6 +15,7 @@ export default function Reports() {
   const [startDate, setStartDate] = useState('');
   const [endDate, setEndDate] = useState('');
   const [limit, setLimit] = useState(10);
+  const [exporting, setExporting] = useState<string | null>(null);
 
   useEffect(() => {
     // Setar datas padrão (últimos 30 dias)
@@ -61,6 +62,62 @@ export default function Reports() {
     }
   };
 
+  const saveBlob = (data: Blob, filename: string) => {
+    const url = window.URL.createObjectURL(data);
+    const link = document.createElement('a');
+    link.href = url;
+    link.setAttribute('download', filename);
+    document.body.appendChild(link);
+    link.click();
+    link.parentNode?.removeChild(link);
+    window.URL.revokeObjectURL(url);
+  };
+
+  const filenameFrom = (disposition: string | undefined, fallback: string) => {
+    const match = disposition?.match(/filename="?([^";]+)"?/);
+    return match ? match[1] : fallback;
+  };
+
+  // Exportações grandes respondem 202 e rodam no servidor: acompanha o status e baixa no fim
+  const exportReport = async (report: string, format: 'csv' | 'xlsx') => {
+    const key = `${report}-${format}`;
+    try {
+      setExporting(key);
+      const params = {
+        start_date: `${startDate}T00:00:00`,
+        end_date: `${endDate}T23:59:59`,
+        format
+      };
+      const response = await api.get(`/reports/export/${report}`, { params, responseType: 'blob' });
+      if (response.status !== 202) {
+        saveBlob(response.data, filenameFrom(response.headers['content-disposition'], `${report}.${format}`));
+        return;
+      }
+
+      let job = JSON.parse(await response.data.text());
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        job = (await api.get(job.status_url)).data;
+      }
+      if (job.status !== 'done') {
+        throw new Error(job.error || 'Exportação falhou');
+      }
+      const file = await api.get(job.artifact_url, { responseType: 'blob' });
+      saveBlob(file.data, job.artifact_name);
+    } catch (error) {
+      console.error('Erro ao exportar relatório:', error);
+      alert('Erro ao exportar relatório');
+    } finally {
+      setExporting(null);
+    }
+  };
+
+  const exports = [
+    { report: 'sales-by-period', label: 'Vendas por Período' },
+    { report: 'top-customers', label: 'Clientes' },
+    { report: 'quotes', label: 'Orçamentos' }
+  ];
+
   if (loading) {
     return <div className="text-center py-8">Carregando relatórios...</div>;
   }
@@ -126,6 +183,33 @@ export default function Reports() {
         </div>
       </div>
 
+      {/* Exportações */}
+      <div className="bg-white rounded-lg shadow-md p-4 sm:p-6 mb-6 sm:mb-8">
+        <div className="flex items-center gap-2 mb-4">
+          <Download size={20} className="text-slate-600" />
+          <h2 className="text-lg font-semibold text-slate-900">Exportar período</h2>
+        </div>
+        <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+          {exports.map(({ report, label }) => (
+            <div key={report} className="flex items-center justify-between gap-2 border border-slate-200 rounded-lg px-4 py-2">
+              <span className="text-sm font-medium text-slate-700">{label}</span>
+              <div className="flex gap-2">
+                {(['csv', 'xlsx'] as const).map((format) => (
+                  <button
+                    key={format}
+                    onClick={() => exportReport(report, format)}
+                    disabled={exporting !== null}
+                    className="px-3 py-1 text-sm border border-slate-300 rounded-lg hover:bg-slate-50 disabled:opacity-50"
+                  >
+                    {exporting === `${report}-${format}` ? 'Gerando...' : format.toUpperCase()}
+                  </button>
+                ))}
+              </div>
+            </div>
+          ))}
+        </div>
+      </div>
+
       {/* Resumo */}
       {summary && (
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-5 gap-4 sm:gap-6 mb-6 sm:mb-8">
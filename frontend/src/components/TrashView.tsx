@@ -34,6 +34,8 @@ export default function TrashView() {
   const [auditCustomerId, setAuditCustomerId] = useState<number | null>(null);
   const [auditLogs, setAuditLogs] = useState<any[]>([]);
   const [auditLoading, setAuditLoading] = useState(false);
+  const [auditNextCursor, setAuditNextCursor] = useState<string | null>(null);
+  const [auditLoadingMore, setAuditLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchData();
@@ -58,16 +60,28 @@ export default function TrashView() {
     return users.find(u => u.id === id)?.name || 'N/A';
   };
 
-  const handleViewAudit = async (customerId: number) => {
-    setAuditLoading(true);
+  // A rota de auditoria é paginada por cursor: {items, next_cursor}
+  const handleViewAudit = async (customerId: number, cursor?: string) => {
+    if (cursor) {
+      setAuditLoadingMore(true);
+    } else {
+      setAuditLoading(true);
+    }
     try {
-      const response = await api.get(`/audit/customer/${customerId}`);
-      setAuditLogs(response.data);
+      const response = await api.get(`/audit/customer/${customerId}`, {
+        params: cursor ? { cursor } : {}
+      });
+      setAuditLogs(prev => cursor ? [...prev, ...response.data.items] : response.data.items);
+      setAuditNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Erro ao carregar auditoria', error);
-      setAuditLogs([]);
+      if (!cursor) {
+        setAuditLogs([]);
+        setAuditNextCursor(null);
+      }
     } finally {
       setAuditLoading(false);
+      setAuditLoadingMore(false);
     }
   };
 
@@ -236,6 +250,7 @@ export default function TrashView() {
                 onClick={() => {
                   setAuditCustomerId(null);
                   setAuditLogs([]);
+                  setAuditNextCursor(null);
                 }}
                 className="text-gray-400 hover:text-gray-600 text-2xl"
               >
@@ -277,6 +292,17 @@ export default function TrashView() {
                     )}
                   </div>
                 ))}
+                {auditNextCursor && (
+                  <div className="text-center">
+                    <button
+                      onClick={() => handleViewAudit(auditCustomerId, auditNextCursor)}
+                      disabled={auditLoadingMore}
+                      className="px-4 py-2 text-sm font-medium text-blue-600 hover:bg-blue-50 rounded-lg transition disabled:opacity-50"
+                    >
+                      {auditLoadingMore ? 'Carregando...' : 'Carregar mais'}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
 
@@ -285,6 +311,7 @@ export default function TrashView() {
                 onClick={() => {
                   setAuditCustomerId(null);
                   setAuditLogs([]);
+                  setAuditNextCursor(null);
                 }}
                 className="px-4 py-2 text-gray-600 hover:bg-gray-100 rounded-lg transition"
               >
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Compressão
+Mede, por endpoint, os bytes enviados e o custo de CPU da compressão
+(backend/compression.py) sem compressão, com gzip e com brotli.
+
+O app roda em processo (TestClient, com o middleware de verdade) contra o
+banco de DATABASE_URL; os bytes são os do corpo como saem do servidor
+(antes da descompressão do cliente) e a CPU é a medida pelo próprio
+middleware (mesmos números de /metrics).
+
+Uso (dados gerados com scripts/generate_data.py):
+    python3 scripts/bench_compression.py
+    python3 scripts/bench_compression.py --repeat 20 --output scripts/results/compression.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+ENCODINGS = ("identity", "gzip", "br")
+
+
+def endpoints(session):
+    """Endpoints medidos (caminho com ids reais do banco)"""
+    from sqlmodel import func, select
+    from models import AuditLog, Customer, Quote
+
+    quote_id = session.exec(select(Quote.id).order_by(Quote.id)).first()
+    customer_id = session.exec(select(Customer.id).order_by(Customer.id)).first()
+    audited = session.exec(
+        select(AuditLog.table_name, AuditLog.record_id)
+        .group_by(AuditLog.table_name, AuditLog.record_id)
+        .order_by(func.count().desc())
+    ).first()
+
+    paths = [
+        "/customers/?limit=100",
+        "/quotes/?limit=100",
+        "/quotes/?limit=100&view=detail",
+        f"/quotes/customer/{customer_id}",
+        "/reports/summary",
+        "/reports/top-customers",
+        "/reports/products-most-sold",
+        "/reports/sales-by-period",
+        "/dashboard/stats",
+        "/feed/",
+    ]
+    if audited:
+        paths.append(f"/audit/{audited[0]}/{audited[1]}?limit=100")
+        paths.append(f"/audit/{audited[0]}/{audited[1]}?format=ndjson")
+    if quote_id:
+        paths.append(f"/quotes/{quote_id}/pdf")
+    return paths
+
+
+def user_headers(session):
+    """Token do primeiro admin (auditoria) ou, nos dados gerados, do primeiro gerente"""
+    import security
+    from sqlmodel import select
+    from models import Role, User
+
+    for slug in ("admin", "manager"):
+        email = session.exec(
+            select(User.email).join(Role, User.role_id == Role.id).where(Role.slug == slug).order_by(User.id)
+        ).first()
+        if email:
+            if slug != "admin":
+                print(f"⚠️ Sem admin no banco; medindo como {email} (auditoria fica de fora)")
+            return {"Authorization": f"Bearer {security.create_access_token({'sub': email, 'role': slug})}"}
+    print("❌ Nenhum admin ou gerente no banco; gere dados com scripts/generate_data.py")
+    sys.exit(1)
+
+
+def measure(client, path, headers, encoding, repeat):
+    """Mediana de latência, bytes do corpo/enviados e CPU de compressão por requisição"""
+    from instrumentation import metrics
+
+    latencies, wire, body, cpu = [], [], [], []
+    for _ in range(repeat):
+        before = {key: list(series) for key, series in metrics.bodies.items()}
+        started = time.perf_counter()
+        with client.stream("GET", path, headers={**headers, "Accept-Encoding": encoding}) as response:
+            raw = sum(len(chunk) for chunk in response.iter_raw())
+            used = response.headers.get("content-encoding", "identity")
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            return None
+
+        after = [
+            [a - b for a, b in zip(series, before.get(key, [0, 0, 0, 0.0]))]
+            for key, series in metrics.bodies.items()
+        ]
+        delta = next(series for series in after if series[0])
+        wire.append(raw)
+        body.append(delta[1])
+        cpu.append(delta[3])
+    return {
+        "encoding": used,
+        "body_bytes": int(statistics.median(body)),
+        "wire_bytes": int(statistics.median(wire)),
+        "cpu_ms": statistics.median(cpu) * 1000,
+        "latency_ms": statistics.median(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes enviados e CPU da compressão por endpoint")
+    parser.add_argument("--repeat", type=int, default=10, help="Requisições por endpoint e codificação")
+    parser.add_argument("--output", help="Salva os resultados em JSON")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        parser.error("defina DATABASE_URL")
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session
+    from database import engine
+    import compression
+    import main as app_module
+
+    engine.echo = False
+    if not compression.BROTLI_AVAILABLE:
+        print("⚠️ Pacote brotli não instalado: medindo só gzip")
+    encodings = [e for e in ENCODINGS if e != "br" or compression.BROTLI_AVAILABLE]
+
+    with Session(engine) as session:
+        paths = endpoints(session)
+        headers = user_headers(session)
+
+    results = {}
+    with TestClient(app_module.app) as client:
+        for path in paths:
+            by_encoding = {e: measure(client, path, headers, e, args.repeat) for e in encodings}
+            if None in by_encoding.values():
+                print(f"⚠️ {path} não respondeu 200; fora da medição")
+                continue
+            results[path] = by_encoding
+
+    print(f"\n{'endpoint':<46}{'corpo KB':>10}" + "".join(f"{f'{e} KB':>11}{f'{e} CPU ms':>14}" for e in encodings[1:]))
+    for path, by_encoding in results.items():
+        line = f"{path[:45]:<46}{by_encoding['identity']['body_bytes'] / 1024:>10.1f}"
+        for e in encodings[1:]:
+            data = by_encoding[e]
+            if data["encoding"] == "identity":
+                line += f"{'-':>11}{'-':>14}"  # Não comprimido (tipo ou tamanho)
+            else:
+                line += f"{data['wire_bytes'] / 1024:>11.1f}{data['cpu_ms']:>14.2f}"
+        print(line)
+
+    total = {e: sum(r[e]["wire_bytes"] for r in results.values()) for e in encodings}
+    print()
+    for e in encodings[1:]:
+        print(f"Total enviado ({e}): {total['identity'] / 1024:.0f}KB -> {total[e] / 1024:.0f}KB "
+              f"({100 * (1 - total[e] / total['identity']):.0f}% menos)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"min_size": compression.COMPRESSION_MIN_SIZE, "gzip_level": compression.COMPRESSION_GZIP_LEVEL,
+                       "brotli_quality": compression.COMPRESSION_BROTLI_QUALITY, "endpoints": results}, f, indent=2)
+        print(f"💾 Resultados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Importação de Clientes
+Mede a vazão (linhas/min) de POST /customers/import com um CSV sintético.
+
+Uso:
+    python3 scripts/bench_customer_import.py --rows 20000 [--chunk-size 1000] [--target 10000]
+
+    # Remover os clientes importados (mesmo --rows da medição)
+    python3 scripts/bench_customer_import.py --rows 20000 --cleanup
+
+Requer a API rodando (docker-compose up) e o admin padrão do reset_erp.py.
+Os documentos são CPFs válidos gerados a partir de BENCH_PREFIX, então a
+mesma execução pode ser repetida depois do --cleanup.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import requests
+
+# Configurações
+API_URL = "http://localhost:8000"
+ADMIN_EMAIL = "pacheco@rhynoproject.com.br"
+ADMIN_PASSWORD = "123"
+
+BENCH_PREFIX = 970_000_000
+
+CITIES = ["São Paulo", "Curitiba", "Belo Horizonte", "Porto Alegre", "Recife", "Goiânia"]
+
+
+def make_cpf(number):
+    """CPF válido a partir de um número (9 primeiros dígitos)"""
+    digits = [int(d) for d in f"{number % 10 ** 9:09d}"]
+    for weight in (10, 11):
+        remainder = sum(d * w for d, w in zip(digits, range(weight, 1, -1))) % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return "".join(map(str, digits))
+
+
+def documents(rows):
+    return [make_cpf(BENCH_PREFIX + i) for i in range(rows)]
+
+
+def build_csv(rows):
+    """CSV com os cabeçalhos em português usados nas planilhas reais"""
+    lines = ["nome;cpf;tipo_pessoa;cidade;uf;telefone;email"]
+    for i, document in enumerate(documents(rows)):
+        lines.append(
+            f"Cliente Importado {i};{document};fisica;{CITIES[i % len(CITIES)]};SP;"
+            f"(11) 9{i % 10000:04d}-{i % 7919:04d};importado{i}@exemplo.com.br"
+        )
+    return "\n".join(lines).encode()
+
+
+def login(email, password):
+    """Faz login e retorna token"""
+    response = requests.post(
+        f"{API_URL}/auth/login",
+        data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def cleanup(rows):
+    from sqlalchemy import text
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+    from database import engine
+
+    batch = 5000
+    generated = documents(rows)
+    removed = 0
+    with engine.begin() as connection:
+        for offset in range(0, len(generated), batch):
+            chunk = generated[offset:offset + batch]
+            params = {f"d{i}": document for i, document in enumerate(chunk)}
+            placeholders = ", ".join(f":d{i}" for i in range(len(chunk)))
+            removed += connection.execute(
+                text(f"DELETE FROM customer WHERE document IN ({placeholders})"), params
+            ).rowcount
+    print(f"🧹 {removed:,} clientes removidos")
+
+
+def run(rows, chunk_size, target):
+    headers = {"Authorization": f"Bearer {login(ADMIN_EMAIL, ADMIN_PASSWORD)}"}
+    content = build_csv(rows)
+    print(f"📄 CSV: {rows:,} linhas, {len(content) / 1024:.0f} KB, lotes de {chunk_size}")
+
+    start = time.perf_counter()
+    response = requests.post(
+        f"{API_URL}/customers/import",
+        params={"chunk_size": chunk_size},
+        files={"file": ("bench.csv", io.BytesIO(content), "text/csv")},
+        headers=headers,
+        timeout=600,
+    )
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    report = response.json()
+
+    per_minute = report["created"] / elapsed * 60
+    print(f"✅ criados={report['created']:,} falhas={report['failed']:,} em {elapsed:.2f}s")
+    print(f"   {per_minute:,.0f} linhas/min (meta: {target:,})")
+    if report["failed"]:
+        print(f"   primeiros erros: {report['errors'][:3]} (rode --cleanup antes de repetir)")
+    if per_minute < target:
+        print("❌ Abaixo da meta")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de POST /customers/import")
+    parser.add_argument("--rows", type=int, default=20000, help="Linhas do CSV sintético")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Linhas por lote (commit)")
+    parser.add_argument("--target", type=int, default=10000, help="Meta em linhas por minuto")
+    parser.add_argument("--cleanup", action="store_true", help="Remove os clientes do benchmark")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup(args.rows)
+    else:
+        run(args.rows, args.chunk_size, args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Busca de Clientes
+Mede a latência de GET /customers/search com uma base grande de clientes.
+
+Uso:
+    # 1. Popular a base (Postgres, dentro do container backend ou com DATABASE_URL)
+    python3 scripts/bench_customer_search.py --seed 500000
+
+    # 2. Medir (API rodando)
+    python3 scripts/bench_customer_search.py --repeat 50 --target-p95 50
+
+    # Remover os clientes sintéticos
+    python3 scripts/bench_customer_search.py --cleanup
+
+Os clientes sintéticos usam documentos iniciados por BENCH_PREFIX.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+# Configurações
+API_URL = "http://localhost:8000"
+ADMIN_EMAIL = "pacheco@rhynoproject.com.br"
+ADMIN_PASSWORD = "123"
+
+BENCH_PREFIX = "99"
+
+# Consultas típicas: nome, trecho, erro de digitação, sem acento, documento, cidade
+QUERIES = [
+    "joao",
+    "silva",
+    "souza comercio",
+    "mariaa",
+    "sao paulo",
+    "construtora",
+    "9900001",
+    "curitiba",
+    "gonçalves",
+    "ana lima",
+]
+
+SEED_SQL = """
+INSERT INTO customer (
+    name, fantasy_name, document, person_type, status, is_customer, is_supplier,
+    email, city, state, contact_name, credit_limit, created_at, updated_at
+)
+SELECT
+    (ARRAY['João','Maria','José','Ana','Carlos','Fernanda','Paulo','Juliana','Lucas','Mariana'])[1 + i % 10]
+        || ' ' ||
+    (ARRAY['Silva','Souza','Oliveira','Santos','Lima','Gonçalves','Pereira','Costa','Rodrigues','Almeida'])[1 + (i / 10) % 10]
+        || ' ' || i,
+    (ARRAY['Construtora','Comércio','Eventos','Locadora','Indústria'])[1 + i % 5] || ' ' || i,
+    :prefix || lpad(i::text, 9, '0'),
+    'fisica',
+    'ativo',
+    true,
+    false,
+    'cliente' || i || '@exemplo.com.br',
+    (ARRAY['São Paulo','Curitiba','Belo Horizonte','Porto Alegre','Recife','Goiânia'])[1 + i % 6],
+    'SP',
+    (ARRAY['Roberto','Cláudia','Márcio','Patrícia'])[1 + i % 4],
+    0,
+    now(),
+    now()
+FROM generate_series(:start, :stop) AS i
+ON CONFLICT (document) DO NOTHING
+"""
+
+
+def get_engine():
+    """Engine do backend (usa DATABASE_URL)"""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+    from database import engine
+    return engine
+
+
+def seed(count, batch=50000):
+    from sqlalchemy import text
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        print("❌ O seed usa generate_series e requer Postgres")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    for offset in range(1, count + 1, batch):
+        stop = min(offset + batch - 1, count)
+        with engine.begin() as connection:
+            connection.execute(text(SEED_SQL), {"prefix": BENCH_PREFIX, "start": offset, "stop": stop})
+        print(f"   {stop:,}/{count:,}")
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE customer"))
+    print(f"✅ {count:,} clientes em {time.perf_counter() - start:.1f}s")
+
+
+def cleanup():
+    from sqlalchemy import text
+
+    engine = get_engine()
+    with engine.begin() as connection:
+        result = connection.execute(
+            text("DELETE FROM customer WHERE document LIKE :prefix AND length(document) = :length"),
+            {"prefix": f"{BENCH_PREFIX}%", "length": len(BENCH_PREFIX) + 9}
+        )
+    print(f"🧹 {result.rowcount:,} clientes removidos")
+
+
+def login(email, password):
+    """Faz login e retorna token"""
+    response = requests.post(
+        f"{API_URL}/auth/login",
+        data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run(repeat, target_p95):
+    headers = {"Authorization": f"Bearer {login(ADMIN_EMAIL, ADMIN_PASSWORD)}"}
+
+    # Aquecimento
+    for query in QUERIES:
+        requests.get(f"{API_URL}/customers/search", params={"q": query}, headers=headers)
+
+    print(f"{'consulta':<18}{'result.':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    all_timings = []
+    for query in QUERIES:
+        timings = []
+        found = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = requests.get(f"{API_URL}/customers/search", params={"q": query}, headers=headers)
+            timings.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+            found = len(response.json())
+        all_timings.extend(timings)
+        print(f"{query:<18}{found:>8}{statistics.median(timings):>10.1f}{percentile(timings, 95):>10.1f}")
+
+    p95 = percentile(all_timings, 95)
+    print(f"\nGeral: p50={statistics.median(all_timings):.1f} ms  p95={p95:.1f} ms  (meta: {target_p95} ms)")
+    if p95 > target_p95:
+        print("❌ p95 acima da meta")
+        sys.exit(1)
+    print("✅ p95 dentro da meta")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de GET /customers/search")
+    parser.add_argument("--seed", type=int, help="Insere N clientes sintéticos (Postgres)")
+    parser.add_argument("--cleanup", action="store_true", help="Remove os clientes sintéticos")
+    parser.add_argument("--repeat", type=int, default=30, help="Requisições por consulta")
+    parser.add_argument("--target-p95", type=float, default=50.0, help="Meta de p95 em ms")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    elif args.cleanup:
+        cleanup()
+    else:
+        run(args.repeat, args.target_p95)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Criação de Orçamentos
+Mede a latência de POST /quotes/ em função do número de itens.
+
+Uso:
+    python3 scripts/bench_quote_creation.py [--sizes 1,10,50,100,200] [--repeat 10]
+
+Requer a API rodando (docker-compose up) e o admin padrão do reset_erp.py.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import requests
+
+# Configurações
+API_URL = "http://localhost:8000"
+ADMIN_EMAIL = "pacheco@rhynoproject.com.br"
+ADMIN_PASSWORD = "123"
+
+# CPF válido usado apenas pelo benchmark
+BENCH_DOCUMENT = "52998224725"
+
+
+def login(email, password):
+    """Faz login e retorna token"""
+    response = requests.post(
+        f"{API_URL}/auth/login",
+        data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def ensure_customer(headers):
+    """Retorna o ID do cliente de benchmark, criando se necessário"""
+    check = requests.get(f"{API_URL}/customers/verify/{BENCH_DOCUMENT}", headers=headers).json()
+    if check.get("exists"):
+        return check["id"]
+
+    response = requests.post(f"{API_URL}/customers/", json={
+        "name": "Cliente Benchmark",
+        "document": BENCH_DOCUMENT,
+        "person_type": "fisica",
+    }, headers=headers)
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def ensure_catalog(headers, count):
+    """Cria (ou reaproveita) `count` produtos e serviços de benchmark"""
+    product_ids = []
+    service_ids = []
+    run_id = int(time.time())
+
+    for i in range(count):
+        response = requests.post(f"{API_URL}/products/", json={
+            "name": f"Bench Produto {run_id}-{i}",
+            "category": "benchmark",
+            "price_daily": 10.0,
+            "quantity": 1000,
+        }, headers=headers)
+        response.raise_for_status()
+        product_ids.append(response.json()["id"])
+
+        response = requests.post(f"{API_URL}/services/", json={
+            "name": f"Bench Serviço {run_id}-{i}",
+            "category": "benchmark",
+            "price_base": 50.0,
+        }, headers=headers)
+        response.raise_for_status()
+        service_ids.append(response.json()["id"])
+
+    return product_ids, service_ids
+
+
+def build_items(size, product_ids, service_ids):
+    """Monta `size` itens alternando produtos e serviços"""
+    items = []
+    for i in range(size):
+        if i % 2 == 0:
+            item_id = product_ids[(i // 2) % len(product_ids)]
+            items.append({"type": "product", "item_id": item_id, "name": f"Produto {item_id}",
+                          "quantity": 1, "unit_price": 10.0, "subtotal": 10.0})
+        else:
+            item_id = service_ids[(i // 2) % len(service_ids)]
+            items.append({"type": "service", "item_id": item_id, "name": f"Serviço {item_id}",
+                          "quantity": 1, "unit_price": 50.0, "subtotal": 50.0})
+    return items
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(sizes, repeat, catalog_size):
+    token = login(ADMIN_EMAIL, ADMIN_PASSWORD)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    customer_id = ensure_customer(headers)
+    product_ids, service_ids = ensure_catalog(headers, catalog_size)
+
+    print(f"{'itens':>6} | {'média (ms)':>10} | {'p50 (ms)':>9} | {'p95 (ms)':>9}")
+    print("-" * 45)
+
+    for size in sizes:
+        payload = {
+            "customer_id": customer_id,
+            "items": build_items(size, product_ids, service_ids),
+        }
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = requests.post(f"{API_URL}/quotes/", json=payload, headers=headers)
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                print(f"❌ Falha com {size} itens: {response.status_code} {response.text}")
+                sys.exit(1)
+            timings.append(elapsed)
+
+        print(f"{size:>6} | {statistics.mean(timings):>10.1f} | "
+              f"{percentile(timings, 50):>9.1f} | {percentile(timings, 95):>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de criação de orçamentos")
+    parser.add_argument("--sizes", default="1,10,50,100,200",
+                        help="Quantidades de itens separadas por vírgula")
+    parser.add_argument("--repeat", type=int, default=10, help="Repetições por tamanho")
+    parser.add_argument("--catalog-size", type=int, default=50,
+                        help="Produtos/serviços distintos usados nos itens")
+    args = parser.parse_args()
+
+    run([int(s) for s in args.sizes.split(",")], args.repeat, args.catalog_size)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Serialização de Orçamentos
+Compara, em processo (sem HTTP), o custo de montar uma página de orçamentos
+de GET /quotes/ nos caminhos:
+
+    modelos   Quote do ORM -> QuoteRead + QuoteItem por item -> validação do
+              response_model -> JSON (caminho original da rota)
+    detail    linhas com os itens em texto JSON -> QuoteProjection.detail
+              (orjson.Fragment) -> orjson   (GET /quotes/?view=detail)
+    summary   só as colunas da tabela, itens contados no banco ->
+              QuoteProjection.summary -> orjson   (GET /quotes/, padrão)
+
+Cada etapa (consulta, montagem, serialização) é medida separadamente, e o
+JSON de modelos e detail é conferido (deve ser igual).
+
+Uso (dados gerados com scripts/generate_data.py, dentro do container
+backend ou com DATABASE_URL):
+    python3 scripts/bench_quote_serialization.py
+    python3 scripts/bench_quote_serialization.py --page-size 100 --pages 10 --repeat 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+STAGES = ("consulta", "montagem", "serialização")
+
+
+def legacy_page(session, skip, limit, timings):
+    """Caminho anterior: modelos -> QuoteRead -> TypeAdapter(dict) (response_model=dict)"""
+    from pydantic import TypeAdapter
+    from schemas import QuoteRead, QuoteItem
+    from services.quote_service import QuoteService
+
+    started = time.perf_counter()
+    quotes = QuoteService.get_quotes_for_user(session=session, user=None, skip=skip, limit=limit)
+    timings["consulta"].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    quotes_read = []
+    for quote in quotes:
+        items_list = json.loads(quote.items) if isinstance(quote.items, str) else quote.items
+        data = {field: getattr(quote, field) for field in QuoteRead.model_fields if field != "items"}
+        quotes_read.append(QuoteRead(items=[QuoteItem(**item) for item in items_list], **data))
+    content = {"items": quotes_read, "total": len(quotes_read), "skip": skip, "limit": limit}
+    timings["montagem"].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    adapter = TypeAdapter(dict)
+    body = adapter.dump_json(adapter.validate_python(content))
+    timings["serialização"].append(time.perf_counter() - started)
+    return body
+
+
+def projection_page(view):
+    """Caminho atual: colunas da visão -> QuoteProjection -> ORJSONResponse.render"""
+    def page(session, skip, limit, timings):
+        from serialization import ORJSONResponse
+        from services.quote_projection import QuoteProjection
+        from services.quote_service import QuoteService
+
+        started = time.perf_counter()
+        rows = QuoteService.get_quote_rows(session=session, user=None, skip=skip, limit=limit, view=view)
+        timings["consulta"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        project = QuoteProjection.summary if view == "summary" else QuoteProjection.detail
+        content = {"items": [project(row) for row in rows], "total": len(rows), "skip": skip, "limit": limit}
+        timings["montagem"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        body = ORJSONResponse(content).body
+        timings["serialização"].append(time.perf_counter() - started)
+        return body
+    return page
+
+
+def median_ms(values):
+    return statistics.median(values) * 1000 if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo de serialização de páginas de orçamentos")
+    parser.add_argument("--page-size", type=int, default=100, help="Orçamentos por página (padrão 100)")
+    parser.add_argument("--pages", type=int, default=5, help="Páginas distintas (offsets) medidas")
+    parser.add_argument("--repeat", type=int, default=10, help="Repetições por página")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        parser.error("defina DATABASE_URL")
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    import orjson
+    from sqlmodel import Session, func, select
+    from database import engine
+    from models import Quote
+
+    engine.echo = False
+    with Session(engine) as session:
+        total = session.exec(select(func.count()).select_from(Quote)).one()
+    if total < args.page_size:
+        print(f"❌ Só {total} orçamentos no banco; gere dados com scripts/generate_data.py")
+        sys.exit(1)
+
+    step = max(1, (total - args.page_size) // max(1, args.pages - 1))
+    offsets = [min(i * step, total - args.page_size) for i in range(args.pages)]
+    paths = {"modelos": legacy_page, "detail": projection_page("detail"), "summary": projection_page("summary")}
+    timings = {name: {stage: [] for stage in STAGES} for name in paths}
+    sizes = {}
+
+    print(f"📄 {args.pages} páginas de {args.page_size} orçamentos × {args.repeat} repetições ({total:,} no banco)")
+    for skip in offsets:
+        bodies = {}
+        for _ in range(args.repeat):
+            for name, page in paths.items():
+                # Sessão nova por página: sem identity map aquecido entre repetições
+                with Session(engine) as session:
+                    bodies[name] = page(session, skip, args.page_size, timings[name])
+        if orjson.loads(bodies["modelos"]) != orjson.loads(bodies["detail"]):
+            print(f"❌ JSON diferente entre os caminhos (skip={skip})")
+            sys.exit(1)
+        for name, body in bodies.items():
+            sizes.setdefault(name, []).append(len(body))
+
+    print(f"\n{'caminho':<10}" + "".join(f"{stage + ' ms':>18}" for stage in STAGES) + f"{'total ms':>12}{'KB':>9}")
+    totals = {}
+    for name in paths:
+        stages = [median_ms(timings[name][stage]) for stage in STAGES]
+        totals[name] = sum(stages)
+        print(f"{name:<10}" + "".join(f"{value:>18.2f}" for value in stages)
+              + f"{totals[name]:>12.2f}{statistics.mean(sizes[name]) / 1024:>9.1f}")
+    build_and_serialize = {
+        name: median_ms(timings[name]["montagem"]) + median_ms(timings[name]["serialização"]) for name in paths
+    }
+    print()
+    for name in ("detail", "summary"):
+        print(f"Montagem + serialização ({name}): {build_and_serialize['modelos']:.2f}ms -> "
+              f"{build_and_serialize[name]:.2f}ms "
+              f"({build_and_serialize['modelos'] / build_and_serialize[name]:.1f}x mais rápido); "
+              f"total {totals['modelos']:.2f}ms -> {totals[name]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Workers
+Sobe o backend com gunicorn (backend/gunicorn.conf.py) com 1 worker e
+depois com N, roda o mesmo teste de carga (scripts/load_test.py) contra cada
+um e compara vazão e p95.
+
+Uso (dados gerados com scripts/generate_data.py e DATABASE_URL definido):
+    python3 scripts/bench_workers.py --workers 1,4
+    python3 scripts/bench_workers.py --workers 1,2,4 -- --scenarios dashboard_refresh --duration 20
+
+Argumentos depois de "--" vão para o load_test.py. Os JSON de cada execução
+ficam em scripts/results/ (bench-workers-<N>.json).
+"""
+
+from datetime import datetime
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+LOAD_TEST = os.path.join(ROOT_DIR, "scripts", "load_test.py")
+RESULTS_DIR = os.path.join(ROOT_DIR, "scripts", "results")
+
+
+def wait_ready(base_url, workers, timeout):
+    """Espera /health/ready responder 200 em todos os workers (pids distintos)"""
+    deadline = time.monotonic() + timeout
+    pids = set()
+    while time.monotonic() < deadline:
+        try:
+            response = requests.get(f"{base_url}/health/ready", timeout=2)
+            if response.status_code == 200:
+                pids.add(response.json()["pid"])
+                if len(pids) >= workers:
+                    return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    # Com poucas conexões o balanceamento do kernel pode não alcançar todos os pids
+    return bool(pids)
+
+
+def run(workers, port, load_args, timeout):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    output = os.path.join(RESULTS_DIR, f"bench-workers-{workers}.json")
+    try:
+        if not wait_ready(base_url, workers, timeout):
+            raise RuntimeError(f"gunicorn com {workers} worker(s) não ficou pronto em {timeout:.0f}s")
+        print(f"\n=== {workers} worker(s) ===")
+        subprocess.run([sys.executable, LOAD_TEST, "--output", output, *load_args],
+                       env=dict(os.environ, API_URL=base_url), check=True)
+    finally:
+        # SIGTERM: desligamento gracioso (mesmo caminho de um deploy)
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    with open(output) as f:
+        return json.load(f)
+
+
+def print_comparison(results):
+    counts = list(results)
+    base = counts[0]
+    print(f"\n{'cenário':<22}" + "".join(f"{f'{n}w req/s':>14}" for n in counts) + f"{'ganho':>9}")
+    for scenario, data in results[base]["scenarios"].items():
+        if "delivery_ratio" in data:
+            # Fan-out: fração das mensagens entregue a cada conexão (1.0 = todas)
+            values = [results[n]["scenarios"].get(scenario, {}).get("delivery_ratio") or 0.0 for n in counts]
+            print(f"{scenario + ' entrega':<22}" + "".join(f"{v:>14.2f}" for v in values))
+            continue
+        values = [results[n]["scenarios"].get(scenario, {}).get("throughput_rps") or 0.0 for n in counts]
+        gain = f"{values[-1] / values[0]:.2f}x" if values[0] else "-"
+        print(f"{scenario:<22}" + "".join(f"{v:>14.1f}" for v in values) + f"{gain:>9}")
+
+    print(f"\n{'endpoint':<34}" + "".join(f"{f'{n}w p95 ms':>14}" for n in counts))
+    for label in results[base]["endpoints"]:
+        values = [results[n]["endpoints"].get(label, {}).get("p95_ms") for n in counts]
+        print(f"{label:<34}" + "".join(f"{v:>14.1f}" if v is not None else f"{'-':>14}" for v in values))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o backend com 1 e N workers")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 2}",
+                        help="Quantidades de workers separadas por vírgula (padrão: 1,<CPUs>)")
+    parser.add_argument("--port", type=int, default=8100, help="Porta do gunicorn durante o benchmark")
+    parser.add_argument("--ready-timeout", type=float, default=60, help="Espera máxima pelo /health/ready (s)")
+    parser.add_argument("load_args", nargs=argparse.REMAINDER, help="Argumentos do load_test.py (após --)")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        parser.error("defina DATABASE_URL (o mesmo banco dos dados gerados)")
+    load_args = args.load_args[1:] if args.load_args[:1] == ["--"] else args.load_args
+    counts = [int(n) for n in args.workers.split(",") if n.strip()]
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+
+    results = {n: run(n, args.port, load_args, args.ready_timeout) for n in counts}
+    print_comparison(results)
+
+    summary = os.path.join(RESULTS_DIR, f"bench-workers-{datetime.now().strftime('%Y%m%d-%H%M')}.json")
+    with open(summary, "w") as f:
+        json.dump({"cpus": os.cpu_count(), "runs": {str(n): r for n, r in results.items()}}, f, indent=2)
+    print(f"\n💾 Resumo em {summary}")
+
+
+if __name__ == "__main__":
+    main()
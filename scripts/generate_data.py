@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Gerador de Dados Sintéticos
+Carrega volumes realistas direto no banco, usando os modelos do backend
+(INSERT em lote, sem passar pela API).
+
+Volumes com --scale 1 (padrão):
+    500.000 clientes, 2.000.000 de orçamentos (itens em JSON),
+    5.000.000 de linhas de auditoria e 1.000.000 de itens de feed
+
+Uso (dentro do container backend ou com DATABASE_URL):
+    python3 scripts/generate_data.py                      # volume completo
+    python3 scripts/generate_data.py --scale 0.01         # 1% (desenvolvimento)
+    python3 scripts/generate_data.py --customers 100000 --quotes 0
+    python3 scripts/generate_data.py --cleanup            # remove tudo que foi gerado
+
+Os dados são reprodutíveis: a mesma --seed e a mesma --end-date geram as
+mesmas linhas (rode --cleanup antes de repetir uma seed). Tudo que é
+gerado pode ser identificado para o --cleanup: usuários @loadtest.local,
+produtos/serviços da categoria "loadtest", orçamentos ORC-LT-*, e
+clientes/feed/auditoria desses usuários.
+
+Os usuários gerados (vendedores e gerentes) usam a senha --password e são
+os mesmos que scripts/load_test.py usa para autenticar.
+
+Com a API rodando, reinicie o backend depois da carga: o índice de
+typeahead é montado na subida (o cache do catálogo é invalidado pela
+versão do catálogo, incrementada ao final).
+"""
+
+from datetime import date, datetime, timedelta
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+LOADTEST_DOMAIN = "loadtest.local"
+LOADTEST_CATEGORY = "loadtest"
+QUOTE_PREFIX = "ORC-LT-"
+
+# Volumes com --scale 1
+VOLUMES = {
+    "customers": 500_000,
+    "quotes": 2_000_000,
+    "audit": 5_000_000,
+    "feed": 1_000_000,
+}
+SALESPEOPLE = 60
+MANAGERS = 6
+PRODUCTS = 400
+SERVICES = 120
+
+FIRST_NAMES = [
+    "João", "Maria", "José", "Ana", "Carlos", "Fernanda", "Paulo", "Juliana", "Lucas", "Mariana",
+    "Pedro", "Beatriz", "Rafael", "Camila", "Gabriel", "Larissa", "Bruno", "Patrícia", "Diego", "Aline",
+]
+LAST_NAMES = [
+    "Silva", "Souza", "Oliveira", "Santos", "Lima", "Gonçalves", "Pereira", "Costa", "Rodrigues",
+    "Almeida", "Nascimento", "Carvalho", "Ferreira", "Ribeiro", "Martins", "Araújo", "Barbosa",
+]
+COMPANY_KINDS = ["Construtora", "Comércio", "Eventos", "Locadora", "Indústria", "Buffet", "Produções", "Engenharia"]
+CITIES = [
+    ("São Paulo", "SP"), ("Campinas", "SP"), ("Santo André", "SP"), ("Rio de Janeiro", "RJ"),
+    ("Belo Horizonte", "MG"), ("Curitiba", "PR"), ("Porto Alegre", "RS"), ("Florianópolis", "SC"),
+    ("Recife", "PE"), ("Salvador", "BA"), ("Goiânia", "GO"), ("Brasília", "DF"),
+]
+PRODUCT_CATEGORIES = ["som", "iluminação", "palco", "móveis", "eletrônicos", "estruturas"]
+SERVICE_KINDS = ["Instalação", "Montagem", "Operação técnica", "Transporte", "Consultoria", "Manutenção"]
+CUSTOMER_STATUSES = ["ativo"] * 14 + ["pendente", "inativo", "inativo", "excluido"]
+QUOTE_STATUSES = ["rascunho"] * 3 + ["enviado"] * 4 + ["aprovado"] * 3 + ["recusado"] * 2 + ["faturado"] * 3 + ["cancelado"]
+FEED_TEMPLATES = [
+    "cadastrou o cliente {name}",
+    "enviou um orçamento para {name}",
+    "registrou uma ligação com {name}",
+    "atualizou os dados de {name}",
+    "aprovou o orçamento de {name}",
+]
+
+
+# --- Documentos válidos ---
+
+def _check_digits(digits, weights_list):
+    for weights in weights_list:
+        remainder = sum(d * w for d, w in zip(digits, weights)) % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return "".join(map(str, digits))
+
+
+def make_cpf(number):
+    """CPF válido a partir dos 9 primeiros dígitos"""
+    digits = [int(d) for d in f"{number % 10 ** 9:09d}"]
+    return _check_digits(digits, [range(10, 1, -1), range(11, 1, -1)])
+
+
+def make_cnpj(number):
+    """CNPJ válido (matriz 0001) a partir dos 8 primeiros dígitos"""
+    digits = [int(d) for d in f"{number % 10 ** 8:08d}0001"]
+    return _check_digits(digits, [
+        [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2],
+        [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2],
+    ])
+
+
+# --- Infraestrutura ---
+
+def get_engine():
+    """Engine do backend (usa DATABASE_URL), sem eco de SQL"""
+    from database import engine
+    engine.echo = False
+    return engine
+
+
+def batches(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class Progress:
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+
+    def add(self, count):
+        self.done += count
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0
+        print(f"\r   {self.label}: {self.done:,}/{self.total:,} ({rate:,.0f}/s)", end="", flush=True)
+
+    def finish(self):
+        print(f"\r✅ {self.label}: {self.done:,} em {time.perf_counter() - self.started:.1f}s" + " " * 20)
+
+
+def random_datetime(rng, end, days):
+    return end - timedelta(seconds=rng.randrange(days * 86400))
+
+
+# --- Geradores ---
+
+def generate_users(connection, password):
+    from sqlalchemy import insert, select
+    from models import Role, User, UserSupervisor
+    import security
+
+    roles = dict(connection.execute(select(Role.slug, Role.id)).all())
+    if "sales" not in roles or "manager" not in roles:
+        print("❌ Cargos padrão não encontrados: suba o backend uma vez antes de gerar dados")
+        sys.exit(1)
+
+    existing = dict(connection.execute(
+        select(User.email, User.id).where(User.email.like(f"%@{LOADTEST_DOMAIN}"))
+    ).all())
+    password_hash = security.get_password_hash(password)
+    now = datetime.utcnow()
+
+    def ensure(email, name, role_slug):
+        if email not in existing:
+            existing[email] = connection.execute(insert(User).values(
+                name=name, email=email, password_hash=password_hash, is_active=True,
+                role_id=roles[role_slug], created_at=now, updated_at=now
+            ).returning(User.id)).scalar_one()
+        return existing[email]
+
+    managers = [ensure(f"gerente{i}@{LOADTEST_DOMAIN}", f"Gerente Carga {i}", "manager") for i in range(MANAGERS)]
+    salespeople = [ensure(f"vendedor{i}@{LOADTEST_DOMAIN}", f"Vendedor Carga {i}", "sales") for i in range(SALESPEOPLE)]
+
+    links = set(connection.execute(
+        select(UserSupervisor.user_id, UserSupervisor.supervisor_id).where(UserSupervisor.user_id.in_(salespeople))
+    ).all())
+    missing = [
+        {"user_id": user_id, "supervisor_id": managers[i % MANAGERS]}
+        for i, user_id in enumerate(salespeople)
+        if (user_id, managers[i % MANAGERS]) not in links
+    ]
+    if missing:
+        connection.execute(insert(UserSupervisor), missing)
+    print(f"✅ Usuários: {MANAGERS} gerentes e {SALESPEOPLE} vendedores (senha: {password})")
+    return salespeople, managers
+
+
+def generate_catalog(connection, rng, end):
+    from sqlalchemy import insert, select
+    from models import Product, Service
+
+    products = connection.execute(
+        select(Product.id, Product.name, Product.price_daily).where(Product.category == LOADTEST_CATEGORY)
+    ).all()
+    if not products:
+        rows = []
+        for i in range(PRODUCTS):
+            price = round(rng.uniform(20, 900), 2)
+            rows.append({
+                "name": f"{rng.choice(PRODUCT_CATEGORIES).title()} Carga {i:04d}",
+                "description": "Produto gerado para teste de carga",
+                "category": LOADTEST_CATEGORY, "status": "disponivel",
+                "price_daily": price, "price_weekly": round(price * 5, 2), "price_monthly": round(price * 18, 2),
+                "cost": round(price * 30, 2), "quantity": rng.randint(5, 200),
+                "created_at": end, "updated_at": end,
+            })
+        connection.execute(insert(Product), rows)
+        products = connection.execute(
+            select(Product.id, Product.name, Product.price_daily).where(Product.category == LOADTEST_CATEGORY)
+        ).all()
+
+    services = connection.execute(
+        select(Service.id, Service.name, Service.price_base).where(Service.category == LOADTEST_CATEGORY)
+    ).all()
+    if not services:
+        connection.execute(insert(Service), [
+            {
+                "name": f"{rng.choice(SERVICE_KINDS)} Carga {i:04d}",
+                "description": "Serviço gerado para teste de carga",
+                "category": LOADTEST_CATEGORY, "status": "ativo",
+                "price_base": round(rng.uniform(80, 3000), 2), "duration_type": "projeto",
+                "created_at": end, "updated_at": end,
+            }
+            for i in range(SERVICES)
+        ])
+        services = connection.execute(
+            select(Service.id, Service.name, Service.price_base).where(Service.category == LOADTEST_CATEGORY)
+        ).all()
+
+    print(f"✅ Catálogo: {len(products)} produtos e {len(services)} serviços")
+    return [tuple(p) for p in products], [tuple(s) for s in services]
+
+
+def generate_customers(engine, rng, total, salespeople, end, days, batch_size, seed):
+    from sqlalchemy import insert
+    from models import Customer
+
+    progress = Progress("Clientes", total)
+    ids = []
+    # Faixa de documentos por seed: gerar de novo com outra seed não colide
+    cpf_base = 100_000_000 + (seed % 100) * 8_000_000
+    cnpj_base = 40_000_000 + (seed % 100) * 500_000
+    for start, count in batches(total, batch_size):
+        rows = []
+        for i in range(start, start + count):
+            city, state = rng.choice(CITIES)
+            salesperson = rng.choice(salespeople)
+            created_at = random_datetime(rng, end, days)
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            if i % 5 == 0:
+                kind = rng.choice(COMPANY_KINDS)
+                name = f"{kind} {last} {i} Ltda"
+                row = {"person_type": "juridica", "document": make_cnpj(cnpj_base + i // 5),
+                       "fantasy_name": f"{kind} {last}", "ie": f"{rng.randrange(10 ** 11):011d}"}
+            else:
+                name = f"{first} {last} {i}"
+                row = {"person_type": "fisica", "document": make_cpf(cpf_base + i), "fantasy_name": None, "ie": None}
+            row.update({
+                "name": name, "status": rng.choice(CUSTOMER_STATUSES),
+                "salesperson_id": salesperson, "created_by_id": salesperson,
+                "is_customer": True, "is_supplier": i % 25 == 0,
+                "email": f"cliente{i}@{LOADTEST_DOMAIN}", "phone": f"11{rng.randrange(10 ** 8):08d}",
+                "cellphone": f"119{rng.randrange(10 ** 8):08d}", "contact_name": rng.choice(FIRST_NAMES),
+                "city": city, "state": state, "neighborhood": "Centro", "address_line": f"Rua {last}",
+                "number": str(rng.randint(1, 3000)), "cep": f"{rng.randrange(10 ** 8):08d}",
+                "credit_limit": float(rng.choice([0, 5000, 10000, 50000])),
+                "created_at": created_at, "updated_at": created_at,
+            })
+            rows.append(row)
+        with engine.begin() as connection:
+            ids.extend(connection.execute(insert(Customer).returning(Customer.id), rows).scalars())
+        progress.add(count)
+    progress.finish()
+    return ids
+
+
+def build_items(rng, products, services):
+    items = []
+    for _ in range(rng.choice((1, 1, 2, 2, 3, 4, 6, 8))):
+        if rng.random() < 0.7:
+            item_id, name, price = rng.choice(products)
+            item_type = "product"
+        else:
+            item_id, name, price = rng.choice(services)
+            item_type = "service"
+        quantity = rng.randint(1, 10)
+        items.append({
+            "type": item_type, "item_id": item_id, "name": name,
+            "quantity": quantity, "unit_price": price, "subtotal": round(price * quantity, 2),
+        })
+    return items
+
+
+def generate_quotes(engine, rng, total, customer_ids, products, services, end, days, batch_size, seed):
+    from sqlalchemy import insert
+    from models import Quote
+
+    progress = Progress("Orçamentos", total)
+    first_id = last_id = None
+    for start, count in batches(total, batch_size):
+        rows = []
+        for i in range(start, start + count):
+            items = build_items(rng, products, services)
+            subtotal = round(sum(item["subtotal"] for item in items), 2)
+            discount_percent = rng.choice((0, 0, 0, 5, 10))
+            total_value = round(subtotal * (1 - discount_percent / 100), 2)
+            status = rng.choice(QUOTE_STATUSES)
+            created_at = random_datetime(rng, end, days)
+            sent_at = created_at + timedelta(hours=rng.randint(1, 48)) if status != "rascunho" else None
+            approved_at = sent_at + timedelta(days=rng.randint(1, 10)) if status in ("aprovado", "faturado") else None
+            rental_start = created_at + timedelta(days=rng.randint(3, 30))
+            rows.append({
+                "quote_number": f"{QUOTE_PREFIX}{seed:02d}-{i:08d}",
+                "customer_id": rng.choice(customer_ids),
+                "items": items,
+                "subtotal": subtotal, "discount": 0.0, "discount_percent": float(discount_percent),
+                "total": total_value, "status": status,
+                "valid_until": created_at + timedelta(days=15),
+                "payment_terms": "30 dias", "delivery_terms": "Retirada no local",
+                "sent_at": sent_at, "approved_at": approved_at,
+                "invoiced_at": approved_at + timedelta(days=2) if status == "faturado" else None,
+                "rental_start": rental_start, "rental_end": rental_start + timedelta(days=rng.randint(1, 15)),
+                "created_at": created_at, "updated_at": approved_at or sent_at or created_at,
+            })
+        with engine.begin() as connection:
+            ids = list(connection.execute(insert(Quote).returning(Quote.id), rows).scalars())
+        first_id = ids[0] if first_id is None else first_id
+        last_id = ids[-1]
+        progress.add(count)
+    progress.finish()
+    return (first_id, last_id) if first_id is not None else None
+
+
+def ensure_audit_partitions(engine, end, days):
+    """No Postgres particionado, cria as partições mensais do período gerado"""
+    import audit_retention
+
+    with engine.begin() as connection:
+        if not audit_retention.is_partitioned(connection):
+            return
+        start = (end - timedelta(days=days)).date().replace(day=1)
+        month = start
+        while month <= end.date():
+            audit_retention.ensure_partition(connection, month)
+            month = audit_retention.add_months(month, 1)
+
+
+def generate_audit(engine, rng, total, users, customer_ids, quote_range, products, services, end, days, batch_size):
+    from sqlalchemy import insert
+    from models import AuditLog
+
+    ensure_audit_partitions(engine, end, days)
+    progress = Progress("Auditoria", total)
+    targets = [("customer", lambda: rng.choice(customer_ids))] * 4
+    if quote_range:
+        targets += [("quote", lambda: rng.randint(*quote_range))] * 4
+    targets += [("product", lambda: rng.choice(products)[0]), ("service", lambda: rng.choice(services)[0])]
+
+    for start, count in batches(total, batch_size):
+        rows = []
+        for _ in range(count):
+            table_name, pick = rng.choice(targets)
+            action = rng.choice(("CREATE", "UPDATE", "UPDATE", "UPDATE", "DELETE"))
+            if action == "UPDATE":
+                changes = {"status": {"old": "ativo", "new": rng.choice(("inativo", "pendente", "ativo"))}}
+            else:
+                changes = {"origem": "carga"}
+            created_at = random_datetime(rng, end, days)
+            rows.append({
+                "table_name": table_name, "record_id": pick(), "action": action,
+                "user_id": rng.choice(users), "changes": changes,
+                "created_at": created_at, "updated_at": created_at,
+            })
+        with engine.begin() as connection:
+            connection.execute(insert(AuditLog), rows)
+        progress.add(count)
+    progress.finish()
+
+
+def generate_feed(engine, rng, total, salespeople, customer_ids, end, days, batch_size):
+    from sqlalchemy import insert
+    from models import FeedItem
+
+    progress = Progress("Feed", total)
+    for start, count in batches(total, batch_size):
+        rows = []
+        for _ in range(count):
+            customer_id = rng.choice(customer_ids)
+            created_at = random_datetime(rng, end, days)
+            rows.append({
+                "content": rng.choice(FEED_TEMPLATES).format(name=f"cliente #{customer_id}"),
+                "icon": rng.choice(("activity", "user-plus", "file-text", "phone")),
+                "user_id": rng.choice(salespeople), "related_customer_id": customer_id,
+                "visibility": "public", "created_at": created_at, "updated_at": created_at,
+            })
+        with engine.begin() as connection:
+            connection.execute(insert(FeedItem), rows)
+        progress.add(count)
+    progress.finish()
+
+
+def finish(engine):
+    """Invalida o cache do catálogo dos workers e atualiza estatísticas do planner"""
+    from sqlalchemy import text
+    from sqlmodel import Session
+    from services.catalog_cache import bump_catalog_version
+
+    with Session(engine) as session:
+        bump_catalog_version(session, "product")
+        bump_catalog_version(session, "service")
+        session.commit()
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE"))
+
+
+def generate(args):
+    from sqlalchemy import select
+    from models import Customer
+
+    engine = get_engine()
+    rng = random.Random(args.seed)
+    end = datetime.combine(args.end_date, datetime.min.time())
+    volumes = {
+        name: getattr(args, name) if getattr(args, name) is not None else int(VOLUMES[name] * args.scale)
+        for name in VOLUMES
+    }
+    print(f"🏭 Gerando em {engine.url.render_as_string(hide_password=True)} (seed {args.seed}): "
+          + ", ".join(f"{name}={count:,}" for name, count in volumes.items()))
+    started = time.perf_counter()
+
+    with engine.begin() as connection:
+        salespeople, managers = generate_users(connection, args.password)
+        products, services = generate_catalog(connection, rng, end)
+
+    customer_ids = generate_customers(
+        engine, rng, volumes["customers"], salespeople, end, args.days, args.batch_size, args.seed
+    )
+    if not customer_ids:
+        # Reaproveita clientes gerados em uma execução anterior
+        with engine.connect() as connection:
+            customer_ids = list(connection.execute(
+                select(Customer.id).where(Customer.created_by_id.in_(salespeople))
+            ).scalars())
+    if not customer_ids and (volumes["quotes"] or volumes["audit"] or volumes["feed"]):
+        print("❌ Sem clientes gerados para relacionar orçamentos, auditoria e feed")
+        sys.exit(1)
+
+    quote_range = generate_quotes(
+        engine, rng, volumes["quotes"], customer_ids, products, services, end, args.days, args.batch_size, args.seed
+    )
+    generate_audit(
+        engine, rng, volumes["audit"], salespeople + managers, customer_ids, quote_range,
+        products, services, end, args.days, args.batch_size
+    )
+    generate_feed(engine, rng, volumes["feed"], salespeople, customer_ids, end, args.days, args.batch_size)
+    finish(engine)
+    print(f"🏁 Concluído em {time.perf_counter() - started:.0f}s")
+
+
+def cleanup():
+    from sqlalchemy import delete, select
+    from models import (
+        AuditLog, Customer, CustomerNote, FeedItem, Notification, Product, Quote, Service,
+        StockReservation, User, UserSupervisor
+    )
+
+    engine = get_engine()
+    with engine.begin() as connection:
+        users = select(User.id).where(User.email.like(f"%@{LOADTEST_DOMAIN}")).scalar_subquery()
+        customers = select(Customer.id).where(Customer.created_by_id.in_(users)).scalar_subquery()
+        quotes = select(Quote.id).where(Quote.customer_id.in_(customers)).scalar_subquery()
+        statements = [
+            ("auditoria", delete(AuditLog).where(AuditLog.user_id.in_(users))),
+            ("feed", delete(FeedItem).where(FeedItem.user_id.in_(users) | FeedItem.related_customer_id.in_(customers))),
+            ("notificações", delete(Notification).where(Notification.user_id.in_(users))),
+            ("reservas", delete(StockReservation).where(StockReservation.quote_id.in_(quotes))),
+            ("orçamentos", delete(Quote).where(Quote.customer_id.in_(customers))),
+            ("notas", delete(CustomerNote).where(CustomerNote.customer_id.in_(customers))),
+            ("clientes", delete(Customer).where(Customer.id.in_(customers))),
+            ("supervisões", delete(UserSupervisor).where(
+                UserSupervisor.user_id.in_(users) | UserSupervisor.supervisor_id.in_(users))),
+            ("usuários", delete(User).where(User.id.in_(users))),
+            ("produtos", delete(Product).where(Product.category == LOADTEST_CATEGORY)),
+            ("serviços", delete(Service).where(Service.category == LOADTEST_CATEGORY)),
+        ]
+        for label, statement in statements:
+            result = connection.execute(statement)
+            print(f"🧹 {label}: {result.rowcount:,}")
+    finish(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para testes de carga")
+    parser.add_argument("--scale", type=float, default=1.0, help="Fração dos volumes padrão")
+    parser.add_argument("--customers", type=int, help=f"Clientes (padrão {VOLUMES['customers']:,} × scale)")
+    parser.add_argument("--quotes", type=int, help=f"Orçamentos (padrão {VOLUMES['quotes']:,} × scale)")
+    parser.add_argument("--audit", type=int, help=f"Linhas de auditoria (padrão {VOLUMES['audit']:,} × scale)")
+    parser.add_argument("--feed", type=int, help=f"Itens de feed (padrão {VOLUMES['feed']:,} × scale)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente (dados reprodutíveis)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Data mais recente dos registros (AAAA-MM-DD)")
+    parser.add_argument("--days", type=int, default=730, help="Período coberto, em dias até --end-date")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Linhas por INSERT/transação")
+    parser.add_argument("--password", default="loadtest", help="Senha dos usuários gerados")
+    parser.add_argument("--cleanup", action="store_true", help="Remove os dados gerados")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+    else:
+        generate(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Teste de Carga
+Executa um perfil de carga roteirizado contra a API e mede vazão e
+latência (p50/p95/p99) por endpoint.
+
+Cenários (executados em sequência, cada um por --duration segundos):
+    login_storm        POST /auth/login simultâneos
+    dashboard_refresh  painel inicial: stats, timeline, receita, feed e notificações
+    quote_creation     POST /quotes/ com itens do catálogo gerado
+    pdf_download       GET /quotes/{id}/pdf
+    websocket_fanout   N conexões em /ws; cada POST /feed/ é entregue a todas
+                       (mede a latência de entrega por conexão)
+
+Uso:
+    # 1. Dados (ver scripts/generate_data.py)
+    python3 scripts/generate_data.py --scale 0.1
+
+    # 2. Carga (API rodando)
+    python3 scripts/load_test.py --concurrency 20 --duration 30
+    python3 scripts/load_test.py --scenarios dashboard_refresh,quote_creation
+
+    # 3. Comparar com uma execução anterior (sai com erro se o p95 piorar)
+    python3 scripts/load_test.py --compare scripts/results/loadtest-20261019-1400-abc1234.json
+
+Os resultados vão para scripts/results/ em JSON, com o commit atual, para
+comparar regressões entre commits.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+# Configurações
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+LOADTEST_DOMAIN = "loadtest.local"
+LOADTEST_CATEGORY = "loadtest"
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SCENARIOS = ["login_storm", "dashboard_refresh", "quote_creation", "pdf_download", "websocket_fanout"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Latências e erros por endpoint (thread-safe)"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.windows = {}
+        self._lock = threading.Lock()
+
+    def record(self, label, elapsed_ms, error=None):
+        """error: status HTTP ou nome da exceção, quando a requisição falhou"""
+        with self._lock:
+            self.samples.setdefault(label, []).append(elapsed_ms)
+            if error is not None:
+                kinds = self.errors.setdefault(label, {})
+                kinds[str(error)] = kinds.get(str(error), 0) + 1
+
+    def request(self, session, method, label, url, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            response = session.request(method, f"{API_URL}{url}", timeout=60, **kwargs)
+            if response.status_code >= 400:
+                error = response.status_code
+        except requests.RequestException as e:
+            response, error = None, type(e).__name__
+        self.record(label, (time.perf_counter() - start) * 1000, error)
+        return response if error is None else None
+
+    def summary(self):
+        endpoints = {}
+        for label, values in sorted(self.samples.items()):
+            window = self.windows.get(label)
+            endpoints[label] = {
+                "count": len(values),
+                "errors": sum(self.errors.get(label, {}).values()),
+                "error_kinds": self.errors.get(label, {}),
+                "throughput_rps": round(len(values) / window, 2) if window else None,
+                "mean_ms": round(statistics.mean(values), 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(max(values), 2),
+            }
+        return endpoints
+
+
+class Context:
+    """Usuários gerados, tokens e ids usados pelos cenários"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.users = [f"vendedor{i}@{LOADTEST_DOMAIN}" for i in range(args.users)]
+        self.tokens = {}
+        self.customers = {}
+        self.quotes = []
+        self.products = []
+        self.services = []
+
+    def login(self, email):
+        response = requests.post(
+            f"{API_URL}/auth/login", data={"username": email, "password": self.args.password}, timeout=60
+        )
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    def prepare(self):
+        print(f"🔑 Autenticando {len(self.users)} usuários gerados...")
+        for email in self.users:
+            try:
+                self.tokens[email] = self.login(email)
+            except requests.HTTPError:
+                print(f"❌ Falha no login de {email}: rode scripts/generate_data.py antes (senha --password)")
+                sys.exit(1)
+
+        headers = self.headers(self.users[0])
+        self.products = self.fetch_items("/products/", headers, category=LOADTEST_CATEGORY)
+        self.services = self.fetch_items("/services/", headers, category=LOADTEST_CATEGORY)
+
+        for email in self.users:
+            self.customers[email] = [c["id"] for c in self.fetch_items("/customers/", self.headers(email), limit=50)]
+        self.quotes = [q["id"] for q in self.fetch_items("/quotes/", headers)]
+
+    @staticmethod
+    def fetch_items(url, headers, **params):
+        params.setdefault("limit", 100)
+        response = requests.get(f"{API_URL}{url}", params=params, headers=headers, timeout=60)
+        response.raise_for_status()
+        return response.json()["items"]
+
+    def headers(self, email):
+        return {"Authorization": f"Bearer {self.tokens[email]}"}
+
+    def user_for(self, worker):
+        return self.users[worker % len(self.users)]
+
+
+# --- Cenários ---
+
+def login_storm(ctx, recorder, worker, rng, session):
+    email = ctx.user_for(worker)
+    recorder.request(session, "POST", "POST /auth/login", "/auth/login",
+                     data={"username": email, "password": ctx.args.password})
+
+
+def dashboard_refresh(ctx, recorder, worker, rng, session):
+    headers = ctx.headers(ctx.user_for(worker))
+    for url in ("/dashboard/stats", "/dashboard/quotes-timeline", "/dashboard/revenue-by-month",
+                "/feed/", "/notifications/"):
+        recorder.request(session, "GET", f"GET {url}", url, headers=headers)
+
+
+def quote_creation(ctx, recorder, worker, rng, session):
+    email = ctx.user_for(worker)
+    customers = ctx.customers.get(email)
+    if not customers or not (ctx.products or ctx.services):
+        return
+    items = []
+    for _ in range(rng.choice((1, 2, 3, 5, 8))):
+        if ctx.products and (rng.random() < 0.7 or not ctx.services):
+            item = rng.choice(ctx.products)
+            item_type, price = "product", item.get("price_daily", 0.0)
+        else:
+            item = rng.choice(ctx.services)
+            item_type, price = "service", item.get("price_base", 0.0)
+        quantity = rng.randint(1, 5)
+        items.append({"type": item_type, "item_id": item["id"], "name": item["name"],
+                      "quantity": quantity, "unit_price": price, "subtotal": round(price * quantity, 2)})
+    recorder.request(session, "POST", "POST /quotes/", "/quotes/",
+                     json={"customer_id": rng.choice(customers), "items": items}, headers=ctx.headers(email))
+
+
+def pdf_download(ctx, recorder, worker, rng, session):
+    if not ctx.quotes:
+        return
+    recorder.request(session, "GET", "GET /quotes/{id}/pdf", f"/quotes/{rng.choice(ctx.quotes)}/pdf",
+                     headers=ctx.headers(ctx.users[0]))
+
+
+def run_scenario(ctx, recorder, name, step):
+    """Executa `step` em --concurrency threads durante --duration segundos"""
+    deadline = time.perf_counter() + ctx.args.duration
+
+    def worker(index):
+        rng = random.Random(ctx.args.seed * 1000 + index)
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                step(ctx, recorder, index, rng, session)
+
+    before = {label: len(values) for label, values in recorder.samples.items()}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=ctx.args.concurrency) as pool:
+        list(pool.map(worker, range(ctx.args.concurrency)))
+    elapsed = time.perf_counter() - started
+    for label, values in recorder.samples.items():
+        if len(values) != before.get(label, 0):
+            recorder.windows[label] = recorder.windows.get(label, 0) + elapsed
+    requests_done = sum(len(v) for v in recorder.samples.values()) - sum(before.values())
+    return {"duration_s": round(elapsed, 2), "requests": requests_done,
+            "throughput_rps": round(requests_done / elapsed, 2) if elapsed else None}
+
+
+def websocket_fanout(ctx, recorder):
+    """Conecta --ws-clients sockets e mede a entrega de cada POST /feed/ a todos"""
+    from websockets.sync.client import connect
+
+    ws_url = API_URL.replace("http", "ws", 1)
+    sent_at = {}
+    sockets = []
+    stop = threading.Event()
+
+    def receive(connection):
+        while not stop.is_set():
+            try:
+                message = json.loads(connection.recv(timeout=1))
+            except TimeoutError:
+                continue
+            except Exception:
+                return
+            if message.get("type") != "feed_update":
+                continue
+            marker = message.get("post", {}).get("content", "").rpartition("#")[2]
+            if marker in sent_at:
+                recorder.record("WS feed_update delivery", (time.perf_counter() - sent_at[marker]) * 1000)
+
+    posts = 0
+    with ExitStack() as stack:
+        for i in range(ctx.args.ws_clients):
+            token = ctx.tokens[ctx.user_for(i)]
+            sockets.append(stack.enter_context(connect(f"{ws_url}/ws?token={token}", open_timeout=30)))
+        for connection in sockets:
+            threading.Thread(target=receive, args=(connection,), daemon=True).start()
+
+        started = time.perf_counter()
+        deadline = started + ctx.args.duration
+        with requests.Session() as session:
+            headers = ctx.headers(ctx.users[0])
+            while time.perf_counter() < deadline:
+                marker = f"{os.getpid()}-{posts}"
+                sent_at[marker] = time.perf_counter()
+                recorder.request(session, "POST", "POST /feed/", "/feed/",
+                                 json={"content": f"Teste de carga #{marker}"}, headers=headers)
+                posts += 1
+                time.sleep(ctx.args.ws_interval)
+        time.sleep(2)  # Entregas em trânsito
+        stop.set()
+
+    elapsed = time.perf_counter() - started
+    recorder.windows["POST /feed/"] = elapsed
+    recorder.windows["WS feed_update delivery"] = elapsed
+    delivered = len(recorder.samples.get("WS feed_update delivery", []))
+    expected = posts * len(sockets)
+    return {"duration_s": round(elapsed, 2), "posts": posts, "clients": len(sockets),
+            "delivered": delivered, "expected": expected,
+            "delivery_ratio": round(delivered / expected, 4) if expected else None}
+
+
+# --- Resultados ---
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.check_output(
+                ["git", *args], cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.DEVNULL, text=True
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "--short", "HEAD"), "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def print_table(endpoints):
+    print(f"\n{'endpoint':<34}{'req':>8}{'erros':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for label, data in endpoints.items():
+        rps = f"{data['throughput_rps']:.1f}" if data["throughput_rps"] is not None else "-"
+        print(f"{label:<34}{data['count']:>8}{data['errors']:>7}{rps:>9}"
+              f"{data['p50_ms']:>9.1f}{data['p95_ms']:>9.1f}{data['p99_ms']:>9.1f}")
+
+
+def compare(result, baseline_path, max_regression):
+    """Compara p95 e vazão com uma execução anterior; retorna True se houve regressão"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparação com {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    print(f"{'endpoint':<34}{'p95 antes':>11}{'p95 agora':>11}{'variação':>10}")
+    regressed = False
+    for label, data in result["endpoints"].items():
+        before = baseline["endpoints"].get(label)
+        if not before:
+            continue
+        change = (data["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        flag = ""
+        if change > max_regression:
+            flag, regressed = " ❌", True
+        print(f"{label:<34}{before['p95_ms']:>11.1f}{data['p95_ms']:>11.1f}{change:>+9.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Cenários separados por vírgula")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos por cenário")
+    parser.add_argument("--concurrency", type=int, default=10, help="Threads simultâneas por cenário")
+    parser.add_argument("--users", type=int, default=20, help="Vendedores gerados usados na carga")
+    parser.add_argument("--password", default="loadtest", help="Senha dos usuários gerados")
+    parser.add_argument("--ws-clients", type=int, default=100, help="Conexões WebSocket no fan-out")
+    parser.add_argument("--ws-interval", type=float, default=0.2, help="Intervalo entre posts no fan-out (s)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente das escolhas aleatórias")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: scripts/results/)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Piora máxima de p95 aceita na comparação (%%)")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    ctx = Context(args)
+    ctx.prepare()
+    recorder = Recorder()
+    steps = {"login_storm": login_storm, "dashboard_refresh": dashboard_refresh,
+             "quote_creation": quote_creation, "pdf_download": pdf_download}
+
+    scenario_results = {}
+    for name in scenarios:
+        print(f"🚀 {name} ({args.duration:.0f}s)...")
+        if name == "websocket_fanout":
+            scenario_results[name] = websocket_fanout(ctx, recorder)
+        else:
+            scenario_results[name] = run_scenario(ctx, recorder, name, steps[name])
+
+    result = {
+        "meta": {
+            **git_info(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "api_url": API_URL,
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "scenarios": scenario_results,
+        "endpoints": recorder.summary(),
+    }
+    print_table(result["endpoints"])
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M")
+        output = os.path.join(RESULTS_DIR, f"loadtest-{stamp}-{result['meta']['commit'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados em {output}")
+
+    if args.compare and compare(result, args.compare, args.max_regression):
+        print(f"❌ p95 piorou mais de {args.max_regression:.0f}% em algum endpoint")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()